@@ -0,0 +1,244 @@
+# adaptadores.py
+
+import heapq
+import math
+
+from metricas import Metricas
+
+# Cada adaptador importa el módulo de su estructura al crearse, así importar
+# este archivo (por ejemplo desde app.py) no carga las cuatro estructuras.
+
+
+class IndiceEspacial:
+    """
+    Interfaz común sobre las cuatro estructuras del proyecto.
+    Cada estructura tiene su propia firma de consulta (tuplas de límites,
+    Rectangle de centro y semiancho, MBR, nodo o tupla como resultado);
+    los adaptadores las unifican para poder compararlas y combinarlas:
+
+    - insertar(punto, id=None) -> bool
+    - buscarPunto(punto) -> bool
+    - buscarEnRango(xMin, xMax, yMin, yMax, modo='puntos') -> lista de puntos, o
+      ids / arreglo de ids / conteo según `modo` (ver utils.MODOS_RESULTADO)
+    - iterarEnRango(xMin, xMax, yMin, yMax, limite=None) -> generador de los
+      mismos puntos que buscarEnRango, a medida que se encuentran
+    - existeEnRango(xMin, xMax, yMin, yMax) -> bool, se detiene en el primer punto
+    - buscarVecinoMasCercano(punto) -> punto o None
+    - buscarKVecinos(punto, k) -> lista de hasta k puntos, del más cercano al más lejano
+    - cargarMasivo(puntos, ids=None) -> cantidad insertada
+
+    Los puntos insertados con id se devuelven como utils.PuntoId (con `.id`).
+
+    La estructura original queda accesible en `self.estructura`.
+    Las métricas por consulta (ver metricas.py) se activan con activarMetricas().
+    """
+    nombre = None
+    # Si conviene ordenar los lotes por código Morton antes de cargarMasivo (ver bufferEscritura.py)
+    ordenarLotes = True
+    # Si la estructura puede descartar puntos dentro de su espacio (ver concurrencia.py)
+    puedeRechazar = False
+    # Si cargarMasivo es más rápido que insertar de a uno (si no, EscritorBuffer escribe directo)
+    cargaPorLotes = False
+
+    def __init__(self, x_min, x_max, y_min, y_max):
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.estructura = None
+
+    def insertar(self, punto, id=None):
+        raise NotImplementedError
+
+    def buscarPunto(self, punto):
+        raise NotImplementedError
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        raise NotImplementedError
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        raise NotImplementedError
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, limite=1):
+            return True
+        return False
+
+    def buscarVecinoMasCercano(self, punto):
+        raise NotImplementedError
+
+    def buscarKVecinos(self, punto, k):
+        """
+        k vecinos más cercanos mediante consultas de rango con una ventana cuadrada
+        que se duplica hasta contener k puntos a distancia no mayor que su semilado
+        (entonces ningún punto fuera de la ventana puede estar más cerca).
+        Supone que los puntos están dentro del espacio del índice.
+        """
+        if k <= 0:
+            return []
+        px, py = punto
+        radio = max(self.x_max - self.x_min, self.y_max - self.y_min) / 64 or 1.0
+        while True:
+            candidatos = kMasCercanos(punto, k, self.buscarEnRango(px - radio, px + radio, py - radio, py + radio))
+            if len(candidatos) == k and math.dist(candidatos[-1], punto) <= radio:
+                return candidatos
+            if (px - radio <= self.x_min and px + radio >= self.x_max and
+                    py - radio <= self.y_min and py + radio >= self.y_max):
+                return candidatos
+            radio *= 2
+
+    def cargarMasivo(self, puntos, ids=None):
+        return self.estructura.cargarMasivo(puntos, ids)
+
+    @property
+    def metricas(self):
+        return self.estructura.metricas
+
+    def activarMetricas(self, historial=1000):
+        self.estructura.metricas = Metricas(historial)
+        return self.estructura.metricas
+
+    def desactivarMetricas(self):
+        self.estructura.metricas = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.nombre})"
+
+
+class IndiceKD(IndiceEspacial):
+    nombre = "KD-Tree"
+
+    def __init__(self, x_min, x_max, y_min, y_max):
+        super().__init__(x_min, x_max, y_min, y_max)
+        from kdTree import ArbolKD
+        self.estructura = ArbolKD()
+
+    def insertar(self, punto, id=None):
+        self.estructura.insertar(punto, id)
+        return True
+
+    def buscarPunto(self, punto):
+        return self.estructura.buscarPunto(punto)
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        return self.estructura.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        return self.estructura.iterarEnRango(xMin, xMax, yMin, yMax, limite)
+
+    def buscarVecinoMasCercano(self, punto):
+        nodo = self.estructura.buscarVecinoMasCercano(punto)
+        return nodo.punto if nodo else None
+
+
+class IndiceQuadTree(IndiceEspacial):
+    nombre = "Quadtree"
+
+    def __init__(self, x_min, x_max, y_min, y_max, capacidad=4):
+        super().__init__(x_min, x_max, y_min, y_max)
+        from quadTree import QuadTree, RangoCerrado, Rectangle
+        self._RangoCerrado = RangoCerrado
+        # El Rectangle del Quadtree es semiabierto: se agranda un poco el borde
+        # superior para que los puntos sobre x_max / y_max también se indexen.
+        margen_x = (x_max - x_min) * 1e-9 or 1e-9
+        margen_y = (y_max - y_min) * 1e-9 or 1e-9
+        boundary = Rectangle((x_min + x_max) / 2 + margen_x / 2, (y_min + y_max) / 2 + margen_y / 2,
+                               (x_max - x_min + margen_x) / 2, (y_max - y_min + margen_y) / 2)
+        self.estructura = QuadTree(boundary, capacidad)
+
+    def insertar(self, punto, id=None):
+        return bool(self.estructura.insertar(punto, id))
+
+    def buscarPunto(self, punto):
+        return self.estructura.buscarPunto(punto) is not None
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        return self.estructura.buscarEnRango(self._rango(xMin, xMax, yMin, yMax), modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        return self.estructura.iterarEnRango(self._rango(xMin, xMax, yMin, yMax), limite)
+
+    def _rango(self, xMin, xMax, yMin, yMax):
+        # Cerrado como en los demás adaptadores, aunque el Rectangle del Quadtree sea semiabierto
+        return self._RangoCerrado(xMin, xMax, yMin, yMax)
+
+    def buscarVecinoMasCercano(self, punto):
+        vecino, _ = self.estructura.buscarVecinoMasCercano(punto)
+        return vecino
+
+    def buscarKVecinos(self, punto, k):
+        return [p for p, _ in self.estructura.buscarKVecinos(punto, k)]
+
+
+class IndiceGridFile(IndiceEspacial):
+    nombre = "Grid File"
+    ordenarLotes = False  # cargarMasivo ya agrupa por celda
+    puedeRechazar = True  # Los buckets llenos descartan los puntos que no caben
+
+    def __init__(self, x_min, x_max, y_min, y_max, grid_size_x=5, grid_size_y=5, bucket_capacity=4):
+        super().__init__(x_min, x_max, y_min, y_max)
+        from gridFile import GridFile
+        self.estructura = GridFile(x_min, x_max, y_min, y_max, grid_size_x, grid_size_y, bucket_capacity)
+
+    def insertar(self, punto, id=None):
+        return self.estructura.insertar(punto, id)
+
+    def buscarPunto(self, punto):
+        return self.estructura.buscarPunto(punto)
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        return self.estructura.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        return self.estructura.iterarEnRango(xMin, xMax, yMin, yMax, limite)
+
+    def buscarVecinoMasCercano(self, punto):
+        return self.estructura.buscarVecinoMasCercano(punto)
+
+
+class IndiceRTree(IndiceEspacial):
+    nombre = "R-Tree"
+    cargaPorLotes = True  # Reparto del lote por nodos y reempaquetado STR
+
+    def __init__(self, x_min, x_max, y_min, y_max, max_entries=4, min_entries=2):
+        super().__init__(x_min, x_max, y_min, y_max)
+        from rTree import RTree, Rectangle
+        self._Rectangle = Rectangle
+        self.estructura = RTree(max_entries=max_entries, min_entries=min_entries)
+
+    def insertar(self, punto, id=None):
+        self.estructura.insertar(punto, id)
+        return True
+
+    def buscarPunto(self, punto):
+        return self.estructura.existeEnRango(self._Rectangle(punto[0], punto[1], punto[0], punto[1]))
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        return self.estructura.buscarEnRango(self._Rectangle(xMin, yMin, xMax, yMax), modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        return self.estructura.iterarEnRango(self._Rectangle(xMin, yMin, xMax, yMax), limite)
+
+    def buscarVecinoMasCercano(self, punto):
+        return self.estructura.buscarVecinoMasCercano(punto)
+
+
+def kMasCercanos(punto, k, puntos):
+    """Los k puntos de `puntos` más cercanos a `punto`, ordenados por distancia."""
+    return heapq.nsmallest(k, puntos, key=lambda p: math.dist(p, punto))
+
+
+# Adaptadores disponibles, con los mismos nombres que usa app.py
+INDICES = {
+    IndiceKD.nombre: IndiceKD,
+    IndiceQuadTree.nombre: IndiceQuadTree,
+    IndiceGridFile.nombre: IndiceGridFile,
+    IndiceRTree.nombre: IndiceRTree,
+}
+
+
+def crearIndice(nombre, x_min, x_max, y_min, y_max, **parametros):
+    """Crea el adaptador de la estructura `nombre` con sus parámetros propios."""
+    if nombre not in INDICES:
+        raise ValueError(f"Estructura desconocida: {nombre!r}. Opciones: {', '.join(INDICES)}")
+    return INDICES[nombre](x_min, x_max, y_min, y_max, **parametros)
@@ -1,18 +1,83 @@
 # app.py
 
-import streamlit as st
-from kdTree import ArbolKD
-from quadTree import QuadTree, Rectangle as QTRectangle # Renombrar para evitar conflicto con RTree.Rectangle
-from gridFile import GridFile
-from rTree import RTree, Rectangle as RTRectangle # Importa RTree y su Rectangle, renombrado para evitar conflicto
+import importlib
 
-# Importaciones de visualizadores separados
-from visualizadorKdTree import graficarPuntos as graficarPuntosKd, graficarConsulta as graficarConsultaKd
-from visualizadorQuadTree import graficarConQuadTree, graficarConsultaQuadTree
-from visualizadorGridFile import graficarConGridFile, graficarConsultaGridFile
-from visualizadorRTree import graficarConRTree, graficarConsultaRTree # Importa las funciones de visualización para R-Tree
+import streamlit as st
 
-from utils import generarPuntosAleatorios, esPuntoValido
+from utils import esPuntoValido
+from datos import GENERADORES, aTuplas
+from adaptadores import crearIndice
+from cacheConsultas import CacheConsultas
+
+# Visualizador de cada estructura. Cada visualizador (y el módulo de su
+# estructura) se importa recién cuando se elige la estructura, y matplotlib
+# recién cuando se dibuja la primera figura (ver visualizadorComun.pyplot).
+# Medición del arranque: python arranque.py
+VISUALIZADORES = {
+    "KD-Tree": "visualizadorKdTree",
+    "Quadtree": "visualizadorQuadTree",
+    "Grid File": "visualizadorGridFile",
+    "R-Tree": "visualizadorRTree",
+}
+
+def cargarVisualizador(nombre):
+    return importlib.import_module(VISUALIZADORES[nombre])
+
+# Muestra junto al resultado el trabajo que hizo la última consulta (ver metricas.py);
+# si el resultado salió de la caché de consultas, lo indica en su lugar
+def mostrarMetricas(metricas, cache=None):
+    if cache is not None and cache.ultimaFueAcierto:
+        e = cache.estadisticas()
+        st.caption(f"Resultado servido desde la caché · Aciertos: {e['aciertos']} · Fallos: {e['fallos']} · "
+                   f"Entradas: {e['entradas']}/{e['capacidad']}")
+        return
+    c = metricas.ultima
+    if c is None:
+        return
+    st.caption(f"Nodos/buckets visitados: {c.nodos_visitados} · Puntos probados: {c.puntos_probados} · "
+               f"Distancias calculadas: {c.distancias} · Podas: {c.podas} · Tiempo: {c.tiempo * 1e3:.3f} ms")
+
+# Límites del espacio que se dibuja y que usan los índices: los puntos más un margen
+def limitesEspacio(puntos):
+    if not puntos:
+        return 10, 10
+    return max(10, int(max(p[0] for p in puntos) + 5)), max(10, int(max(p[1] for p in puntos) + 5))
+
+# Sliders de cada estructura: (clave en session_state, clave del slider, parámetro de crearIndice)
+SLIDERS = {
+    "Quadtree": [("quadtree_capacidad", "quadtree_capacidad_slider", "capacidad")],
+    "Grid File": [("grid_size_x", "grid_x_global_slider", "grid_size_x"),
+                  ("grid_size_y", "grid_y_global_slider", "grid_size_y"),
+                  ("bucket_capacity", "grid_bucket_global_slider", "bucket_capacity")],
+    "R-Tree": [("rtree_max_entries", "rtree_max_entries_slider", "max_entries"),
+               ("rtree_min_entries", "rtree_min_entries_slider", "min_entries")],
+}
+
+# Ajusta los parámetros de la estructura con asesor.py sobre los puntos actuales
+# y guarda la recomendación para mostrar la evidencia junto a los sliders
+def aplicarAsesor(nombre):
+    from asesor import recomendarParametros  # Solo se carga si se usa el asesor
+    limX, limY = limitesEspacio(st.session_state.puntos)
+    recomendacion = recomendarParametros(nombre, st.session_state.puntos, espacio=(0, limX, 0, limY))
+    for estado, slider, parametro in SLIDERS[nombre]:
+        st.session_state[estado] = recomendacion["parametros"][parametro]
+        # Al quitar su estado, el slider se vuelve a crear con el valor nuevo
+        st.session_state.pop(slider, None)
+    st.session_state.asesor = recomendacion
+
+def mostrarAsesor(nombre):
+    st.button("Ajustar con el asesor", key=f"asesor_{nombre}", on_click=aplicarAsesor, args=(nombre,),
+              disabled=not st.session_state.puntos,
+              help="Prueba varias configuraciones sobre una muestra de los puntos y aplica la más rápida")
+    recomendacion = st.session_state.get('asesor')
+    if recomendacion is None or recomendacion["estructura"] != nombre:
+        return
+    st.caption(f"Recomendado: {recomendacion['parametros']} · {recomendacion['costo_us']:.1f} µs por consulta "
+               f"(muestra de {recomendacion['muestra']} de {recomendacion['n']} puntos)")
+    st.dataframe([{"parámetros": str(fila["parametros"]), "estado": fila["estado"],
+                   **{clave: round(valor, 1) for clave, valor in fila.items()
+                      if clave not in ("parametros", "estado")}}
+                  for fila in recomendacion["evidencia"]])
 
 # Inicializa el estado de sesión
 if 'puntos' not in st.session_state:
@@ -20,6 +85,10 @@ if 'puntos' not in st.session_state:
 if 'estructura' not in st.session_state:
     st.session_state.estructura = "KD-Tree"
 
+# Capacidad de los nodos del Quadtree
+if 'quadtree_capacidad' not in st.session_state:
+    st.session_state.quadtree_capacidad = 4
+
 # Nuevos estados para la configuración del Grid File
 if 'grid_size_x' not in st.session_state:
     st.session_state.grid_size_x = 5
@@ -46,22 +115,30 @@ st.session_state.estructura = st.radio(
     horizontal=True,
     key="selector_estructura"
 )
+vis = cargarVisualizador(st.session_state.estructura)
 st.markdown("---")
 
 # Mover la configuración de Grid File y R-Tree a la barra lateral, ligada a la selección de estructura
 with st.sidebar:
     st.header("Configuración de Estructuras")
-    if st.session_state.estructura == "Grid File":
+    # Los máximos de los sliders se amplían si el asesor recomendó un valor mayor
+    if st.session_state.estructura == "Quadtree":
+        st.subheader("Quadtree")
+        st.session_state.quadtree_capacidad = st.slider("Capacidad por nodo", 1, max(16, st.session_state.quadtree_capacidad), st.session_state.quadtree_capacidad, key="quadtree_capacidad_slider")
+        mostrarAsesor("Quadtree")
+    elif st.session_state.estructura == "Grid File":
         st.subheader("Grid File")
-        st.session_state.grid_size_x = st.slider("Celdas X (Grid)", 2, 20, st.session_state.grid_size_x, key="grid_x_global_slider")
-        st.session_state.grid_size_y = st.slider("Celdas Y (Grid)", 2, 20, st.session_state.grid_size_y, key="grid_y_global_slider")
-        st.session_state.bucket_capacity = st.slider("Capacidad Bucket (Grid)", 1, 10, st.session_state.bucket_capacity, key="grid_bucket_global_slider")
+        st.session_state.grid_size_x = st.slider("Celdas X (Grid)", 1, max(20, st.session_state.grid_size_x), st.session_state.grid_size_x, key="grid_x_global_slider")
+        st.session_state.grid_size_y = st.slider("Celdas Y (Grid)", 1, max(20, st.session_state.grid_size_y), st.session_state.grid_size_y, key="grid_y_global_slider")
+        st.session_state.bucket_capacity = st.slider("Capacidad Bucket (Grid)", 1, max(10, st.session_state.bucket_capacity), st.session_state.bucket_capacity, key="grid_bucket_global_slider")
+        mostrarAsesor("Grid File")
     elif st.session_state.estructura == "R-Tree":
         st.subheader("R-Tree")
-        st.session_state.rtree_max_entries = st.slider("Máx. Entradas/Nodo (M)", 2, 10, st.session_state.rtree_max_entries, key="rtree_max_entries_slider")
+        st.session_state.rtree_max_entries = st.slider("Máx. Entradas/Nodo (M)", 2, max(10, st.session_state.rtree_max_entries), st.session_state.rtree_max_entries, key="rtree_max_entries_slider")
         # Asegurarse que min_entries <= max_entries / 2
         max_m_val = max(1, st.session_state.rtree_max_entries // 2)
-        st.session_state.rtree_min_entries = st.slider("Mín. Entradas/Nodo (m)", 1, max_m_val, st.session_state.rtree_min_entries, key="rtree_min_entries_slider")
+        st.session_state.rtree_min_entries = st.slider("Mín. Entradas/Nodo (m)", 1, max_m_val, min(st.session_state.rtree_min_entries, max_m_val), key="rtree_min_entries_slider")
+        mostrarAsesor("R-Tree")
 
 
 # ======================== SECCIÓN: AGREGAR PUNTOS ========================
@@ -81,19 +158,26 @@ with col3:
         nuevo = (round(xManual, 1), round(yManual, 1))
         if esPuntoValido(nuevo):
             st.session_state.puntos.append(nuevo)
+            if 'cache_consultas' in st.session_state:
+                st.session_state.cache_consultas.invalidar(nuevo)
             st.success(f"Agregado punto {nuevo}")
             st.rerun()
 
 # ----------- Generar puntos aleatorios -----------
-col4, col5 = st.columns([3, 1])
+col4, col5, col6 = st.columns([2, 1.5, 1])
 with col4:
-    cantidad = st.slider("Cantidad de puntos a generar:", 1, 50, 5)
+    cantidad = st.number_input("Cantidad de puntos a generar:", 1, 200000, 5, step=1)
 with col5:
+    distribucion = st.selectbox("Distribución", list(GENERADORES), key="distribucion")
+with col6:
     st.write("") # Espaciador
     st.write("") # Espaciador
     if st.button("Generar"):
-        nuevos = generarPuntosAleatorios(cantidad, 0, 20, 0, 20)
+        # Generación vectorizada (datos.py), redondeada a 1 decimal como los puntos manuales
+        nuevos = aTuplas(GENERADORES[distribucion](cantidad, 0, 20, 0, 20, decimales=1))
         st.session_state.puntos.extend(nuevos)
+        if 'cache_consultas' in st.session_state:
+            st.session_state.cache_consultas.invalidarPuntos(nuevos)
         st.success(f"{cantidad} puntos generados")
         st.rerun()
 st.markdown("---")
@@ -103,36 +187,67 @@ st.markdown("---")
 
 st.subheader("3. Visualización del espacio y la estructura")
 
-if st.session_state.puntos:
-    maxX = max(p[0] for p in st.session_state.puntos)
-    maxY = max(p[1] for p in st.session_state.puntos)
-    limX = max(10, int(maxX + 5))
-    limY = max(10, int(maxY + 5))
-else:
-    limX = limY = 10
+limX, limY = limitesEspacio(st.session_state.puntos)
+
+# Parámetros de crearIndice de la estructura, tomados de sus sliders
+def parametrosDe(nombre):
+    return {parametro: st.session_state[estado] for estado, _, parametro in SLIDERS.get(nombre, [])}
+
+# Índice de la estructura (para dibujar y consultar) y su caché de resultados.
+# Ambos se conservan entre reejecuciones mientras no cambie la configuración:
+# los puntos agregados desde la última vez se cargan en el mismo índice, y la
+# caché solo descarta las entradas afectadas (ver cacheConsultas.py).
+def indiceConCache(nombre, **parametros):
+    puntos = st.session_state.puntos
+    firma = (nombre, tuple(sorted(parametros.items())), limX, limY)
+    if st.session_state.get('cache_firma') != firma or st.session_state.indice_cargados > len(puntos):
+        indice = crearIndice(nombre, 0, limX, 0, limY, **parametros)
+        indice.cargarMasivo(puntos)
+        indice.activarMetricas()
+        st.session_state.indice_consultas = indice
+        st.session_state.cache_consultas = CacheConsultas(indice, capacidad=256)
+        st.session_state.cache_firma = firma
+    elif st.session_state.indice_cargados < len(puntos):
+        st.session_state.indice_consultas.cargarMasivo(puntos[st.session_state.indice_cargados:])
+    st.session_state.indice_cargados = len(puntos)
+    return st.session_state.indice_consultas, st.session_state.cache_consultas
+
+# Ventana visible y nivel de detalle: para índices grandes solo se dibuja la región
+# ampliada y la estructura hasta cierta profundidad (o número de celdas en el Grid File)
+ventana = None
+profundidad = None
+max_celdas = None
+with st.sidebar:
+    st.header("Vista")
+    if st.checkbox("Ampliar una región", key="zoom_activo"):
+        rangoX = st.slider("Rango X visible", 0.0, float(limX), (0.0, float(limX)), key="zoom_x")
+        rangoY = st.slider("Rango Y visible", 0.0, float(limY), (0.0, float(limY)), key="zoom_y")
+        ventana = (rangoX[0], rangoX[1], rangoY[0], rangoY[1])
+    if st.session_state.estructura == "Grid File":
+        max_celdas = st.slider("Máx. celdas dibujadas", 1, 400, 400, key="lod_max_celdas")
+    elif st.session_state.estructura in ("Quadtree", "R-Tree"):
+        profundidad = st.slider("Profundidad máxima dibujada (0 = sin límite)", 0, 20, 0, key="lod_profundidad") or None
 
 # Dibuja el gráfico según la estructura seleccionada
-if st.session_state.estructura == "Quadtree" and st.session_state.puntos:
-    boundary = QTRectangle(limX / 2, limY / 2, limX / 2, limY / 2) # Usar QTRectangle
-    qtree = QuadTree(boundary, 4)
-    for p in st.session_state.puntos:
-        qtree.insertar(p)
-    fig = graficarConQuadTree(st.session_state.puntos, qtree, xMax=limX, yMax=limY)
-elif st.session_state.estructura == "Grid File" and st.session_state.puntos:
-    # Usar los valores guardados en st.session_state
-    grid_file = GridFile(0, limX, 0, limY, st.session_state.grid_size_x, st.session_state.grid_size_y, st.session_state.bucket_capacity)
-    for p in st.session_state.puntos:
-        grid_file.insertar(p) # Los puntos que no caben no se insertan
-    fig = graficarConGridFile(st.session_state.puntos, grid_file, xMax=limX, yMax=limY)
-elif st.session_state.estructura == "R-Tree" and st.session_state.puntos: # Lógica para R-Tree
-    rtree = RTree(max_entries=st.session_state.rtree_max_entries, min_entries=st.session_state.rtree_min_entries)
-    for p in st.session_state.puntos:
-        rtree.insertar(p)
-    fig = graficarConRTree(st.session_state.puntos, rtree, xMax=limX, yMax=limY)
-else: # KD-Tree o no hay puntos
-    fig = graficarPuntosKd(st.session_state.puntos, xMax=limX, yMax=limY)
-
-st.pyplot(fig)
+fig = None
+if not st.session_state.puntos:
+    # Sin puntos no hay nada que dibujar y matplotlib todavía no se importa
+    st.info("Agrega o genera puntos para ver el espacio y la estructura.")
+elif st.session_state.estructura == "Quadtree":
+    qtree = indiceConCache("Quadtree", **parametrosDe("Quadtree"))[0].estructura
+    fig = vis.graficarConQuadTree(st.session_state.puntos, qtree, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
+elif st.session_state.estructura == "Grid File":
+    # Los puntos que no caben en su bucket no están en el índice
+    grid_file = indiceConCache("Grid File", **parametrosDe("Grid File"))[0].estructura
+    fig = vis.graficarConGridFile(st.session_state.puntos, grid_file, xMax=limX, yMax=limY, ventana=ventana, max_celdas=max_celdas)
+elif st.session_state.estructura == "R-Tree": # Lógica para R-Tree
+    rtree = indiceConCache("R-Tree", **parametrosDe("R-Tree"))[0].estructura
+    fig = vis.graficarConRTree(st.session_state.puntos, rtree, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
+else: # KD-Tree
+    fig = vis.graficarPuntos(st.session_state.puntos, xMax=limX, yMax=limY, ventana=ventana)
+
+if fig is not None:
+    st.pyplot(fig)
 
 # ======================== SECCIÓN: CONSULTAS ========================
 
@@ -142,9 +257,7 @@ if st.session_state.puntos:
 
     # -------- Lógica para KD-Tree --------
     if st.session_state.estructura == "KD-Tree":
-        arbol = ArbolKD()
-        for p in st.session_state.puntos:
-            arbol.insertar(p)
+        indice, cache = indiceConCache("KD-Tree")
 
         tipoConsulta = st.selectbox("Selecciona tipo de consulta", ["Consulta puntual", "Consulta por rango", "Vecino más cercano"], key="kd_consulta")
 
@@ -156,11 +269,12 @@ if st.session_state.puntos:
                 y = st.number_input("Y", key="busqY_kd", step=0.5)
             if st.button("Buscar punto exacto", key="btn_punto_kd"):
                 punto = (x, y)
-                encontrado = arbol.buscarPunto(punto)
+                encontrado = cache.buscarPunto(punto)
                 resultado = [punto] if encontrado else []
-                fig = graficarConsultaKd(st.session_state.puntos, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY)
+                fig = vis.graficarConsulta(st.session_state.puntos, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY, ventana=ventana)
                 st.pyplot(fig)
                 st.success("Punto encontrado." if encontrado else "Punto no encontrado.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Consulta por rango":
             col1, col2 = st.columns(2)
@@ -171,10 +285,11 @@ if st.session_state.puntos:
                 yMin = st.number_input("Y Min", value=2.0, step=0.5, key="rangoYmin_kd")
                 yMax = st.number_input("Y Max", value=8.0, step=0.5, key="rangoYmax_kd")
             if st.button("Buscar en rango", key="btn_rango_kd"):
-                resultados = arbol.buscarEnRango(xMin, xMax, yMin, yMax)
-                fig = graficarConsultaKd(st.session_state.puntos, puntosResultado=resultados, rect=(xMin, xMax, yMin, yMax), xMax=limX, yMax=limY)
+                resultados = cache.buscarEnRango(xMin, xMax, yMin, yMax)
+                fig = vis.graficarConsulta(st.session_state.puntos, puntosResultado=resultados, rect=(xMin, xMax, yMin, yMax), xMax=limX, yMax=limY, ventana=ventana)
                 st.pyplot(fig)
                 st.success(f"{len(resultados)} punto(s) en el rango.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Vecino más cercano":
             colx, coly = st.columns(2)
@@ -184,17 +299,17 @@ if st.session_state.puntos:
                 y = st.number_input("Y consulta", key="nnY_kd", step=0.5)
             if st.button("Buscar vecino más cercano", key="btn_nn_kd"):
                 puntoRef = (x, y)
-                nodo = arbol.buscarVecinoMasCercano(puntoRef)
-                fig = graficarConsultaKd(st.session_state.puntos, puntoConsulta=puntoRef, vecinoCercano=nodo.punto if nodo else None, xMax=limX, yMax=limY)
+                vecino = cache.buscarVecinoMasCercano(puntoRef)
+                fig = vis.graficarConsulta(st.session_state.puntos, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY, ventana=ventana)
                 st.pyplot(fig)
-                st.success(f"Vecino más cercano: {nodo.punto}" if nodo else "No hay puntos en el árbol.")
+                st.success(f"Vecino más cercano: {vecino}" if vecino else "No hay puntos en el árbol.")
+                mostrarMetricas(indice.metricas, cache)
 
     # -------- Lógica para Quadtree --------
     elif st.session_state.estructura == "Quadtree":
-        boundary = QTRectangle(limX / 2, limY / 2, limX / 2, limY / 2) # Usar QTRectangle
-        qtree = QuadTree(boundary, 4)
-        for p in st.session_state.puntos:
-            qtree.insertar(p)
+        indice, cache = indiceConCache("Quadtree", **parametrosDe("Quadtree"))
+        qtree = indice.estructura
+        from quadTree import Rectangle as QTRectangle
 
         tipoConsulta = st.selectbox("Selecciona tipo de consulta", ["Consulta puntual", "Consulta por rango", "Vecino más cercano"], key="qt_consulta")
 
@@ -206,11 +321,12 @@ if st.session_state.puntos:
                 y = st.number_input("Y", key="busqY_qt", step=0.5)
             if st.button("Buscar punto exacto", key="btn_punto_qt"):
                 punto = (x, y)
-                encontrado = qtree.buscarPunto(punto)
+                encontrado = cache.buscarPunto(punto)
                 resultado = [punto] if encontrado else []
-                fig = graficarConsultaQuadTree(st.session_state.puntos, qtree, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY)
+                fig = vis.graficarConsultaQuadTree(st.session_state.puntos, qtree, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success("Punto encontrado." if encontrado else "Punto no encontrado.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Consulta por rango":
             col1, col2 = st.columns(2)
@@ -223,10 +339,11 @@ if st.session_state.puntos:
             if st.button("Buscar en rango", key="btn_rango_qt"):
                 # Para Quadtree, creamos un Rectangle a partir de (centro_x, centro_y, half_width, half_height)
                 rango_rect = QTRectangle(xMin + ancho / 2, yMin + alto / 2, ancho / 2, alto / 2)
-                resultados = qtree.buscarEnRango(rango_rect)
-                fig = graficarConsultaQuadTree(st.session_state.puntos, qtree, puntosResultado=resultados, rect=rango_rect, xMax=limX, yMax=limY)
+                resultados = cache.buscarEnRango(xMin, xMin + ancho, yMin, yMin + alto)
+                fig = vis.graficarConsultaQuadTree(st.session_state.puntos, qtree, puntosResultado=resultados, rect=rango_rect, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success(f"{len(resultados)} punto(s) en el rango.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Vecino más cercano":
             colx, coly = st.columns(2)
@@ -236,17 +353,16 @@ if st.session_state.puntos:
                 y = st.number_input("Y consulta", key="nnY_qt", step=0.5)
             if st.button("Buscar vecino más cercano", key="btn_nn_qt"):
                 puntoRef = (x, y)
-                vecino, _ = qtree.buscarVecinoMasCercano(puntoRef)
-                fig = graficarConsultaQuadTree(st.session_state.puntos, qtree, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY)
+                vecino = cache.buscarVecinoMasCercano(puntoRef)
+                fig = vis.graficarConsultaQuadTree(st.session_state.puntos, qtree, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success(f"Vecino más cercano: {vecino}" if vecino else "No hay puntos en el árbol.")
+                mostrarMetricas(indice.metricas, cache)
 
     # -------- Lógica para Grid File --------
     elif st.session_state.estructura == "Grid File":
-        # Usar los valores guardados en st.session_state para construir el Grid File
-        grid_file = GridFile(0, limX, 0, limY, st.session_state.grid_size_x, st.session_state.grid_size_y, st.session_state.bucket_capacity)
-        for p in st.session_state.puntos:
-            grid_file.insertar(p)
+        indice, cache = indiceConCache("Grid File", **parametrosDe("Grid File"))
+        grid_file = indice.estructura
 
         tipoConsulta = st.selectbox("Selecciona tipo de consulta", ["Consulta puntual", "Consulta por rango", "Vecino más cercano"], key="gf_consulta")
 
@@ -258,11 +374,12 @@ if st.session_state.puntos:
                 y = st.number_input("Y", key="busqY_gf", step=0.5)
             if st.button("Buscar punto exacto", key="btn_punto_gf"):
                 punto = (x, y)
-                encontrado = grid_file.buscarPunto(punto)
+                encontrado = cache.buscarPunto(punto)
                 resultado = [punto] if encontrado else []
-                fig = graficarConsultaGridFile(st.session_state.puntos, grid_file, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY)
+                fig = vis.graficarConsultaGridFile(st.session_state.puntos, grid_file, puntosResultado=resultado, puntoConsulta=punto, xMax=limX, yMax=limY, ventana=ventana, max_celdas=max_celdas)
                 st.pyplot(fig)
                 st.success("Punto encontrado." if encontrado else "Punto no encontrado.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Consulta por rango":
             col1, col2 = st.columns(2)
@@ -273,10 +390,11 @@ if st.session_state.puntos:
                 yMin = st.number_input("Y Min", value=2.0, step=0.5, key="rangoYmin_gf")
                 yMax = st.number_input("Y Max", value=8.0, step=0.5, key="rangoYmax_gf")
             if st.button("Buscar en rango", key="btn_rango_gf"):
-                resultados = grid_file.buscarEnRango(xMin, xMax, yMin, yMax)
-                fig = graficarConsultaGridFile(st.session_state.puntos, grid_file, puntosResultado=resultados, rect=(xMin, xMax, yMin, yMax), xMax=limX, yMax=limY)
+                resultados = cache.buscarEnRango(xMin, xMax, yMin, yMax)
+                fig = vis.graficarConsultaGridFile(st.session_state.puntos, grid_file, puntosResultado=resultados, rect=(xMin, xMax, yMin, yMax), xMax=limX, yMax=limY, ventana=ventana, max_celdas=max_celdas)
                 st.pyplot(fig)
                 st.success(f"{len(resultados)} punto(s) en el rango.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Vecino más cercano":
             colx, coly = st.columns(2)
@@ -286,16 +404,17 @@ if st.session_state.puntos:
                 y = st.number_input("Y consulta", key="nnY_gf", step=0.5)
             if st.button("Buscar vecino más cercano", key="btn_nn_gf"):
                 puntoRef = (x, y)
-                vecino = grid_file.buscarVecinoMasCercano(puntoRef)
-                fig = graficarConsultaGridFile(st.session_state.puntos, grid_file, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY)
+                vecino = cache.buscarVecinoMasCercano(puntoRef)
+                fig = vis.graficarConsultaGridFile(st.session_state.puntos, grid_file, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY, ventana=ventana, max_celdas=max_celdas)
                 st.pyplot(fig)
                 st.success(f"Vecino más cercano: {vecino}" if vecino else "No hay puntos en el Grid File.")
+                mostrarMetricas(indice.metricas, cache)
 
     # -------- Lógica para R-Tree --------
     elif st.session_state.estructura == "R-Tree":
-        rtree = RTree(max_entries=st.session_state.rtree_max_entries, min_entries=st.session_state.rtree_min_entries)
-        for p in st.session_state.puntos:
-            rtree.insertar(p)
+        indice, cache = indiceConCache("R-Tree", **parametrosDe("R-Tree"))
+        rtree = indice.estructura
+        from rTree import Rectangle as RTRectangle
 
         tipoConsulta = st.selectbox("Selecciona tipo de consulta", ["Consulta puntual", "Consulta por rango", "Vecino más cercano"], key="rt_consulta")
 
@@ -308,23 +427,13 @@ if st.session_state.puntos:
                 y = st.number_input("Y", key="busqY_rt", step=0.5)
             if st.button("Buscar punto exacto (aproximado en R-Tree)", key="btn_punto_rt"):
                 punto_a_buscar = (x, y)
-                # La búsqueda puntual en R-Tree no es directa. Podemos simularla buscando en un rango muy pequeño
-                # o iterando a través de los puntos que se insertaron si queremos la semántica de "exacto".
-                # Para mantener la coherencia con otros árboles, implementaremos una búsqueda de "contiene"
-                # en el R-Tree. Si la entrada de un punto se encontró, entonces "está".
-                
-                # Una forma de "buscar punto exacto" en R-Tree es buscarlo después de la inserción.
-                # Como insertamos todos los puntos antes de la consulta, podemos simplemente buscar
-                # en la lista de puntos si el punto existe. Esto no usa el R-Tree para la búsqueda exacta.
-                # Si realmente quieres usar el R-Tree para verificar la existencia, tendrías que modificar
-                # la clase RTree para una función `buscarPunto(point)`.
-                
-                # Por ahora, una simulación simple, si el punto existe en la lista original:
-                encontrado = punto_a_buscar in st.session_state.puntos
+                # El adaptador del R-Tree busca el punto con una consulta de rango degenerada
+                encontrado = cache.buscarPunto(punto_a_buscar)
                 resultado = [punto_a_buscar] if encontrado else []
-                fig = graficarConsultaRTree(st.session_state.puntos, rtree, puntosResultado=resultado, puntoConsulta=punto_a_buscar, xMax=limX, yMax=limY)
+                fig = vis.graficarConsultaRTree(st.session_state.puntos, rtree, puntosResultado=resultado, puntoConsulta=punto_a_buscar, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success("Punto encontrado." if encontrado else "Punto no encontrado.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Consulta por rango":
             col1, col2 = st.columns(2)
@@ -337,10 +446,11 @@ if st.session_state.puntos:
             if st.button("Buscar en rango", key="btn_rango_rt"):
                 # Para R-Tree, la consulta por rango usa su propia clase Rectangle
                 query_rect = RTRectangle(xMin, yMin, xMax, yMax)
-                resultados = rtree.buscarEnRango(query_rect)
-                fig = graficarConsultaRTree(st.session_state.puntos, rtree, puntosResultado=resultados, rect=query_rect, xMax=limX, yMax=limY)
+                resultados = cache.buscarEnRango(xMin, xMax, yMin, yMax)
+                fig = vis.graficarConsultaRTree(st.session_state.puntos, rtree, puntosResultado=resultados, rect=query_rect, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success(f"{len(resultados)} punto(s) en el rango.")
+                mostrarMetricas(indice.metricas, cache)
 
         elif tipoConsulta == "Vecino más cercano":
             colx, coly = st.columns(2)
@@ -350,16 +460,22 @@ if st.session_state.puntos:
                 y = st.number_input("Y consulta", key="nnY_rt", step=0.5)
             if st.button("Buscar vecino más cercano", key="btn_nn_rt"):
                 puntoRef = (x, y)
-                vecino = rtree.buscarVecinoMasCercano(puntoRef)
-                fig = graficarConsultaRTree(st.session_state.puntos, rtree, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY)
+                vecino = cache.buscarVecinoMasCercano(puntoRef)
+                fig = vis.graficarConsultaRTree(st.session_state.puntos, rtree, puntoConsulta=puntoRef, vecinoCercano=vecino, xMax=limX, yMax=limY, ventana=ventana, profundidad=profundidad)
                 st.pyplot(fig)
                 st.success(f"Vecino más cercano: {vecino}" if vecino else "No hay puntos en el R-Tree.")
+                mostrarMetricas(indice.metricas, cache)
 
 
 # ======================== BOTÓN: LIMPIAR ========================
 st.markdown("---")
 if st.button("Limpiar todo"):
     st.session_state.puntos = []
+    st.session_state.pop('cache_consultas', None)
+    st.session_state.pop('cache_firma', None)
+    st.session_state.pop('indice_consultas', None)
+    st.session_state.pop('asesor', None)
+    st.session_state.quadtree_capacidad = 4
     # Restablecer los valores por defecto del Grid File al limpiar todo
     st.session_state.grid_size_x = 5
     st.session_state.grid_size_y = 5
@@ -0,0 +1,131 @@
+# arranque.py
+#
+# Mide sin interfaz el arranque en frío de app.py: cada escenario corre en un
+# intérprete nuevo y se informa la mediana del tiempo de importación y del
+# primer gráfico.
+#
+# - "antes": lo que app.py importaba al inicio antes de la carga diferida
+#   (las cuatro estructuras, los cuatro visualizadores con matplotlib.pyplot
+#   y el asesor), más el gráfico vacío que dibujaba siempre.
+# - "ahora": las importaciones de nivel superior de app.py (leídas del archivo,
+#   así la medición sigue al código) más el visualizador de la estructura
+#   elegida, que no carga matplotlib hasta dibujar.
+# streamlit no se importa en ningún escenario: su costo es el mismo antes y
+# ahora.
+#
+# Ejemplo:
+#   python arranque.py --estructura R-Tree --repeticiones 7
+
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+IMPORTACIONES_ANTERIORES = """
+from quadTree import QuadTree, Rectangle as QTRectangle
+from gridFile import GridFile
+from rTree import RTree, Rectangle as RTRectangle
+from visualizadorKdTree import graficarPuntos as graficarPuntosKd, graficarConsulta as graficarConsultaKd
+from visualizadorQuadTree import graficarConQuadTree, graficarConsultaQuadTree
+from visualizadorGridFile import graficarConGridFile, graficarConsultaGridFile
+from visualizadorRTree import graficarConRTree, graficarConsultaRTree
+from utils import esPuntoValido
+from datos import GENERADORES, aTuplas
+from adaptadores import crearIndice
+from cacheConsultas import CacheConsultas
+from asesor import recomendarParametros
+"""
+
+# Primer gráfico con algunos puntos, con la estructura elegida
+DIBUJO = """
+puntos = [(1.0 + i % 7, 2.0 + i % 5) for i in range(50)]
+indice = crearIndice({nombre!r}, 0, 10, 0, 10)
+indice.cargarMasivo(puntos)
+{graficar}
+"""
+
+GRAFICAR = {
+    "KD-Tree": "vis.graficarPuntos(puntos, xMax=10, yMax=10)",
+    "Quadtree": "vis.graficarConQuadTree(puntos, indice.estructura, xMax=10, yMax=10)",
+    "Grid File": "vis.graficarConGridFile(puntos, indice.estructura, xMax=10, yMax=10)",
+    "R-Tree": "vis.graficarConRTree(puntos, indice.estructura, xMax=10, yMax=10)",
+}
+
+
+
+def leerApp(ruta=os.path.join(DIRECTORIO, "app.py")):
+    """
+    Sentencias import de nivel superior de app.py (sin streamlit) y su tabla
+    VISUALIZADORES, leídas sin ejecutar la aplicación.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        arbol = ast.parse(archivo.read())
+    lineas, visualizadores = [], {}
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.Import):
+            nombres = [n for n in nodo.names if n.name.split(".")[0] != "streamlit"]
+            if nombres:
+                lineas.append(ast.unparse(ast.Import(names=nombres)))
+        elif isinstance(nodo, ast.ImportFrom) and (nodo.module or "").split(".")[0] != "streamlit":
+            lineas.append(ast.unparse(nodo))
+        elif (isinstance(nodo, ast.Assign) and len(nodo.targets) == 1
+              and getattr(nodo.targets[0], "id", None) == "VISUALIZADORES"):
+            visualizadores = ast.literal_eval(nodo.value)
+    return "\n".join(lineas) + "\n", visualizadores
+
+
+def escenarios(nombre):
+    """Código de cada escenario para la estructura `nombre`."""
+    importaciones, visualizadores = leerApp()
+    vis = f"import {visualizadores[nombre]} as vis\n"
+    dibujo = DIBUJO.format(nombre=nombre, graficar=GRAFICAR[nombre])
+    return {
+        "antes, sin puntos": IMPORTACIONES_ANTERIORES + "graficarPuntosKd([], xMax=10, yMax=10)\n",
+        "ahora, sin puntos": importaciones + vis,
+        f"antes, primer gráfico {nombre}": IMPORTACIONES_ANTERIORES + vis + dibujo,
+        f"ahora, primer gráfico {nombre}": importaciones + vis + dibujo,
+    }
+
+
+def medirEscenario(codigo, repeticiones=5):
+    """
+    Ejecuta `codigo` en `repeticiones` intérpretes nuevos y devuelve la
+    mediana del tiempo en ms y los módulos del proyecto y de matplotlib que
+    quedaron cargados.
+    """
+    programa = (
+        "import time, sys\n"
+        "_inicio = time.perf_counter()\n"
+        + codigo +
+        "\n_ms = (time.perf_counter() - _inicio) * 1e3\n"
+        "print(_ms)\n"
+        "print(' '.join(sorted(m for m in sys.modules if m in ('kdTree', 'quadTree', 'gridFile', 'rTree', "
+        "'asesor', 'matplotlib') or m.startswith('visualizador'))))\n"
+    )
+    tiempos, modulos = [], ""
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", programa], cwd=DIRECTORIO,
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        tiempos.append(float(salida[0]))
+        modulos = salida[1] if len(salida) > 1 else ""
+    return statistics.median(tiempos), modulos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de app.py sin interfaz.")
+    parser.add_argument("--estructura", default="KD-Tree", choices=list(GRAFICAR))
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for nombre, codigo in escenarios(args.estructura).items():
+        ms, modulos = medirEscenario(codigo, args.repeticiones)
+        print(f"{nombre:>32}: {ms:7.1f} ms | {modulos}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+# asesor.py
+#
+# Asesor de parámetros: elige la configuración de cada estructura a partir de
+# una muestra de los datos y de una mezcla de consultas representativa.
+#
+# - Cada candidato se describe con perillas que no dependen de n (capacidad de
+#   los nodos, puntos por celda del Grid File) para poder probarlo sobre la
+#   muestra y luego traducirlo al tamaño real de los datos.
+# - El bucket del Grid File se dimensiona con la ocupación de la celda más
+#   llena (estimada con la muestra), de modo que los datos sesgados no se
+#   descarten; un candidato que igual descarta puntos queda fuera.
+# - El costo de cada candidato sale de los contadores de metricas.py: tiempo
+#   promedio por consulta de cada tipo, ponderado por la mezcla, junto con los
+#   nodos visitados y los puntos probados, que se informan como evidencia.
+#
+# Ejemplo:
+#   python asesor.py --n 50000 --distribucion agrupada
+
+import argparse
+import math
+import random
+import time
+
+from adaptadores import INDICES, crearIndice
+from benchmark import DISTRIBUCIONES, ESPACIO
+
+TAMANO_MUESTRA = 5000
+# Fracción de cada tipo de consulta en la mezcla
+MEZCLA_POR_DEFECTO = {"puntual": 0.2, "rango": 0.5, "vecino": 0.3}
+TIPOS = ("puntual", "rango", "vecino")
+
+
+def _candidatos(nombre):
+    """Perillas a probar para cada estructura."""
+    if nombre == "Quadtree":
+        return [{"capacidad": c} for c in (2, 4, 8, 16, 32, 64)]
+    if nombre == "Grid File":
+        return [{"ocupacion": o} for o in (2, 4, 8, 16, 32, 64)]
+    if nombre == "R-Tree":
+        return [{"max_entries": m, "min_entries": max(2, int(m * 0.4))} for m in (4, 8, 16, 32, 64)]
+    return [{}]
+
+
+def _parametrosGrid(ocupacion, puntos, n, espacio):
+    """
+    Celdas para unas `ocupacion` entradas por celda con n puntos (respetando la
+    proporción del espacio) y bucket para la celda más llena según la muestra.
+    """
+    x_min, x_max, y_min, y_max = espacio
+    ancho, alto = (x_max - x_min) or 1, (y_max - y_min) or 1
+    celdas = max(1, n / ocupacion)
+    lado_x = max(1, math.ceil(math.sqrt(celdas * ancho / alto)))
+    lado_y = max(1, math.ceil(celdas / lado_x))
+
+    conteos = {}
+    for x, y in puntos:
+        celda = (min(int((x - x_min) / ancho * lado_x), lado_x - 1), min(int((y - y_min) / alto * lado_y), lado_y - 1))
+        conteos[celda] = conteos.get(celda, 0) + 1
+    mas_llena = max(conteos.values(), default=0) * n / max(1, len(puntos))
+    return {"grid_size_x": lado_x, "grid_size_y": lado_y,
+            "bucket_capacity": max(4 * ocupacion, math.ceil(1.25 * mas_llena))}
+
+
+def traducirParametros(nombre, perillas, puntos, n, espacio):
+    """Parámetros de crearIndice para n puntos a partir de las perillas de un candidato."""
+    if nombre == "Grid File":
+        return _parametrosGrid(perillas["ocupacion"], puntos, n, espacio)
+    return dict(perillas)
+
+
+def espacioDe(puntos):
+    """Rectángulo (x_min, x_max, y_min, y_max) que contiene a los puntos."""
+    xs = [p[0] for p in puntos]
+    ys = [p[1] for p in puntos]
+    x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+    return (x_min, x_max if x_max > x_min else x_min + 1, y_min, y_max if y_max > y_min else y_min + 1)
+
+
+def _muestra(puntos, tamano, semilla):
+    return random.Random(semilla).sample(puntos, min(len(puntos), tamano))
+
+
+def generarMezcla(puntos, cantidad, espacio, area=0.01, semilla=0):
+    """
+    Consultas representativas de los datos, en el formato de benchmark.generarConsultas:
+    - puntuales: mitad puntos existentes y mitad puntos al azar del espacio,
+    - de rango: cuadrados de la fracción `area` del espacio centrados en puntos
+      de los datos (así siguen su distribución),
+    - de vecino más cercano: puntos de los datos con un pequeño desplazamiento.
+    """
+    rng = random.Random(semilla)
+    x_min, x_max, y_min, y_max = espacio
+    lado_x = (x_max - x_min) * math.sqrt(area)
+    lado_y = (y_max - y_min) * math.sqrt(area)
+    base = [rng.choice(puntos) for _ in range(cantidad)]
+
+    puntuales = [(p,) for p in base[:cantidad // 2]]
+    puntuales += [((rng.uniform(x_min, x_max), rng.uniform(y_min, y_max)),) for _ in range(cantidad - len(puntuales))]
+    rangos = [(x - lado_x / 2, x + lado_x / 2, y - lado_y / 2, y + lado_y / 2) for x, y in base]
+    vecinos = [((x + rng.gauss(0, lado_x / 4), y + rng.gauss(0, lado_y / 4)),) for x, y in base]
+    return puntuales, rangos, vecinos
+
+
+def _evaluar(nombre, parametros, muestra, consultas, mezcla, espacio, repeticiones):
+    """Construye el índice sobre la muestra y mide cada tipo de consulta con sus contadores."""
+    fila = {}
+    try:
+        indice = crearIndice(nombre, *espacio, **parametros)
+        inicio = time.perf_counter()
+        insertados = indice.cargarMasivo(muestra)
+        fila["construccion_ms"] = (time.perf_counter() - inicio) * 1e3
+    except RecursionError:
+        # Por ejemplo, un Quadtree de capacidad chica con muchos puntos repetidos
+        fila["estado"] = "recursión demasiado profunda"
+        return fila
+    if insertados < len(muestra):
+        fila["estado"] = f"descarta {len(muestra) - insertados} puntos"
+        return fila
+
+    funciones = {"puntual": indice.buscarPunto, "rango": indice.buscarEnRango, "vecino": indice.buscarVecinoMasCercano}
+    metricas = indice.activarMetricas(historial=None)
+    costo = 0.0
+    for tipo, argumentos in zip(TIPOS, consultas):
+        if not argumentos:
+            continue
+        mejor = None
+        for _ in range(repeticiones):
+            metricas.limpiar()
+            for args in argumentos:
+                funciones[tipo](*args)
+            # Una consulta del adaptador puede registrar varias de la estructura: se suma todo
+            tiempo = sum(c.tiempo for c in metricas.consultas)
+            if mejor is None or tiempo < mejor[0]:
+                mejor = (tiempo, sum(c.nodos_visitados for c in metricas.consultas),
+                         sum(c.puntos_probados for c in metricas.consultas))
+        tiempo, nodos, probados = mejor
+        fila[f"{tipo}_us"] = tiempo / len(argumentos) * 1e6
+        fila[f"{tipo}_nodos"] = nodos / len(argumentos)
+        fila[f"{tipo}_puntos"] = probados / len(argumentos)
+        costo += mezcla.get(tipo, 0) * fila[f"{tipo}_us"]
+    indice.desactivarMetricas()
+    fila["costo_us"] = costo
+    fila["estado"] = "ok"
+    return fila
+
+
+def recomendarParametros(nombre, puntos, espacio=None, consultas=None, mezcla=None,
+                         tamano_muestra=TAMANO_MUESTRA, num_consultas=200, repeticiones=3, semilla=0):
+    """
+    Prueba los candidatos de la estructura `nombre` sobre una muestra de
+    `puntos` y devuelve un dict con:
+    - parametros: la configuración recomendada para todos los puntos,
+    - costo_us: su costo ponderado por consulta en la muestra,
+    - evidencia: una fila por candidato (parámetros, estado, costo, tiempo,
+      nodos y puntos probados por tipo de consulta), de la mejor a la peor.
+    `consultas` usa el formato de benchmark.generarConsultas; si se omite se
+    genera con generarMezcla.
+    """
+    if nombre not in INDICES:
+        raise ValueError(f"Estructura desconocida: {nombre!r}. Opciones: {', '.join(INDICES)}")
+    puntos = [tuple(p) for p in puntos]
+    if not puntos:
+        raise ValueError("Se necesitan puntos para recomendar parámetros")
+    espacio = espacio or espacioDe(puntos)
+    mezcla = mezcla or MEZCLA_POR_DEFECTO
+    total = sum(mezcla.values()) or 1
+    mezcla = {tipo: peso / total for tipo, peso in mezcla.items()}
+    muestra = _muestra(puntos, tamano_muestra, semilla)
+    if consultas is None:
+        consultas = generarMezcla(muestra, num_consultas, espacio, semilla=semilla)
+
+    evidencia = []
+    for perillas in _candidatos(nombre):
+        fila = _evaluar(nombre, traducirParametros(nombre, perillas, muestra, len(muestra), espacio),
+                        muestra, consultas, mezcla, espacio, repeticiones)
+        fila["parametros"] = traducirParametros(nombre, perillas, muestra, len(puntos), espacio)
+        evidencia.append(fila)
+    evidencia.sort(key=lambda f: (f["estado"] != "ok", f.get("costo_us", math.inf)))
+
+    mejor = evidencia[0]
+    if mejor["estado"] != "ok":
+        raise ValueError(f"Ningún candidato de {nombre} indexa la muestra completa: {mejor['estado']}")
+    return {"estructura": nombre, "n": len(puntos), "muestra": len(muestra), "mezcla": mezcla,
+            "parametros": mejor["parametros"], "costo_us": mejor["costo_us"], "evidencia": evidencia}
+
+
+def recomendar(puntos, estructuras=None, **opciones):
+    """
+    Recomienda parámetros para cada estructura (con la misma muestra y las
+    mismas consultas) y la estructura más rápida. Devuelve
+    {'mejor': nombre, 'por_estructura': {nombre: recomendación}}.
+    """
+    puntos = [tuple(p) for p in puntos]
+    estructuras = estructuras or list(INDICES)
+    opciones.setdefault("espacio", espacioDe(puntos))
+    if opciones.get("consultas") is None:
+        semilla = opciones.get("semilla", 0)
+        muestra = _muestra(puntos, opciones.get("tamano_muestra", TAMANO_MUESTRA), semilla)
+        opciones["consultas"] = generarMezcla(muestra, opciones.get("num_consultas", 200), opciones["espacio"],
+                                              semilla=semilla)
+    por_estructura = {nombre: recomendarParametros(nombre, puntos, **opciones) for nombre in estructuras}
+    mejor = min(por_estructura, key=lambda nombre: por_estructura[nombre]["costo_us"])
+    return {"mejor": mejor, "por_estructura": por_estructura}
+
+
+def informe(recomendacion):
+    """Texto con la configuración elegida y la tabla de candidatos que la respalda."""
+    r = recomendacion
+    lineas = [f"{r['estructura']}: {r['parametros']} ({r['costo_us']:.1f} us por consulta ponderada; "
+              f"muestra de {r['muestra']} de {r['n']} puntos)"]
+    for fila in r["evidencia"]:
+        if fila["estado"] != "ok":
+            lineas.append(f"  {fila['parametros']}: {fila['estado']}")
+            continue
+        lineas.append(f"  {fila['parametros']}: costo {fila['costo_us']:.1f} us | "
+                      + " | ".join(f"{tipo} {fila[f'{tipo}_us']:.1f} us, {fila[f'{tipo}_nodos']:.1f} nodos, "
+                                   f"{fila[f'{tipo}_puntos']:.1f} puntos" for tipo in TIPOS if f"{tipo}_us" in fila))
+    return "\n".join(lineas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recomienda los parámetros de cada estructura para un conjunto de datos.")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--distribucion", default="uniforme", choices=list(DISTRIBUCIONES))
+    parser.add_argument("--estructuras", nargs="+", default=list(INDICES), choices=list(INDICES))
+    parser.add_argument("--muestra", type=int, default=TAMANO_MUESTRA)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    random.seed(args.semilla)
+    puntos = DISTRIBUCIONES[args.distribucion](args.n, *ESPACIO)
+    resultado = recomendar(puntos, args.estructuras, espacio=ESPACIO, tamano_muestra=args.muestra,
+                           num_consultas=args.consultas, semilla=args.semilla)
+    for nombre in args.estructuras:
+        print(informe(resultado["por_estructura"][nombre]))
+    print(f"Estructura más rápida para esta mezcla: {resultado['mejor']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
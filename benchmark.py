@@ -0,0 +1,293 @@
+# benchmark.py
+#
+# Banco de pruebas de rendimiento para las cuatro estructuras.
+#
+# Ejemplo:
+#   python benchmark.py --n 1000 10000 --distribuciones uniforme agrupada \
+#       --json resultados.json --csv resultados.csv
+#   python benchmark.py --ingesta --n 10000 --inserciones 20000
+
+import argparse
+import csv
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from adaptadores import INDICES, crearIndice
+from bufferEscritura import EscritorBuffer
+from utils import (generarPuntosAleatorios, generarPuntosAgrupados,
+                   generarPuntosDiagonal, generarPuntosDuplicados)
+
+# Espacio de trabajo de todas las pruebas: (x_min, x_max, y_min, y_max)
+ESPACIO = (0, 1000, 0, 1000)
+
+DISTRIBUCIONES = {
+    "uniforme": generarPuntosAleatorios,
+    "agrupada": generarPuntosAgrupados,
+    "diagonal": generarPuntosDiagonal,
+    "duplicados": generarPuntosDuplicados,
+}
+
+
+def parametrosPorDefecto(nombre, n):
+    """Parámetros razonables de cada estructura para n puntos."""
+    if nombre == "Quadtree":
+        return {"capacidad": 4}
+    if nombre == "Grid File":
+        # Unas 16 entradas por celda en promedio; el bucket admite el cuádruple
+        # para que los datos sesgados no se descarten en exceso.
+        lado = max(1, math.ceil(math.sqrt(n / 16)))
+        return {"grid_size_x": lado, "grid_size_y": lado, "bucket_capacity": 64}
+    if nombre == "R-Tree":
+        return {"max_entries": 8, "min_entries": 4}
+    return {}
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano sobre una lista ya ordenada."""
+    if not valores:
+        return float("nan")
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[indice]
+
+
+def _resumirLatencias(prefijo, latencias):
+    """Resume latencias en segundos como percentiles en microsegundos."""
+    latencias = sorted(latencias)
+    return {
+        f"{prefijo}_p50_us": percentil(latencias, 50) * 1e6,
+        f"{prefijo}_p95_us": percentil(latencias, 95) * 1e6,
+        f"{prefijo}_p99_us": percentil(latencias, 99) * 1e6,
+    }
+
+
+def _medir(funcion, argumentos):
+    """Ejecuta funcion(*args) para cada elemento y devuelve la latencia de cada llamada."""
+    latencias = []
+    reloj = time.perf_counter
+    for args in argumentos:
+        inicio = reloj()
+        funcion(*args)
+        latencias.append(reloj() - inicio)
+    return latencias
+
+
+def _contarTrabajo(indice, prefijo, funcion, argumentos):
+    """Promedio por consulta de los contadores de metricas.py (en una pasada sin cronometrar)."""
+    metricas = indice.activarMetricas(historial=len(argumentos) or 1)
+    for args in argumentos:
+        funcion(*args)
+    consultas = list(metricas.consultas)
+    indice.desactivarMetricas()
+    total = len(consultas) or 1
+    return {
+        f"{prefijo}_nodos": sum(c.nodos_visitados for c in consultas) / total,
+        f"{prefijo}_puntos": sum(c.puntos_probados for c in consultas) / total,
+        f"{prefijo}_distancias": sum(c.distancias for c in consultas) / total,
+    }
+
+
+def generarConsultas(puntos, cantidad, area):
+    """
+    Genera las consultas de una prueba:
+    - puntuales: mitad puntos existentes y mitad puntos aleatorios,
+    - de rango: cuadrados que cubren la fracción `area` del espacio,
+    - de vecino más cercano: puntos aleatorios.
+    """
+    x_min, x_max, y_min, y_max = ESPACIO
+    aleatorios = generarPuntosAleatorios(cantidad, x_min, x_max, y_min, y_max)
+    existentes = random.sample(puntos, min(len(puntos), cantidad // 2)) if puntos else []
+    puntuales = [(p,) for p in existentes + aleatorios[:cantidad - len(existentes)]]
+
+    lado_x = (x_max - x_min) * math.sqrt(area)
+    lado_y = (y_max - y_min) * math.sqrt(area)
+    rangos = []
+    for x, y in generarPuntosAleatorios(cantidad, x_min, x_max - lado_x, y_min, y_max - lado_y):
+        rangos.append((x, x + lado_x, y, y + lado_y))
+
+    vecinos = [(p,) for p in generarPuntosAleatorios(cantidad, x_min, x_max, y_min, y_max)]
+    return puntuales, rangos, vecinos
+
+
+def medirEstructura(nombre, puntos, extra, consultas, parametros, medir_memoria=True):
+    """Mide construcción, inserción, consultas, trabajo por consulta y memoria de una estructura."""
+    puntuales, rangos, vecinos = consultas
+    resultado = {"estructura": nombre, "parametros": json.dumps(parametros, sort_keys=True)}
+
+    indice = crearIndice(nombre, *ESPACIO, **parametros)
+    inicio = time.perf_counter()
+    insertados = sum(1 for p in puntos if indice.insertar(p))
+    resultado["construccion_s"] = time.perf_counter() - inicio
+    resultado["insertados"] = insertados
+
+    if extra:
+        inicio = time.perf_counter()
+        for p in extra:
+            indice.insertar(p)
+        transcurrido = time.perf_counter() - inicio
+        resultado["inserciones_por_s"] = len(extra) / transcurrido if transcurrido else float("inf")
+
+    resultado.update(_resumirLatencias("puntual", _medir(indice.buscarPunto, puntuales)))
+    resultado.update(_resumirLatencias("rango", _medir(indice.buscarEnRango, rangos)))
+    resultado.update(_resumirLatencias("vecino", _medir(indice.buscarVecinoMasCercano, vecinos)))
+
+    resultado.update(_contarTrabajo(indice, "puntual", indice.buscarPunto, puntuales))
+    resultado.update(_contarTrabajo(indice, "rango", indice.buscarEnRango, rangos))
+    resultado.update(_contarTrabajo(indice, "vecino", indice.buscarVecinoMasCercano, vecinos))
+
+    if medir_memoria:
+        # Se reconstruye en una pasada aparte: tracemalloc ralentiza las asignaciones
+        del indice
+        tracemalloc.start()
+        indice = crearIndice(nombre, *ESPACIO, **parametros)
+        for p in puntos:
+            indice.insertar(p)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["memoria_pico_mb"] = pico / 2**20
+
+    return resultado
+
+
+def ejecutar(tamanos, distribuciones, estructuras, num_consultas=200, area=0.01,
+             inserciones=1000, semilla=0, medir_memoria=True, informar=print):
+    """Ejecuta todas las combinaciones y devuelve la lista de resultados."""
+    resultados = []
+    for distribucion in distribuciones:
+        generador = DISTRIBUCIONES[distribucion]
+        for n in tamanos:
+            random.seed(semilla)
+            todos = generador(n + inserciones, *ESPACIO)
+            puntos, extra = todos[:n], todos[n:]
+            consultas = generarConsultas(puntos, num_consultas, area)
+            for nombre in estructuras:
+                random.seed(semilla)
+                fila = {"distribucion": distribucion, "n": n}
+                fila.update(medirEstructura(nombre, puntos, extra, consultas,
+                                            parametrosPorDefecto(nombre, n), medir_memoria))
+                resultados.append(fila)
+                if informar:
+                    informar(_formatearFila(fila))
+    return resultados
+
+
+def medirIngesta(nombre, puntos, extra, parametros, capacidad_buffer=4096):
+    """
+    Compara la tasa de inserción de `extra` sobre un índice ya cargado con `puntos`:
+    inserción punto a punto frente a EscritorBuffer (incluido el vaciado final).
+    """
+    tasas = {}
+    for modo in ("individual", "buffer"):
+        indice = crearIndice(nombre, *ESPACIO, **parametros)
+        indice.cargarMasivo(puntos)
+        inicio = time.perf_counter()
+        if modo == "individual":
+            for p in extra:
+                indice.insertar(p)
+        else:
+            with EscritorBuffer(indice, capacidad_buffer) as escritor:
+                for p in extra:
+                    escritor.insertar(p)
+        transcurrido = time.perf_counter() - inicio
+        tasas[f"ingesta_{modo}_por_s"] = len(extra) / transcurrido if transcurrido else float("inf")
+    tasas["ingesta_aceleracion"] = tasas["ingesta_buffer_por_s"] / tasas["ingesta_individual_por_s"]
+    return tasas
+
+
+def ejecutarIngesta(tamanos, distribuciones, estructuras, inserciones, capacidad_buffer=4096,
+                    semilla=0, informar=print):
+    """Mide la ingesta sostenida con y sin búfer para todas las combinaciones."""
+    resultados = []
+    for distribucion in distribuciones:
+        generador = DISTRIBUCIONES[distribucion]
+        for n in tamanos:
+            random.seed(semilla)
+            todos = generador(n + inserciones, *ESPACIO)
+            puntos, extra = todos[:n], todos[n:]
+            for nombre in estructuras:
+                fila = {"distribucion": distribucion, "n": n, "estructura": nombre, "inserciones": inserciones}
+                fila.update(medirIngesta(nombre, puntos, extra, parametrosPorDefecto(nombre, n), capacidad_buffer))
+                resultados.append(fila)
+                if informar:
+                    informar(f"{distribucion:<10} n={n:<9} {nombre:<10} "
+                             f"individual {fila['ingesta_individual_por_s']:10.0f}/s  "
+                             f"buffer {fila['ingesta_buffer_por_s']:10.0f}/s  "
+                             f"x{fila['ingesta_aceleracion']:.1f}")
+    return resultados
+
+
+def _formatearFila(fila):
+    memoria = f"{fila['memoria_pico_mb']:8.2f} MB" if "memoria_pico_mb" in fila else ""
+    return (f"{fila['distribucion']:<10} n={fila['n']:<9} {fila['estructura']:<10} "
+            f"build {fila['construccion_s']:8.3f} s  "
+            f"rango p50 {fila['rango_p50_us']:9.1f} us  "
+            f"vecino p50 {fila['vecino_p50_us']:9.1f} us ({fila['vecino_nodos']:8.1f} nodos)  {memoria}")
+
+
+def metadatos():
+    """Datos del entorno para comparar resultados entre versiones."""
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+    }
+
+
+def guardarJSON(resultados, ruta, extra_metadatos=None):
+    datos = {"metadatos": {**metadatos(), **(extra_metadatos or {})}, "resultados": resultados}
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+def guardarCSV(resultados, ruta):
+    columnas = []
+    for fila in resultados:
+        for clave in fila:
+            if clave not in columnas:
+                columnas.append(clave)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas)
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el rendimiento de las estructuras espaciales.")
+    parser.add_argument("--n", type=int, nargs="+", default=[1000, 10000],
+                        help="Cantidades de puntos a probar (p. ej. 1000 100000 10000000)")
+    parser.add_argument("--distribuciones", nargs="+", default=list(DISTRIBUCIONES),
+                        choices=list(DISTRIBUCIONES))
+    parser.add_argument("--estructuras", nargs="+", default=list(INDICES), choices=list(INDICES))
+    parser.add_argument("--consultas", type=int, default=200, help="Consultas de cada tipo")
+    parser.add_argument("--area", type=float, default=0.01,
+                        help="Fracción del espacio que cubre cada consulta de rango")
+    parser.add_argument("--inserciones", type=int, default=1000,
+                        help="Inserciones adicionales para medir el rendimiento de inserción")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("--ingesta", action="store_true",
+                        help="Medir solo la ingesta sostenida (punto a punto frente a EscritorBuffer)")
+    parser.add_argument("--buffer", type=int, default=4096, help="Capacidad del búfer de escritura")
+    parser.add_argument("--json", help="Ruta del archivo JSON de resultados")
+    parser.add_argument("--csv", help="Ruta del archivo CSV de resultados")
+    args = parser.parse_args(argv)
+
+    if args.ingesta:
+        resultados = ejecutarIngesta(args.n, args.distribuciones, args.estructuras, args.inserciones,
+                                     args.buffer, args.semilla)
+    else:
+        resultados = ejecutar(args.n, args.distribuciones, args.estructuras, args.consultas, args.area,
+                              args.inserciones, args.semilla, not args.sin_memoria)
+    if args.json:
+        guardarJSON(resultados, args.json, {"argumentos": vars(args)})
+    if args.csv:
+        guardarCSV(resultados, args.csv)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
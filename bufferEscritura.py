@@ -0,0 +1,151 @@
+# bufferEscritura.py
+#
+# Escritor con búfer delante de cualquier índice de adaptadores.py.
+# Las inserciones se acumulan en memoria y se aplican por lotes ordenados por
+# código Morton, de modo que cada lote recorre la estructura con buena localidad.
+# Solo pasan por el búfer los índices con `cargaPorLotes`, es decir, los que
+# tienen una carga por lotes más rápida que insertar de a uno:
+# - R-Tree: el lote se reparte entre los hijos de cada nodo y los nodos que
+#   desbordan se reempaquetan con STR (de 3.3 a 7 veces más inserciones por
+#   segundo con `python benchmark.py --ingesta`).
+# Con el resto la escritura es directa: el búfer solo agrega una llamada por
+# punto (entre 0.7x y 1.2x la inserción sin búfer en las mismas mediciones).
+# Motivos:
+# - KD-Tree, Quadtree: la carga por lotes medida fue de 0.4x a 1.5x la
+#   inserción punto a punto, según datos y tamaño.
+# - Grid File: además de ser más lenta por lotes (0.6x a 1.1x), descarta los
+#   puntos de un bucket lleno; con escritura directa insertar informa si el
+#   punto entró y una consulta nunca ve un punto que después desaparece.
+#
+# Las consultas combinan el índice con los puntos que aún están en el búfer.
+
+import itertools
+import math
+
+from adaptadores import kMasCercanos
+from utils import conId, conIds, extenderResultado, ordenarPorMorton
+
+
+class EscritorBuffer:
+    """
+    Envuelve un IndiceEspacial y ofrece su misma interfaz.
+    - capacidad: cantidad de puntos pendientes que dispara un vaciado automático.
+    Los puntos fuera del espacio del índice se rechazan al insertar.
+    Si el índice no tiene `cargaPorLotes` o puede descartar puntos
+    (`puedeRechazar`), las inserciones van directo a él (`directo`).
+    Puede usarse como administrador de contexto: al salir se vacía el búfer.
+    """
+
+    def __init__(self, indice, capacidad=4096):
+        if capacidad < 1:
+            raise ValueError("capacidad must be at least 1")
+        self.indice = indice
+        self.capacidad = capacidad
+        self.directo = not getattr(indice, 'cargaPorLotes', True) or getattr(indice, 'puedeRechazar', False)
+        self.pendientes = []
+        self._pendientesSet = set()
+        self.vaciados = 0  # Cantidad de lotes aplicados
+
+    @property
+    def nombre(self):
+        return self.indice.nombre
+
+    @property
+    def estructura(self):
+        return self.indice.estructura
+
+    def __len__(self):
+        return len(self.pendientes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.vaciar()
+        return False
+
+    # ---------- Escritura ----------
+
+    def _dentro(self, punto):
+        return (self.indice.x_min <= punto[0] <= self.indice.x_max and
+                self.indice.y_min <= punto[1] <= self.indice.y_max)
+
+    def insertar(self, punto, id=None):
+        if not self._dentro(punto):
+            return False
+        if self.directo:
+            return self.indice.insertar(punto, id)
+        punto = conId(punto, id)
+        self.pendientes.append(punto)
+        self._pendientesSet.add(punto)
+        if len(self.pendientes) >= self.capacidad:
+            self.vaciar()
+        return True
+
+    def cargarMasivo(self, puntos, ids=None):
+        """Añade un bloque al búfer; se vacía tantas veces como haga falta."""
+        cantidad = 0
+        for punto in conIds(puntos, ids):
+            if self.insertar(punto):
+                cantidad += 1
+        return cantidad
+
+    def vaciar(self):
+        """Aplica los puntos pendientes al índice y devuelve cuántos se aceptaron."""
+        if not self.pendientes:
+            return 0
+        lote = self.pendientes
+        if self.indice.ordenarLotes:
+            lote = ordenarPorMorton(lote, self.indice.x_min, self.indice.x_max,
+                                    self.indice.y_min, self.indice.y_max)
+        self.pendientes = []
+        self._pendientesSet = set()
+        self.vaciados += 1
+        return self.indice.cargarMasivo(lote)
+
+    # ---------- Consultas (índice + búfer) ----------
+
+    def buscarPunto(self, punto):
+        return punto in self._pendientesSet or self.indice.buscarPunto(punto)
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        resultado = self.indice.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+        return extenderResultado(resultado, (p for p in self.pendientes
+                                             if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax), modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        pendientes = (p for p in self.pendientes if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax)
+        return itertools.islice(itertools.chain(self.indice.iterarEnRango(xMin, xMax, yMin, yMax, limite),
+                                                pendientes), limite)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, limite=1):
+            return True
+        return False
+
+    def buscarVecinoMasCercano(self, punto):
+        mejor = self.indice.buscarVecinoMasCercano(punto)
+        mejorDistancia = math.dist(mejor, punto) if mejor is not None else float('inf')
+        for p in self.pendientes:
+            distancia = math.dist(p, punto)
+            if distancia < mejorDistancia:
+                mejor, mejorDistancia = p, distancia
+        return mejor
+
+    def buscarKVecinos(self, punto, k):
+        return kMasCercanos(punto, k, self.indice.buscarKVecinos(punto, k) + self.pendientes)
+
+    # ---------- Métricas (solo cubren la parte del índice) ----------
+
+    @property
+    def metricas(self):
+        return self.indice.metricas
+
+    def activarMetricas(self, historial=1000):
+        return self.indice.activarMetricas(historial)
+
+    def desactivarMetricas(self):
+        self.indice.desactivarMetricas()
+
+    def __repr__(self):
+        return f"EscritorBuffer({self.indice!r}, pendientes={len(self.pendientes)})"
@@ -0,0 +1,225 @@
+# cacheConsultas.py
+#
+# Caché de resultados de consultas delante de cualquier índice con la interfaz
+# de adaptadores.py (también EscritorBuffer o IndiceConcurrente).
+#
+# - Las entradas se identifican por el tipo de consulta y sus parámetros
+#   normalizados a float: ('rango', xMin, xMax, yMin, yMax, modo), ('vecino', x, y),
+#   ('knn', x, y, k) y ('punto', x, y). Cada modo de resultado de buscarEnRango
+#   (ver utils.MODOS_RESULTADO) tiene su propia entrada.
+# - Política LRU con capacidad fija y, opcionalmente, expiración por tiempo (TTL).
+# - Invalidación precisa: cuando cambia un punto solo se descartan las entradas
+#   cuyo resultado podría cambiar:
+#     rango        -> el punto cae dentro del rectángulo
+#     vecino / knn -> el punto está a distancia menor o igual que el radio
+#                     guardado (distancia al vecino, o al k-ésimo vecino)
+#     punto        -> es el mismo punto
+
+import itertools
+import math
+import time
+from collections import OrderedDict
+
+from utils import conId, conIds
+
+# Por encima de (puntos x entradas) revisiones, invalidarPuntos vacía la caché:
+# es más barato volver a calcular que revisar cada entrada contra cada punto
+REVISION_MAXIMA = 1_000_000
+
+
+class _Entrada:
+    __slots__ = ('resultado', 'radio', 'expira')
+
+    def __init__(self, resultado, radio, expira):
+        self.resultado = resultado
+        self.radio = radio    # Solo para vecino / knn
+        self.expira = expira  # None si no hay TTL
+
+
+def _copiar(resultado):
+    """Copia de un resultado guardado: lista para las tuplas, copia para los arreglos NumPy."""
+    if isinstance(resultado, tuple):
+        return list(resultado)
+    if hasattr(resultado, 'copy'):
+        return resultado.copy()
+    return resultado  # Conteo
+
+
+class CacheConsultas:
+    """
+    - indice: objeto con la interfaz de IndiceEspacial. Se puede reemplazar por
+      otro equivalente (con los mismos puntos) sin perder la caché.
+    - capacidad: cantidad máxima de entradas (LRU).
+    - ttl: segundos de vida de cada entrada, o None para no expirar.
+    Las escrituras hechas a través de la caché invalidan solas; si el índice se
+    modifica por fuera (o se elimina un punto), hay que llamar a invalidar().
+    """
+
+    def __init__(self, indice, capacidad=1024, ttl=None, reloj=time.monotonic):
+        if capacidad < 1:
+            raise ValueError("capacidad must be at least 1")
+        self.indice = indice
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._reloj = reloj
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.expulsiones = 0
+        self.expiradas = 0
+        self.ultimaFueAcierto = False
+
+    def __len__(self):
+        return len(self._entradas)
+
+    # ---------- Núcleo ----------
+
+    def _obtener(self, clave):
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada.expira is not None and entrada.expira <= self._reloj():
+            del self._entradas[clave]
+            self.expiradas += 1
+            entrada = None
+        self.ultimaFueAcierto = entrada is not None
+        if entrada is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        self._entradas.move_to_end(clave)
+        return entrada
+
+    def _guardar(self, clave, resultado, radio=None):
+        expira = self._reloj() + self.ttl if self.ttl is not None else None
+        self._entradas[clave] = _Entrada(resultado, radio, expira)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.capacidad:
+            self._entradas.popitem(last=False)
+            self.expulsiones += 1
+
+    # ---------- Consultas ----------
+
+    def buscarPunto(self, punto):
+        clave = ('punto', float(punto[0]), float(punto[1]))
+        entrada = self._obtener(clave)
+        if entrada is not None:
+            return entrada.resultado
+        encontrado = self.indice.buscarPunto(punto)
+        self._guardar(clave, encontrado)
+        return encontrado
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        clave = ('rango', float(xMin), float(xMax), float(yMin), float(yMax), modo)
+        entrada = self._obtener(clave)
+        if entrada is not None:
+            return _copiar(entrada.resultado)
+        resultado = self.indice.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+        # Se guarda una copia inmutable (o propia, para los arreglos) de la lista devuelta
+        self._guardar(clave, tuple(resultado) if isinstance(resultado, list) else _copiar(resultado))
+        return resultado
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        # Usa el resultado guardado si lo hay; si no, no se guarda nada, porque
+        # el que recorre puede cortar antes de ver el resultado completo
+        entrada = self._obtener(('rango', float(xMin), float(xMax), float(yMin), float(yMax), 'puntos'))
+        if entrada is not None:
+            return itertools.islice(entrada.resultado, limite)
+        return self.indice.iterarEnRango(xMin, xMax, yMin, yMax, limite)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        entrada = self._obtener(('rango', float(xMin), float(xMax), float(yMin), float(yMax), 'puntos'))
+        if entrada is not None:
+            return bool(entrada.resultado)
+        return self.indice.existeEnRango(xMin, xMax, yMin, yMax)
+
+    def buscarVecinoMasCercano(self, punto):
+        clave = ('vecino', float(punto[0]), float(punto[1]))
+        entrada = self._obtener(clave)
+        if entrada is not None:
+            return entrada.resultado
+        vecino = self.indice.buscarVecinoMasCercano(punto)
+        self._guardar(clave, vecino, math.dist(vecino, punto) if vecino is not None else math.inf)
+        return vecino
+
+    def buscarKVecinos(self, punto, k):
+        clave = ('knn', float(punto[0]), float(punto[1]), int(k))
+        entrada = self._obtener(clave)
+        if entrada is not None:
+            return list(entrada.resultado)
+        vecinos = self.indice.buscarKVecinos(punto, k)
+        # Con menos de k resultados cualquier punto nuevo entraría en la respuesta
+        radio = math.dist(vecinos[-1], punto) if vecinos and len(vecinos) == k else math.inf
+        self._guardar(clave, tuple(vecinos), radio)
+        return vecinos
+
+    # ---------- Escrituras e invalidación ----------
+
+    def insertar(self, punto, id=None):
+        punto = conId(punto, id)
+        insertado = self.indice.insertar(punto)
+        if insertado:
+            self.invalidar(punto)
+        return insertado
+
+    def cargarMasivo(self, puntos, ids=None):
+        puntos = conIds(puntos, ids)
+        cantidad = self.indice.cargarMasivo(puntos)
+        self.invalidarPuntos(puntos)
+        return cantidad
+
+    def _afectada(self, clave, entrada, px, py):
+        tipo = clave[0]
+        if tipo == 'rango':
+            return clave[1] <= px <= clave[2] and clave[3] <= py <= clave[4]
+        if tipo == 'punto':
+            return clave[1] == px and clave[2] == py
+        # vecino / knn: un punto a la misma distancia que el radio puede reemplazar
+        # al vecino guardado según el orden de recorrido, así que también se descarta
+        return math.dist((clave[1], clave[2]), (px, py)) <= entrada.radio
+
+    def invalidar(self, punto):
+        """Descarta las entradas cuyo resultado puede cambiar si `punto` se agrega o se elimina."""
+        px, py = float(punto[0]), float(punto[1])
+        afectadas = [clave for clave, entrada in self._entradas.items() if self._afectada(clave, entrada, px, py)]
+        for clave in afectadas:
+            del self._entradas[clave]
+        self.invalidaciones += len(afectadas)
+        return len(afectadas)
+
+    def invalidarPuntos(self, puntos):
+        """invalidar() para muchos puntos a la vez; cada entrada se revisa una sola vez."""
+        puntos = [(float(p[0]), float(p[1])) for p in puntos]
+        if not puntos:
+            return 0
+        if len(puntos) * len(self._entradas) > REVISION_MAXIMA:
+            descartadas = len(self._entradas)
+            self.limpiar()
+            return descartadas
+        afectadas = [clave for clave, entrada in self._entradas.items()
+                     if any(self._afectada(clave, entrada, px, py) for px, py in puntos)]
+        for clave in afectadas:
+            del self._entradas[clave]
+        self.invalidaciones += len(afectadas)
+        return len(afectadas)
+
+    def limpiar(self):
+        self.invalidaciones += len(self._entradas)
+        self._entradas.clear()
+
+    # ---------- Estadísticas ----------
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'invalidaciones': self.invalidaciones,
+            'expulsiones': self.expulsiones,
+            'expiradas': self.expiradas,
+        }
+
+    def __repr__(self):
+        return f"CacheConsultas({self.indice!r}, entradas={len(self._entradas)}/{self.capacidad})"
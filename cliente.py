@@ -0,0 +1,268 @@
+# cliente.py
+#
+# Cliente asyncio para servidor.py, con un grupo de conexiones reutilizables,
+# y un generador de carga que mide consultas por segundo y latencias.
+#
+# Ejemplo (levanta un servidor local en el mismo proceso):
+#   python cliente.py --local --estructura R-Tree --puntos 20000 --concurrencia 64 --duracion 5
+# Contra un servidor ya iniciado:
+#   python cliente.py --puerto 8765 --concurrencia 64 --duracion 5
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+from benchmark import parametrosPorDefecto, percentil
+
+
+class ErrorServidor(Exception):
+    """El servidor respondió con ok = false."""
+
+
+class Conexion:
+    """
+    Una conexión con solicitudes en tubería: se pueden enviar varias sin esperar
+    respuesta; una tarea lectora entrega cada respuesta al futuro de su id.
+    """
+
+    def __init__(self, lector, escritor):
+        self._lector = lector
+        self._escritor = escritor
+        self._esperando = {}
+        self._ids = itertools.count(1)
+        self._tareaLectora = asyncio.create_task(self._leer())
+
+    @classmethod
+    async def abrir(cls, host="127.0.0.1", puerto=8765, ruta_unix=None):
+        if ruta_unix:
+            lector, escritor = await asyncio.open_unix_connection(ruta_unix, limit=2**24)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto, limit=2**24)
+        return cls(lector, escritor)
+
+    @property
+    def pendientes(self):
+        return len(self._esperando)
+
+    async def _leer(self):
+        try:
+            while True:
+                linea = await self._lector.readline()
+                if not linea:
+                    break
+                respuesta = json.loads(linea)
+                futuro = self._esperando.pop(respuesta.get("id"), None)
+                if futuro is None or futuro.done():
+                    continue
+                if respuesta.get("ok"):
+                    futuro.set_result(respuesta.get("resultado"))
+                else:
+                    futuro.set_exception(ErrorServidor(respuesta.get("error")))
+        finally:
+            for futuro in self._esperando.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("Conexión cerrada por el servidor"))
+            self._esperando.clear()
+
+    async def solicitar(self, op, **campos):
+        identificador = next(self._ids)
+        futuro = asyncio.get_running_loop().create_future()
+        self._esperando[identificador] = futuro
+        self._escritor.write(json.dumps({"id": identificador, "op": op, **campos}, separators=(",", ":")).encode() + b"\n")
+        await self._escritor.drain()
+        return await futuro
+
+    async def cerrar(self):
+        self._escritor.close()
+        try:
+            await self._escritor.wait_closed()
+        except ConnectionError:
+            pass
+        self._tareaLectora.cancel()
+
+
+class Cliente:
+    """
+    Grupo de `conexiones` conexiones al servidor. Cada solicitud va por la
+    conexión con menos solicitudes en curso. Se usa con `async with`.
+    """
+
+    def __init__(self, host="127.0.0.1", puerto=8765, ruta_unix=None, conexiones=4):
+        self.host = host
+        self.puerto = puerto
+        self.ruta_unix = ruta_unix
+        self.cantidad_conexiones = conexiones
+        self._conexiones = []
+
+    async def conectar(self):
+        self._conexiones = [await Conexion.abrir(self.host, self.puerto, self.ruta_unix)
+                            for _ in range(self.cantidad_conexiones)]
+        return self
+
+    async def cerrar(self):
+        for conexion in self._conexiones:
+            await conexion.cerrar()
+        self._conexiones = []
+
+    async def __aenter__(self):
+        return await self.conectar()
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def solicitar(self, op, **campos):
+        conexion = min(self._conexiones, key=lambda c: c.pendientes)
+        return await conexion.solicitar(op, **campos)
+
+    # ---------- Operaciones ----------
+
+    async def crear(self, indice, estructura, espacio, parametros=None):
+        return await self.solicitar("crear", indice=indice, estructura=estructura,
+                                    espacio=list(espacio), parametros=parametros or {})
+
+    async def eliminar(self, indice):
+        return await self.solicitar("eliminar", indice=indice)
+
+    async def listar(self):
+        return await self.solicitar("listar")
+
+    async def estadisticas(self):
+        return await self.solicitar("estadisticas")
+
+    async def insertar(self, indice, puntos):
+        return await self.solicitar("insertar", indice=indice, puntos=[list(p) for p in puntos])
+
+    async def buscarPunto(self, indice, punto):
+        return await self.solicitar("punto", indice=indice, punto=list(punto))
+
+    async def buscarEnRango(self, indice, xMin, xMax, yMin, yMax):
+        resultado = await self.solicitar("rango", indice=indice, rango=[xMin, xMax, yMin, yMax])
+        return [tuple(p) for p in resultado]
+
+    async def buscarKVecinos(self, indice, punto, k):
+        resultado = await self.solicitar("knn", indice=indice, punto=list(punto), k=k)
+        return [tuple(p) for p in resultado]
+
+
+# ======================== GENERADOR DE CARGA ========================
+
+# Proporción de cada tipo de solicitud en la carga generada
+MEZCLA_POR_DEFECTO = {"rango": 0.4, "knn": 0.3, "punto": 0.2, "insertar": 0.1}
+
+
+async def generarCarga(cliente, indice, espacio, duracion=5.0, concurrencia=32, mezcla=None,
+                       lado_rango=0.02, k=5, semilla=0):
+    """
+    Lanza `concurrencia` tareas que envían solicitudes sin pausa durante `duracion`
+    segundos y devuelve QPS y percentiles de latencia (en milisegundos), en total
+    y por tipo de solicitud.
+    """
+    mezcla = mezcla or MEZCLA_POR_DEFECTO
+    tipos = list(mezcla)
+    pesos = [mezcla[t] for t in tipos]
+    x_min, x_max, y_min, y_max = espacio
+    ancho = (x_max - x_min) * lado_rango
+    alto = (y_max - y_min) * lado_rango
+    latencias = {t: [] for t in tipos}
+    errores = 0
+    fin = time.perf_counter() + duracion
+
+    async def trabajador(numero):
+        nonlocal errores
+        rng = random.Random(semilla + numero)
+        while time.perf_counter() < fin:
+            tipo = rng.choices(tipos, pesos)[0]
+            x, y = rng.uniform(x_min, x_max), rng.uniform(y_min, y_max)
+            inicio = time.perf_counter()
+            try:
+                if tipo == "rango":
+                    await cliente.buscarEnRango(indice, x, x + ancho, y, y + alto)
+                elif tipo == "knn":
+                    await cliente.buscarKVecinos(indice, (x, y), k)
+                elif tipo == "punto":
+                    await cliente.buscarPunto(indice, (x, y))
+                else:
+                    await cliente.insertar(indice, [(x, y)])
+            except (ErrorServidor, ConnectionError):
+                errores += 1
+                continue
+            latencias[tipo].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador(i) for i in range(concurrencia)))
+    transcurrido = time.perf_counter() - inicio
+
+    todas = sorted(itertools.chain.from_iterable(latencias.values()))
+    resultado = {
+        "solicitudes": len(todas),
+        "errores": errores,
+        "segundos": transcurrido,
+        "qps": len(todas) / transcurrido if transcurrido else 0.0,
+        "p50_ms": percentil(todas, 50) * 1e3,
+        "p99_ms": percentil(todas, 99) * 1e3,
+    }
+    for tipo, valores in latencias.items():
+        valores.sort()
+        resultado[f"{tipo}_p50_ms"] = percentil(valores, 50) * 1e3
+        resultado[f"{tipo}_p99_ms"] = percentil(valores, 99) * 1e3
+    return resultado
+
+
+async def _ejecutarCarga(args):
+    servidor = socket = None
+    if args.local:
+        from servidor import ServidorIndices
+        servidor = ServidorIndices()
+        socket = await servidor.iniciar(args.host, 0, args.unix)
+        if not args.unix:
+            args.puerto = socket.sockets[0].getsockname()[1]
+
+    espacio = (0.0, 1000.0, 0.0, 1000.0)
+    try:
+        async with Cliente(args.host, args.puerto, args.unix, args.conexiones) as cliente:
+            if args.puntos:
+                await cliente.crear(args.indice, args.estructura, espacio,
+                                    parametrosPorDefecto(args.estructura, args.puntos))
+                rng = random.Random(args.semilla)
+                puntos = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(args.puntos)]
+                for i in range(0, len(puntos), 10000):
+                    await cliente.insertar(args.indice, puntos[i:i + 10000])
+
+            r = await generarCarga(cliente, args.indice, espacio, args.duracion, args.concurrencia,
+                                   semilla=args.semilla)
+            print(f"{r['solicitudes']} solicitudes en {r['segundos']:.2f} s: {r['qps']:.0f} QPS, "
+                  f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, {r['errores']} errores")
+            for tipo in MEZCLA_POR_DEFECTO:
+                print(f"  {tipo:<9} p50 {r[f'{tipo}_p50_ms']:8.2f} ms  p99 {r[f'{tipo}_p99_ms']:8.2f} ms")
+            e = await cliente.estadisticas()
+            print(f"  {e['solicitudes_por_lote']:.1f} solicitudes por lote en el servidor")
+            return r
+    finally:
+        if socket is not None:
+            socket.close()
+            servidor.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para servidor.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", help="Ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--local", action="store_true", help="Levantar el servidor en este mismo proceso")
+    parser.add_argument("--indice", default="carga")
+    parser.add_argument("--estructura", default="R-Tree")
+    parser.add_argument("--puntos", type=int, default=20000,
+                        help="Crear el índice y cargar estos puntos antes de medir (0 = usar uno existente)")
+    parser.add_argument("--conexiones", type=int, default=4)
+    parser.add_argument("--concurrencia", type=int, default=32)
+    parser.add_argument("--duracion", type=float, default=5.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(_ejecutarCarga(args))
+
+
+if __name__ == "__main__":
+    main()
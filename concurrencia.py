@@ -0,0 +1,439 @@
+# concurrencia.py
+#
+# Modo concurrente para cualquier índice de adaptadores.py: muchos lectores
+# y un solo escritor, con versiones inmutables (instantáneas).
+#
+# Las estructuras del proyecto modifican sus nodos en el lugar (por ejemplo,
+# RTree._handle_overflow reemplaza parent.entries durante una división), así
+# que un lector que recorre el árbol mientras alguien inserta podría ver un
+# nodo a medio dividir. Aquí el índice publicado nunca se modifica:
+#
+# - Cada Instantanea es un índice ya construido más un `delta` con los puntos
+#   insertados después de construirlo. El delta es una cola de hasta
+#   TAMANO_BLOQUE puntos (que se recorre entera) más niveles inmutables, cada
+#   uno un KD-Tree balanceado con sus puntos. Cuando la cola se llena, el
+#   escritor la convierte en un nivel nuevo.
+# - El escritor (protegido por un Lock) crea una nueva Instantanea por cada
+#   inserción, con el delta extendido, y la publica reemplazando una
+#   referencia (operación atómica). Los lectores toman esa referencia una vez
+#   por consulta y trabajan sobre ella sin bloquearse.
+# - Un hilo aparte hace el resto del trabajo sin tomar el Lock mientras
+#   construye, y solo lo toma para publicar el resultado:
+#   - Cuando el delta crece más que una fracción del índice, construye un
+#     índice nuevo con cargarMasivo con la base y los niveles.
+#   - Si no, funde los últimos niveles en uno cuando juntos alcanzan al
+#     anterior (método logarítmico): cada nivel queda más grande que todos los
+#     siguientes juntos, así hay O(log n) niveles y cada punto se reconstruye
+#     O(log n) veces.
+#   Los niveles que el escritor agrega mientras tanto se conservan.
+# - Si la estructura puede descartar puntos (los buckets llenos del Grid
+#   File), el escritor mantiene además una copia privada del índice, que
+#   nadie lee, para decidir al insertar qué puntos entran: así un punto
+#   aceptado en el delta no desaparece en la siguiente reconstrucción.
+#
+# Ejemplo de prueba de estrés:
+#   python concurrencia.py --estructura R-Tree --lectores 8 --inserciones 20000
+
+import argparse
+import itertools
+import math
+import random
+import threading
+import time
+
+from adaptadores import INDICES, crearIndice, kMasCercanos
+from benchmark import parametrosPorDefecto
+from utils import conId, conIds, extenderResultado
+
+# Puntos de la cola del delta (y del nivel más chico)
+TAMANO_BLOQUE = 256
+
+
+class NivelDelta:
+    """Nivel inmutable del delta: sus puntos y un KD-Tree balanceado con ellos."""
+    __slots__ = ('puntos', 'indice')
+
+    def __init__(self, puntos):
+        self.puntos = puntos
+        xs = [p[0] for p in puntos]
+        ys = [p[1] for p in puntos]
+        self.indice = crearIndice("KD-Tree", min(xs), max(xs), min(ys), max(ys))
+        self.indice.cargarMasivo(puntos)
+
+
+class Instantanea:
+    """Versión inmutable del índice: estructura construida + puntos posteriores (delta)."""
+    __slots__ = ('numero', 'indice', 'base', 'niveles', 'cola', 'tamano_delta')
+
+    def __init__(self, numero, indice, base, niveles=(), cola=()):
+        self.numero = numero
+        self.indice = indice    # No se modifica después de publicarse
+        self.base = base        # Tupla con los puntos cargados en `indice`
+        self.niveles = niveles  # Tupla de NivelDelta, del más grande (más viejo) al más chico
+        self.cola = cola        # Tupla con los últimos puntos insertados, sin indexar
+        self.tamano_delta = sum(len(n.puntos) for n in niveles) + len(cola)
+
+    def __len__(self):
+        return len(self.base) + self.tamano_delta
+
+    def delta(self):
+        """Itera los puntos insertados después de construir el índice, en orden de inserción."""
+        return itertools.chain(itertools.chain.from_iterable(n.puntos for n in self.niveles), self.cola)
+
+    def puntos(self):
+        return self.base + tuple(self.delta())
+
+    def extender(self, numero, nuevos):
+        """Nueva versión con `nuevos` agregados al delta; esta no se modifica."""
+        niveles = self.niveles
+        cola = self.cola + tuple(nuevos)
+        if len(cola) >= TAMANO_BLOQUE:
+            niveles = niveles + (NivelDelta(cola),)
+            cola = ()
+        return Instantanea(numero, self.indice, self.base, niveles, cola)
+
+    def _indices(self):
+        return [self.indice] + [n.indice for n in self.niveles]
+
+    def _enCola(self, xMin, xMax, yMin, yMax):
+        return (p for p in self.cola if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax)
+
+    def buscarPunto(self, punto):
+        return punto in self.cola or any(indice.buscarPunto(punto) for indice in self._indices())
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        resultado = self.indice.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+        delta = itertools.chain.from_iterable(n.indice.iterarEnRango(xMin, xMax, yMin, yMax) for n in self.niveles)
+        return extenderResultado(resultado, itertools.chain(delta, self._enCola(xMin, xMax, yMin, yMax)), modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        indices = (indice.iterarEnRango(xMin, xMax, yMin, yMax, limite) for indice in self._indices())
+        return itertools.islice(itertools.chain(itertools.chain.from_iterable(indices),
+                                                self._enCola(xMin, xMax, yMin, yMax)), limite)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, limite=1):
+            return True
+        return False
+
+    def buscarVecinoMasCercano(self, punto):
+        candidatos = itertools.chain((indice.buscarVecinoMasCercano(punto) for indice in self._indices()), self.cola)
+        mejor = None
+        mejorDistancia = float('inf')
+        for p in candidatos:
+            if p is None:
+                continue
+            distancia = math.dist(p, punto)
+            if distancia < mejorDistancia:
+                mejor, mejorDistancia = p, distancia
+        return mejor
+
+    def buscarKVecinos(self, punto, k):
+        candidatos = itertools.chain.from_iterable(indice.buscarKVecinos(punto, k) for indice in self._indices())
+        return kMasCercanos(punto, k, itertools.chain(candidatos, self.cola))
+
+
+def _mismos(niveles, otros):
+    # Si dos tuplas de niveles tienen los mismos objetos
+    return len(niveles) == len(otros) and all(a is b for a, b in zip(niveles, otros))
+
+
+class IndiceConcurrente:
+    """
+    Índice seguro para hilos: lecturas sin bloqueo y un escritor a la vez.
+    - nombre, x_min, x_max, y_min, y_max, **parametros: como en crearIndice.
+    - fraccion_reconstruccion: el índice se reconstruye (en otro hilo) cuando el
+      delta supera esta fracción de los puntos ya indexados.
+    - delta_minimo: tamaño mínimo del delta antes de reconstruir.
+    esperarReconstruccion() espera al trabajo en segundo plano y compactar()
+    reconstruye en el hilo que la llama.
+    Los puntos fuera del espacio del índice se rechazan.
+    Las métricas por consulta de la estructura no se usan en este modo.
+    """
+
+    def __init__(self, nombre, x_min, x_max, y_min, y_max, fraccion_reconstruccion=0.25,
+                 delta_minimo=256, **parametros):
+        if fraccion_reconstruccion <= 0:
+            raise ValueError("fraccion_reconstruccion must be positive")
+        self.nombre = nombre
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.parametros = parametros
+        self.fraccion_reconstruccion = fraccion_reconstruccion
+        self.delta_minimo = delta_minimo
+        self.reconstrucciones = 0
+
+        self._escritura = threading.Lock()
+        self._actual = Instantanea(0, crearIndice(nombre, x_min, x_max, y_min, y_max, **parametros), ())
+        # Copia que solo usa el escritor para saber qué puntos acepta la estructura
+        self._admision = (crearIndice(nombre, x_min, x_max, y_min, y_max, **parametros)
+                          if INDICES[nombre].puedeRechazar else None)
+        # Hilo de la reconstrucción o fusión de niveles en curso
+        self._trabajo = None
+
+    # ---------- Lectura (sin bloqueo) ----------
+
+    def instantanea(self):
+        """Versión publicada en este momento; sirve para hacer varias consultas coherentes."""
+        return self._actual
+
+    @property
+    def version(self):
+        return self._actual.numero
+
+    def __len__(self):
+        return len(self._actual)
+
+    def buscarPunto(self, punto):
+        return self._actual.buscarPunto(punto)
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        return self._actual.buscarEnRango(xMin, xMax, yMin, yMax, modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        # El generador queda atado a la instantánea vigente al llamarlo
+        return self._actual.iterarEnRango(xMin, xMax, yMin, yMax, limite)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        return self._actual.existeEnRango(xMin, xMax, yMin, yMax)
+
+    def buscarVecinoMasCercano(self, punto):
+        return self._actual.buscarVecinoMasCercano(punto)
+
+    def buscarKVecinos(self, punto, k):
+        return self._actual.buscarKVecinos(punto, k)
+
+    # ---------- Escritura (un escritor a la vez) ----------
+
+    def enEspacio(self, punto):
+        """Si el punto cae dentro del espacio del índice (si no, se rechaza al insertar)."""
+        return self.x_min <= punto[0] <= self.x_max and self.y_min <= punto[1] <= self.y_max
+
+    def insertar(self, punto, id=None):
+        return self.cargarMasivo([conId(punto, id)]) == 1
+
+    def cargarMasivo(self, puntos, ids=None):
+        """
+        Inserta un bloque de puntos y publica una sola versión nueva; devuelve cuántos
+        entraron. Los puntos que la estructura descartaría (bucket lleno) se rechazan aquí.
+        """
+        return self.cargarLotes([conIds(puntos, ids)])[0]
+
+    def cargarLotes(self, grupos):
+        """
+        Como cargarMasivo para varios grupos de puntos a la vez (por ejemplo, las
+        inserciones de distintas solicitudes): publica una sola versión nueva y
+        devuelve cuántos puntos de cada grupo entraron.
+        """
+        grupos = [[p for p in grupo if self.enEspacio(p)] for grupo in grupos]
+        if not any(grupos):
+            return [0] * len(grupos)
+        with self._escritura:
+            if self._admision is not None:
+                grupos = [[p for p in grupo if self._admision.insertar(p)] for grupo in grupos]
+            nuevos = tuple(p for grupo in grupos for p in grupo)
+            if nuevos:
+                self._actual = self._actual.extender(self._actual.numero + 1, nuevos)
+                self._programar()
+        return [len(grupo) for grupo in grupos]
+
+    # ---------- Trabajo en segundo plano (uno a la vez) ----------
+
+    def _programar(self):
+        # Se llama con el Lock tomado: lanza la reconstrucción o la fusión de
+        # niveles que haga falta, si no hay otra en curso
+        if self._trabajo is not None:
+            return
+        actual = self._actual
+        if actual.tamano_delta > max(self.delta_minimo, self.fraccion_reconstruccion * len(actual.base)):
+            if actual.cola:
+                # La cola pasa a ser un nivel para que la reconstrucción tome todo el delta
+                actual = Instantanea(actual.numero + 1, actual.indice, actual.base,
+                                     actual.niveles + (NivelDelta(actual.cola),))
+                self._actual = actual
+            destino, args = self._reconstruirBase, (actual,)
+        else:
+            niveles = actual.niveles
+            inicio = len(niveles) - 1
+            juntos = len(niveles[-1].puntos) if niveles else 0
+            while inicio > 0 and len(niveles[inicio - 1].puntos) <= juntos:
+                inicio -= 1
+                juntos += len(niveles[inicio].puntos)
+            if len(niveles) - inicio < 2:
+                return
+            destino, args = self._fusionarNiveles, (actual, inicio)
+        self._trabajo = threading.Thread(target=destino, args=args, daemon=True,
+                                         name=f"{destino.__name__}-{self.nombre}")
+        self._trabajo.start()
+
+    def _reconstruirBase(self, previa):
+        # Índice nuevo con la base y todos los niveles de `previa`
+        indice = base = None
+        try:
+            indice, base = self._construir(previa.puntos())
+        finally:
+            with self._escritura:
+                self._trabajo = None
+                actual = self._actual
+                cantidad = len(previa.niveles)
+                if (indice is not None and actual.base is previa.base and
+                        _mismos(actual.niveles[:cantidad], previa.niveles)):
+                    self.reconstrucciones += 1
+                    self._actual = Instantanea(actual.numero + 1, indice, base,
+                                               actual.niveles[cantidad:], actual.cola)
+                    self._programar()
+
+    def _fusionarNiveles(self, previa, inicio):
+        # Un solo nivel con los niveles de `previa` desde `inicio`
+        nivel = None
+        try:
+            nivel = NivelDelta(tuple(itertools.chain.from_iterable(n.puntos for n in previa.niveles[inicio:])))
+        finally:
+            with self._escritura:
+                self._trabajo = None
+                actual = self._actual
+                fin = len(previa.niveles)
+                if (nivel is not None and actual.base is previa.base and
+                        _mismos(actual.niveles[:fin], previa.niveles)):
+                    self._actual = Instantanea(actual.numero + 1, actual.indice, actual.base,
+                                               actual.niveles[:inicio] + (nivel,) + actual.niveles[fin:], actual.cola)
+                    self._programar()
+
+    def _construir(self, puntos):
+        # El índice nuevo se construye aparte; los lectores siguen usando la versión anterior
+        indice = crearIndice(self.nombre, self.x_min, self.x_max, self.y_min, self.y_max, **self.parametros)
+        if indice.cargarMasivo(puntos) != len(puntos):
+            # La base debe tener exactamente los puntos que quedaron en el índice
+            puntos = tuple(indice.buscarEnRango(self.x_min, self.x_max, self.y_min, self.y_max))
+        return indice, puntos
+
+    def esperarReconstruccion(self):
+        """Espera a que terminen las reconstrucciones y fusiones de niveles en curso."""
+        while True:
+            # Bajo el Lock: al terminar, un trabajo programa el siguiente en la misma sección
+            with self._escritura:
+                trabajo = self._trabajo
+            if trabajo is None:
+                return
+            trabajo.join()
+
+    def compactar(self):
+        """Reconstruye el índice en este hilo para vaciar el delta."""
+        self.esperarReconstruccion()
+        with self._escritura:
+            actual = self._actual
+            if actual.tamano_delta:
+                indice, base = self._construir(actual.puntos())
+                self.reconstrucciones += 1
+                self._actual = Instantanea(actual.numero + 1, indice, base)
+
+    def __repr__(self):
+        actual = self._actual
+        return f"IndiceConcurrente({self.nombre}, version={actual.numero}, puntos={len(actual)}, delta={actual.tamano_delta})"
+
+
+# ======================== PRUEBA DE ESTRÉS ========================
+
+def pruebaDeEstres(nombre="R-Tree", lectores=8, inserciones=20000, lote=1, lado_consulta=50,
+                   espacio=(0, 1000, 0, 1000), semilla=0, **parametros):
+    """
+    Un hilo escritor inserta `inserciones` puntos (de a `lote`) mientras `lectores`
+    hilos consultan sin parar. Cada lector toma una instantánea, hace una consulta
+    de rango y un vecino más cercano, y los compara con una búsqueda exhaustiva
+    sobre los puntos de esa misma instantánea. También verifica que las versiones
+    que observa nunca retrocedan. Devuelve un diccionario con contadores y errores;
+    al final, `aceptados`, `puntos_finales` y `puntos_indexados` deben coincidir.
+    """
+    x_min, x_max, y_min, y_max = espacio
+    parametros = parametros or parametrosPorDefecto(nombre, inserciones)
+    indice = IndiceConcurrente(nombre, x_min, x_max, y_min, y_max, **parametros)
+    rng = random.Random(semilla)
+    puntos = [(round(rng.uniform(x_min, x_max), 1), round(rng.uniform(y_min, y_max), 1))
+              for _ in range(inserciones)]
+
+    terminado = threading.Event()
+    errores = []
+    lecturas = [0] * lectores
+    aceptados = [0]
+
+    def escritor():
+        try:
+            for i in range(0, len(puntos), lote):
+                aceptados[0] += indice.cargarMasivo(puntos[i:i + lote])
+            indice.esperarReconstruccion()
+        finally:
+            terminado.set()
+
+    def lector(numero):
+        rng_lector = random.Random(semilla + numero + 1)
+        ultimaVersion = -1
+        while not terminado.is_set():
+            v = indice.instantanea()
+            if v.numero < ultimaVersion:
+                errores.append(f"lector {numero}: versión {v.numero} después de {ultimaVersion}")
+            ultimaVersion = v.numero
+
+            x = rng_lector.uniform(x_min, x_max - lado_consulta)
+            y = rng_lector.uniform(y_min, y_max - lado_consulta)
+            obtenido = sorted(v.buscarEnRango(x, x + lado_consulta, y, y + lado_consulta))
+            todos = v.puntos()
+            esperado = sorted(p for p in todos if x <= p[0] <= x + lado_consulta and y <= p[1] <= y + lado_consulta)
+            if obtenido != esperado:
+                errores.append(f"lector {numero}: rango con {len(obtenido)} puntos, se esperaban {len(esperado)} (versión {v.numero})")
+
+            q = (rng_lector.uniform(x_min, x_max), rng_lector.uniform(y_min, y_max))
+            vecino = v.buscarVecinoMasCercano(q)
+            if todos and (vecino is None or math.dist(vecino, q) > min(math.dist(p, q) for p in todos)):
+                errores.append(f"lector {numero}: vecino incorrecto (versión {v.numero})")
+            lecturas[numero] += 1
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    hilos.append(threading.Thread(target=escritor))
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    transcurrido = time.perf_counter() - inicio
+
+    return {
+        "estructura": nombre,
+        "lectores": lectores,
+        "inserciones": inserciones,
+        "segundos": transcurrido,
+        "lecturas": sum(lecturas),
+        "version_final": indice.version,
+        "reconstrucciones": indice.reconstrucciones,
+        "aceptados": aceptados[0],
+        "puntos_finales": len(indice),
+        "puntos_indexados": len(indice.buscarEnRango(x_min, x_max, y_min, y_max)),
+        "errores": errores,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de estrés: lectores concurrentes contra un escritor.")
+    parser.add_argument("--estructura", default="R-Tree", choices=list(INDICES))
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--inserciones", type=int, default=20000)
+    parser.add_argument("--lote", type=int, default=1, help="Puntos por publicación del escritor")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    resultado = pruebaDeEstres(args.estructura, args.lectores, args.inserciones, args.lote, semilla=args.semilla)
+    print(f"{resultado['estructura']}: {resultado['lecturas']} lecturas verificadas y "
+          f"{resultado['inserciones']} inserciones en {resultado['segundos']:.2f} s "
+          f"({resultado['reconstrucciones']} reconstrucciones, versión final {resultado['version_final']})")
+    for error in resultado["errores"][:20]:
+        print("ERROR:", error)
+    if not resultado["aceptados"] == resultado["puntos_finales"] == resultado["puntos_indexados"]:
+        print(f"ERROR: {resultado['aceptados']} puntos aceptados, {resultado['puntos_finales']} contados y "
+              f"{resultado['puntos_indexados']} indexados al final")
+        return 1
+    return 1 if resultado["errores"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+# datos.py
+#
+# Generación vectorizada de conjuntos de puntos y carga por bloques desde archivos.
+# Todas las funciones trabajan con arreglos NumPy de forma (n, 2); los bloques
+# se pueden pasar directamente a `cargarMasivo` de cualquier estructura.
+
+import itertools
+import os
+
+import numpy as np
+
+
+def _rng(semilla):
+    return np.random.default_rng(semilla)
+
+
+def _ajustar(puntos, xMin, xMax, yMin, yMax, decimales):
+    """Recorta los puntos al rango y, si se pide, los redondea."""
+    np.clip(puntos[:, 0], xMin, xMax, out=puntos[:, 0])
+    np.clip(puntos[:, 1], yMin, yMax, out=puntos[:, 1])
+    if decimales is not None:
+        np.round(puntos, decimales, out=puntos)
+    return puntos
+
+
+# ======================== GENERADORES ========================
+
+def generarUniforme(cantidad, xMin, xMax, yMin, yMax, semilla=None, decimales=None):
+    """Puntos uniformes en el rectángulo (equivalente vectorizado de utils.generarPuntosAleatorios)."""
+    rng = _rng(semilla)
+    puntos = np.empty((cantidad, 2))
+    puntos[:, 0] = rng.uniform(xMin, xMax, cantidad)
+    puntos[:, 1] = rng.uniform(yMin, yMax, cantidad)
+    return _ajustar(puntos, xMin, xMax, yMin, yMax, decimales)
+
+
+def generarAgrupados(cantidad, xMin, xMax, yMin, yMax, grupos=5, dispersion=None, semilla=None, decimales=None):
+    """Cúmulos gaussianos con centros uniformes y tamaños desiguales."""
+    rng = _rng(semilla)
+    if dispersion is None:
+        dispersion = 0.05 * min(xMax - xMin, yMax - yMin)
+    centros = np.column_stack((rng.uniform(xMin, xMax, grupos), rng.uniform(yMin, yMax, grupos)))
+    pesos = rng.dirichlet(np.ones(grupos))
+    asignacion = rng.choice(grupos, size=cantidad, p=pesos)
+    puntos = centros[asignacion] + rng.normal(0, dispersion, (cantidad, 2))
+    return _ajustar(puntos, xMin, xMax, yMin, yMax, decimales)
+
+
+def generarZipf(cantidad, xMin, xMax, yMin, yMax, celdas=64, exponente=1.2, semilla=None, decimales=None):
+    """
+    Datos sesgados: el espacio se divide en celdas x celdas casillas y la
+    popularidad de cada casilla sigue una ley de Zipf (la k-ésima más
+    popular recibe una fracción proporcional a 1 / k^exponente).
+    """
+    rng = _rng(semilla)
+    total = celdas * celdas
+    probabilidades = 1.0 / np.arange(1, total + 1) ** exponente
+    probabilidades /= probabilidades.sum()
+    casillas = rng.permutation(total)[rng.choice(total, size=cantidad, p=probabilidades)]
+    ancho = (xMax - xMin) / celdas
+    alto = (yMax - yMin) / celdas
+    puntos = np.empty((cantidad, 2))
+    puntos[:, 0] = xMin + (casillas % celdas + rng.random(cantidad)) * ancho
+    puntos[:, 1] = yMin + (casillas // celdas + rng.random(cantidad)) * alto
+    return _ajustar(puntos, xMin, xMax, yMin, yMax, decimales)
+
+
+def generarRedVial(cantidad, xMin, xMax, yMin, yMax, calles=40, ruido=None, semilla=None, decimales=None):
+    """
+    Puntos a lo largo de una red de segmentos, como lecturas GPS sobre calles:
+    mayormente horizontales y verticales, con algunas avenidas diagonales.
+    """
+    rng = _rng(semilla)
+    if ruido is None:
+        ruido = 0.002 * min(xMax - xMin, yMax - yMin)
+
+    inicios = np.column_stack((rng.uniform(xMin, xMax, calles), rng.uniform(yMin, yMax, calles)))
+    finales = inicios.copy()
+    tipo = rng.choice(3, size=calles, p=[0.45, 0.45, 0.10])
+    largo = rng.uniform(0.2, 1.0, calles)
+    finales[tipo == 0, 0] = xMin + largo[tipo == 0] * (xMax - xMin)  # horizontales
+    inicios[tipo == 0, 0] = xMin
+    finales[tipo == 1, 1] = yMin + largo[tipo == 1] * (yMax - yMin)  # verticales
+    inicios[tipo == 1, 1] = yMin
+    diagonales = tipo == 2
+    finales[diagonales] = np.column_stack((rng.uniform(xMin, xMax, diagonales.sum()),
+                                           rng.uniform(yMin, yMax, diagonales.sum())))
+
+    # Cada calle recibe puntos en proporción a su longitud
+    longitudes = np.hypot(*(finales - inicios).T) + 1e-12
+    calle = rng.choice(calles, size=cantidad, p=longitudes / longitudes.sum())
+    t = rng.random(cantidad)[:, None]
+    puntos = inicios[calle] + t * (finales[calle] - inicios[calle]) + rng.normal(0, ruido, (cantidad, 2))
+    return _ajustar(puntos, xMin, xMax, yMin, yMax, decimales)
+
+
+GENERADORES = {
+    "uniforme": generarUniforme,
+    "agrupada": generarAgrupados,
+    "zipf": generarZipf,
+    "red_vial": generarRedVial,
+}
+
+
+def aTuplas(puntos):
+    """Convierte un arreglo (n, 2) en una lista de tuplas (x, y) de floats de Python."""
+    return list(map(tuple, np.asarray(puntos).tolist()))
+
+
+# ======================== CARGA POR BLOQUES ========================
+
+def leerCSV(ruta, tamano_bloque=100_000, separador=",", columnas=(0, 1)):
+    """
+    Lee un CSV por bloques de `tamano_bloque` filas y genera arreglos (k, 2).
+    Si la primera línea no es numérica se toma como encabezado.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        primera = f.readline()
+        lineas = f
+        try:
+            [float(primera.split(separador)[c]) for c in columnas]
+            lineas = itertools.chain([primera], f)
+        except (ValueError, IndexError):
+            pass  # Encabezado
+        while True:
+            bloque = list(itertools.islice(lineas, tamano_bloque))
+            if not bloque:
+                return
+            yield np.loadtxt(bloque, delimiter=separador, usecols=columnas, ndmin=2, dtype=float)
+
+
+def guardarBinario(ruta, puntos):
+    """Guarda los puntos como pares float64 little-endian intercalados (x0, y0, x1, y1, ...)."""
+    np.ascontiguousarray(puntos, dtype="<f8").tofile(ruta)
+
+
+def leerBinario(ruta, tamano_bloque=1_000_000):
+    """Lee un archivo de guardarBinario por bloques, sin cargarlo entero en memoria."""
+    if os.path.getsize(ruta) == 0:
+        return
+    datos = np.memmap(ruta, dtype="<f8", mode="r").reshape(-1, 2)
+    for inicio in range(0, len(datos), tamano_bloque):
+        yield np.array(datos[inicio:inicio + tamano_bloque])
+
+
+def guardarColumnar(ruta, puntos):
+    """Guarda los puntos en formato columnar: un directorio con x.npy e y.npy."""
+    os.makedirs(ruta, exist_ok=True)
+    puntos = np.asarray(puntos, dtype=float)
+    np.save(os.path.join(ruta, "x.npy"), puntos[:, 0])
+    np.save(os.path.join(ruta, "y.npy"), puntos[:, 1])
+
+
+def leerColumnar(ruta, tamano_bloque=1_000_000, columnas=("x", "y")):
+    """
+    Lee datos columnares por bloques:
+    - un directorio de guardarColumnar (columnas .npy mapeadas en memoria), o
+    - un archivo .parquet (requiere pyarrow), leyendo solo las columnas indicadas.
+    """
+    if ruta.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Leer archivos Parquet requiere el paquete 'pyarrow'") from error
+        archivo = pq.ParquetFile(ruta)
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=list(columnas)):
+            yield np.column_stack([lote.column(i).to_numpy(zero_copy_only=False) for i in range(len(columnas))]).astype(float)
+        return
+
+    xs = np.load(os.path.join(ruta, f"{columnas[0]}.npy"), mmap_mode="r")
+    ys = np.load(os.path.join(ruta, f"{columnas[1]}.npy"), mmap_mode="r")
+    for inicio in range(0, len(xs), tamano_bloque):
+        yield np.column_stack((xs[inicio:inicio + tamano_bloque], ys[inicio:inicio + tamano_bloque]))
+
+
+def cargarEnEstructura(estructura, bloques):
+    """Envía cada bloque a `estructura.cargarMasivo` y devuelve el total de puntos insertados."""
+    total = 0
+    for bloque in bloques:
+        total += estructura.cargarMasivo(bloque)
+    return total
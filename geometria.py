@@ -0,0 +1,127 @@
+# geometria.py
+#
+# Geometrías exactas para el paso de refinamiento de las consultas de objetos
+# del R-Tree (ver RTree.insertar_objeto). El índice filtra con los MBRs y solo
+# los candidatos que pasan ese filtro se comparan con su geometría.
+#
+# Todas las geometrías ofrecen la misma interfaz:
+# - mbr() -> (min_x, min_y, max_x, max_y)
+# - intersectaRectangulo(min_x, min_y, max_x, max_y) -> bool
+# - contienePunto(punto) -> bool (borde incluido)
+# - distanciaAPunto(punto) -> float (0 si el punto está sobre o dentro de la geometría)
+
+import math
+
+
+def _distanciaPuntoSegmento(p, a, b):
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    largo2 = dx * dx + dy * dy
+    if largo2 == 0:
+        return math.dist(p, a)
+    # Proyección de p sobre la recta, recortada al segmento
+    t = max(0.0, min(1.0, ((p[0] - ax) * dx + (p[1] - ay) * dy) / largo2))
+    return math.dist(p, (ax + t * dx, ay + t * dy))
+
+
+def _segmentoIntersectaRectangulo(a, b, min_x, min_y, max_x, max_y):
+    # Recorte de Liang-Barsky: el segmento a + t (b - a), t en [0, 1], se acota
+    # contra cada borde; si el intervalo de t queda vacío, no hay intersección
+    t0, t1 = 0.0, 1.0
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    for p, q in ((-dx, a[0] - min_x), (dx, max_x - a[0]), (-dy, a[1] - min_y), (dy, max_y - a[1])):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
+
+
+def _mbrDeVertices(vertices):
+    xs = [v[0] for v in vertices]
+    ys = [v[1] for v in vertices]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+class Polilinea:
+    """Línea quebrada abierta (por ejemplo, un tramo de calle)."""
+
+    def __init__(self, vertices):
+        self.vertices = [tuple(v) for v in vertices]
+        if not self.vertices:
+            raise ValueError("Una polilínea necesita al menos un vértice")
+
+    def segmentos(self):
+        if len(self.vertices) == 1:
+            return [(self.vertices[0], self.vertices[0])]
+        return list(zip(self.vertices, self.vertices[1:]))
+
+    def mbr(self):
+        return _mbrDeVertices(self.vertices)
+
+    def intersectaRectangulo(self, min_x, min_y, max_x, max_y):
+        return any(_segmentoIntersectaRectangulo(a, b, min_x, min_y, max_x, max_y) for a, b in self.segmentos())
+
+    def contienePunto(self, punto):
+        return self.distanciaAPunto(punto) == 0
+
+    def distanciaAPunto(self, punto):
+        return min(_distanciaPuntoSegmento(punto, a, b) for a, b in self.segmentos())
+
+    def __repr__(self):
+        return f"Polilinea({len(self.vertices)} vértices)"
+
+
+class Poligono:
+    """Polígono simple (por ejemplo, el contorno de un edificio); se cierra solo."""
+
+    def __init__(self, vertices):
+        self.vertices = [tuple(v) for v in vertices]
+        if len(self.vertices) > 1 and self.vertices[0] == self.vertices[-1]:
+            self.vertices.pop()
+        if len(self.vertices) < 3:
+            raise ValueError("Un polígono necesita al menos tres vértices")
+
+    def segmentos(self):
+        return list(zip(self.vertices, self.vertices[1:] + self.vertices[:1]))
+
+    def mbr(self):
+        return _mbrDeVertices(self.vertices)
+
+    def _dentro(self, punto):
+        # Regla par-impar con un rayo horizontal hacia la derecha
+        px, py = punto
+        dentro = False
+        for (ax, ay), (bx, by) in self.segmentos():
+            if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+                dentro = not dentro
+        return dentro
+
+    def intersectaRectangulo(self, min_x, min_y, max_x, max_y):
+        # Se cortan si algún borde del polígono toca el rectángulo, o si uno
+        # contiene al otro (entonces basta probar una esquina del rectángulo)
+        if any(_segmentoIntersectaRectangulo(a, b, min_x, min_y, max_x, max_y) for a, b in self.segmentos()):
+            return True
+        return self._dentro((min_x, min_y))
+
+    def contienePunto(self, punto):
+        return self._dentro(punto) or self.distanciaAPunto(punto) == 0
+
+    def distanciaAPunto(self, punto):
+        if self._dentro(punto):
+            return 0.0
+        return min(_distanciaPuntoSegmento(punto, a, b) for a, b in self.segmentos())
+
+    def area(self):
+        """Área por la fórmula del área de Gauss."""
+        return abs(sum(a[0] * b[1] - b[0] * a[1] for a, b in self.segmentos())) / 2
+
+    def __repr__(self):
+        return f"Poligono({len(self.vertices)} vértices)"
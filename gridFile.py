@@ -2,6 +2,8 @@
 
 import math
 
+from utils import conId, conIds, crearSumidero, resultadoDeSumidero
+
 class Bucket:
     def __init__(self, capacity):
         self.points = []
@@ -26,6 +28,7 @@ class GridFile:
         self.grid_size_x = max(1, grid_size_x) # Asegura que sea al menos 1
         self.grid_size_y = max(1, grid_size_y) # Asegura que sea al menos 1
         self.bucket_capacity = bucket_capacity
+        self.metricas = None  # Instancia opcional de metricas.Metricas
 
         # Calcula el tamaño de cada celda en X e Y
         # Asegúrate de que el divisor no sea cero para evitar errores
@@ -58,7 +61,9 @@ class GridFile:
         y_idx = max(0, min(y_idx, self.grid_size_y - 1))
         return x_idx, y_idx
 
-    def insertar(self, point):
+    def insertar(self, point, id=None):
+        # Con `id` el punto se guarda como PuntoId (ver utils.py)
+        point = conId(point, id)
         # Verifica si el punto está dentro del rango general del Grid File
         if not (self.x_min <= point[0] <= self.x_max and
                 self.y_min <= point[1] <= self.y_max):
@@ -68,6 +73,23 @@ class GridFile:
         # Intenta añadir el punto al bucket correspondiente
         return self.grid[x_idx][y_idx].add_point(point)
 
+    def cargarMasivo(self, points, ids=None):
+        # Agrupa los puntos por celda y los añade a cada bucket de una sola vez
+        grupos = {}
+        for point in conIds(points, ids):
+            if (self.x_min <= point[0] <= self.x_max and
+                    self.y_min <= point[1] <= self.y_max):
+                grupos.setdefault(self._get_grid_coordinates(point), []).append(point)
+
+        inserted = 0
+        for (x_idx, y_idx), group in grupos.items():
+            bucket = self.grid[x_idx][y_idx]
+            # Igual que en insertar, lo que no cabe en el bucket se descarta
+            space = max(0, bucket.capacity - len(bucket.points))
+            bucket.points.extend(group[:space])
+            inserted += min(space, len(group))
+        return inserted
+
     def buscarPunto(self, point):
         # Verifica si el punto está dentro del rango general del Grid File
         if not (self.x_min <= point[0] <= self.x_max and
@@ -75,24 +97,35 @@ class GridFile:
             return False
         x_idx, y_idx = self._get_grid_coordinates(point)
         # Busca el punto en el bucket de la celda correspondiente
-        return self.grid[x_idx][y_idx].contains_point(point)
-
-    def buscarEnRango(self, xMin, xMax, yMin, yMax):
-        results = []
+        if self.metricas is None:
+            return self.grid[x_idx][y_idx].contains_point(point)
+        c = self.metricas.iniciar('puntual')
+        bucket = self.grid[x_idx][y_idx]
+        encontrado = bucket.contains_point(point)
+        c.nodos_visitados = 1
+        c.puntos_probados = bucket.points.index(point) + 1 if encontrado else len(bucket.points)
+        c.podas = self.grid_size_x * self.grid_size_y - 1
+        self.metricas.finalizar(c)
+        return encontrado
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        # `modo` elige qué devolver: puntos, ids, arreglo de ids o conteo (ver utils.MODOS_RESULTADO)
+        results = crearSumidero(modo)
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
         
         # Determina las celdas de la cuadrícula que se intersectan con el rango de consulta
         # Es crucial usar floor para el inicio y ceil para el final (o int y ajuste)
         
         # Calcular los índices de las celdas que contienen los límites del rango de consulta
         # Limitar a los bordes de la cuadrícula
-        start_x_idx = max(0, int(math.floor((xMin - self.x_min) / self.x_step)))
+        start_x_idx = min(self.grid_size_x - 1, max(0, int(math.floor((xMin - self.x_min) / self.x_step))))
         # Para el final, floor(xMax / step) podría dar un índice menor si xMax es un límite exacto.
         # Por eso, se calcula a dónde caería el punto y se ajusta al último índice si es necesario.
         end_x_idx = min(self.grid_size_x - 1, int(math.floor((xMax - self.x_min) / self.x_step)))
         # Si xMax coincide exactamente con el límite superior de la última celda, el floor
         # lo dejará en grid_size_x - 1, lo cual es correcto. Si lo excede, min lo recorta.
 
-        start_y_idx = max(0, int(math.floor((yMin - self.y_min) / self.y_step)))
+        start_y_idx = min(self.grid_size_y - 1, max(0, int(math.floor((yMin - self.y_min) / self.y_step))))
         end_y_idx = min(self.grid_size_y - 1, int(math.floor((yMax - self.y_min) / self.y_step)))
         
         # Iterar sobre las celdas que se superponen con el rango.
@@ -103,7 +136,52 @@ class GridFile:
                 for p in self.grid[i][j].points:
                     if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax:
                         results.append(p)
-        return results
+                if c is not None:
+                    c.nodos_visitados += 1
+                    c.puntos_probados += len(self.grid[i][j].points)
+
+        if c is not None:
+            c.podas = self.grid_size_x * self.grid_size_y - c.nodos_visitados
+            self.metricas.finalizar(c)
+        return resultadoDeSumidero(results)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        """
+        Versión perezosa de buscarEnRango: genera los puntos celda por celda y
+        se detiene tras `limite` puntos.
+        """
+        if limite is not None and limite <= 0:
+            return
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
+        start_x_idx = min(self.grid_size_x - 1, max(0, int(math.floor((xMin - self.x_min) / self.x_step))))
+        end_x_idx = min(self.grid_size_x - 1, int(math.floor((xMax - self.x_min) / self.x_step)))
+        start_y_idx = min(self.grid_size_y - 1, max(0, int(math.floor((yMin - self.y_min) / self.y_step))))
+        end_y_idx = min(self.grid_size_y - 1, int(math.floor((yMax - self.y_min) / self.y_step)))
+        found = 0
+        try:
+            for i in range(start_x_idx, end_x_idx + 1):
+                for j in range(start_y_idx, end_y_idx + 1):
+                    points = self.grid[i][j].points
+                    if c is not None:
+                        c.nodos_visitados += 1
+                    for p in points:
+                        if c is not None:
+                            c.puntos_probados += 1
+                        if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax:
+                            yield p
+                            found += 1
+                            if found == limite:
+                                return
+        finally:
+            if c is not None:
+                c.podas = self.grid_size_x * self.grid_size_y - c.nodos_visitados
+                self.metricas.finalizar(c)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        """Indica si hay algún punto en el rango; se detiene en el primero."""
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, limite=1):
+            return True
+        return False
 
     def buscarVecinoMasCercano(self, punto_objetivo):
         if not self.grid_size_x > 0 or not self.grid_size_y > 0:
@@ -111,6 +189,7 @@ class GridFile:
 
         closest_point = None
         min_dist = float('inf')
+        c = self.metricas.iniciar('vecino') if self.metricas is not None else None
         
         for i in range(self.grid_size_x):
             for j in range(self.grid_size_y):
@@ -119,21 +198,52 @@ class GridFile:
                     if dist < min_dist:
                         min_dist = dist
                         closest_point = p
+                if c is not None:
+                    c.nodos_visitados += 1
+                    c.puntos_probados += len(self.grid[i][j].points)
+                    c.distancias += len(self.grid[i][j].points)
         
+        if c is not None:
+            self.metricas.finalizar(c)
         return closest_point
 
-    def get_grid_cells_boundaries(self):
-        # Devuelve los límites de todas las celdas de la cuadrícula para visualización
-        boundaries = []
+    def get_grid_cells_boundaries(self, ventana=None, max_celdas=None):
+        # Devuelve los límites de las celdas de la cuadrícula para visualización (ver iterar_celdas)
+        return list(self.iterar_celdas(ventana, max_celdas))
+
+    def iterar_celdas(self, ventana=None, max_celdas=None):
+        """
+        Genera los límites ((x_start, y_start), (x_end, y_end)) de las celdas.
+        - ventana: (xMin, xMax, yMin, yMax); solo se generan las celdas que la intersectan.
+        - max_celdas: nivel de detalle. Si la ventana abarca más celdas, se agrupan
+          en bloques de k x k celdas (k potencia de 2) hasta no superar ese número.
+        """
         # Solo procede si los pasos no son cero y las dimensiones de la cuadrícula son válidas
         if self.x_step == 0 or self.y_step == 0 or self.grid_size_x == 0 or self.grid_size_y == 0:
-            return boundaries
-            
-        for i in range(self.grid_size_x):
-            for j in range(self.grid_size_y):
+            return
+
+        if ventana is None:
+            start_x_idx, end_x_idx = 0, self.grid_size_x - 1
+            start_y_idx, end_y_idx = 0, self.grid_size_y - 1
+        else:
+            xMin, xMax, yMin, yMax = ventana
+            # Mismo recorte que buscarEnRango: una ventana que empieza en el borde superior toca la última celda
+            start_x_idx = min(self.grid_size_x - 1, max(0, int(math.floor((xMin - self.x_min) / self.x_step))))
+            end_x_idx = min(self.grid_size_x - 1, int(math.floor((xMax - self.x_min) / self.x_step)))
+            start_y_idx = min(self.grid_size_y - 1, max(0, int(math.floor((yMin - self.y_min) / self.y_step))))
+            end_y_idx = min(self.grid_size_y - 1, int(math.floor((yMax - self.y_min) / self.y_step)))
+
+        # Agrupación de celdas para no superar max_celdas (los bloques se alinean con el origen de la cuadrícula)
+        bloque = 1
+        if max_celdas is not None:
+            while (end_x_idx // bloque - start_x_idx // bloque + 1) * \
+                  (end_y_idx // bloque - start_y_idx // bloque + 1) > max(1, max_celdas):
+                bloque *= 2
+
+        for i in range(start_x_idx // bloque * bloque, end_x_idx + 1, bloque):
+            for j in range(start_y_idx // bloque * bloque, end_y_idx + 1, bloque):
                 x_start = self.x_min + i * self.x_step
                 y_start = self.y_min + j * self.y_step
-                x_end = x_start + self.x_step
-                y_end = y_start + self.y_step
-                boundaries.append(((x_start, y_start), (x_end, y_end)))
-        return boundaries
\ No newline at end of file
+                x_end = self.x_min + min(i + bloque, self.grid_size_x) * self.x_step
+                y_end = self.y_min + min(j + bloque, self.grid_size_y) * self.y_step
+                yield ((x_start, y_start), (x_end, y_end))
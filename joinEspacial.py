@@ -0,0 +1,350 @@
+# joinEspacial.py
+#
+# Joins espaciales entre dos conjuntos de puntos indexados, sin hacer una
+# consulta por cada punto del primer conjunto:
+#
+# - Join por distancia: todos los pares (a, b) con dist(a, b) <= distancia.
+#   Con distancia = 0 es el join por intersección (puntos coincidentes).
+#     unirRTree     recorrido sincronizado de dos RTree: solo se bajan los pares
+#                   de nodos cuyos MBRs están a distancia <= distancia.
+#     unirKD        recorrido dual de dos ArbolKD con la caja de cada subárbol.
+#     unirGridFile  pares de celdas: cada celda no vacía de A solo se compara con
+#                   las celdas de B que tocan su caja agrandada en `distancia`.
+#     unirPorDistancia  elige el método según las estructuras (o adaptadores);
+#                   si son de tipos distintos hace un join con consultas de rango.
+# - Join de vecino más cercano: para cada a, el punto de B más cercano
+#   (unirVecinoMasCercano).
+#
+# Todas las funciones son generadores: los pares se producen a medida que se
+# encuentran, sin armar la lista completa.
+#
+# Ejemplo (compara con el join por consultas de rango):
+#   python joinEspacial.py --estructura R-Tree --puntos 20000 --distancia 2
+
+import argparse
+import bisect
+import math
+import random
+import time
+
+from kdTree import ArbolKD
+from quadTree import QuadTree
+from gridFile import GridFile
+from rTree import RTree
+from adaptadores import INDICES, IndiceEspacial, crearIndice
+from benchmark import parametrosPorDefecto
+from utils import ordenarPorMorton
+
+# Por debajo de esta cantidad de puntos entre los dos subárboles, unirKD deja de
+# dividir y compara los bloques directamente (ver _paresCercanos)
+HOJA_KD = 256
+
+
+def _distanciaCajas(a, b):
+    # Cajas como (xMin, yMin, xMax, yMax)
+    dx = max(a[0] - b[2], b[0] - a[2], 0)
+    dy = max(a[1] - b[3], b[1] - a[3], 0)
+    return math.hypot(dx, dy)
+
+
+def _cajaDePuntos(puntos):
+    xs = [p[0] for p in puntos]
+    ys = [p[1] for p in puntos]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _paresCercanos(puntosA, puntosB, distancia):
+    # Pares a distancia <= distancia entre dos bloques pequeños, con barrido en x:
+    # B se ordena por x y cada punto de A solo recorre la franja [x - d, x + d]
+    puntosB = sorted(puntosB)
+    xsB = [b[0] for b in puntosB]
+    for a in puntosA:
+        ax, ay = a
+        i = bisect.bisect_left(xsB, ax - distancia)
+        fin = bisect.bisect_right(xsB, ax + distancia)
+        while i < fin:
+            b = puntosB[i]
+            if abs(b[1] - ay) <= distancia and math.dist(a, b) <= distancia:
+                yield a, b
+            i += 1
+
+
+# ======================== R-TREE ========================
+
+def unirRTree(arbolA, arbolB, distancia=0.0):
+    """
+    Pares (a, b) con a en arbolA, b en arbolB y dist(a, b) <= distancia.
+    Recorre ambos árboles a la vez; un par de nodos se descarta cuando la
+    distancia entre sus MBRs supera `distancia`. Si los árboles tienen distinta
+    altura, se sigue bajando solo por el que todavía no llegó a las hojas.
+    """
+    if not arbolA.root.entries or not arbolB.root.entries:
+        return
+    pendientes = [(arbolA.root, arbolB.root)]
+    while pendientes:
+        nodoA, nodoB = pendientes.pop()
+        if nodoA.mbr.min_distance(nodoB.mbr) > distancia:
+            continue
+        # Solo interesan las entradas de cada nodo cercanas al MBR del otro
+        entradasA = [e for e in nodoA.entries if e.mbr.min_distance(nodoB.mbr) <= distancia]
+        entradasB = [e for e in nodoB.entries if e.mbr.min_distance(nodoA.mbr) <= distancia]
+        if nodoA.is_leaf and nodoB.is_leaf:
+            # Los objetos con extensión (RTree.insertar_objeto) no participan del join de puntos
+            yield from _paresCercanos([e.point for e in entradasA if e.point is not None],
+                                      [e.point for e in entradasB if e.point is not None], distancia)
+        elif nodoA.is_leaf:
+            pendientes.extend((nodoA, eb.child_node) for eb in entradasB)
+        elif nodoB.is_leaf:
+            pendientes.extend((ea.child_node, nodoB) for ea in entradasA)
+        else:
+            for ea in entradasA:
+                for eb in entradasB:
+                    if ea.mbr.min_distance(eb.mbr) <= distancia:
+                        pendientes.append((ea.child_node, eb.child_node))
+
+
+# ======================== KD-TREE ========================
+
+def _cajasHijos(nodo, caja):
+    # Regiones de los hijos: a la izquierda van las coordenadas menores o iguales
+    # que el corte y a la derecha las mayores o iguales (ver ArbolKD._insertarDesde)
+    eje = nodo.profundidad % 2
+    corte = nodo.punto[eje]
+    izquierda = list(caja)
+    derecha = list(caja)
+    izquierda[eje + 2] = min(caja[eje + 2], corte)
+    derecha[eje] = max(caja[eje], corte)
+    return tuple(izquierda), tuple(derecha)
+
+
+def _puntoContraSubarbol(punto, nodo, caja, distancia):
+    # Puntos del subárbol a distancia <= distancia de `punto`
+    cajaPunto = (punto[0], punto[1], punto[0], punto[1])
+    pendientes = [(nodo, caja)]
+    while pendientes:
+        nodo, caja = pendientes.pop()
+        if _distanciaCajas(cajaPunto, caja) > distancia:
+            continue
+        if math.dist(punto, nodo.punto) <= distancia:
+            yield nodo.punto
+        cajaIzquierda, cajaDerecha = _cajasHijos(nodo, caja)
+        if nodo.izquierdo:
+            pendientes.append((nodo.izquierdo, cajaIzquierda))
+        if nodo.derecho:
+            pendientes.append((nodo.derecho, cajaDerecha))
+
+
+def unirKD(arbolA, arbolB, distancia=0.0):
+    """
+    Pares (a, b) con a en arbolA, b en arbolB y dist(a, b) <= distancia.
+    Recorrido dual: cada par de subárboles se descarta si sus cajas están a más
+    de `distancia`; si no, se separa el más grande en su punto y sus dos hijos.
+    El punto separado se compara con el otro subárbol (con poda por cajas) y
+    los hijos forman pares nuevos, así cada par de puntos se revisa una sola vez.
+    Los pares de subárboles con menos de HOJA_KD puntos se comparan en bloque.
+    """
+    if arbolA.raiz is None or arbolB.raiz is None:
+        return
+    # La caja inicial de cada árbol es la que encierra todos sus puntos
+    pendientes = [(arbolA.raiz, _cajaDePuntos(arbolA._recolectarPuntos(arbolA.raiz)),
+                   arbolB.raiz, _cajaDePuntos(arbolB._recolectarPuntos(arbolB.raiz)))]
+    while pendientes:
+        nodoA, cajaA, nodoB, cajaB = pendientes.pop()
+        if _distanciaCajas(cajaA, cajaB) > distancia:
+            continue
+        if nodoA.tamano + nodoB.tamano <= HOJA_KD:
+            yield from _paresCercanos(arbolA._recolectarPuntos(nodoA), arbolB._recolectarPuntos(nodoB), distancia)
+        elif nodoA.tamano >= nodoB.tamano:
+            for b in _puntoContraSubarbol(nodoA.punto, nodoB, cajaB, distancia):
+                yield nodoA.punto, b
+            cajaIzquierda, cajaDerecha = _cajasHijos(nodoA, cajaA)
+            if nodoA.izquierdo:
+                pendientes.append((nodoA.izquierdo, cajaIzquierda, nodoB, cajaB))
+            if nodoA.derecho:
+                pendientes.append((nodoA.derecho, cajaDerecha, nodoB, cajaB))
+        else:
+            for a in _puntoContraSubarbol(nodoB.punto, nodoA, cajaA, distancia):
+                yield a, nodoB.punto
+            cajaIzquierda, cajaDerecha = _cajasHijos(nodoB, cajaB)
+            if nodoB.izquierdo:
+                pendientes.append((nodoA, cajaA, nodoB.izquierdo, cajaIzquierda))
+            if nodoB.derecho:
+                pendientes.append((nodoA, cajaA, nodoB.derecho, cajaDerecha))
+
+
+# ======================== GRID FILE ========================
+
+def _rangoCeldas(grid, minimo, maximo, eje):
+    # Índices de las celdas de `grid` que tocan [minimo, maximo] en el eje dado,
+    # con el mismo redondeo que GridFile.buscarEnRango
+    if eje == 0:
+        origen, paso, cantidad = grid.x_min, grid.x_step, grid.grid_size_x
+    else:
+        origen, paso, cantidad = grid.y_min, grid.y_step, grid.grid_size_y
+    if paso == 0:
+        return range(cantidad)
+    inicio = min(cantidad - 1, max(0, int(math.floor((minimo - origen) / paso))))
+    fin = min(cantidad - 1, int(math.floor((maximo - origen) / paso)))
+    return range(inicio, fin + 1)
+
+
+def unirGridFile(gridA, gridB, distancia=0.0):
+    """
+    Pares (a, b) con a en gridA, b en gridB y dist(a, b) <= distancia.
+    Para cada celda no vacía de A se toma la caja de sus puntos agrandada en
+    `distancia` y solo se comparan las celdas de B que la tocan. Las dos
+    cuadrículas pueden tener distinto tamaño y distinta división.
+    """
+    for columna in gridA.grid:
+        for bucket in columna:
+            puntosA = bucket.points
+            if not puntosA:
+                continue
+            xMin, yMin, xMax, yMax = _cajaDePuntos(puntosA)
+            xMin, yMin, xMax, yMax = xMin - distancia, yMin - distancia, xMax + distancia, yMax + distancia
+            candidatos = [b for i in _rangoCeldas(gridB, xMin, xMax, 0)
+                          for j in _rangoCeldas(gridB, yMin, yMax, 1)
+                          for b in gridB.grid[i][j].points
+                          if xMin <= b[0] <= xMax and yMin <= b[1] <= yMax]
+            if candidatos:
+                yield from _paresCercanos(puntosA, candidatos, distancia)
+
+
+# ======================== GENÉRICOS ========================
+
+def _puntos(estructura):
+    """Todos los puntos guardados en cualquiera de las cuatro estructuras."""
+    if isinstance(estructura, ArbolKD):
+        return estructura._recolectarPuntos(estructura.raiz) if estructura.raiz else []
+    if isinstance(estructura, GridFile):
+        return [p for columna in estructura.grid for bucket in columna for p in bucket.points]
+    if isinstance(estructura, RTree):
+        puntos = []
+        pendientes = [estructura.root]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.is_leaf:
+                puntos.extend(e.point for e in nodo.entries if e.point is not None)
+            else:
+                pendientes.extend(e.child_node for e in nodo.entries)
+        return puntos
+    if isinstance(estructura, QuadTree):
+        puntos = []
+        pendientes = [estructura]
+        while pendientes:
+            nodo = pendientes.pop()
+            puntos.extend(nodo.puntos)
+            if nodo.dividido:
+                pendientes.extend((nodo.noroeste, nodo.noreste, nodo.suroeste, nodo.sureste))
+        return puntos
+    raise TypeError(f"Estructura no soportada: {type(estructura).__name__}")
+
+
+def unirPorConsultas(indiceA, indiceB, distancia=0.0):
+    """
+    Join por distancia con una consulta de rango en B por cada punto de A
+    (index nested loop). Sirve para cualquier par de adaptadores y como
+    referencia para los joins especializados.
+    """
+    for a in _puntos(indiceA.estructura):
+        for b in indiceB.buscarEnRango(a[0] - distancia, a[0] + distancia, a[1] - distancia, a[1] + distancia):
+            if math.dist(a, b) <= distancia:
+                yield a, b
+
+
+def unirPorDistancia(a, b, distancia=0.0):
+    """
+    Pares (pa, pb) a distancia <= distancia. `a` y `b` pueden ser estructuras o
+    adaptadores (IndiceEspacial); si son del mismo tipo se usa el join
+    especializado y si no, unirPorConsultas.
+    """
+    if distancia < 0:
+        raise ValueError("distancia must be non-negative")
+    estructuraA = a.estructura if isinstance(a, IndiceEspacial) else a
+    estructuraB = b.estructura if isinstance(b, IndiceEspacial) else b
+    if isinstance(estructuraA, RTree) and isinstance(estructuraB, RTree):
+        return unirRTree(estructuraA, estructuraB, distancia)
+    if isinstance(estructuraA, ArbolKD) and isinstance(estructuraB, ArbolKD):
+        return unirKD(estructuraA, estructuraB, distancia)
+    if isinstance(estructuraA, GridFile) and isinstance(estructuraB, GridFile):
+        return unirGridFile(estructuraA, estructuraB, distancia)
+    if not isinstance(a, IndiceEspacial) or not isinstance(b, IndiceEspacial):
+        raise TypeError("Para estructuras de distinto tipo se necesitan adaptadores (ver adaptadores.py)")
+    return unirPorConsultas(a, b, distancia)
+
+
+def unirVecinoMasCercano(puntosA, indiceB):
+    """
+    Pares (a, vecino más cercano de a en indiceB) para cada punto de puntosA.
+    En el R-Tree y el Grid File, cuya búsqueda de vecino recorre todos los
+    puntos, los de A se recorren en orden Morton (no en el orden de entrada): el
+    vecino del punto anterior, que suele estar cerca, acota la distancia del
+    actual, y basta una consulta de rango pequeña. El KD-Tree y el Quadtree usan
+    su propia búsqueda de vecino. Si indiceB está vacío no se produce nada.
+    """
+    puntosA = [tuple(p) for p in puntosA]
+    if not puntosA:
+        return
+    if isinstance(indiceB.estructura, (ArbolKD, QuadTree)):
+        # Su búsqueda de vecino ya poda por regiones: no hace falta la cota
+        for a in puntosA:
+            vecino = indiceB.buscarVecinoMasCercano(a)
+            if vecino is None:
+                return
+            yield a, vecino
+        return
+    puntosA = ordenarPorMorton(puntosA, indiceB.x_min, indiceB.x_max, indiceB.y_min, indiceB.y_max)
+    anterior = indiceB.buscarVecinoMasCercano(puntosA[0])
+    if anterior is None:
+        return
+    for a in puntosA:
+        # El vecino anterior es un candidato, así que el más cercano está a distancia <= r
+        r = math.dist(a, anterior)
+        candidatos = indiceB.buscarEnRango(a[0] - r, a[0] + r, a[1] - r, a[1] + r) if r else [anterior]
+        mejor = min(candidatos, key=lambda b: math.dist(a, b), default=anterior)
+        if math.dist(a, mejor) > r:
+            mejor = anterior
+        yield a, mejor
+        anterior = mejor
+
+
+# ======================== COMPARACIÓN ========================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Join por distancia entre dos índices: especializado contra consultas de rango.")
+    parser.add_argument("--estructura", default="R-Tree", choices=list(INDICES))
+    parser.add_argument("--puntos", type=int, default=20000, help="Puntos de cada conjunto")
+    parser.add_argument("--distancia", type=float, default=2.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.semilla)
+    parametros = parametrosPorDefecto(args.estructura, args.puntos)
+    indices = []
+    for _ in range(2):
+        indice = crearIndice(args.estructura, 0, 1000, 0, 1000, **parametros)
+        indice.cargarMasivo([(round(rng.uniform(0, 1000), 1), round(rng.uniform(0, 1000), 1))
+                             for _ in range(args.puntos)])
+        indices.append(indice)
+
+    inicio = time.perf_counter()
+    pares = sorted(unirPorDistancia(indices[0], indices[1], args.distancia))
+    tiempoJoin = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    esperado = sorted(unirPorConsultas(indices[0], indices[1], args.distancia))
+    tiempoConsultas = time.perf_counter() - inicio
+    print(f"{args.estructura}: {len(pares)} pares a distancia <= {args.distancia}")
+    print(f"  join especializado    {tiempoJoin:8.3f} s")
+    print(f"  consultas de rango    {tiempoConsultas:8.3f} s")
+
+    inicio = time.perf_counter()
+    vecinos = sum(1 for _ in unirVecinoMasCercano(_puntos(indices[0].estructura), indices[1]))
+    print(f"  vecino más cercano    {time.perf_counter() - inicio:8.3f} s ({vecinos} puntos)")
+    if pares != esperado:
+        print(f"ERROR: {len(pares)} pares, se esperaban {len(esperado)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
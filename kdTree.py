@@ -1,6 +1,14 @@
 # kdTree.py
 
+import heapq
 import math
+from array import array
+
+from utils import conId, conIds, crearSumidero, resultadoDeSumidero
+
+# Subárboles de hasta este tamaño se tratan como un solo bloque en
+# todosKVecinos y parMasCercano
+TAMANO_BLOQUE_VECINOS = 16
 
 class NodoKD:
     def __init__(self, punto, profundidad=0):
@@ -8,56 +16,281 @@ class NodoKD:
         self.izquierdo = None
         self.derecho = None
         self.profundidad = profundidad
+        self.tamano = 1  # Cantidad de nodos del subárbol (incluido este)
+
+def _tamano(nodo):
+    return nodo.tamano if nodo is not None else 0
 
 class ArbolKD:
-    def __init__(self):
+    # alfa: si se indica (0.5 < alfa < 1), el árbol se mantiene con altura
+    # acotada por log_{1/alfa}(n) mediante reconstrucciones parciales (scapegoat).
+    # En cada nodo, a la izquierda quedan las coordenadas <= corte y a la derecha
+    # las >= corte: los puntos iguales al corte van al lado con menos nodos, así
+    # que también las rachas de duplicados exactos quedan balanceadas.
+    def __init__(self, alfa=None):
+        if alfa is not None and not 0.5 < alfa < 1:
+            raise ValueError("alfa must be between 0.5 and 1 (exclusive)")
         self.raiz = None
+        self.alfa = alfa
+        self.metricas = None  # Instancia opcional de metricas.Metricas
 
-    # Insertar un nuevo punto en el árbol KD
-    def insertar(self, punto):
-        self.raiz = self._insertarRecursivo(self.raiz, punto, 0)
+    # Insertar un nuevo punto en el árbol KD; con `id` se guarda como PuntoId (ver utils.py)
+    def insertar(self, punto, id=None):
+        punto = conId(punto, id)
+        if self.raiz is None:
+            self.raiz = NodoKD(punto)
+            return
+        camino = self._insertarDesde(self.raiz, punto)
 
-    def _insertarRecursivo(self, nodo, punto, profundidad):
-        if nodo is None:
-            return NodoKD(punto, profundidad)
+        # Si el nuevo nodo quedó más profundo de lo permitido, reconstruir un ancestro
+        if self.alfa is not None and len(camino) > self._profundidadPermitida():
+            self._reconstruirChivoExpiatorio(camino)
 
-        eje = profundidad % 2
+    @staticmethod
+    def _insertarDesde(nodo, punto):
+        # Baja desde `nodo` (no vacío) hasta un hueco y cuelga ahí el punto.
+        # Devuelve el camino recorrido (los ancestros del nodo nuevo)
+        camino = []
+        while True:
+            nodo.tamano += 1
+            camino.append(nodo)
+            eje = nodo.profundidad % 2
+            if punto[eje] < nodo.punto[eje]:
+                izquierda = True
+            elif punto[eje] > nodo.punto[eje]:
+                izquierda = False
+            else:
+                izquierda = _tamano(nodo.izquierdo) < _tamano(nodo.derecho)
+            siguiente = nodo.izquierdo if izquierda else nodo.derecho
+            if siguiente is None:
+                nuevo = NodoKD(punto, nodo.profundidad + 1)
+                if izquierda:
+                    nodo.izquierdo = nuevo
+                else:
+                    nodo.derecho = nuevo
+                return camino
+            nodo = siguiente
 
-        if punto[eje] < nodo.punto[eje]:
-            nodo.izquierdo = self._insertarRecursivo(nodo.izquierdo, punto, profundidad + 1)
+    # Carga masiva: si el bloque es al menos tan grande como el árbol, se reconstruye
+    # todo de forma balanceada; si no, se insertan por lotes (ver _insertarLote).
+    # Devuelve la cantidad de puntos del bloque.
+    def cargarMasivo(self, puntos, ids=None):
+        puntos = conIds(puntos, ids)
+        cantidad = len(puntos)
+        if cantidad >= _tamano(self.raiz):
+            if self.raiz is not None:
+                puntos.extend(self._recolectarPuntos(self.raiz))
+            self.raiz = self._construirBalanceado(puntos, 0)
         else:
-            nodo.derecho = self._insertarRecursivo(nodo.derecho, punto, profundidad + 1)
+            self._insertarLote(puntos)
+        return cantidad
 
-        return nodo
+    # Inserción por lotes al estilo buffer-tree: el lote se reparte en cada nodo
+    # según el eje de corte y baja entero por cada rama; al llegar a un hueco vacío
+    # el sub-lote se cuelga como subárbol balanceado. Cada nodo se visita una vez
+    # por lote en lugar de una vez por punto.
+    def _insertarLote(self, puntos):
+        visitados = []  # (nodo, padre) en preorden
+        pendientes = [(self.raiz, None, puntos)]
+        while pendientes:
+            nodo, padre, lote = pendientes.pop()
+            nodo.tamano += len(lote)
+            visitados.append((nodo, padre))
+            eje = nodo.profundidad % 2
+            corte = nodo.punto[eje]
+            izquierda = []
+            derecha = []
+            iguales = []
+            for p in lote:
+                if p[eje] < corte:
+                    izquierda.append(p)
+                elif p[eje] > corte:
+                    derecha.append(p)
+                else:
+                    iguales.append(p)
+            if iguales:
+                # Los iguales al corte completan primero el lado más chico
+                diferencia = (_tamano(nodo.derecho) + len(derecha)) - (_tamano(nodo.izquierdo) + len(izquierda))
+                aIzquierda = min(len(iguales), max(0, (diferencia + len(iguales)) // 2))
+                izquierda.extend(iguales[:aIzquierda])
+                derecha.extend(iguales[aIzquierda:])
+            for hijo, subLote, esIzquierdo in ((nodo.izquierdo, izquierda, True), (nodo.derecho, derecha, False)):
+                if not subLote:
+                    continue
+                if hijo is not None:
+                    pendientes.append((hijo, nodo, subLote))
+                elif esIzquierdo:
+                    nodo.izquierdo = self._construirBalanceado(subLote, nodo.profundidad + 1)
+                else:
+                    nodo.derecho = self._construirBalanceado(subLote, nodo.profundidad + 1)
 
-    # Consulta puntual: verificar si un punto exacto está en el árbol
-    def buscarPunto(self, punto):
-        return self._buscarRecursivo(self.raiz, punto, 0)
+        # Con alfa, cada subárbol que quedó desbalanceado tras el lote se reconstruye,
+        # de abajo hacia arriba (los descendientes se visitaron después que su padre)
+        if self.alfa is None:
+            return
+        for nodo, padre in reversed(visitados):
+            if max(_tamano(nodo.izquierdo), _tamano(nodo.derecho)) > self.alfa * nodo.tamano:
+                self._reemplazar(padre, nodo, self._construirBalanceado(self._recolectarPuntos(nodo), nodo.profundidad))
 
-    def _buscarRecursivo(self, nodo, punto, profundidad):
-        if nodo is None:
-            return False
+    # ---------- Balanceo ----------
 
-        if nodo.punto == punto:
-            return True
+    def _profundidadPermitida(self):
+        # Profundidad máxima admitida por el criterio scapegoat: log_{1/alfa}(n)
+        return math.floor(math.log(self.raiz.tamano) / math.log(1 / self.alfa))
 
-        eje = profundidad % 2
+    def _reconstruirChivoExpiatorio(self, camino):
+        # Recorre el camino desde abajo buscando el primer ancestro desbalanceado:
+        # aquel en el que un hijo tiene más de alfa veces los nodos del subárbol.
+        tamanoHijo = 1
+        for i in range(len(camino) - 1, -1, -1):
+            nodo = camino[i]
+            if tamanoHijo > self.alfa * nodo.tamano:
+                nuevo = self._construirBalanceado(self._recolectarPuntos(nodo), nodo.profundidad)
+                self._reemplazar(camino[i - 1] if i else None, nodo, nuevo)
+                return
+            tamanoHijo = nodo.tamano
 
-        if punto[eje] < nodo.punto[eje]:
-            return self._buscarRecursivo(nodo.izquierdo, punto, profundidad + 1)
+    def _reemplazar(self, padre, nodo, nuevo):
+        # Pone `nuevo` en el lugar que ocupaba `nodo` bajo `padre` (None: la raíz)
+        if padre is None:
+            self.raiz = nuevo
+        elif padre.izquierdo is nodo:
+            padre.izquierdo = nuevo
         else:
-            return self._buscarRecursivo(nodo.derecho, punto, profundidad + 1)
+            padre.derecho = nuevo
+
+    # Reconstruye todo el árbol de forma balanceada (mediana en cada nivel)
+    def reconstruir(self):
+        if self.raiz is not None:
+            self.raiz = self._construirBalanceado(self._recolectarPuntos(self.raiz), 0)
+
+    def _recolectarPuntos(self, nodo):
+        puntos = []
+        pendientes = [nodo]
+        while pendientes:
+            actual = pendientes.pop()
+            puntos.append(actual.punto)
+            if actual.izquierdo:
+                pendientes.append(actual.izquierdo)
+            if actual.derecho:
+                pendientes.append(actual.derecho)
+        return puntos
+
+    # Subárbol balanceado con la mediana de cada nivel como corte (con pila
+    # explícita). Los iguales a la mediana quedan repartidos a ambos lados.
+    def _construirBalanceado(self, puntos, profundidad):
+        if not puntos:
+            return None
+        raiz = None
+        pendientes = [(puntos, profundidad, None, False)]
+        while pendientes:
+            puntos, profundidad, padre, esIzquierdo = pendientes.pop()
+            eje = profundidad % 2
+            puntos.sort(key=lambda p: p[eje])
+            medio = len(puntos) // 2
+            nodo = NodoKD(puntos[medio], profundidad)
+            nodo.tamano = len(puntos)
+            if padre is None:
+                raiz = nodo
+            elif esIzquierdo:
+                padre.izquierdo = nodo
+            else:
+                padre.derecho = nodo
+            if medio > 0:
+                pendientes.append((puntos[:medio], profundidad + 1, nodo, True))
+            if medio + 1 < len(puntos):
+                pendientes.append((puntos[medio + 1:], profundidad + 1, nodo, False))
+        return raiz
+
+    # Informe de la forma del árbol: altura, profundidades y nodos por nivel
+    def estadisticas(self):
+        nodosPorNivel = []
+        hojasPorNivel = []
+        sumaProfundidades = 0
+        sumaProfundidadesHojas = 0
+        pendientes = [self.raiz] if self.raiz else []
+        while pendientes:
+            nodo = pendientes.pop()
+            while len(nodosPorNivel) <= nodo.profundidad:
+                nodosPorNivel.append(0)
+                hojasPorNivel.append(0)
+            nodosPorNivel[nodo.profundidad] += 1
+            sumaProfundidades += nodo.profundidad
+            if nodo.izquierdo is None and nodo.derecho is None:
+                hojasPorNivel[nodo.profundidad] += 1
+                sumaProfundidadesHojas += nodo.profundidad
+            if nodo.izquierdo:
+                pendientes.append(nodo.izquierdo)
+            if nodo.derecho:
+                pendientes.append(nodo.derecho)
+
+        nodos = sum(nodosPorNivel)
+        hojas = sum(hojasPorNivel)
+        alturaOptima = math.ceil(math.log2(nodos + 1)) if nodos else 0
+        return {
+            'nodos': nodos,
+            'hojas': hojas,
+            'altura': len(nodosPorNivel),
+            'altura_optima': alturaOptima,
+            'factor_balance': len(nodosPorNivel) / alturaOptima if alturaOptima else 1.0,
+            'profundidad_maxima': len(nodosPorNivel) - 1 if nodos else 0,
+            'profundidad_promedio': sumaProfundidades / nodos if nodos else 0.0,
+            'profundidad_promedio_hojas': sumaProfundidadesHojas / hojas if hojas else 0.0,
+            'nodos_por_nivel': nodosPorNivel,
+            'hojas_por_nivel': hojasPorNivel,
+        }
+
+    # Consulta puntual: verificar si un punto exacto está en el árbol
+    def buscarPunto(self, punto):
+        if self.metricas is None:
+            return self._buscarPuntoDesde(self.raiz, punto)
+        c = self.metricas.iniciar('puntual')
+        encontrado = self._buscarPuntoDesde(self.raiz, punto, c)
+        self.metricas.finalizar(c)
+        return encontrado
 
-    # Consulta por rango: obtener puntos dentro de un rectángulo [xMin, xMax, yMin, yMax]
-    def buscarEnRango(self, xMin, xMax, yMin, yMax):
-        resultado = []
-        self._buscarEnRangoRecursivo(self.raiz, xMin, xMax, yMin, yMax, 0, resultado)
-        return resultado
+    def _buscarPuntoDesde(self, nodo, punto, c=None):
+        # Con una coordenada igual al corte el punto puede estar en cualquiera
+        # de los dos hijos, así que se revisan ambos
+        pendientes = [nodo] if nodo is not None else []
+        while pendientes:
+            nodo = pendientes.pop()
+            if c is not None:
+                c.nodos_visitados += 1
+                c.puntos_probados += 1
+            if nodo.punto == punto:
+                return True
 
-    def _buscarEnRangoRecursivo(self, nodo, xMin, xMax, yMin, yMax, profundidad, resultado):
+            eje = nodo.profundidad % 2
+            if punto[eje] <= nodo.punto[eje] and nodo.izquierdo is not None:
+                pendientes.append(nodo.izquierdo)
+            elif c is not None and nodo.izquierdo is not None:
+                c.podas += 1
+            if punto[eje] >= nodo.punto[eje] and nodo.derecho is not None:
+                pendientes.append(nodo.derecho)
+            elif c is not None and nodo.derecho is not None:
+                c.podas += 1
+        return False
+
+    # Consulta por rango: obtener puntos dentro de un rectángulo [xMin, xMax, yMin, yMax].
+    # `modo` elige qué devolver: puntos, ids, arreglo de ids o conteo (ver utils.MODOS_RESULTADO)
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        resultado = crearSumidero(modo)
+        if self.metricas is None:
+            self._buscarEnRangoRecursivo(self.raiz, xMin, xMax, yMin, yMax, 0, resultado)
+            return resultadoDeSumidero(resultado)
+        c = self.metricas.iniciar('rango')
+        self._buscarEnRangoRecursivo(self.raiz, xMin, xMax, yMin, yMax, 0, resultado, c)
+        self.metricas.finalizar(c)
+        return resultadoDeSumidero(resultado)
+
+    def _buscarEnRangoRecursivo(self, nodo, xMin, xMax, yMin, yMax, profundidad, resultado, c=None):
         if nodo is None:
             return
 
+        if c is not None:
+            c.nodos_visitados += 1
+            c.puntos_probados += 1
         x, y = nodo.punto
         if xMin <= x <= xMax and yMin <= y <= yMax:
             resultado.append(nodo.punto)
@@ -68,29 +301,87 @@ class ArbolKD:
         # para podar ramas que no se intersectan con el rectángulo de búsqueda.
         # Por ahora lo dejamos como estaba para no introducir más cambios.
         if eje == 0:  # Comparar en X
-            if nodo.punto[0] >= xMin:
-                self._buscarEnRangoRecursivo(nodo.izquierdo, xMin, xMax, yMin, yMax, profundidad + 1, resultado)
-            if nodo.punto[0] <= xMax:
-                self._buscarEnRangoRecursivo(nodo.derecho, xMin, xMax, yMin, yMax, profundidad + 1, resultado)
+            minimo, maximo = xMin, xMax
         else:  # Comparar en Y
-            if nodo.punto[1] >= yMin:
-                self._buscarEnRangoRecursivo(nodo.izquierdo, xMin, xMax, yMin, yMax, profundidad + 1, resultado)
-            if nodo.punto[1] <= yMax:
-                self._buscarEnRangoRecursivo(nodo.derecho, xMin, xMax, yMin, yMax, profundidad + 1, resultado)
+            minimo, maximo = yMin, yMax
+
+        if nodo.punto[eje] >= minimo:
+            self._buscarEnRangoRecursivo(nodo.izquierdo, xMin, xMax, yMin, yMax, profundidad + 1, resultado, c)
+        elif c is not None and nodo.izquierdo is not None:
+            c.podas += 1
+        if nodo.punto[eje] <= maximo:
+            self._buscarEnRangoRecursivo(nodo.derecho, xMin, xMax, yMin, yMax, profundidad + 1, resultado, c)
+        elif c is not None and nodo.derecho is not None:
+            c.podas += 1
+
+    # Versión perezosa de buscarEnRango: genera los puntos a medida que el
+    # recorrido (con pila explícita) los encuentra y se detiene tras `limite`
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        if limite is not None and limite <= 0:
+            return
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
+        encontrados = 0
+        pendientes = [(self.raiz, 0)] if self.raiz is not None else []
+        try:
+            while pendientes:
+                nodo, profundidad = pendientes.pop()
+                if c is not None:
+                    c.nodos_visitados += 1
+                    c.puntos_probados += 1
+                x, y = nodo.punto
+                if xMin <= x <= xMax and yMin <= y <= yMax:
+                    yield nodo.punto
+                    encontrados += 1
+                    if encontrados == limite:
+                        return
+
+                if profundidad % 2 == 0:
+                    corte, minimo, maximo = x, xMin, xMax
+                else:
+                    corte, minimo, maximo = y, yMin, yMax
+                # Se apila primero la derecha para recorrer en el mismo orden que buscarEnRango
+                if nodo.derecho is not None:
+                    if corte <= maximo:
+                        pendientes.append((nodo.derecho, profundidad + 1))
+                    elif c is not None:
+                        c.podas += 1
+                if nodo.izquierdo is not None:
+                    if corte >= minimo:
+                        pendientes.append((nodo.izquierdo, profundidad + 1))
+                    elif c is not None:
+                        c.podas += 1
+        finally:
+            if c is not None:
+                self.metricas.finalizar(c)
+
+    # Si hay algún punto en el rango; se detiene en el primero
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, limite=1):
+            return True
+        return False
 
     # ================== SECCIÓN CORREGIDA ==================
 
     # Consulta de vecino más cercano
     def buscarVecinoMasCercano(self, puntoObjetivo):
         # CORRECCIÓN: La llamada inicial ahora espera una tupla (nodo, distancia)
-        mejorNodo, _ = self._buscarNN(self.raiz, puntoObjetivo, 0, None, float('inf'))
+        if self.metricas is None:
+            mejorNodo, _ = self._buscarNN(self.raiz, puntoObjetivo, 0, None, float('inf'))
+            return mejorNodo
+        c = self.metricas.iniciar('vecino')
+        mejorNodo, _ = self._buscarNN(self.raiz, puntoObjetivo, 0, None, float('inf'), c)
+        self.metricas.finalizar(c)
         return mejorNodo
 
-    def _buscarNN(self, nodo, puntoObjetivo, profundidad, mejorNodo, mejorDistancia):
+    def _buscarNN(self, nodo, puntoObjetivo, profundidad, mejorNodo, mejorDistancia, c=None):
         if nodo is None:
             # CORRECCIÓN: Devuelve la tupla completa
             return mejorNodo, mejorDistancia
 
+        if c is not None:
+            c.nodos_visitados += 1
+            c.puntos_probados += 1
+            c.distancias += 1
         distancia = math.dist(nodo.punto, puntoObjetivo)
         if distancia < mejorDistancia:
             mejorNodo = nodo
@@ -106,12 +397,146 @@ class ArbolKD:
             otro = nodo.izquierdo
 
         # CORRECCIÓN: Actualiza mejorNodo y mejorDistancia con el resultado de la recursión
-        mejorNodo, mejorDistancia = self._buscarNN(siguiente, puntoObjetivo, profundidad + 1, mejorNodo, mejorDistancia)
+        mejorNodo, mejorDistancia = self._buscarNN(siguiente, puntoObjetivo, profundidad + 1, mejorNodo, mejorDistancia, c)
 
         # CORRECCIÓN: Esta comprobación ahora usa la `mejorDistancia` actualizada
         if abs(puntoObjetivo[eje] - nodo.punto[eje]) < mejorDistancia:
             # CORRECCIÓN: Actualiza de nuevo al explorar la otra rama
-            mejorNodo, mejorDistancia = self._buscarNN(otro, puntoObjetivo, profundidad + 1, mejorNodo, mejorDistancia)
+            mejorNodo, mejorDistancia = self._buscarNN(otro, puntoObjetivo, profundidad + 1, mejorNodo, mejorDistancia, c)
+        elif c is not None and otro is not None:
+            c.podas += 1
 
         # CORRECCIÓN: Devuelve siempre la tupla (nodo, distancia)
-        return mejorNodo, mejorDistancia
\ No newline at end of file
+        return mejorNodo, mejorDistancia
+
+    # ---------- Operadores sobre todos los puntos ----------
+
+    # Parte el árbol en bloques: cada subárbol con hasta TAMANO_BLOQUE_VECINOS
+    # puntos es un bloque y cada nodo por encima de ellos es un bloque de un solo
+    # punto cuyos hijos son otros bloques. Los puntos de cada bloque quedan con
+    # índices contiguos. Devuelve (puntos, bloques) donde cada bloque es
+    # [inicio, fin, cajaPropia, cajaSubarbol, hijos] y el bloque 0 es la raíz.
+    def _particionarEnBloques(self):
+        puntos = []
+        bloques = []
+        pendientes = [(self.raiz, None)] if self.raiz else []
+        while pendientes:
+            nodo, padre = pendientes.pop()
+            inicio = len(puntos)
+            if nodo.tamano <= TAMANO_BLOQUE_VECINOS:
+                puntos.extend(self._recolectarPuntos(nodo))
+            else:
+                puntos.append(nodo.punto)
+                if nodo.izquierdo:
+                    pendientes.append((nodo.izquierdo, len(bloques)))
+                if nodo.derecho:
+                    pendientes.append((nodo.derecho, len(bloques)))
+            xs = [p[0] for p in puntos[inicio:]]
+            ys = [p[1] for p in puntos[inicio:]]
+            caja = (min(xs), min(ys), max(xs), max(ys))
+            if padre is not None:
+                bloques[padre][4].append(len(bloques))
+            bloques.append([inicio, len(puntos), caja, caja, []])
+
+        # Los hijos siempre se crean después que el padre: recorriendo al revés,
+        # la caja de cada subárbol ya tiene incluidas las de sus hijos
+        for bloque in reversed(bloques):
+            xMin, yMin, xMax, yMax = bloque[3]
+            for hijo in bloque[4]:
+                c = bloques[hijo][3]
+                xMin, yMin, xMax, yMax = min(xMin, c[0]), min(yMin, c[1]), max(xMax, c[2]), max(yMax, c[3])
+            bloque[3] = (xMin, yMin, xMax, yMax)
+        return puntos, bloques
+
+    @staticmethod
+    def _recorrerBloques(bloques, caja, cota):
+        # Bloques cuyo subárbol puede tener puntos a distancia al cuadrado menor
+        # que cota() de la caja dada; los hijos más cercanos se visitan primero
+        xMin, yMin, xMax, yMax = caja
+        pendientes = [(0, 0)]
+        while pendientes:
+            b, d2 = pendientes.pop()
+            if d2 > cota():
+                continue
+            yield b
+            hijos = []
+            for hijo in bloques[b][4]:
+                c = bloques[hijo][3]
+                dx = max(xMin - c[2], c[0] - xMax, 0)
+                dy = max(yMin - c[3], c[1] - yMax, 0)
+                hijos.append((hijo, dx * dx + dy * dy))
+            if len(hijos) == 2 and hijos[0][1] < hijos[1][1]:
+                hijos.reverse()
+            pendientes.extend(hijos)
+
+    # k vecinos más cercanos de cada punto del árbol, sin contarse a sí mismo
+    # (los duplicados exactos sí cuentan como vecinos entre sí). Los puntos se
+    # consultan por bloques: todos los de un bloque comparten un solo recorrido
+    # del árbol, que se poda con la peor de sus k-ésimas distancias.
+    # Devuelve (puntos, vecinos, distancias): vecinos es un array('l') de n * k
+    # índices sobre `puntos` (la fila i son los del punto i, del más cercano al
+    # más lejano) y distancias un array('d') con sus distancias. Si hay menos de
+    # k puntos más, las posiciones sobrantes quedan en -1 e infinito.
+    def todosKVecinos(self, k):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        puntos, bloques = self._particionarEnBloques()
+        n = len(puntos)
+        vecinos = array('l', [-1]) * (n * k)
+        distancias = array('d', [math.inf]) * (n * k)
+
+        for inicio, fin, caja, _, _ in bloques:
+            consultas = range(inicio, fin)
+            xs = [puntos[q][0] for q in consultas]
+            ys = [puntos[q][1] for q in consultas]
+            posiciones = range(fin - inicio)
+            mejores = [[] for _ in consultas]     # Max-heaps de (-distancia², índice)
+            cotas = [math.inf for _ in consultas]  # k-ésima distancia² de cada consulta
+
+            for b in self._recorrerBloques(bloques, caja, lambda: max(cotas)):
+                for j in range(bloques[b][0], bloques[b][1]):
+                    px, py = puntos[j]
+                    for posicion in posiciones:
+                        dx = xs[posicion] - px
+                        dy = ys[posicion] - py
+                        d2 = dx * dx + dy * dy
+                        if d2 < cotas[posicion] and inicio + posicion != j:
+                            heap = mejores[posicion]
+                            if len(heap) < k:
+                                heapq.heappush(heap, (-d2, j))
+                            else:
+                                heapq.heapreplace(heap, (-d2, j))
+                            if len(heap) == k:
+                                cotas[posicion] = -heap[0][0]
+
+            for q, heap in zip(consultas, mejores):
+                heap.sort(reverse=True)
+                for posicion, (d2, j) in enumerate(heap):
+                    vecinos[q * k + posicion] = j
+                    distancias[q * k + posicion] = math.sqrt(-d2)
+        return puntos, vecinos, distancias
+
+    # Par de puntos distintos (como nodos; pueden ser duplicados) más cercanos
+    # entre sí. Usa los mismos bloques que todosKVecinos con una sola cota global,
+    # y cada par se revisa desde el punto de menor índice.
+    # Devuelve (puntoA, puntoB, distancia), o None con menos de dos puntos.
+    def parMasCercano(self):
+        puntos, bloques = self._particionarEnBloques()
+        mejor = [math.inf, None, None]  # distancia², índices del par
+
+        for inicio, fin, caja, _, _ in bloques:
+            if mejor[0] == 0:
+                break
+            for b in self._recorrerBloques(bloques, caja, lambda: mejor[0]):
+                for j in range(max(bloques[b][0], inicio + 1), bloques[b][1]):
+                    px, py = puntos[j]
+                    for q in range(inicio, min(fin, j)):
+                        dx = puntos[q][0] - px
+                        dy = puntos[q][1] - py
+                        d2 = dx * dx + dy * dy
+                        if d2 < mejor[0]:
+                            mejor[:] = [d2, q, j]
+
+        if mejor[1] is None:
+            return None
+        return puntos[mejor[1]], puntos[mejor[2]], math.sqrt(mejor[0])
@@ -0,0 +1,232 @@
+# kdTreeN.py
+#
+# Árbol KD de cualquier dimensión (3D para (x, y, z), 4D para (x, y, z, t), ...).
+# Es la versión general de kdTree.py con dos diferencias:
+# - Cada nodo guarda su eje de corte. Al construir de forma balanceada
+#   (cargarMasivo sobre un árbol vacío o reconstruir) se corta por el eje de
+#   mayor dispersión del subconjunto en lugar de alternar ejes por profundidad.
+#   Los nodos que se agregan de a uno usan el eje siguiente al de su padre.
+# - Las consultas de rango reciben los vectores de mínimos y máximos.
+# Igual que en kdTree.py, los iguales al corte van a la derecha.
+
+import heapq
+import math
+
+from utils import comoListaDeTuplas, esPuntoValido
+
+
+class NodoKDN:
+    __slots__ = ('punto', 'eje', 'izquierdo', 'derecho', 'tamano')
+
+    def __init__(self, punto, eje):
+        self.punto = punto
+        self.eje = eje
+        self.izquierdo = None
+        self.derecho = None
+        self.tamano = 1  # Cantidad de nodos del subárbol (incluido este)
+
+
+class ArbolKDN:
+    def __init__(self, dimensiones=3):
+        if dimensiones < 1:
+            raise ValueError("dimensiones must be at least 1")
+        self.dimensiones = dimensiones
+        self.raiz = None
+        self.metricas = None  # Instancia opcional de metricas.Metricas
+
+    def __len__(self):
+        return self.raiz.tamano if self.raiz else 0
+
+    def _validar(self, punto):
+        if not esPuntoValido(punto, self.dimensiones):
+            raise ValueError(f"Se esperaba un punto de {self.dimensiones} coordenadas: {punto!r}")
+
+    # ---------- Inserción ----------
+
+    def insertar(self, punto):
+        punto = tuple(punto)
+        self._validar(punto)
+        if self.raiz is None:
+            self.raiz = NodoKDN(punto, 0)
+            return
+        nodo = self.raiz
+        while True:
+            nodo.tamano += 1
+            eje = nodo.eje
+            if punto[eje] < nodo.punto[eje]:
+                if nodo.izquierdo is None:
+                    nodo.izquierdo = NodoKDN(punto, (eje + 1) % self.dimensiones)
+                    return
+                nodo = nodo.izquierdo
+            else:
+                if nodo.derecho is None:
+                    nodo.derecho = NodoKDN(punto, (eje + 1) % self.dimensiones)
+                    return
+                nodo = nodo.derecho
+
+    # Carga masiva: si el bloque es al menos tan grande como el árbol, se reconstruye
+    # todo de forma balanceada; si no, los puntos se insertan de a uno.
+    # Devuelve la cantidad de puntos del bloque.
+    def cargarMasivo(self, puntos):
+        puntos = comoListaDeTuplas(puntos)
+        for punto in puntos:
+            self._validar(punto)
+        cantidad = len(puntos)
+        if cantidad >= len(self):
+            if self.raiz is not None:
+                puntos.extend(self._recolectarPuntos(self.raiz))
+            self.raiz = self._construirBalanceado(puntos)
+        else:
+            for punto in puntos:
+                self.insertar(punto)
+        return cantidad
+
+    def reconstruir(self):
+        if self.raiz is not None:
+            self.raiz = self._construirBalanceado(self._recolectarPuntos(self.raiz))
+
+    def _recolectarPuntos(self, nodo):
+        puntos = []
+        pendientes = [nodo]
+        while pendientes:
+            actual = pendientes.pop()
+            puntos.append(actual.punto)
+            if actual.izquierdo:
+                pendientes.append(actual.izquierdo)
+            if actual.derecho:
+                pendientes.append(actual.derecho)
+        return puntos
+
+    def _ejeDeMayorDispersion(self, puntos):
+        # En subconjuntos grandes basta una muestra pareja para elegir el eje
+        if len(puntos) > 256:
+            puntos = puntos[::len(puntos) // 256]
+        mejorEje = 0
+        mejorDispersion = -1
+        for eje in range(self.dimensiones):
+            valores = [p[eje] for p in puntos]
+            dispersion = max(valores) - min(valores)
+            if dispersion > mejorDispersion:
+                mejorEje, mejorDispersion = eje, dispersion
+        return mejorEje
+
+    def _construirBalanceado(self, puntos):
+        if not puntos:
+            return None
+
+        eje = self._ejeDeMayorDispersion(puntos)
+        puntos.sort(key=lambda p: p[eje])
+        medio = len(puntos) // 2
+        # Los iguales a la mediana deben quedar a la derecha (insertar usa `<` para ir a la izquierda)
+        while medio > 0 and puntos[medio - 1][eje] == puntos[medio][eje]:
+            medio -= 1
+
+        nodo = NodoKDN(puntos[medio], eje)
+        nodo.izquierdo = self._construirBalanceado(puntos[:medio])
+        nodo.derecho = self._construirBalanceado(puntos[medio + 1:])
+        nodo.tamano = len(puntos)
+        return nodo
+
+    # ---------- Consultas ----------
+
+    def buscarPunto(self, punto):
+        punto = tuple(punto)
+        c = self.metricas.iniciar('puntual') if self.metricas is not None else None
+        nodo = self.raiz
+        encontrado = False
+        while nodo is not None:
+            if c is not None:
+                c.nodos_visitados += 1
+                c.puntos_probados += 1
+            if nodo.punto == punto:
+                encontrado = True
+                break
+            nodo = nodo.izquierdo if punto[nodo.eje] < nodo.punto[nodo.eje] else nodo.derecho
+        if c is not None:
+            self.metricas.finalizar(c)
+        return encontrado
+
+    # Consulta por rango: puntos p con minimos[i] <= p[i] <= maximos[i] en cada eje
+    def buscarEnRango(self, minimos, maximos):
+        minimos = tuple(minimos)
+        maximos = tuple(maximos)
+        if len(minimos) != self.dimensiones or len(maximos) != self.dimensiones:
+            raise ValueError(f"Se esperaban límites de {self.dimensiones} coordenadas")
+        resultado = []
+        if self.metricas is None:
+            self._buscarEnRangoRecursivo(self.raiz, minimos, maximos, resultado)
+            return resultado
+        c = self.metricas.iniciar('rango')
+        self._buscarEnRangoRecursivo(self.raiz, minimos, maximos, resultado, c)
+        self.metricas.finalizar(c)
+        return resultado
+
+    def _buscarEnRangoRecursivo(self, nodo, minimos, maximos, resultado, c=None):
+        if nodo is None:
+            return
+
+        if c is not None:
+            c.nodos_visitados += 1
+            c.puntos_probados += 1
+        punto = nodo.punto
+        for i in range(len(punto)):
+            if not minimos[i] <= punto[i] <= maximos[i]:
+                break
+        else:
+            resultado.append(punto)
+
+        eje = nodo.eje
+        if punto[eje] >= minimos[eje]:
+            self._buscarEnRangoRecursivo(nodo.izquierdo, minimos, maximos, resultado, c)
+        elif c is not None and nodo.izquierdo is not None:
+            c.podas += 1
+        if punto[eje] <= maximos[eje]:
+            self._buscarEnRangoRecursivo(nodo.derecho, minimos, maximos, resultado, c)
+        elif c is not None and nodo.derecho is not None:
+            c.podas += 1
+
+    # Devuelve el punto más cercano (no el nodo, a diferencia de kdTree.py), o None
+    def buscarVecinoMasCercano(self, puntoObjetivo):
+        vecinos = self.buscarKVecinos(puntoObjetivo, 1)
+        return vecinos[0] if vecinos else None
+
+    # Los k puntos más cercanos, del más cercano al más lejano
+    def buscarKVecinos(self, puntoObjetivo, k):
+        if k <= 0:
+            return []
+        puntoObjetivo = tuple(puntoObjetivo)
+        c = self.metricas.iniciar('vecino' if k == 1 else 'k_vecinos') if self.metricas is not None else None
+        mejores = []  # Max-heap de (-distancia, orden, punto)
+        self._buscarKNN(self.raiz, puntoObjetivo, k, mejores, c)
+        if c is not None:
+            self.metricas.finalizar(c)
+        mejores.sort(reverse=True)
+        return [p for _, _, p in mejores]
+
+    def _buscarKNN(self, nodo, puntoObjetivo, k, mejores, c=None):
+        if nodo is None:
+            return
+
+        if c is not None:
+            c.nodos_visitados += 1
+            c.puntos_probados += 1
+            c.distancias += 1
+        distancia = math.dist(nodo.punto, puntoObjetivo)
+        if len(mejores) < k:
+            heapq.heappush(mejores, (-distancia, -len(mejores), nodo.punto))
+        elif distancia < -mejores[0][0]:
+            heapq.heapreplace(mejores, (-distancia, mejores[0][1], nodo.punto))
+
+        eje = nodo.eje
+        diferencia = puntoObjetivo[eje] - nodo.punto[eje]
+        if diferencia < 0:
+            siguiente, otro = nodo.izquierdo, nodo.derecho
+        else:
+            siguiente, otro = nodo.derecho, nodo.izquierdo
+
+        self._buscarKNN(siguiente, puntoObjetivo, k, mejores, c)
+        # La otra rama solo puede mejorar si el plano de corte está más cerca que el k-ésimo
+        if len(mejores) < k or abs(diferencia) < -mejores[0][0]:
+            self._buscarKNN(otro, puntoObjetivo, k, mejores, c)
+        elif c is not None and otro is not None:
+            c.podas += 1
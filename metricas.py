@@ -0,0 +1,87 @@
+# metricas.py
+
+import time
+from collections import deque
+
+
+class ContadorConsulta:
+    """
+    Trabajo realizado por una consulta:
+    - nodos_visitados: nodos del árbol (o buckets del Grid File) examinados,
+    - puntos_probados: puntos comparados contra la consulta,
+    - distancias: llamadas a math.dist,
+    - podas: subárboles o celdas descartados sin recorrerlos,
+    - tiempo: tiempo de reloj en segundos.
+    """
+    __slots__ = ('tipo', 'nodos_visitados', 'puntos_probados', 'distancias', 'podas', 'tiempo', '_inicio')
+
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.nodos_visitados = 0
+        self.puntos_probados = 0
+        self.distancias = 0
+        self.podas = 0
+        self.tiempo = 0.0
+        self._inicio = time.perf_counter()
+
+    def como_dict(self):
+        return {
+            'tipo': self.tipo,
+            'nodos_visitados': self.nodos_visitados,
+            'puntos_probados': self.puntos_probados,
+            'distancias': self.distancias,
+            'podas': self.podas,
+            'tiempo': self.tiempo,
+        }
+
+    def __repr__(self):
+        return (f"ContadorConsulta({self.tipo}: nodos={self.nodos_visitados}, puntos={self.puntos_probados}, "
+                f"distancias={self.distancias}, podas={self.podas}, tiempo={self.tiempo * 1e6:.1f}us)")
+
+
+class Metricas:
+    """
+    Registro opcional de contadores por consulta. Las estructuras tienen un
+    atributo `metricas` que vale None por defecto; al asignarle una instancia
+    de esta clase cada consulta deja aquí su ContadorConsulta:
+
+        arbol.metricas = Metricas()
+        arbol.buscarEnRango(0, 5, 0, 5)
+        print(arbol.metricas.ultima)
+
+    Con `metricas = None` las consultas solo pagan una comparación con None.
+    """
+    def __init__(self, historial=1000):
+        self.consultas = deque(maxlen=historial)
+
+    def iniciar(self, tipo):
+        return ContadorConsulta(tipo)
+
+    def finalizar(self, contador):
+        contador.tiempo = time.perf_counter() - contador._inicio
+        self.consultas.append(contador)
+        return contador
+
+    @property
+    def ultima(self):
+        return self.consultas[-1] if self.consultas else None
+
+    def limpiar(self):
+        self.consultas.clear()
+
+    def resumen(self):
+        """Promedio de cada contador agrupado por tipo de consulta."""
+        totales = {}
+        for c in self.consultas:
+            t = totales.setdefault(c.tipo, {'consultas': 0, 'nodos_visitados': 0, 'puntos_probados': 0,
+                                            'distancias': 0, 'podas': 0, 'tiempo': 0.0})
+            t['consultas'] += 1
+            t['nodos_visitados'] += c.nodos_visitados
+            t['puntos_probados'] += c.puntos_probados
+            t['distancias'] += c.distancias
+            t['podas'] += c.podas
+            t['tiempo'] += c.tiempo
+        for t in totales.values():
+            for clave in ('nodos_visitados', 'puntos_probados', 'distancias', 'podas', 'tiempo'):
+                t[clave] /= t['consultas']
+        return totales
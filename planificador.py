@@ -0,0 +1,499 @@
+# planificador.py
+#
+# Planificador de consultas: mantiene varios índices de adaptadores.py sobre
+# los mismos puntos (por ejemplo Grid File, R-Tree y KD-Tree) y manda cada
+# consulta al que cuesta menos según un modelo de costo.
+#
+# - Estadísticas de selectividad: un selectividad.Histograma, al día con cada
+#   inserción, estima cuántos puntos caen en un rectángulo.
+# - Modelo de costo de rango: tiempo = a + b * k para los árboles, con k el
+#   conteo estimado, y tiempo = a + b * celdas + c * escaneados para el Grid
+#   File, donde escaneados son los puntos estimados en las celdas que toca la
+#   consulta (un bucket denso cuesta aunque la consulta sea chica).
+# - Las consultas puntuales y de vecinos tienen costo constante por índice.
+# - calibrar() ajusta los coeficientes por mínimos cuadrados midiendo cada
+#   índice con consultas de áreas variadas (de 1e-6 a 1/4 del espacio)
+#   centradas en una muestra de los puntos insertados. Nunca corre dentro de
+#   una consulta: se llama explícitamente (calibrarSiHaceFalta() lo hace
+#   solo si la cantidad de puntos se duplicó desde la última calibración).
+#   Mientras no haya modelo, las consultas van al primer índice candidato.
+# - Un índice que rechaza algún punto (por ejemplo un bucket del Grid File
+#   lleno) queda incompleto y deja de recibir consultas.
+#
+# Ejemplo:
+#   python planificador.py --n 50000 --distribucion agrupada
+
+import argparse
+import math
+import random
+import time
+from collections import Counter
+
+from adaptadores import INDICES, IndiceEspacial, crearIndice
+from asesor import espacioDe, traducirParametros
+from benchmark import DISTRIBUCIONES, ESPACIO, parametrosPorDefecto
+from selectividad import RESOLUCION_POR_DEFECTO, Histograma
+
+ESTRUCTURAS_POR_DEFECTO = ("Grid File", "R-Tree", "KD-Tree")
+# Tipos de consulta con costo constante por índice
+TIPOS_CONSTANTES = ("puntual", "vecino", "kvecinos")
+# k con el que se calibra buscarKVecinos
+K_CALIBRACION = 8
+
+
+def _caracteristicasArbol(indice, estadisticas, k, xMin, xMax, yMin, yMax):
+    return (1.0, k)
+
+
+def _caracteristicasGrid(indice, estadisticas, k, xMin, xMax, yMin, yMax):
+    """Celdas que toca la consulta y puntos estimados en ellas (todos se revisan)."""
+    g = indice.estructura
+    i1 = max(0, int(math.floor((xMin - g.x_min) / g.x_step)))
+    i2 = min(g.grid_size_x - 1, int(math.floor((xMax - g.x_min) / g.x_step)))
+    j1 = max(0, int(math.floor((yMin - g.y_min) / g.y_step)))
+    j2 = min(g.grid_size_y - 1, int(math.floor((yMax - g.y_min) / g.y_step)))
+    if i2 < i1 or j2 < j1:
+        return (1.0, 0.0, 0.0)
+    escaneados = estadisticas.estimar(g.x_min + i1 * g.x_step, g.x_min + (i2 + 1) * g.x_step,
+                                      g.y_min + j1 * g.y_step, g.y_min + (j2 + 1) * g.y_step)
+    return (1.0, float((i2 - i1 + 1) * (j2 - j1 + 1)), escaneados)
+
+
+# Características del modelo de costo de rango de cada estructura
+CARACTERISTICAS = {
+    "Grid File": _caracteristicasGrid,
+}
+
+
+def _resolver(a, b):
+    """Resuelve a x = b por eliminación gaussiana con pivoteo parcial (a es d x d)."""
+    d = len(b)
+    m = [list(fila) + [valor] for fila, valor in zip(a, b)]
+    for col in range(d):
+        pivote = max(range(col, d), key=lambda f: abs(m[f][col]))
+        if abs(m[pivote][col]) < 1e-12:
+            return None
+        m[col], m[pivote] = m[pivote], m[col]
+        for f in range(col + 1, d):
+            factor = m[f][col] / m[col][col]
+            for c in range(col, d + 1):
+                m[f][c] -= factor * m[col][c]
+    x = [0.0] * d
+    for f in range(d - 1, -1, -1):
+        x[f] = (m[f][d] - sum(m[f][c] * x[c] for c in range(f + 1, d))) / m[f][f]
+    return x
+
+
+def ajustarCostos(filas, tiempos):
+    """
+    Coeficientes no negativos de tiempo ~ suma(coef * característica) por
+    mínimos cuadrados del error relativo (cada fila se divide por su tiempo,
+    para que las consultas grandes no dominen el ajuste de las chicas): si
+    algún coeficiente sale negativo se quita esa característica y se vuelve
+    a ajustar.
+    """
+    d = len(filas[0])
+    pesos = [1.0 / max(t, 1e-3) for t in tiempos]
+    filas = [[valor * w for valor in f] for f, w in zip(filas, pesos)]
+    tiempos = [t * w for t, w in zip(tiempos, pesos)]
+    activas = list(range(d))
+    while activas:
+        a = [[sum(f[i] * f[j] for f in filas) for j in activas] for i in activas]
+        b = [sum(f[i] * t for f, t in zip(filas, tiempos)) for i in activas]
+        x = _resolver(a, b)
+        if x is not None and min(x) >= 0:
+            coeficientes = [0.0] * d
+            for i, valor in zip(activas, x):
+                coeficientes[i] = valor
+            return coeficientes
+        # Sistema singular o coeficiente negativo: se descarta la peor característica
+        peor = activas[-1] if x is None else activas[min(range(len(x)), key=x.__getitem__)]
+        activas.remove(peor)
+    return [0.0] * d
+
+
+class Planificador:
+    """
+    Fachada con la interfaz de IndiceEspacial sobre varios índices con los
+    mismos puntos.
+    - indices: dict nombre -> adaptador de adaptadores.py, vacíos y sobre el
+      mismo espacio que el planificador, para que cualquier ruta dé la misma
+      respuesta (ver crearPlanificador para construirlos y cargarlos de una vez).
+    - resolucion: celdas por lado de las estadísticas de selectividad.
+    - tamano_muestra: puntos que se guardan (muestreo de reservorio) para
+      generar las consultas de calibración.
+    Las escrituras van a todos los índices; cada consulta a uno solo.
+    `rutas` cuenta cuántas consultas de cada tipo fueron a cada índice.
+    """
+    nombre = "Planificador"
+    ordenarLotes = False  # Cada índice ya organiza su propia carga masiva
+    cargaPorLotes = True  # Un lote llega a todos los índices con una llamada a cargarMasivo
+
+    def __init__(self, indices, x_min, x_max, y_min, y_max, resolucion=RESOLUCION_POR_DEFECTO,
+                 tamano_muestra=2048, semilla=0):
+        if not indices:
+            raise ValueError("Se necesita al menos un índice")
+        for nombre, indice in dict(indices).items():
+            _validarIndice(nombre, indice, (x_min, x_max, y_min, y_max))
+        self.indices = dict(indices)
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.estadisticas = Histograma(x_min, x_max, y_min, y_max, resolucion)
+        self.incompletos = set()
+        self.modelo = None
+        self.rutas = Counter()
+        self.tamano_muestra = tamano_muestra
+        self.muestra = []
+        self._rng = random.Random(semilla)
+        self._nCalibrado = 0
+
+    def __len__(self):
+        return self.estadisticas.total
+
+    def __repr__(self):
+        return f"Planificador({', '.join(self.indices)})"
+
+    # ---------- Escritura ----------
+
+    def _dentro(self, punto):
+        return self.x_min <= punto[0] <= self.x_max and self.y_min <= punto[1] <= self.y_max
+
+    def _muestrear(self, punto, vistos):
+        # Muestreo de reservorio: cada punto visto queda con la misma probabilidad
+        if len(self.muestra) < self.tamano_muestra:
+            self.muestra.append(tuple(punto))
+        else:
+            posicion = self._rng.randrange(vistos)
+            if posicion < self.tamano_muestra:
+                self.muestra[posicion] = tuple(punto)
+
+    def insertar(self, punto, id=None):
+        if not self._dentro(punto):
+            return False
+        for nombre, indice in self.indices.items():
+            if not indice.insertar(punto, id):
+                self.incompletos.add(nombre)
+        self.estadisticas.agregar(punto)
+        self._muestrear(punto, self.estadisticas.total)
+        return True
+
+    def cargarMasivo(self, puntos, ids=None):
+        puntos = list(puntos)
+        ids = list(ids) if ids is not None else None
+        if ids is not None and len(ids) != len(puntos):
+            raise ValueError("ids must have the same length as puntos")
+        dentro = [i for i, p in enumerate(puntos) if self._dentro(p)]
+        if len(dentro) < len(puntos):
+            puntos = [puntos[i] for i in dentro]
+            ids = [ids[i] for i in dentro] if ids is not None else None
+        for nombre, indice in self.indices.items():
+            if indice.cargarMasivo(puntos, ids) < len(puntos):
+                self.incompletos.add(nombre)
+        vistos = self.estadisticas.total
+        self.estadisticas.agregarMuchos(puntos)
+        for p in puntos:
+            vistos += 1
+            self._muestrear(p, vistos)
+        return len(puntos)
+
+    # ---------- Modelo de costo ----------
+
+    def _candidatos(self):
+        completos = [nombre for nombre in self.indices if nombre not in self.incompletos]
+        # Si ningún índice está completo se usan todos igual
+        return completos or list(self.indices)
+
+    @property
+    def necesitaCalibracion(self):
+        """Si todavía no hay modelo o la cantidad de puntos se duplicó desde la última calibración."""
+        return self.modelo is None or self.estadisticas.total >= 2 * max(1, self._nCalibrado)
+
+    def calibrarSiHaceFalta(self, **opciones):
+        """Llama a calibrar() solo si necesitaCalibracion; devuelve si calibró."""
+        if not self.necesitaCalibracion:
+            return False
+        self.calibrar(**opciones)
+        return True
+
+    def costosRango(self, xMin, xMax, yMin, yMax):
+        """
+        Costo estimado (us) de buscarEnRango en cada índice candidato. Sin modelo
+        calibrado todos cuestan 0 (gana el primer candidato).
+        """
+        modelo = self.modelo
+        if modelo is None:
+            return dict.fromkeys(self._candidatos(), 0.0)
+        k = self.estadisticas.estimar(xMin, xMax, yMin, yMax)
+        costos = {}
+        for nombre in self._candidatos():
+            indice = self.indices[nombre]
+            caracteristicas = CARACTERISTICAS.get(nombre, _caracteristicasArbol)(
+                indice, self.estadisticas, k, xMin, xMax, yMin, yMax)
+            costos[nombre] = sum(c * f for c, f in zip(modelo[nombre]["rango"], caracteristicas))
+        return costos
+
+    def elegirRango(self, xMin, xMax, yMin, yMax):
+        costos = self.costosRango(xMin, xMax, yMin, yMax)
+        return min(costos, key=costos.get)
+
+    def elegir(self, tipo):
+        """Índice más barato para una consulta de costo constante (ver TIPOS_CONSTANTES)."""
+        modelo = self.modelo
+        if modelo is None:
+            return self._candidatos()[0]
+        return min(self._candidatos(), key=lambda nombre: modelo[nombre][tipo])
+
+    def explicar(self, xMin, xMax, yMin, yMax):
+        """Conteo estimado, costo estimado por índice y el índice elegido para un rango."""
+        costos = self.costosRango(xMin, xMax, yMin, yMax)
+        return {"conteo_estimado": self.estadisticas.estimar(xMin, xMax, yMin, yMax),
+                "costos_us": costos, "elegido": min(costos, key=costos.get),
+                "incompletos": sorted(self.incompletos)}
+
+    def _consultasCalibracion(self, cantidad, rng):
+        x_min, x_max, y_min, y_max = self.x_min, self.x_max, self.y_min, self.y_max
+        rangos = []
+        for i in range(cantidad):
+            # Áreas log-uniformes entre 1e-6 y 1/4 del espacio; la mitad centradas
+            # en puntos de la muestra (siguen los datos) y la mitad al azar
+            lado = math.sqrt(10 ** rng.uniform(-6, math.log10(0.25)))
+            lado_x, lado_y = (x_max - x_min) * lado, (y_max - y_min) * lado
+            if i % 2 == 0 and self.muestra:
+                x, y = rng.choice(self.muestra)
+            else:
+                x, y = rng.uniform(x_min, x_max), rng.uniform(y_min, y_max)
+            rangos.append((x - lado_x / 2, x + lado_x / 2, y - lado_y / 2, y + lado_y / 2))
+        if self.muestra:
+            puntos = [rng.choice(self.muestra) for _ in range(max(1, cantidad // 4))]
+        else:
+            puntos = [(rng.uniform(x_min, x_max), rng.uniform(y_min, y_max)) for _ in range(max(1, cantidad // 4))]
+        return rangos, puntos
+
+    def calibrar(self, num_consultas=150, repeticiones=3, semilla=0):
+        """
+        Mide cada índice con consultas de calibración y ajusta el modelo de
+        costo. Devuelve el modelo: {nombre: {'rango': coeficientes,
+        'puntual': us, 'vecino': us, 'kvecinos': us}}.
+        """
+        rng = random.Random(semilla)
+        rangos, puntos = self._consultasCalibracion(num_consultas, rng)
+        reloj = time.perf_counter
+        self.estadisticas.refrescar()
+        k_estimados = [self.estadisticas.estimar(*r) for r in rangos]
+        modelo = {}
+        for nombre, indice in self.indices.items():
+            extraer = CARACTERISTICAS.get(nombre, _caracteristicasArbol)
+            filas, tiempos = [], []
+            for rango, k in zip(rangos, k_estimados):
+                mejor = math.inf
+                for _ in range(repeticiones):
+                    inicio = reloj()
+                    indice.buscarEnRango(*rango)
+                    mejor = min(mejor, reloj() - inicio)
+                filas.append(extraer(indice, self.estadisticas, k, *rango))
+                tiempos.append(mejor * 1e6)
+            modelo[nombre] = {"rango": ajustarCostos(filas, tiempos)}
+
+            operaciones = {
+                "puntual": lambda p: indice.buscarPunto(p),
+                "vecino": lambda p: indice.buscarVecinoMasCercano(p),
+                "kvecinos": lambda p: indice.buscarKVecinos(p, K_CALIBRACION),
+            }
+            for tipo, operacion in operaciones.items():
+                mejor = math.inf
+                for _ in range(repeticiones):
+                    inicio = reloj()
+                    for p in puntos:
+                        operacion(p)
+                    mejor = min(mejor, reloj() - inicio)
+                modelo[nombre][tipo] = mejor / len(puntos) * 1e6
+        self.modelo = modelo
+        self._nCalibrado = self.estadisticas.total
+        return modelo
+
+    # ---------- Consultas ----------
+
+    def buscarPunto(self, punto):
+        nombre = self.elegir("puntual")
+        self.rutas["puntual", nombre] += 1
+        return self.indices[nombre].buscarPunto(punto)
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, modo='puntos'):
+        nombre = self.elegirRango(xMin, xMax, yMin, yMax)
+        self.rutas["rango", nombre] += 1
+        return self.indices[nombre].buscarEnRango(xMin, xMax, yMin, yMax, modo)
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, limite=None):
+        nombre = self.elegirRango(xMin, xMax, yMin, yMax)
+        self.rutas["rango", nombre] += 1
+        return self.indices[nombre].iterarEnRango(xMin, xMax, yMin, yMax, limite)
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax):
+        nombre = self.elegirRango(xMin, xMax, yMin, yMax)
+        self.rutas["rango", nombre] += 1
+        return self.indices[nombre].existeEnRango(xMin, xMax, yMin, yMax)
+
+    def buscarVecinoMasCercano(self, punto):
+        nombre = self.elegir("vecino")
+        self.rutas["vecino", nombre] += 1
+        return self.indices[nombre].buscarVecinoMasCercano(punto)
+
+    def buscarKVecinos(self, punto, k):
+        nombre = self.elegir("kvecinos")
+        self.rutas["kvecinos", nombre] += 1
+        return self.indices[nombre].buscarKVecinos(punto, k)
+
+
+def _validarIndice(nombre, indice, espacio):
+    """
+    Un índice del planificador debe ser un adaptador (rangos cerrados, misma
+    interfaz) sobre el espacio del planificador y estar vacío: las escrituras
+    van a todos, así que solo así todas las rutas responden lo mismo.
+    """
+    if not isinstance(indice, IndiceEspacial):
+        raise TypeError(f"{nombre}: se esperaba un adaptador de adaptadores.py, no {type(indice).__name__}")
+    if (indice.x_min, indice.x_max, indice.y_min, indice.y_max) != tuple(espacio):
+        raise ValueError(f"{nombre}: el espacio del índice no coincide con el del planificador")
+    if indice.existeEnRango(*espacio):
+        raise ValueError(f"{nombre}: el índice debe estar vacío")
+
+
+def parametrosPlanificador(nombre, puntos, espacio):
+    """
+    Parámetros de cada índice del planificador. El bucket del Grid File se
+    dimensiona con la celda más llena (como en asesor.py) para que el índice
+    quede completo también con datos sesgados.
+    """
+    if nombre == "Grid File":
+        muestra = random.Random(0).sample(puntos, min(len(puntos), 5000))
+        return traducirParametros(nombre, {"ocupacion": 16}, muestra, len(puntos), espacio)
+    return parametrosPorDefecto(nombre, len(puntos))
+
+
+def crearPlanificador(puntos, estructuras=ESTRUCTURAS_POR_DEFECTO, espacio=None, parametros=None,
+                      n_esperado=None, **opciones):
+    """
+    Construye un Planificador con un índice de cada estructura, carga los
+    puntos y calibra el modelo de costo.
+    - parametros: dict opcional nombre -> parámetros de crearIndice.
+    - n_esperado: cantidad de puntos que se espera insertar después. Sin
+      puntos iniciales es obligatoria para dimensionar el Grid File (salvo
+      que sus parámetros vengan en `parametros`).
+    """
+    puntos = [tuple(p) for p in puntos]
+    espacio = tuple(espacio or (espacioDe(puntos) if puntos else ESPACIO))
+    parametros = parametros or {}
+    if len(set(estructuras)) != len(estructuras):
+        raise ValueError("Cada estructura puede aparecer una sola vez")
+    indices = {}
+    for nombre in estructuras:
+        if nombre not in INDICES:
+            raise ValueError(f"Estructura desconocida: {nombre!r}. Opciones: {', '.join(INDICES)}")
+        propios = parametros.get(nombre)
+        if propios is None and puntos:
+            propios = parametrosPlanificador(nombre, puntos, espacio)
+        elif propios is None:
+            if nombre == "Grid File" and n_esperado is None:
+                raise ValueError("Sin puntos iniciales, el Grid File necesita n_esperado o parámetros explícitos")
+            propios = parametrosPorDefecto(nombre, n_esperado or 0)
+        indices[nombre] = crearIndice(nombre, *espacio, **propios)
+    planificador = Planificador(indices, *espacio, **opciones)
+    if puntos:
+        planificador.cargarMasivo(puntos)
+        planificador.calibrar()
+    return planificador
+
+
+def generarCarga(puntos, cantidad, espacio, mezcla=None, semilla=0):
+    """
+    Mezcla de consultas [(tipo, argumentos)] para comparar el planificador
+    con cada índice por separado: rangos de áreas log-uniformes entre 1e-6 y
+    1/10 del espacio centrados en puntos de los datos, vecino más cercano,
+    k vecinos y consultas puntuales, en las proporciones de `mezcla`.
+    """
+    rng = random.Random(semilla)
+    mezcla = mezcla or {"rango": 0.6, "vecino": 0.2, "kvecinos": 0.1, "puntual": 0.1}
+    x_min, x_max, y_min, y_max = espacio
+    tipos = list(mezcla)
+    carga = []
+    for tipo in rng.choices(tipos, weights=[mezcla[t] for t in tipos], k=cantidad):
+        x, y = rng.choice(puntos)
+        if tipo == "rango":
+            lado = math.sqrt(10 ** rng.uniform(-6, -1))
+            lado_x, lado_y = (x_max - x_min) * lado, (y_max - y_min) * lado
+            carga.append((tipo, (x - lado_x / 2, x + lado_x / 2, y - lado_y / 2, y + lado_y / 2)))
+        elif tipo == "kvecinos":
+            carga.append((tipo, ((x + rng.gauss(0, 1), y + rng.gauss(0, 1)), 10)))
+        elif tipo == "vecino":
+            carga.append((tipo, ((x + rng.gauss(0, 1), y + rng.gauss(0, 1)),)))
+        else:
+            carga.append((tipo, ((x, y),)))
+    return carga
+
+
+def _ejecutarCarga(indice, carga):
+    operaciones = {
+        "rango": indice.buscarEnRango,
+        "vecino": indice.buscarVecinoMasCercano,
+        "kvecinos": indice.buscarKVecinos,
+        "puntual": indice.buscarPunto,
+    }
+    inicio = time.perf_counter()
+    for tipo, argumentos in carga:
+        operaciones[tipo](*argumentos)
+    return time.perf_counter() - inicio
+
+
+def compararCarga(planificador, carga):
+    """
+    Tiempo total (s) de la carga en cada índice por separado y a través del
+    planificador, y el costo de planificar por sí solo (elegir el índice sin
+    ejecutar la consulta).
+    """
+    resultado = {nombre: _ejecutarCarga(indice, carga) for nombre, indice in planificador.indices.items()}
+    planificador.rutas.clear()
+    resultado["Planificador"] = _ejecutarCarga(planificador, carga)
+    inicio = time.perf_counter()
+    for tipo, argumentos in carga:
+        if tipo == "rango":
+            planificador.elegirRango(*argumentos)
+        else:
+            planificador.elegir(tipo)
+    resultado["planificacion"] = time.perf_counter() - inicio
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el planificador de consultas con cada índice por separado.")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--distribucion", default="uniforme", choices=list(DISTRIBUCIONES))
+    parser.add_argument("--estructuras", nargs="+", default=list(ESTRUCTURAS_POR_DEFECTO), choices=list(INDICES))
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    random.seed(args.semilla)
+    puntos = DISTRIBUCIONES[args.distribucion](args.n, *ESPACIO)
+    inicio = time.perf_counter()
+    planificador = crearPlanificador(puntos, args.estructuras, espacio=ESPACIO, semilla=args.semilla)
+    print(f"Construcción y calibración: {time.perf_counter() - inicio:.2f} s")
+    if planificador.incompletos:
+        print(f"Índices incompletos (no reciben consultas): {', '.join(sorted(planificador.incompletos))}")
+
+    carga = generarCarga(puntos, args.consultas, ESPACIO, semilla=args.semilla)
+    resultado = compararCarga(planificador, carga)
+    for nombre in list(planificador.indices) + ["Planificador"]:
+        print(f"{nombre:>14}: {resultado[nombre] * 1e3:9.1f} ms")
+    print(f"{'(planificar)':>14}: {resultado['planificacion'] * 1e3:9.1f} ms de los del planificador")
+    for (tipo, nombre), cantidad in sorted(planificador.rutas.items()):
+        print(f"  {tipo:>8} -> {nombre}: {cantidad}")
+    mejor_unico = min(planificador.indices, key=resultado.get)
+    print(f"Mejor índice único: {mejor_unico}; el planificador tarda "
+          f"{resultado['Planificador'] / resultado[mejor_unico]:.2f}x su tiempo")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,10 @@
 # quadTree.py
 
+import heapq
 import math
 
+from utils import Agregado, conId, conIds, crearSumidero, resultadoDeSumidero
+
 class Rectangle:
     """Define un área rectangular en el plano."""
     def __init__(self, x, y, w, h):
@@ -22,6 +25,39 @@ class Rectangle:
                     rango.y - rango.h > self.y + self.h or
                     rango.y + rango.h < self.y - self.h)
 
+    def contiene_rectangulo(self, otro):
+        """Verifica si otro rectángulo queda por completo dentro de este."""
+        return (self.x - self.w <= otro.x - otro.w and otro.x + otro.w <= self.x + self.w and
+                self.y - self.h <= otro.y - otro.h and otro.y + otro.h <= self.y + self.h)
+
+    def distancia_minima(self, punto):
+        """Distancia mínima (MINDIST) de un punto a este rectángulo; 0 si está dentro."""
+        dx = max(self.x - self.w - punto[0], 0, punto[0] - (self.x + self.w))
+        dy = max(self.y - self.h - punto[1], 0, punto[1] - (self.y + self.h))
+        return math.hypot(dx, dy)
+
+class RangoCerrado(Rectangle):
+    """
+    Rango de consulta [xMin, xMax] x [yMin, yMax] cerrado en los cuatro bordes
+    (Rectangle es semiabierto). Los puntos se prueban contra los límites exactos;
+    el centro y los semianchos se agrandan un poco para que el redondeo no pode
+    nodos que tocan el borde del rango.
+    """
+    def __init__(self, xMin, xMax, yMin, yMax):
+        margen = 1e-12 * max(1.0, abs(xMin), abs(xMax), abs(yMin), abs(yMax))
+        super().__init__((xMin + xMax) / 2, (yMin + yMax) / 2,
+                         (xMax - xMin) / 2 + margen, (yMax - yMin) / 2 + margen)
+        self.limites = (xMin, xMax, yMin, yMax)
+
+    def contiene_punto(self, punto):
+        xMin, xMax, yMin, yMax = self.limites
+        return xMin <= punto[0] <= xMax and yMin <= punto[1] <= yMax
+
+    def contiene_rectangulo(self, otro):
+        xMin, xMax, yMin, yMax = self.limites
+        return (xMin <= otro.x - otro.w and otro.x + otro.w <= xMax and
+                yMin <= otro.y - otro.h and otro.y + otro.h <= yMax)
+
 class QuadTree:
     """Estructura de datos Quadtree."""
     def __init__(self, boundary, capacidad):
@@ -33,6 +69,7 @@ class QuadTree:
         self.noroeste = None
         self.sureste = None
         self.suroeste = None
+        self.metricas = None  # Instancia opcional de metricas.Metricas (solo en la raíz)
 
     def subdividir(self):
         """Divide el quadtree en cuatro sub-quadtrees."""
@@ -42,18 +79,22 @@ class QuadTree:
         h = self.boundary.h / 2
 
         ne = Rectangle(x + w, y - h, w, h)
-        self.noreste = QuadTree(ne, self.capacidad)
+        self.noreste = self._crearHijo(ne)
         nw = Rectangle(x - w, y - h, w, h)
-        self.noroeste = QuadTree(nw, self.capacidad)
+        self.noroeste = self._crearHijo(nw)
         se = Rectangle(x + w, y + h, w, h)
-        self.sureste = QuadTree(se, self.capacidad)
+        self.sureste = self._crearHijo(se)
         sw = Rectangle(x - w, y + h, w, h)
-        self.suroeste = QuadTree(sw, self.capacidad)
+        self.suroeste = self._crearHijo(sw)
 
         self.dividido = True
 
-    def insertar(self, punto):
-        """Inserta un punto en el Quadtree."""
+    def _crearHijo(self, boundary):
+        return QuadTree(boundary, self.capacidad)
+
+    def insertar(self, punto, id=None):
+        """Inserta un punto en el Quadtree; con `id` se guarda como PuntoId (ver utils.py)."""
+        punto = conId(punto, id)
         if not self.boundary.contiene_punto(punto):
             return False
 
@@ -73,69 +114,271 @@ class QuadTree:
             elif self.suroeste.insertar(punto):
                 return True
     
+    def cargarMasivo(self, puntos, ids=None):
+        """Inserta un bloque de puntos (lista o arreglo (n, 2)), con sus ids opcionales; devuelve cuántos entraron."""
+        return sum(1 for p in conIds(puntos, ids) if self.insertar(p))
+
     def buscarPunto(self, punto):
         """Busca un punto exacto en el Quadtree."""
+        if self.metricas is None:
+            return self._buscarPunto(punto)
+        c = self.metricas.iniciar('puntual')
+        resultado = self._buscarPunto(punto, c)
+        self.metricas.finalizar(c)
+        return resultado
+
+    def _buscarPunto(self, punto, c=None):
+        if c is not None:
+            c.nodos_visitados += 1
         if not self.boundary.contiene_punto(punto):
+            if c is not None:
+                c.podas += 1
             return None
 
         for p in self.puntos:
+            if c is not None:
+                c.puntos_probados += 1
             if p == punto:
                 return p
         
         if self.dividido:
-            if (res := self.noroeste.buscarPunto(punto)) is not None: return res
-            if (res := self.noreste.buscarPunto(punto)) is not None: return res
-            if (res := self.suroeste.buscarPunto(punto)) is not None: return res
-            if (res := self.sureste.buscarPunto(punto)) is not None: return res
+            if (res := self.noroeste._buscarPunto(punto, c)) is not None: return res
+            if (res := self.noreste._buscarPunto(punto, c)) is not None: return res
+            if (res := self.suroeste._buscarPunto(punto, c)) is not None: return res
+            if (res := self.sureste._buscarPunto(punto, c)) is not None: return res
         
         return None
 
-    def buscarEnRango(self, rango):
-        """Encuentra todos los puntos dentro de un rango rectangular."""
-        puntos_encontrados = []
+    def buscarEnRango(self, rango, modo='puntos'):
+        """
+        Encuentra todos los puntos dentro de un rango rectangular.
+        `modo` elige qué devolver: puntos, ids, arreglo de ids o conteo (ver utils.MODOS_RESULTADO).
+        """
+        puntos_encontrados = crearSumidero(modo)
+        if self.metricas is None:
+            self._buscarEnRango(rango, puntos_encontrados)
+            return resultadoDeSumidero(puntos_encontrados)
+        c = self.metricas.iniciar('rango')
+        self._buscarEnRango(rango, puntos_encontrados, c)
+        self.metricas.finalizar(c)
+        return resultadoDeSumidero(puntos_encontrados)
+
+    def _buscarEnRango(self, rango, puntos_encontrados, c=None):
+        if c is not None:
+            c.nodos_visitados += 1
         if not self.boundary.intersecta(rango):
-            return puntos_encontrados
+            if c is not None:
+                c.podas += 1
+            return
 
         for p in self.puntos:
             if rango.contiene_punto(p):
                 puntos_encontrados.append(p)
+        if c is not None:
+            c.puntos_probados += len(self.puntos)
 
         if self.dividido:
-            puntos_encontrados.extend(self.noroeste.buscarEnRango(rango))
-            puntos_encontrados.extend(self.noreste.buscarEnRango(rango))
-            puntos_encontrados.extend(self.suroeste.buscarEnRango(rango))
-            puntos_encontrados.extend(self.sureste.buscarEnRango(rango))
+            self.noroeste._buscarEnRango(rango, puntos_encontrados, c)
+            self.noreste._buscarEnRango(rango, puntos_encontrados, c)
+            self.suroeste._buscarEnRango(rango, puntos_encontrados, c)
+            self.sureste._buscarEnRango(rango, puntos_encontrados, c)
 
-        return puntos_encontrados
+    def iterarEnRango(self, rango, limite=None):
+        """
+        Versión perezosa de buscarEnRango: genera los puntos a medida que los
+        encuentra (recorrido con pila explícita, en el mismo orden) y se
+        detiene tras `limite` puntos. La memoria no depende del tamaño del resultado.
+        """
+        if limite is not None and limite <= 0:
+            return
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
+        encontrados = 0
+        pendientes = [self]
+        try:
+            while pendientes:
+                nodo = pendientes.pop()
+                if c is not None:
+                    c.nodos_visitados += 1
+                if not nodo.boundary.intersecta(rango):
+                    if c is not None:
+                        c.podas += 1
+                    continue
 
-    def buscarVecinoMasCercano(self, punto_consulta, mejor_dist=float('inf'), vecino_cercano=None):
-        """Encuentra el vecino más cercano a un punto dado."""
-        if not self.boundary.contiene_punto(punto_consulta) and \
-           math.dist((self.boundary.x, self.boundary.y), punto_consulta) > mejor_dist:
-             return vecino_cercano, mejor_dist
+                for p in nodo.puntos:
+                    if c is not None:
+                        c.puntos_probados += 1
+                    if rango.contiene_punto(p):
+                        yield p
+                        encontrados += 1
+                        if encontrados == limite:
+                            return
+                if nodo.dividido:
+                    pendientes.extend((nodo.sureste, nodo.suroeste, nodo.noreste, nodo.noroeste))
+        finally:
+            if c is not None:
+                self.metricas.finalizar(c)
 
-        for p in self.puntos:
-            dist = math.dist(p, punto_consulta)
-            if dist < mejor_dist:
-                mejor_dist = dist
-                vecino_cercano = p
+    def existeEnRango(self, rango):
+        """Indica si hay algún punto en el rango; se detiene en el primero."""
+        for _ in self.iterarEnRango(rango, limite=1):
+            return True
+        return False
 
-        if self.dividido:
-            # Ordenar los hijos por proximidad al punto de consulta
-            hijos = [self.noroeste, self.noreste, self.suroeste, self.sureste]
-            hijos.sort(key=lambda quad: math.dist((quad.boundary.x, quad.boundary.y), punto_consulta))
+    def buscarVecinoMasCercano(self, punto_consulta):
+        """Encuentra el vecino más cercano a un punto dado. Devuelve (vecino, distancia)."""
+        vecinos = self.buscarKVecinos(punto_consulta, 1)
+        if not vecinos:
+            return None, float('inf')
+        return vecinos[0]
+
+    def buscarKVecinos(self, punto_consulta, k):
+        """
+        Encuentra los k vecinos más cercanos a un punto dado, ordenados por distancia.
+        Recorre los cuadrantes en orden best-first usando la distancia mínima (MINDIST)
+        de cada rectángulo al punto, y se detiene cuando ningún cuadrante pendiente
+        puede contener un punto más cercano que el k-ésimo encontrado.
+        Devuelve una lista de tuplas (punto, distancia).
+        """
+        if k <= 0:
+            return []
+        c = self.metricas.iniciar('vecino' if k == 1 else 'k_vecinos') if self.metricas is not None else None
 
-            for hijo in hijos:
-                vecino_cercano, mejor_dist = hijo.buscarVecinoMasCercano(punto_consulta, mejor_dist, vecino_cercano)
+        # Max-heap de los mejores candidatos: (-distancia, orden, punto)
+        mejores = []
+        # Min-heap de cuadrantes pendientes: (mindist, orden, nodo). El orden desempata.
+        cola = [(self.boundary.distancia_minima(punto_consulta), 0, self)]
+        orden = 1
 
-        return vecino_cercano, mejor_dist
+        while cola:
+            dist_caja, _, nodo = heapq.heappop(cola)
+            if len(mejores) == k and dist_caja >= -mejores[0][0]:
+                if c is not None:
+                    c.podas += len(cola) + 1
+                break
+
+            if c is not None:
+                c.nodos_visitados += 1
+                c.puntos_probados += len(nodo.puntos)
+                c.distancias += len(nodo.puntos)
+            for p in nodo.puntos:
+                dist = math.dist(p, punto_consulta)
+                if len(mejores) < k:
+                    heapq.heappush(mejores, (-dist, orden, p))
+                elif dist < -mejores[0][0]:
+                    heapq.heapreplace(mejores, (-dist, orden, p))
+                orden += 1
+
+            if nodo.dividido:
+                for hijo in (nodo.noroeste, nodo.noreste, nodo.suroeste, nodo.sureste):
+                    dist_hijo = hijo.boundary.distancia_minima(punto_consulta)
+                    if len(mejores) < k or dist_hijo < -mejores[0][0]:
+                        heapq.heappush(cola, (dist_hijo, orden, hijo))
+                        orden += 1
+                    elif c is not None:
+                        c.podas += 1
+
+        if c is not None:
+            self.metricas.finalizar(c)
+        mejores.sort(key=lambda candidato: (-candidato[0], candidato[1]))
+        return [(p, -dist_neg) for dist_neg, _, p in mejores]
     
-    def obtener_limites(self):
-        """Recopila todos los límites de los quadtree para visualización."""
-        limites = [self.boundary]
-        if self.dividido:
-            limites.extend(self.noroeste.obtener_limites())
-            limites.extend(self.noreste.obtener_limites())
-            limites.extend(self.suroeste.obtener_limites())
-            limites.extend(self.sureste.obtener_limites())
-        return limites
\ No newline at end of file
+    def obtener_limites(self, ventana=None, profundidad_maxima=None):
+        """Recopila los límites de los quadtree para visualización (ver iterar_limites)."""
+        return list(self.iterar_limites(ventana, profundidad_maxima))
+
+    def iterar_limites(self, ventana=None, profundidad_maxima=None):
+        """
+        Genera los límites de los cuadrantes en preorden. Si se indica una
+        `ventana` (Rectangle) solo se recorren los cuadrantes que la intersectan,
+        y con `profundidad_maxima` no se desciende más allá de ese nivel (raíz = 0).
+        """
+        pendientes = [(self, 0)]
+        while pendientes:
+            nodo, profundidad = pendientes.pop()
+            if ventana is not None and not nodo.boundary.intersecta(ventana):
+                continue
+            yield nodo.boundary
+            if nodo.dividido and (profundidad_maxima is None or profundidad < profundidad_maxima):
+                # Se apilan en orden inverso para conservar el orden noroeste, noreste, suroeste, sureste
+                pendientes.append((nodo.sureste, profundidad + 1))
+                pendientes.append((nodo.suroeste, profundidad + 1))
+                pendientes.append((nodo.noreste, profundidad + 1))
+                pendientes.append((nodo.noroeste, profundidad + 1))
+
+
+class QuadTreeAgregado(QuadTree):
+    """
+    Quadtree aumentado con agregados (al estilo aR-tree): cada nodo guarda un
+    Agregado con el conteo y, si se indica `valor`, la suma, el mínimo y el
+    máximo de los puntos de su subárbol (los propios incluidos).
+    - valor: función punto -> número que se evalúa una vez al insertar; por
+      ejemplo `lambda p: pesos[p.id]` con puntos insertados con id. Sin ella
+      solo se cuenta. El valor queda guardado junto al punto (en `valores`,
+      paralela a `puntos`), así que cambiar después la fuente no altera las sumas.
+    agregarEnRango no baja por los cuadrantes que quedan enteros dentro de la
+    consulta: usa su Agregado directamente, así que el costo depende del borde
+    del rango y no de cuántos puntos contiene.
+    """
+    def __init__(self, boundary, capacidad, valor=None):
+        super().__init__(boundary, capacidad)
+        self.valor = valor
+        self.valores = []  # Valor de cada punto de self.puntos, calculado al insertar
+        self.agregado = Agregado()
+
+    def _crearHijo(self, boundary):
+        return QuadTreeAgregado(boundary, self.capacidad, self.valor)
+
+    def insertar(self, punto, id=None):
+        """Inserta un punto y actualiza los agregados del camino desde la raíz."""
+        punto = conId(punto, id)
+        if not self.boundary.contiene_punto(punto):
+            return False
+
+        # Se busca primero el nodo destino para no contar un punto que no se guarde
+        camino = [self]
+        nodo = self
+        while len(nodo.puntos) >= nodo.capacidad:
+            if not nodo.dividido:
+                nodo.subdividir()
+            for hijo in (nodo.noreste, nodo.noroeste, nodo.sureste, nodo.suroeste):
+                if hijo.boundary.contiene_punto(punto):
+                    nodo = hijo
+                    break
+            else:
+                return False
+            camino.append(nodo)
+
+        valor = self.valor(punto) if self.valor is not None else None
+        nodo.puntos.append(punto)
+        nodo.valores.append(valor)
+        for nodo in camino:
+            nodo.agregado.agregarValor(valor)
+        return True
+
+    def agregarEnRango(self, rango):
+        """Agregado de los puntos dentro de `rango` (Rectangle semiabierto o RangoCerrado, como buscarEnRango)."""
+        resultado = Agregado()
+        c = self.metricas.iniciar('agregado') if self.metricas is not None else None
+        pendientes = [self]
+        while pendientes:
+            nodo = pendientes.pop()
+            if c is not None:
+                c.nodos_visitados += 1
+            if not nodo.boundary.intersecta(rango):
+                if c is not None:
+                    c.podas += 1
+                continue
+            if rango.contiene_rectangulo(nodo.boundary):
+                resultado.combinar(nodo.agregado)
+                continue
+
+            for p, valor in zip(nodo.puntos, nodo.valores):
+                if rango.contiene_punto(p):
+                    resultado.agregarValor(valor)
+            if c is not None:
+                c.puntos_probados += len(nodo.puntos)
+            if nodo.dividido:
+                pendientes.extend((nodo.noroeste, nodo.noreste, nodo.suroeste, nodo.sureste))
+        if c is not None:
+            self.metricas.finalizar(c)
+        return resultado
@@ -0,0 +1,279 @@
+# quadTreeLineal.py
+
+import bisect
+import heapq
+import math
+
+from quadTree import Rectangle
+from utils import codigoMorton, decodificarMorton
+
+# Código de localización de la raíz: un bit centinela seguido de 0 pares de bits
+CODIGO_RAIZ = 1
+
+
+def nivel_de_codigo(codigo):
+    """Nivel (profundidad) de la celda representada por un código de localización."""
+    return (codigo.bit_length() - 1) // 2
+
+
+def morton_de_codigo(codigo):
+    """Código Morton de la celda, sin el bit centinela."""
+    return codigo ^ (1 << (2 * nivel_de_codigo(codigo)))
+
+
+def codigo_de_celda(nivel, ix, iy):
+    """Construye el código de localización de la celda (ix, iy) en el nivel dado."""
+    return (1 << (2 * nivel)) | codigoMorton(ix, iy)
+
+
+class QuadTreeLineal:
+    """
+    Quadtree lineal: en lugar de nodos enlazados con cuatro hijos, solo guarda las
+    hojas en un diccionario indexado por su código de localización Morton.
+
+    Un código de localización es un bit centinela seguido de dos bits por nivel
+    (x en el bit par, y en el impar), de modo que el padre de una celda es
+    `codigo >> 2` y sus hijos son `(codigo << 2) | q` con q en 0..3.
+    Junto al diccionario se mantiene un arreglo ordenado con el código Morton,
+    a profundidad máxima, de la esquina inicial de cada hoja; así la localización
+    de un punto es el cálculo de su clave más una búsqueda binaria.
+    """
+    def __init__(self, boundary, capacidad, profundidad_maxima=16):
+        self.boundary = boundary
+        self.capacidad = capacidad
+        self.profundidad_maxima = profundidad_maxima
+        self.hojas = {CODIGO_RAIZ: []}  # código -> lista de puntos
+        self._inicios = [0]             # inicio Morton de cada hoja (ordenado)
+        self._codigos = [CODIGO_RAIZ]   # código de la hoja en la misma posición
+
+        self._celdas_lado = 1 << profundidad_maxima
+        self._x_min = boundary.x - boundary.w
+        self._y_min = boundary.y - boundary.h
+
+    # --- Aritmética de códigos ---
+
+    def _indices_celda(self, punto):
+        """Índices (ix, iy) de la celda de profundidad máxima que contiene el punto."""
+        ix = int((punto[0] - self._x_min) / (2 * self.boundary.w) * self._celdas_lado)
+        iy = int((punto[1] - self._y_min) / (2 * self.boundary.h) * self._celdas_lado)
+        # Protege contra errores de redondeo justo en el borde superior
+        ix = min(max(ix, 0), self._celdas_lado - 1)
+        iy = min(max(iy, 0), self._celdas_lado - 1)
+        return ix, iy
+
+    def _clave(self, punto):
+        """Código Morton del punto a profundidad máxima."""
+        return codigoMorton(*self._indices_celda(punto))
+
+    def _inicio(self, codigo):
+        """Código Morton, a profundidad máxima, de la primera celda cubierta por `codigo`."""
+        nivel = nivel_de_codigo(codigo)
+        return morton_de_codigo(codigo) << (2 * (self.profundidad_maxima - nivel))
+
+    def _rango_celda(self, codigo):
+        """Rango entero [x0, x1) x [y0, y1) de la celda, en unidades de profundidad máxima."""
+        nivel = nivel_de_codigo(codigo)
+        ix, iy = decodificarMorton(morton_de_codigo(codigo))
+        lado = 1 << (self.profundidad_maxima - nivel)
+        return ix * lado, (ix + 1) * lado, iy * lado, (iy + 1) * lado
+
+    def rectangulo(self, codigo):
+        """Devuelve el Rectangle (centro y semiancho) de la celda de un código."""
+        nivel = nivel_de_codigo(codigo)
+        ix, iy = decodificarMorton(morton_de_codigo(codigo))
+        w = self.boundary.w / (1 << nivel)
+        h = self.boundary.h / (1 << nivel)
+        return Rectangle(self._x_min + (2 * ix + 1) * w, self._y_min + (2 * iy + 1) * h, w, h)
+
+    # --- Localización e inserción ---
+
+    def localizar(self, punto):
+        """Devuelve el código de la hoja que contiene el punto, o None si está fuera."""
+        if not self.boundary.contiene_punto(punto):
+            return None
+        i = bisect.bisect_right(self._inicios, self._clave(punto)) - 1
+        return self._codigos[i]
+
+    def insertar(self, punto):
+        """Inserta un punto en el Quadtree lineal."""
+        codigo = self.localizar(punto)
+        if codigo is None:
+            return False
+
+        self.hojas[codigo].append(punto)
+        if len(self.hojas[codigo]) > self.capacidad:
+            self._subdividir(codigo)
+        return True
+
+    def _subdividir(self, codigo):
+        """Sustituye una hoja desbordada por sus cuatro hijas y reparte sus puntos."""
+        nivel = nivel_de_codigo(codigo)
+        if nivel >= self.profundidad_maxima:
+            return  # Celda mínima: la hoja se queda con todos los puntos
+
+        puntos = self.hojas.pop(codigo)
+        i = bisect.bisect_left(self._inicios, self._inicio(codigo))
+        hijos = [(codigo << 2) | q for q in range(4)]
+        self._inicios[i:i + 1] = [self._inicio(h) for h in hijos]
+        self._codigos[i:i + 1] = hijos
+        for h in hijos:
+            self.hojas[h] = []
+
+        desplazamiento = 2 * (self.profundidad_maxima - nivel - 1)
+        for p in puntos:
+            q = (self._clave(p) >> desplazamiento) & 3
+            self.hojas[hijos[q]].append(p)
+
+        for h in hijos:
+            if len(self.hojas[h]) > self.capacidad:
+                self._subdividir(h)
+
+    # --- Consultas ---
+
+    def buscarPunto(self, punto):
+        """Busca un punto exacto: un cálculo de clave y una búsqueda de la hoja."""
+        codigo = self.localizar(punto)
+        if codigo is None:
+            return None
+        for p in self.hojas[codigo]:
+            if p == punto:
+                return p
+        return None
+
+    def buscarEnRango(self, rango):
+        """Encuentra todos los puntos dentro de un rango rectangular."""
+        puntos_encontrados = []
+        pendientes = [CODIGO_RAIZ]
+        while pendientes:
+            codigo = pendientes.pop()
+            if not self.rectangulo(codigo).intersecta(rango):
+                continue
+            if codigo in self.hojas:
+                for p in self.hojas[codigo]:
+                    if rango.contiene_punto(p):
+                        puntos_encontrados.append(p)
+            else:
+                pendientes.extend((codigo << 2) | q for q in range(4))
+        return puntos_encontrados
+
+    def buscarVecinoMasCercano(self, punto_consulta):
+        """Encuentra el vecino más cercano a un punto dado. Devuelve (vecino, distancia)."""
+        vecinos = self.buscarKVecinos(punto_consulta, 1)
+        if not vecinos:
+            return None, float('inf')
+        return vecinos[0]
+
+    def buscarKVecinos(self, punto_consulta, k):
+        """Los k vecinos más cercanos, recorriendo las celdas por MINDIST (best-first)."""
+        if k <= 0:
+            return []
+
+        mejores = []
+        cola = [(self.boundary.distancia_minima(punto_consulta), CODIGO_RAIZ)]
+        orden = 0
+        while cola:
+            dist_caja, codigo = heapq.heappop(cola)
+            if len(mejores) == k and dist_caja >= -mejores[0][0]:
+                break
+
+            if codigo in self.hojas:
+                for p in self.hojas[codigo]:
+                    dist = math.dist(p, punto_consulta)
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-dist, orden, p))
+                    elif dist < -mejores[0][0]:
+                        heapq.heapreplace(mejores, (-dist, orden, p))
+                    orden += 1
+            else:
+                for q in range(4):
+                    hijo = (codigo << 2) | q
+                    dist_hijo = self.rectangulo(hijo).distancia_minima(punto_consulta)
+                    if len(mejores) < k or dist_hijo < -mejores[0][0]:
+                        heapq.heappush(cola, (dist_hijo, hijo))
+
+        mejores.sort(key=lambda candidato: (-candidato[0], candidato[1]))
+        return [(p, -dist_neg) for dist_neg, _, p in mejores]
+
+    def vecinos(self, codigo, dx, dy):
+        """
+        Devuelve los códigos de las hojas adyacentes a la hoja `codigo` en la
+        dirección (dx, dy), con dx, dy en {-1, 0, 1}. Se calcula con aritmética
+        de códigos: se desplazan los índices de la celda en su propio nivel y
+        se busca la hoja del mismo tamaño, de un ancestro mayor o, si la
+        región vecina está subdividida, las hojas menores que tocan el borde.
+        """
+        nivel = nivel_de_codigo(codigo)
+        ix, iy = decodificarMorton(morton_de_codigo(codigo))
+        nx, ny = ix + dx, iy + dy
+        if not (0 <= nx < (1 << nivel) and 0 <= ny < (1 << nivel)):
+            return []
+
+        vecino = codigo_de_celda(nivel, nx, ny)
+        ancestro = vecino
+        while ancestro >= CODIGO_RAIZ:
+            if ancestro in self.hojas:
+                return [ancestro]
+            ancestro >>= 2
+
+        # La región vecina está subdividida: recorre sus hojas en el rango Morton
+        x0, x1, y0, y1 = self._rango_celda(codigo)
+        inicio = self._inicio(vecino)
+        fin = inicio + (1 << (2 * (self.profundidad_maxima - nivel)))
+        i = bisect.bisect_left(self._inicios, inicio)
+        j = bisect.bisect_left(self._inicios, fin)
+        adyacentes = []
+        for hoja in self._codigos[i:j]:
+            hx0, hx1, hy0, hy1 = self._rango_celda(hoja)
+            toca_x = hx0 == x1 if dx > 0 else hx1 == x0 if dx < 0 else hx0 < x1 and x0 < hx1
+            toca_y = hy0 == y1 if dy > 0 else hy1 == y0 if dy < 0 else hy0 < y1 and y0 < hy1
+            if toca_x and toca_y:
+                adyacentes.append(hoja)
+        return adyacentes
+
+    # --- Visualización y serialización ---
+
+    def obtener_limites(self, ventana=None, profundidad_maxima=None):
+        """
+        Límites de las celdas (hojas e internas) para visualización, con el
+        mismo formato (Rectangle) que QuadTree.obtener_limites. Las celdas no
+        coinciden con las de QuadTree para los mismos puntos: aquí una hoja se
+        divide al superar `capacidad` y reparte todos sus puntos entre sus hijas
+        (con tope en `profundidad_maxima`), mientras que QuadTree deja los
+        primeros `capacidad` puntos en el nodo y solo manda los siguientes a
+        los cuadrantes.
+        """
+        return list(self.iterar_limites(ventana, profundidad_maxima))
+
+    def iterar_limites(self, ventana=None, profundidad_maxima=None):
+        """
+        Genera los límites de las celdas en preorden, limitados a las que
+        intersectan `ventana` (Rectangle) y hasta `profundidad_maxima` (raíz = 0).
+        Un código que no es hoja es una celda interna: sus cuatro hijas existen.
+        """
+        pendientes = [CODIGO_RAIZ]
+        while pendientes:
+            codigo = pendientes.pop()
+            rectangulo = self.rectangulo(codigo)
+            if ventana is not None and not rectangulo.intersecta(ventana):
+                continue
+            yield rectangulo
+            if codigo not in self.hojas and (profundidad_maxima is None or nivel_de_codigo(codigo) < profundidad_maxima):
+                pendientes.extend((codigo << 2) | q for q in (3, 2, 1, 0))
+
+    def exportar(self):
+        """Representación plana (serializable) del árbol: parámetros y hojas por código."""
+        return {
+            'boundary': (self.boundary.x, self.boundary.y, self.boundary.w, self.boundary.h),
+            'capacidad': self.capacidad,
+            'profundidad_maxima': self.profundidad_maxima,
+            'hojas': {codigo: list(puntos) for codigo, puntos in self.hojas.items()},
+        }
+
+    @classmethod
+    def importar(cls, datos):
+        """Reconstruye un QuadTreeLineal a partir de la salida de `exportar()`."""
+        arbol = cls(Rectangle(*datos['boundary']), datos['capacidad'], datos['profundidad_maxima'])
+        arbol.hojas = {int(codigo): [tuple(p) for p in puntos] for codigo, puntos in datos['hojas'].items()}
+        arbol._codigos = sorted(arbol.hojas, key=arbol._inicio)
+        arbol._inicios = [arbol._inicio(c) for c in arbol._codigos]
+        return arbol
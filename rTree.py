@@ -1,6 +1,9 @@
 # rTree.py
 
 import math
+from collections import deque
+
+from utils import Agregado, conId, conIds, crearSumidero, resultadoDeSumidero
 
 class Rectangle:
     """
@@ -29,6 +32,17 @@ class Rectangle:
                     self.min_y > other_rect.max_y or
                     self.max_y < other_rect.min_y)
 
+    def contains(self, other_rect):
+        """Verifica si otro rectángulo queda por completo dentro de este."""
+        return (self.min_x <= other_rect.min_x and other_rect.max_x <= self.max_x and
+                self.min_y <= other_rect.min_y and other_rect.max_y <= self.max_y)
+
+    def min_distance(self, other_rect):
+        """Distancia mínima entre este rectángulo y otro (0 si se intersectan)."""
+        dx = max(self.min_x - other_rect.max_x, other_rect.min_x - self.max_x, 0)
+        dy = max(self.min_y - other_rect.max_y, other_rect.min_y - self.max_y, 0)
+        return math.hypot(dx, dy)
+
     def union(self, other_rect):
         """Calcula el MBR que abarca a este rectángulo y otro."""
         new_min_x = min(self.min_x, other_rect.min_x)
@@ -48,12 +62,16 @@ class Rectangle:
 class Entry:
     """
     Representa una entrada en un nodo del R-Tree.
-    Puede ser un MBR de un nodo hijo o un punto de dato.
+    Puede ser un MBR de un nodo hijo, un punto de dato o un objeto con extensión
+    (identificado por object_id, con su geometría exacta opcional; ver insertar_objeto).
     """
-    def __init__(self, mbr, child_node=None, point=None):
+    def __init__(self, mbr, child_node=None, point=None, object_id=None, geometry=None, value=None):
         self.mbr = mbr # Rectangle object
         self.child_node = child_node # None if it's a leaf entry (contains a point)
         self.point = point # None if it's an internal node entry (contains a child_node)
+        self.object_id = object_id # Solo en entradas de objeto (point es None)
+        self.geometry = geometry # Geometría de geometria.py, o None si solo se conoce el MBR
+        self.value = value # Valor del punto para los agregados (ver RTreeAgregado)
 
 class Node:
     """
@@ -114,14 +132,23 @@ class RTree:
         self.min_entries = min_entries # m
         if self.min_entries > self.max_entries / 2:
             raise ValueError("min_entries must be less than or equal to max_entries / 2")
-        self.root = Node(is_leaf=True)
+        self.root = self._new_node(is_leaf=True)
+        self.metricas = None # Instancia opcional de metricas.Metricas
+
+    def _new_node(self, is_leaf=True):
+        return Node(is_leaf=is_leaf)
 
-    def insertar(self, point):
+    def _point_entry(self, point):
+        return Entry(mbr=Rectangle(point[0], point[1], point[0], point[1]), point=point)
+
+    def insertar(self, point, id=None):
+        # Con `id` el punto se guarda como PuntoId (ver utils.py)
+        point = conId(point, id)
         # 1. Crear una entrada para el punto
         # Un punto es un MBR de sí mismo.
-        point_mbr = Rectangle(point[0], point[1], point[0], point[1])
-        new_entry = Entry(mbr=point_mbr, point=point)
+        self._insert_entry(self._point_entry(point))
 
+    def _insert_entry(self, new_entry):
         # 2. Encontrar la hoja donde insertar la entrada
         leaf_node = self._choose_subtree(self.root, new_entry)
 
@@ -134,6 +161,162 @@ class RTree:
         else:
             self._adjust_tree(leaf_node) # No need to pass new_mbr, it's implicitly handled by _update_mbr
 
+    def insertar_objeto(self, object_id, mbr=None, geometria=None):
+        """
+        Inserta un objeto con extensión (un edificio, un tramo de calle, ...).
+        - object_id: identificador que devuelven las consultas de objetos.
+        - mbr: Rectangle o tupla (min_x, min_y, max_x, max_y). Si se omite, se
+          toma el de la geometría.
+        - geometria: geometría exacta opcional (ver geometria.py) para refinar
+          las consultas; sin ella las respuestas se basan solo en el MBR.
+        Los objetos conviven con los puntos pero no aparecen en buscarEnRango ni
+        en buscarVecinoMasCercano, que solo devuelven puntos.
+        """
+        self._insert_entry(self._object_entry(object_id, mbr, geometria))
+
+    def cargar_objetos(self, objetos):
+        """
+        Carga un bloque de tuplas (object_id, mbr, geometria). Con el árbol vacío
+        se construye con STR como cargarMasivo; si no, se insertan de a uno.
+        """
+        entries = [self._object_entry(*objeto) for objeto in objetos]
+        if self.root.entries or not entries:
+            for entry in entries:
+                self._insert_entry(entry)
+            return len(entries)
+        nodes = self._pack_str(entries, is_leaf=True)
+        while len(nodes) > 1:
+            nodes = self._pack_str([Entry(n.mbr, child_node=n) for n in nodes], is_leaf=False)
+        self.root = nodes[0]
+        self.root.parent = None
+        return len(entries)
+
+    def _object_entry(self, object_id, mbr=None, geometria=None):
+        if mbr is None:
+            if geometria is None:
+                raise ValueError("Se necesita el MBR o la geometría del objeto")
+            mbr = geometria.mbr()
+        if not isinstance(mbr, Rectangle):
+            mbr = Rectangle(*mbr)
+        if mbr.min_x > mbr.max_x or mbr.min_y > mbr.max_y:
+            raise ValueError(f"MBR inválido: {mbr}")
+        return Entry(mbr=mbr, object_id=object_id, geometry=geometria)
+
+    def cargarMasivo(self, points, ids=None):
+        """
+        Carga un bloque de puntos (con sus ids opcionales). Si el árbol está vacío
+        se construye con Sort-Tile-Recursive (STR): las entradas se ordenan por x,
+        se cortan en franjas verticales, cada franja se ordena por y y se empaqueta
+        en nodos llenos; el proceso se repite nivel a nivel con los MBRs de los nodos.
+        Si el árbol ya tiene datos, los puntos se insertan por lotes (ver _insert_batch).
+        """
+        points = conIds(points, ids)
+        if self.root.entries:
+            self._insert_batch(points)
+            return len(points)
+        if not points:
+            return 0
+
+        entries = [self._point_entry(p) for p in points]
+        nodes = self._pack_str(entries, is_leaf=True)
+        while len(nodes) > 1:
+            nodes = self._pack_str([Entry(n.mbr, child_node=n) for n in nodes], is_leaf=False)
+        self.root = nodes[0]
+        self.root.parent = None
+        return len(points)
+
+    def _insert_batch(self, points):
+        """
+        Inserción por lotes al estilo buffer-tree: el lote completo baja desde la
+        raíz y en cada nodo interno se reparte entre los hijos (el que ya contiene
+        al punto o, si ninguno, el que menos crece). En las hojas los puntos se
+        añaden de una vez; un nodo que desborda se reempaqueta con STR en varios
+        nodos hermanos, que suben al padre. Así cada nodo se visita una vez por lote
+        y todas las hojas siguen a la misma profundidad.
+        """
+        entries = [self._point_entry(p) for p in points]
+        nodes = self._insert_batch_node(self.root, entries)
+        while len(nodes) > 1:
+            nodes = self._pack_str([Entry(n.mbr, child_node=n) for n in nodes], is_leaf=False)
+        self.root = nodes[0]
+        self.root.parent = None
+
+    def _insert_batch_node(self, node, entries):
+        """Aplica las entradas al subárbol de `node`; devuelve los nodos que lo reemplazan."""
+        if node.is_leaf:
+            node.entries.extend(entries)
+        else:
+            groups = {}
+            for entry in entries:
+                px, py = entry.point
+                best = None
+                min_enlargement = float('inf')
+                for child_entry in node.entries:
+                    r = child_entry.mbr
+                    if r.min_x <= px <= r.max_x and r.min_y <= py <= r.max_y:
+                        best = child_entry
+                        break
+                    enlargement = ((max(r.max_x, px) - min(r.min_x, px)) *
+                                   (max(r.max_y, py) - min(r.min_y, py)) - r.area())
+                    if enlargement < min_enlargement:
+                        min_enlargement = enlargement
+                        best = child_entry
+                groups.setdefault(id(best), (best, []))[1].append(entry)
+
+            new_entries = []
+            for child_entry in node.entries:
+                if id(child_entry) not in groups:
+                    new_entries.append(child_entry)
+                    continue
+                for child in self._insert_batch_node(child_entry.child_node, groups[id(child_entry)][1]):
+                    child.parent = node
+                    new_entries.append(Entry(child.mbr, child_node=child))
+            node.entries = new_entries
+
+        if len(node.entries) > self.max_entries:
+            return self._pack_str(node.entries, is_leaf=node.is_leaf)
+        node._update_mbr()
+        return [node]
+
+    def _pack_str(self, entries, is_leaf):
+        """Empaqueta entradas en nodos de hasta max_entries siguiendo STR."""
+        def center_x(e):
+            return e.mbr.min_x + e.mbr.max_x
+        def center_y(e):
+            return e.mbr.min_y + e.mbr.max_y
+
+        node_count = math.ceil(len(entries) / self.max_entries)
+        slices = math.ceil(math.sqrt(node_count))
+        # Franjas de tamaño parejo: así ninguna queda con menos de min_entries
+        # (con pocas entradas, p. ej. M + 1, una franja "llena" dejaría otra casi vacía)
+        base, extra = divmod(len(entries), slices)
+
+        entries.sort(key=center_x)
+        nodes = []
+        start = 0
+        for k in range(slices):
+            end = start + base + (1 if k < extra else 0)
+            vertical_slice = sorted(entries[start:end], key=center_y)
+            start = end
+            for group in self._split_groups(vertical_slice):
+                node = self._new_node(is_leaf=is_leaf)
+                node.entries = group
+                for entry in group:
+                    if entry.child_node:
+                        entry.child_node.parent = node
+                node._update_mbr()
+                nodes.append(node)
+        return nodes
+
+    def _split_groups(self, entries):
+        """Corta en grupos de max_entries; si el último queda por debajo de min_entries, toma del anterior."""
+        groups = [entries[i:i + self.max_entries] for i in range(0, len(entries), self.max_entries)]
+        if len(groups) > 1 and len(groups[-1]) < self.min_entries:
+            missing = self.min_entries - len(groups[-1])
+            groups[-1] = groups[-2][-missing:] + groups[-1]
+            groups[-2] = groups[-2][:-missing]
+        return groups
+
     def _choose_subtree(self, current_node, entry):
         """
         Elige el subárbol donde insertar la nueva entrada.
@@ -186,7 +369,7 @@ class RTree:
         # Propagar la división
         if node is self.root:
             # Si el nodo dividido era la raíz, crear una nueva raíz
-            new_root = Node(is_leaf=False)
+            new_root = self._new_node(is_leaf=False)
             new_root.add_entry(Entry(node1.mbr, child_node=node1))
             new_root.add_entry(Entry(node2.mbr, child_node=node2))
             # The new nodes are now children of new_root. Their parent attribute is set via add_entry.
@@ -248,8 +431,8 @@ class RTree:
         seed1, seed2 = self._pick_seeds(node.entries)
         
         # Crear los dos nuevos nodos
-        node1 = Node(is_leaf=node.is_leaf)
-        node2 = Node(is_leaf=node.is_leaf)
+        node1 = self._new_node(is_leaf=node.is_leaf)
+        node2 = self._new_node(is_leaf=node.is_leaf)
 
         # Añadir las semillas a los nuevos nodos
         node1.add_entry(seed1)
@@ -375,18 +558,28 @@ class RTree:
             current = current.parent
 
     # --- Consultas ---
-    def buscarEnRango(self, query_rect):
+    def buscarEnRango(self, query_rect, modo='puntos'):
         """
         Busca todos los puntos dentro de un rectángulo de consulta dado.
-        query_rect es un objeto Rectangle.
+        query_rect es un objeto Rectangle. `modo` elige qué devolver: puntos,
+        ids, arreglo de ids o conteo (ver utils.MODOS_RESULTADO).
         """
-        results = []
-        self._search_recursive(self.root, query_rect, results)
-        return results
-
-    def _search_recursive(self, node, query_rect, results):
+        results = crearSumidero(modo)
+        if self.metricas is None:
+            self._search_recursive(self.root, query_rect, results)
+            return resultadoDeSumidero(results)
+        c = self.metricas.iniciar('rango')
+        self._search_recursive(self.root, query_rect, results, c)
+        self.metricas.finalizar(c)
+        return resultadoDeSumidero(results)
+
+    def _search_recursive(self, node, query_rect, results, c=None):
         """Función auxiliar recursiva para buscar en rango."""
+        if c is not None:
+            c.nodos_visitados += 1
         if node is None or node.mbr is None or not node.mbr.intersects(query_rect):
+            if c is not None:
+                c.podas += 1
             return
 
         if node.is_leaf:
@@ -394,13 +587,125 @@ class RTree:
             for entry in node.entries:
                 if entry.point and query_rect.contains_point(entry.point):
                     results.append(entry.point)
+            if c is not None:
+                c.puntos_probados += len(node.entries)
         else:
             # Si es un nodo interno, recurre a los hijos cuyos MBRs se intersectan
             for entry in node.entries:
                 # Make sure child_node exists before recursing
                 if entry.child_node:
-                    self._search_recursive(entry.child_node, query_rect, results)
+                    self._search_recursive(entry.child_node, query_rect, results, c)
     
+    def iterarEnRango(self, query_rect, limite=None):
+        """
+        Versión perezosa de buscarEnRango: genera los puntos a medida que el
+        recorrido (con pila explícita, en el mismo orden) los encuentra y se
+        detiene tras `limite` puntos.
+        """
+        if limite is not None and limite <= 0:
+            return
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
+        found = 0
+        stack = [self.root]
+        try:
+            while stack:
+                node = stack.pop()
+                if c is not None:
+                    c.nodos_visitados += 1
+                if node.mbr is None or not node.mbr.intersects(query_rect):
+                    if c is not None:
+                        c.podas += 1
+                    continue
+
+                if node.is_leaf:
+                    for entry in node.entries:
+                        if c is not None:
+                            c.puntos_probados += 1
+                        if entry.point is not None and query_rect.contains_point(entry.point):
+                            yield entry.point
+                            found += 1
+                            if found == limite:
+                                return
+                else:
+                    stack.extend(entry.child_node for entry in reversed(node.entries))
+        finally:
+            if c is not None:
+                self.metricas.finalizar(c)
+
+    def existeEnRango(self, query_rect):
+        """Indica si hay algún punto dentro de query_rect; se detiene en el primero."""
+        for _ in self.iterarEnRango(query_rect, limite=1):
+            return True
+        return False
+
+    # --- Consultas de objetos: filtro por MBR y refinamiento con la geometría ---
+
+    def _filter_objects(self, node_test, entry_test, c=None):
+        """
+        Paso de filtro: genera las entradas de objeto cuyo MBR cumple entry_test,
+        bajando solo por los nodos cuyo MBR cumple node_test.
+        """
+        if self.root.mbr is None:
+            return
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if c is not None:
+                c.nodos_visitados += 1
+            if node.is_leaf:
+                for entry in node.entries:
+                    if entry.point is None and entry_test(entry.mbr):
+                        if c is not None:
+                            c.puntos_probados += 1
+                        yield entry
+            else:
+                for entry in node.entries:
+                    if node_test(entry.mbr):
+                        stack.append(entry.child_node)
+                    elif c is not None:
+                        c.podas += 1
+
+    def _query_objects(self, tipo, node_test, entry_test, refine=None):
+        c = self.metricas.iniciar(tipo) if self.metricas is not None else None
+        results = []
+        for entry in self._filter_objects(node_test, entry_test, c):
+            # Paso de refinamiento: solo sobre los candidatos y si hay geometría
+            if refine is None or entry.geometry is None or refine(entry.geometry):
+                results.append(entry.object_id)
+        if c is not None:
+            self.metricas.finalizar(c)
+        return results
+
+    def objetos_que_intersectan(self, query_rect, refinar=True):
+        """Ids de los objetos que tocan el rectángulo (Rectangle)."""
+        q = query_rect
+        refine = (lambda g: g.intersectaRectangulo(q.min_x, q.min_y, q.max_x, q.max_y)) if refinar else None
+        return self._query_objects('objetos_interseccion', q.intersects, q.intersects, refine)
+
+    def objetos_contenidos_en(self, query_rect):
+        """
+        Ids de los objetos completamente dentro del rectángulo. Un objeto está
+        dentro si y solo si su MBR lo está, así que no hace falta refinar.
+        """
+        q = query_rect
+
+        def inside(r):
+            return q.min_x <= r.min_x and r.max_x <= q.max_x and q.min_y <= r.min_y and r.max_y <= q.max_y
+        return self._query_objects('objetos_contenidos', q.intersects, inside)
+
+    def objetos_que_contienen(self, point, refinar=True):
+        """Ids de los objetos que contienen al punto (borde incluido)."""
+        refine = (lambda g: g.contienePunto(point)) if refinar else None
+        test = lambda r: r.contains_point(point)
+        return self._query_objects('objetos_contienen', test, test, refine)
+
+    def objetos_a_distancia(self, point, distance, refinar=True):
+        """Ids de los objetos a distancia <= distance del punto."""
+        point_rect = Rectangle(point[0], point[1], point[0], point[1])
+        refine = (lambda g: g.distanciaAPunto(point) <= distance) if refinar else None
+        test = lambda r: r.min_distance(point_rect) <= distance
+        return self._query_objects('objetos_distancia', test, test, refine)
+
     def buscarVecinoMasCercano(self, point_query):
         """
         Busca el vecino más cercano a un punto dado.
@@ -414,6 +719,7 @@ class RTree:
         # If the tree is empty
         if not self.root or not self.root.entries:
             return None
+        c = self.metricas.iniciar('vecino') if self.metricas is not None else None
 
         # Auxiliary function to traverse all points in the R-Tree
         def _get_all_points(node):
@@ -421,6 +727,8 @@ class RTree:
             if node is None:
                 return []
             
+            if c is not None:
+                c.nodos_visitados += 1
             if node.is_leaf:
                 for entry in node.entries:
                     if entry.point:
@@ -435,6 +743,8 @@ class RTree:
 
         # Now, find the closest point among them
         if not all_points_in_tree:
+            if c is not None:
+                self.metricas.finalizar(c)
             return None
 
         for p in all_points_in_tree:
@@ -443,23 +753,111 @@ class RTree:
                 min_dist = dist
                 closest_point = p
         
+        if c is not None:
+            c.puntos_probados += len(all_points_in_tree)
+            c.distancias += len(all_points_in_tree)
+            self.metricas.finalizar(c)
         return closest_point
 
-    def get_all_mbrs(self):
+    def get_all_mbrs(self, ventana=None, nivel_maximo=None):
+        """
+        Obtiene los MBRs de los nodos en el árbol para visualización.
+        Devuelve una lista de objetos Rectangle (ver iterar_mbrs).
+        """
+        return list(self.iterar_mbrs(ventana, nivel_maximo))
+
+    def iterar_mbrs(self, ventana=None, nivel_maximo=None):
         """
-        Obtiene todos los MBRs de los nodos en el árbol para visualización.
-        Devuelve una lista de objetos Rectangle.
+        Genera los MBRs de los nodos por niveles (BFS). Con `ventana` (Rectangle)
+        se omiten los subárboles cuyo MBR no la intersecta, y con `nivel_maximo`
+        no se desciende más allá de ese nivel (raíz = 0).
         """
-        mbrs = []
-        nodes_to_visit = [self.root]
+        nodes_to_visit = deque([(self.root, 0)])
         
         while nodes_to_visit:
-            current_node = nodes_to_visit.pop(0) # Use pop(0) for BFS
+            current_node, nivel = nodes_to_visit.popleft() # BFS
             if current_node: # Ensure node is not None
                 if current_node.mbr:
-                    mbrs.append(current_node.mbr)
-                if not current_node.is_leaf:
+                    if ventana is not None and not current_node.mbr.intersects(ventana):
+                        continue
+                    yield current_node.mbr
+                if not current_node.is_leaf and (nivel_maximo is None or nivel < nivel_maximo):
                     for entry in current_node.entries:
                         if entry.child_node: # Ensure child_node exists
-                            nodes_to_visit.append(entry.child_node)
-        return mbrs
\ No newline at end of file
+                            nodes_to_visit.append((entry.child_node, nivel + 1))
+
+
+class NodeAgregado(Node):
+    """Nodo que además del MBR mantiene el Agregado de los puntos de su subárbol."""
+    def __init__(self, is_leaf=True):
+        super().__init__(is_leaf)
+        self.agregado = Agregado()
+
+    def _update_mbr(self):
+        # Todas las modificaciones del árbol recalculan el MBR de los nodos
+        # afectados de abajo hacia arriba; el agregado se rehace en el mismo paso
+        super()._update_mbr()
+        agregado = Agregado()
+        for entry in self.entries:
+            if entry.child_node is not None:
+                agregado.combinar(entry.child_node.agregado)
+            elif entry.point is not None:
+                agregado.agregarValor(entry.value)
+        self.agregado = agregado
+
+
+class RTreeAgregado(RTree):
+    """
+    R-Tree aumentado con agregados (aR-tree): cada nodo guarda el conteo y, si
+    se indica `valor`, la suma, el mínimo y el máximo de los puntos de su
+    subárbol (ver utils.Agregado).
+    - valor: función punto -> número que se evalúa una vez al insertar; por
+      ejemplo `lambda p: pesos[p.id]` con puntos insertados con id. Sin ella
+      solo se cuenta.
+    Los objetos con extensión (insertar_objeto) no entran en los agregados.
+    agregarEnRango usa directamente el agregado de los nodos cuyo MBR queda
+    dentro de la consulta, así que solo recorre los nodos que cortan su borde.
+    """
+    def __init__(self, max_entries=4, min_entries=2, valor=None):
+        self.valor = valor
+        super().__init__(max_entries, min_entries)
+
+    def _new_node(self, is_leaf=True):
+        return NodeAgregado(is_leaf=is_leaf)
+
+    def _point_entry(self, point):
+        entry = super()._point_entry(point)
+        if self.valor is not None:
+            entry.value = self.valor(point)
+        return entry
+
+    def agregarEnRango(self, query_rect):
+        """Agregado de los puntos dentro de query_rect (Rectangle, bordes incluidos)."""
+        resultado = Agregado()
+        if self.root.mbr is None:
+            return resultado
+        c = self.metricas.iniciar('agregado') if self.metricas is not None else None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if c is not None:
+                c.nodos_visitados += 1
+            if not node.mbr.intersects(query_rect):
+                if c is not None:
+                    c.podas += 1
+                continue
+            if query_rect.contains(node.mbr):
+                resultado.combinar(node.agregado)
+                continue
+
+            if node.is_leaf:
+                for entry in node.entries:
+                    if entry.point is not None and query_rect.contains_point(entry.point):
+                        resultado.agregarValor(entry.value)
+                if c is not None:
+                    c.puntos_probados += len(node.entries)
+            else:
+                stack.extend(entry.child_node for entry in node.entries)
+        if c is not None:
+            self.metricas.finalizar(c)
+        return resultado
@@ -0,0 +1,302 @@
+# rTreeN.py
+#
+# R-Tree de cualquier dimensión: versión general de rTree.py en la que los MBRs
+# guardan los vectores de mínimos y máximos en lugar de campos x / y.
+# - Carga masiva con STR generalizado: las entradas se cortan en franjas por el
+#   primer eje, cada franja en franjas por el segundo, y así hasta el último.
+# - Las divisiones por desbordamiento ordenan las entradas por el eje de mayor
+#   dispersión de sus centros y cortan por la mitad.
+# - El vecino más cercano se busca best-first con la distancia mínima a cada MBR.
+
+import heapq
+import math
+
+from utils import comoListaDeTuplas, esPuntoValido
+
+
+class RectangleN:
+    """MBR de n dimensiones: mins[i] <= x[i] <= maxs[i] en cada eje."""
+    __slots__ = ('mins', 'maxs')
+
+    def __init__(self, mins, maxs):
+        self.mins = tuple(mins)
+        self.maxs = tuple(maxs)
+
+    @classmethod
+    def from_point(cls, point):
+        return cls(point, point)
+
+    def volume(self):
+        """Área en 2D, volumen en 3D, etc."""
+        volume = 1.0
+        for low, high in zip(self.mins, self.maxs):
+            volume *= high - low
+        return volume
+
+    def contains_point(self, point):
+        mins, maxs = self.mins, self.maxs
+        for i in range(len(mins)):
+            if not mins[i] <= point[i] <= maxs[i]:
+                return False
+        return True
+
+    def intersects(self, other_rect):
+        mins, maxs = self.mins, self.maxs
+        other_mins, other_maxs = other_rect.mins, other_rect.maxs
+        for i in range(len(mins)):
+            if mins[i] > other_maxs[i] or maxs[i] < other_mins[i]:
+                return False
+        return True
+
+    def union(self, other_rect):
+        return RectangleN(map(min, self.mins, other_rect.mins), map(max, self.maxs, other_rect.maxs))
+
+    def enlarge_amount(self, other_rect):
+        return self.union(other_rect).volume() - self.volume()
+
+    def min_distance_point(self, point):
+        """Distancia mínima de un punto al rectángulo (0 si está dentro)."""
+        total = 0.0
+        for low, value, high in zip(self.mins, point, self.maxs):
+            if value < low:
+                total += (low - value) ** 2
+            elif value > high:
+                total += (value - high) ** 2
+        return math.sqrt(total)
+
+    def center(self, axis):
+        return self.mins[axis] + self.maxs[axis]
+
+    def __repr__(self):
+        return f"RectN({self.mins}, {self.maxs})"
+
+
+class EntryN:
+    __slots__ = ('mbr', 'child_node', 'point')
+
+    def __init__(self, mbr, child_node=None, point=None):
+        self.mbr = mbr
+        self.child_node = child_node  # None en las entradas de hoja
+        self.point = point            # None en las entradas de nodos internos
+
+
+class NodeN:
+    __slots__ = ('is_leaf', 'entries', 'mbr')
+
+    def __init__(self, is_leaf=True, entries=None):
+        self.is_leaf = is_leaf
+        self.entries = entries if entries is not None else []
+        self.mbr = None
+        if self.entries:
+            self.update_mbr()
+
+    def update_mbr(self):
+        if not self.entries:
+            self.mbr = None
+            return
+        mbrs = [e.mbr for e in self.entries]
+        self.mbr = RectangleN(map(min, *(r.mins for r in mbrs)) if len(mbrs) > 1 else mbrs[0].mins,
+                              map(max, *(r.maxs for r in mbrs)) if len(mbrs) > 1 else mbrs[0].maxs)
+
+
+class RTreeN:
+    def __init__(self, dimensiones=3, max_entries=8, min_entries=4):
+        if dimensiones < 1:
+            raise ValueError("dimensiones must be at least 1")
+        if min_entries > max_entries / 2:
+            raise ValueError("min_entries must be less than or equal to max_entries / 2")
+        self.dimensiones = dimensiones
+        self.max_entries = max_entries
+        self.min_entries = min_entries
+        self.root = NodeN(is_leaf=True)
+        self.size = 0
+        self.metricas = None  # Instancia opcional de metricas.Metricas
+
+    def __len__(self):
+        return self.size
+
+    def _validate(self, point):
+        if not esPuntoValido(point, self.dimensiones):
+            raise ValueError(f"Se esperaba un punto de {self.dimensiones} coordenadas: {point!r}")
+
+    # ---------- Inserción ----------
+
+    def insertar(self, point):
+        point = tuple(point)
+        self._validate(point)
+        entry = EntryN(RectangleN.from_point(point), point=point)
+
+        # Bajar eligiendo el hijo que menos crece (a igual crecimiento, el de menor volumen)
+        path = []
+        node = self.root
+        while not node.is_leaf:
+            best = min(node.entries, key=lambda e: (e.mbr.enlarge_amount(entry.mbr), e.mbr.volume()))
+            path.append((node, best))
+            node = best.child_node
+        node.entries.append(entry)
+        self.size += 1
+
+        # Subir dividiendo los nodos que desbordan y ajustando los MBRs
+        new_nodes = self._split(node) if len(node.entries) > self.max_entries else [node]
+        for parent, parent_entry in reversed(path):
+            if len(new_nodes) == 1:
+                new_nodes[0].update_mbr()
+                parent_entry.mbr = new_nodes[0].mbr
+                new_nodes = [parent]
+                continue
+            parent.entries.remove(parent_entry)
+            parent.entries.extend(EntryN(n.mbr, child_node=n) for n in new_nodes)
+            new_nodes = self._split(parent) if len(parent.entries) > self.max_entries else [parent]
+        if len(new_nodes) > 1:
+            self.root = NodeN(is_leaf=False, entries=[EntryN(n.mbr, child_node=n) for n in new_nodes])
+        else:
+            self.root = new_nodes[0]
+            self.root.update_mbr()
+
+    def _split(self, node):
+        """Divide un nodo desbordado en dos por el eje de mayor dispersión de los centros."""
+        entries = node.entries
+        axis = max(range(self.dimensiones),
+                   key=lambda a: max(e.mbr.center(a) for e in entries) - min(e.mbr.center(a) for e in entries))
+        entries.sort(key=lambda e: e.mbr.center(axis))
+        half = max(self.min_entries, len(entries) // 2)
+        return [NodeN(node.is_leaf, entries[:half]), NodeN(node.is_leaf, entries[half:])]
+
+    def cargarMasivo(self, points):
+        """
+        Carga un bloque de puntos. Si el árbol está vacío se construye con STR
+        generalizado (ver _pack_str); si no, los puntos se insertan de a uno.
+        """
+        points = comoListaDeTuplas(points)
+        for point in points:
+            self._validate(point)
+        if self.root.entries:
+            for point in points:
+                self.insertar(point)
+            return len(points)
+        if not points:
+            return 0
+
+        nodes = self._pack_str([EntryN(RectangleN.from_point(p), point=p) for p in points], is_leaf=True)
+        while len(nodes) > 1:
+            nodes = self._pack_str([EntryN(n.mbr, child_node=n) for n in nodes], is_leaf=False)
+        self.root = nodes[0]
+        self.size = len(points)
+        return len(points)
+
+    def _pack_str(self, entries, is_leaf):
+        """Empaqueta entradas en nodos de hasta max_entries siguiendo STR en n ejes."""
+        nodes = []
+        self._tile(entries, 0, is_leaf, nodes)
+        return nodes
+
+    def _tile(self, entries, axis, is_leaf, nodes):
+        entries.sort(key=lambda e: e.mbr.center(axis))
+        if axis == self.dimensiones - 1:
+            for group in self._split_groups(entries):
+                nodes.append(NodeN(is_leaf, group))
+            return
+        # Franjas de tamaño parejo por este eje; cada una se corta por los ejes siguientes
+        node_count = math.ceil(len(entries) / self.max_entries)
+        slices = max(1, math.ceil(node_count ** (1 / (self.dimensiones - axis))))
+        base, extra = divmod(len(entries), slices)
+        start = 0
+        for k in range(slices):
+            end = start + base + (1 if k < extra else 0)
+            if end > start:
+                self._tile(entries[start:end], axis + 1, is_leaf, nodes)
+            start = end
+
+    def _split_groups(self, entries):
+        """Corta en grupos de max_entries; si el último queda por debajo de min_entries, toma del anterior."""
+        groups = [entries[i:i + self.max_entries] for i in range(0, len(entries), self.max_entries)]
+        if len(groups) > 1 and len(groups[-1]) < self.min_entries:
+            missing = self.min_entries - len(groups[-1])
+            groups[-1] = groups[-2][-missing:] + groups[-1]
+            groups[-2] = groups[-2][:-missing]
+        return groups
+
+    # ---------- Consultas ----------
+
+    def buscarPunto(self, point):
+        point = tuple(point)
+        return point in self.buscarEnRango(point, point)
+
+    def buscarEnRango(self, minimos, maximos):
+        """Puntos con minimos[i] <= p[i] <= maximos[i] en cada eje."""
+        query = RectangleN(minimos, maximos)
+        if len(query.mins) != self.dimensiones or len(query.maxs) != self.dimensiones:
+            raise ValueError(f"Se esperaban límites de {self.dimensiones} coordenadas")
+        results = []
+        if self.root.mbr is None:
+            return results
+        c = self.metricas.iniciar('rango') if self.metricas is not None else None
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if c is not None:
+                c.nodos_visitados += 1
+            if node.is_leaf:
+                for entry in node.entries:
+                    if query.contains_point(entry.point):
+                        results.append(entry.point)
+                if c is not None:
+                    c.puntos_probados += len(node.entries)
+            else:
+                for entry in node.entries:
+                    if entry.mbr.intersects(query):
+                        stack.append(entry.child_node)
+                    elif c is not None:
+                        c.podas += 1
+        if c is not None:
+            self.metricas.finalizar(c)
+        return results
+
+    def buscarVecinoMasCercano(self, point):
+        neighbors = self.buscarKVecinos(point, 1)
+        return neighbors[0] if neighbors else None
+
+    def buscarKVecinos(self, point, k):
+        """
+        Los k puntos más cercanos, del más cercano al más lejano. Recorrido
+        best-first: se expande siempre el nodo con menor distancia mínima y se
+        termina cuando ninguno pendiente puede mejorar el k-ésimo encontrado.
+        """
+        if k <= 0 or self.root.mbr is None:
+            return []
+        point = tuple(point)
+        c = self.metricas.iniciar('vecino' if k == 1 else 'k_vecinos') if self.metricas is not None else None
+        best = []  # Max-heap de (-distancia, orden, punto)
+        queue = [(self.root.mbr.min_distance_point(point), 0, self.root)]
+        order = 1
+        while queue:
+            distance, _, node = heapq.heappop(queue)
+            if len(best) == k and distance >= -best[0][0]:
+                if c is not None:
+                    c.podas += len(queue) + 1
+                break
+            if c is not None:
+                c.nodos_visitados += 1
+            if node.is_leaf:
+                for entry in node.entries:
+                    d = math.dist(entry.point, point)
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, order, entry.point))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, order, entry.point))
+                    order += 1
+                if c is not None:
+                    c.puntos_probados += len(node.entries)
+                    c.distancias += len(node.entries)
+            else:
+                for entry in node.entries:
+                    d = entry.mbr.min_distance_point(point)
+                    if len(best) < k or d < -best[0][0]:
+                        heapq.heappush(queue, (d, order, entry.child_node))
+                        order += 1
+                    elif c is not None:
+                        c.podas += 1
+        if c is not None:
+            self.metricas.finalizar(c)
+        best.sort(key=lambda b: (-b[0], b[1]))
+        return [p for _, _, p in best]
@@ -0,0 +1,244 @@
+# selectividad.py
+#
+# Estimador de selectividad: cuántos puntos devolvería buscarEnRango para un
+# rectángulo, sin ejecutar la consulta.
+#
+# - Histograma de celdas fijas sobre el espacio (como las celdas del Grid
+#   File; puede construirse directamente desde la ocupación de un GridFile).
+#   Dentro de cada celda se supone densidad uniforme.
+# - Una tabla de sumas prefijas da el conteo de cualquier rectángulo en O(1):
+#   dieciséis lecturas, interpolando las celdas que el rectángulo corta.
+# - Las inserciones se mantienen al día: cada punto suma uno en su celda y
+#   queda en una lista de pendientes que las estimaciones cuentan de forma
+#   exacta; cuando hay más pendientes que columnas se recalcula la tabla
+#   (con itertools.accumulate, fila por fila), así el costo de inserción
+#   amortizado es de unas pocas operaciones por celda de columna.
+#
+# Con bordes equiprofundos (cuantiles de x e y, o de y dentro de cada
+# columna) el error medido con `python selectividad.py` fue mayor en los
+# datos agrupados y en diagonal: las celdas de los extremos reparten sus
+# puntos sobre zonas vacías. Por eso las celdas son de ancho fijo y la
+# precisión se ajusta con la resolución.
+#
+# Ejemplo (error contra los conteos reales):
+#   python selectividad.py --n 50000 --distribucion agrupada
+
+import argparse
+import itertools
+import math
+import operator
+import random
+import time
+
+from benchmark import DISTRIBUCIONES, ESPACIO
+
+RESOLUCION_POR_DEFECTO = 128
+
+
+class Histograma:
+    """
+    Conteos de puntos en columnas x filas celdas del mismo tamaño sobre
+    [x_min, x_max] x [y_min, y_max]. Los puntos fuera del espacio se cuentan
+    en la celda más cercana.
+    - max_pendientes: inserciones que se acumulan antes de recalcular la
+      tabla prefija (por defecto, la cantidad de columnas).
+    """
+
+    def __init__(self, x_min, x_max, y_min, y_max, columnas=RESOLUCION_POR_DEFECTO, filas=None,
+                 max_pendientes=None):
+        filas = filas or columnas
+        if columnas < 1 or filas < 1:
+            raise ValueError("columnas and filas must be at least 1")
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.columnas = columnas
+        self.filas = filas
+        self.dx = (x_max - x_min) / columnas or 1.0
+        self.dy = (y_max - y_min) / filas or 1.0
+        self.conteos = [[0] * filas for _ in range(columnas)]
+        self.total = 0
+        self.pendientes = []  # Puntos insertados desde el último refresco
+        self.max_pendientes = max_pendientes or columnas
+        self._prefijo = [[0] * (filas + 1) for _ in range(columnas + 1)]
+
+    @classmethod
+    def desdePuntos(cls, puntos, x_min, x_max, y_min, y_max, columnas=RESOLUCION_POR_DEFECTO, filas=None):
+        histograma = cls(x_min, x_max, y_min, y_max, columnas, filas)
+        histograma.agregarMuchos(puntos)
+        return histograma
+
+    @classmethod
+    def desdeGridFile(cls, grid):
+        """Histograma con las celdas de un gridFile.GridFile y la ocupación de sus buckets."""
+        histograma = cls(grid.x_min, grid.x_max, grid.y_min, grid.y_max, grid.grid_size_x, grid.grid_size_y)
+        for i, columna in enumerate(grid.grid):
+            for j, bucket in enumerate(columna):
+                histograma.conteos[i][j] = len(bucket.points)
+                histograma.total += len(bucket.points)
+        histograma.refrescar()
+        return histograma
+
+    def __len__(self):
+        return self.total
+
+    # ---------- Actualización ----------
+
+    def _celda(self, punto):
+        i = min(self.columnas - 1, max(0, int((punto[0] - self.x_min) / self.dx)))
+        j = min(self.filas - 1, max(0, int((punto[1] - self.y_min) / self.dy)))
+        return i, j
+
+    def agregar(self, punto):
+        i, j = self._celda(punto)
+        self.conteos[i][j] += 1
+        self.total += 1
+        self.pendientes.append(punto)
+        if len(self.pendientes) > self.max_pendientes:
+            self.refrescar()
+
+    def agregarMuchos(self, puntos):
+        celda = self._celda
+        conteos = self.conteos
+        cantidad = 0
+        for p in puntos:
+            i, j = celda(p)
+            conteos[i][j] += 1
+            cantidad += 1
+        self.total += cantidad
+        self.refrescar()
+
+    def refrescar(self):
+        """Recalcula la tabla prefija: P[i][j] = puntos en las celdas [0, i) x [0, j)."""
+        anterior = [0] * (self.filas + 1)
+        prefijo = [anterior]
+        for columna in self.conteos:
+            acumulado = [0]
+            acumulado.extend(itertools.accumulate(columna))
+            anterior = list(map(operator.add, anterior, acumulado))
+            prefijo.append(anterior)
+        self._prefijo = prefijo
+        self.pendientes = []
+
+    # ---------- Estimación ----------
+
+    def _acumulado(self, u, v):
+        """Puntos estimados en [x_min, x) x [y_min, y), con u, v en unidades de celda."""
+        i = min(int(u), self.columnas - 1)
+        j = min(int(v), self.filas - 1)
+        fu, fv = u - i, v - j
+        actual, siguiente = self._prefijo[i], self._prefijo[i + 1]
+        return ((actual[j] * (1 - fu) + siguiente[j] * fu) * (1 - fv)
+                + (actual[j + 1] * (1 - fu) + siguiente[j + 1] * fu) * fv)
+
+    def estimar(self, xMin, xMax, yMin, yMax):
+        """Cantidad estimada de puntos en el rectángulo [xMin, xMax] x [yMin, yMax]."""
+        if xMax < xMin or yMax < yMin:
+            return 0.0
+        u1 = min(self.columnas, max(0.0, (xMin - self.x_min) / self.dx))
+        u2 = min(self.columnas, max(0.0, (xMax - self.x_min) / self.dx))
+        v1 = min(self.filas, max(0.0, (yMin - self.y_min) / self.dy))
+        v2 = min(self.filas, max(0.0, (yMax - self.y_min) / self.dy))
+        estimado = 0.0
+        if u2 > u1 and v2 > v1:
+            acumulado = self._acumulado
+            estimado = (acumulado(u2, v2) - acumulado(u1, v2)
+                        - acumulado(u2, v1) + acumulado(u1, v1))
+        for x, y in self.pendientes:
+            if xMin <= x <= xMax and yMin <= y <= yMax:
+                estimado += 1
+        return estimado
+
+
+def medirError(histograma, indice, rangos):
+    """
+    Compara histograma.estimar con el conteo real de `indice` (interfaz de
+    adaptadores.py) en cada rango. Devuelve el error absoluto medio, el error
+    relativo medio (sobre los rangos con resultado) y la mediana, el
+    percentil 95 y el máximo del q-error, max(e, r) / min(e, r) con e y r
+    el estimado y el real más uno.
+    """
+    absolutos, relativos, q = [], [], []
+    for rango in rangos:
+        estimado = histograma.estimar(*rango)
+        real = indice.buscarEnRango(*rango, modo='conteo')
+        absolutos.append(abs(estimado - real))
+        if real:
+            relativos.append(abs(estimado - real) / real)
+        e, r = estimado + 1, real + 1
+        q.append(max(e, r) / min(e, r))
+    q.sort()
+    return {
+        "consultas": len(rangos),
+        "error_absoluto": sum(absolutos) / len(absolutos) if absolutos else 0.0,
+        "error_relativo": sum(relativos) / len(relativos) if relativos else 0.0,
+        "q_mediana": q[len(q) // 2] if q else 1.0,
+        "q_p95": q[max(0, math.ceil(0.95 * len(q)) - 1)] if q else 1.0,
+        "q_max": q[-1] if q else 1.0,
+    }
+
+
+def generarRangos(puntos, cantidad, espacio, area_min=1e-5, area_max=0.1, semilla=0):
+    """Rangos cuadrados de áreas log-uniformes, la mitad centrados en puntos de los datos."""
+    rng = random.Random(semilla)
+    x_min, x_max, y_min, y_max = espacio
+    rangos = []
+    for i in range(cantidad):
+        lado = math.sqrt(10 ** rng.uniform(math.log10(area_min), math.log10(area_max)))
+        lado_x, lado_y = (x_max - x_min) * lado, (y_max - y_min) * lado
+        if i % 2 == 0 and puntos:
+            x, y = rng.choice(puntos)
+        else:
+            x, y = rng.uniform(x_min, x_max), rng.uniform(y_min, y_max)
+        rangos.append((x - lado_x / 2, x + lado_x / 2, y - lado_y / 2, y + lado_y / 2))
+    return rangos
+
+
+def main(argv=None):
+    from adaptadores import crearIndice
+    from benchmark import parametrosPorDefecto
+
+    parser = argparse.ArgumentParser(description="Mide el error del estimador de selectividad contra los conteos reales.")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--distribucion", default="uniforme", choices=list(DISTRIBUCIONES))
+    parser.add_argument("--resoluciones", type=int, nargs="+", default=[32, 64, RESOLUCION_POR_DEFECTO])
+    parser.add_argument("--consultas", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    random.seed(args.semilla)
+    puntos = DISTRIBUCIONES[args.distribucion](args.n, *ESPACIO)
+    indice = crearIndice("Grid File", *ESPACIO, **parametrosPorDefecto("Grid File", args.n))
+    indice.cargarMasivo(puntos)
+    # El Grid File puede descartar puntos con datos sesgados: se compara con lo que guardó
+    guardados = indice.buscarEnRango(*ESPACIO)
+    rangos = generarRangos(guardados, args.consultas, ESPACIO, semilla=args.semilla)
+
+    variantes = {f"Grid File {indice.estructura.grid_size_x}x{indice.estructura.grid_size_y}":
+                 Histograma.desdeGridFile(indice.estructura)}
+    mitad = len(guardados) // 2
+    for resolucion in args.resoluciones:
+        # Mitad de los puntos de una vez y la otra mitad insertados de a uno
+        histograma = Histograma.desdePuntos(guardados[:mitad], *ESPACIO, resolucion)
+        inicio = time.perf_counter()
+        for p in guardados[mitad:]:
+            histograma.agregar(p)
+        por_insercion = (time.perf_counter() - inicio) / max(1, len(guardados) - mitad)
+        variantes[f"{resolucion}x{resolucion} ({por_insercion * 1e6:.1f} us/inserción)"] = histograma
+
+    print(f"{len(guardados)} puntos, {len(rangos)} rangos de área 1e-5 a 0.1")
+    for nombre, histograma in variantes.items():
+        inicio = time.perf_counter()
+        for rango in rangos:
+            histograma.estimar(*rango)
+        por_estimacion = (time.perf_counter() - inicio) / len(rangos)
+        e = medirError(histograma, indice, rangos)
+        print(f"{nombre}: error absoluto {e['error_absoluto']:.1f}, relativo {e['error_relativo']:.1%}, "
+              f"q-error mediana {e['q_mediana']:.2f} p95 {e['q_p95']:.2f} max {e['q_max']:.2f}, "
+              f"{por_estimacion * 1e6:.1f} us por estimación")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+# servidor.py
+#
+# Servicio asyncio que aloja índices espaciales con nombre y los expone por un
+# socket local (TCP o Unix).
+#
+# Protocolo: líneas JSON (un objeto por línea, terminado en "\n", UTF-8).
+# Cada solicitud lleva un "id" que se devuelve en la respuesta; las respuestas
+# de una misma conexión pueden llegar en distinto orden que las solicitudes.
+#
+#   {"id": 1, "op": "crear", "indice": "tiendas", "estructura": "R-Tree",
+#    "espacio": [0, 1000, 0, 1000], "parametros": {"max_entries": 8, "min_entries": 4}}
+#   {"id": 2, "op": "insertar", "indice": "tiendas", "puntos": [[10, 20], [30.5, 40]]}
+#   {"id": 3, "op": "punto", "indice": "tiendas", "punto": [10, 20]}
+#   {"id": 4, "op": "rango", "indice": "tiendas", "rango": [0, 100, 0, 100]}
+#   {"id": 5, "op": "knn", "indice": "tiendas", "punto": [50, 50], "k": 3}
+#   {"id": 6, "op": "listar"}      {"id": 7, "op": "eliminar", "indice": "tiendas"}
+#   {"id": 8, "op": "estadisticas"}
+#
+# Respuestas: {"id": 4, "ok": true, "resultado": [[10, 20]]}
+#             {"id": 9, "ok": false, "error": "..."}
+#
+# Agrupación de solicitudes: cada índice tiene una cola y un trabajador. El
+# trabajador toma todas las solicitudes pendientes (hasta lote_maximo) y las
+# atiende juntas en un hilo aparte: las inserciones del lote se aplican con un
+# solo cargarLotes (una sola versión nueva) y las consultas se resuelven sobre
+# una misma instantánea. Los índices son IndiceConcurrente (concurrencia.py),
+# así que las lecturas en hilos no chocan con las escrituras.
+#
+# Ejemplo:
+#   python servidor.py --puerto 8765
+#   python servidor.py --unix /tmp/indices.sock
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from adaptadores import INDICES
+from concurrencia import IndiceConcurrente
+
+OPERACIONES_DE_INDICE = ("insertar", "punto", "rango", "knn")
+
+
+class ErrorSolicitud(Exception):
+    """Solicitud mal formada o inválida; su mensaje se envía al cliente."""
+
+
+class ServidorIndices:
+    """
+    - lote_maximo: cantidad máxima de solicitudes que se atienden juntas.
+    - hilos: hilos del ejecutor donde se resuelven los lotes.
+    """
+
+    def __init__(self, lote_maximo=256, hilos=4):
+        self.lote_maximo = lote_maximo
+        self.indices = {}
+        self._colas = {}
+        self._trabajadores = {}
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos)
+        self.solicitudes = 0
+        self.lotes = 0
+
+    # ---------- Índices ----------
+
+    def crear(self, nombre, estructura, espacio, parametros=None):
+        if not isinstance(nombre, str) or not nombre:
+            raise ErrorSolicitud("indice debe ser un nombre no vacío")
+        if nombre in self.indices:
+            raise ErrorSolicitud(f"El índice {nombre!r} ya existe")
+        if estructura not in INDICES:
+            raise ErrorSolicitud(f"Estructura desconocida: {estructura!r}. Opciones: {', '.join(INDICES)}")
+        try:
+            x_min, x_max, y_min, y_max = (float(v) for v in espacio)
+        except (TypeError, ValueError):
+            raise ErrorSolicitud("espacio debe ser [x_min, x_max, y_min, y_max]") from None
+        try:
+            indice = IndiceConcurrente(estructura, x_min, x_max, y_min, y_max, **(parametros or {}))
+        except (TypeError, ValueError) as error:
+            raise ErrorSolicitud(f"Parámetros inválidos: {error}") from None
+
+        self.indices[nombre] = indice
+        self._colas[nombre] = asyncio.Queue()
+        self._trabajadores[nombre] = asyncio.create_task(self._trabajador(nombre))
+        return {"indice": nombre, "estructura": estructura, "espacio": [x_min, x_max, y_min, y_max]}
+
+    def eliminar(self, nombre):
+        self._indice(nombre)
+        # El trabajador falla el lote que está atendiendo al cancelarse; lo que
+        # sigue en la cola se falla aquí para que ningún cliente quede esperando.
+        self._trabajadores.pop(nombre).cancel()
+        _fallarPendientes(self._colas.pop(nombre), f"El índice {nombre!r} fue eliminado")
+        del self.indices[nombre]
+        return True
+
+    def listar(self):
+        return {nombre: {"estructura": i.nombre, "puntos": len(i), "version": i.version}
+                for nombre, i in self.indices.items()}
+
+    def estadisticas(self):
+        return {
+            "solicitudes": self.solicitudes,
+            "lotes": self.lotes,
+            "solicitudes_por_lote": self.solicitudes / self.lotes if self.lotes else 0.0,
+        }
+
+    def _indice(self, nombre):
+        if nombre not in self.indices:
+            raise ErrorSolicitud(f"No existe el índice {nombre!r}")
+        return self.indices[nombre]
+
+    # ---------- Lotes ----------
+
+    async def _trabajador(self, nombre):
+        cola = self._colas[nombre]
+        indice = self.indices[nombre]
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await cola.get()]
+            while len(lote) < self.lote_maximo and not cola.empty():
+                lote.append(cola.get_nowait())
+
+            self.lotes += 1
+            self.solicitudes += len(lote)
+            try:
+                resultados = await loop.run_in_executor(
+                    self._ejecutor, self._procesarLote, indice, [s for s, _ in lote])
+            except asyncio.CancelledError:  # Índice eliminado o servidor cerrado
+                error = ErrorSolicitud(f"El índice {nombre!r} dejó de atenderse")
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(error)
+                raise
+            except Exception as error:  # Falla inesperada: se informa a todo el lote
+                resultados = [error] * len(lote)
+            for (_, futuro), resultado in zip(lote, resultados):
+                if futuro.done():
+                    continue
+                if isinstance(resultado, Exception):
+                    futuro.set_exception(resultado)
+                else:
+                    futuro.set_result(resultado)
+
+    def _procesarLote(self, indice, solicitudes):
+        """
+        Atiende un lote en un hilo del ejecutor. Primero se aplican juntas todas las
+        inserciones y luego se responden las consultas sobre una misma instantánea,
+        así una consulta enviada después de una inserción en la misma conexión la ve.
+        Devuelve un resultado (o una excepción) por solicitud.
+        """
+        resultados = [None] * len(solicitudes)
+        inserciones = {}
+        for i, s in enumerate(solicitudes):
+            if s["op"] == "insertar":
+                try:
+                    inserciones[i] = [_punto(p) for p in s.get("puntos", [])]
+                except (ErrorSolicitud, TypeError):
+                    resultados[i] = ErrorSolicitud("puntos debe ser una lista de pares [x, y]")
+        if inserciones:
+            # Una sola versión nueva; cada solicitud recibe cuántos de sus puntos entraron
+            aceptados = indice.cargarLotes(list(inserciones.values()))
+            for i, cantidad in zip(inserciones, aceptados):
+                resultados[i] = cantidad
+
+        v = indice.instantanea()
+        for i, s in enumerate(solicitudes):
+            if s["op"] == "insertar":
+                continue
+            try:
+                if s["op"] == "punto":
+                    resultados[i] = v.buscarPunto(_punto(s.get("punto")))
+                elif s["op"] == "rango":
+                    rango = s.get("rango")
+                    if not isinstance(rango, list) or len(rango) != 4:
+                        raise ErrorSolicitud("rango debe ser [xMin, xMax, yMin, yMax]")
+                    resultados[i] = v.buscarEnRango(*(float(c) for c in rango))
+                else:  # knn
+                    k = s.get("k", 1)
+                    if not isinstance(k, int) or k < 0:
+                        raise ErrorSolicitud("k debe ser un entero no negativo")
+                    resultados[i] = v.buscarKVecinos(_punto(s.get("punto")), k)
+            except (ErrorSolicitud, TypeError, ValueError) as error:
+                resultados[i] = error if isinstance(error, ErrorSolicitud) else ErrorSolicitud(str(error))
+        return resultados
+
+    # ---------- Conexiones ----------
+
+    async def atender(self, solicitud):
+        """Resuelve una solicitud ya decodificada y devuelve su resultado."""
+        if not isinstance(solicitud, dict):
+            raise ErrorSolicitud("La solicitud debe ser un objeto JSON")
+        op = solicitud.get("op")
+        if op == "crear":
+            return self.crear(solicitud.get("indice"), solicitud.get("estructura"),
+                              solicitud.get("espacio"), solicitud.get("parametros"))
+        if op == "eliminar":
+            return self.eliminar(solicitud.get("indice"))
+        if op == "listar":
+            return self.listar()
+        if op == "estadisticas":
+            return self.estadisticas()
+        if op in OPERACIONES_DE_INDICE:
+            nombre = solicitud.get("indice")
+            self._indice(nombre)
+            futuro = asyncio.get_running_loop().create_future()
+            await self._colas[nombre].put((solicitud, futuro))
+            return await futuro
+        raise ErrorSolicitud(f"Operación desconocida: {op!r}")
+
+    async def _responder(self, escritor, linea):
+        identificador = None
+        try:
+            solicitud = json.loads(linea)
+            if isinstance(solicitud, dict):
+                identificador = solicitud.get("id")
+            respuesta = {"id": identificador, "ok": True, "resultado": await self.atender(solicitud)}
+        except json.JSONDecodeError as error:
+            respuesta = {"id": None, "ok": False, "error": f"JSON inválido: {error}"}
+        except ErrorSolicitud as error:
+            respuesta = {"id": identificador, "ok": False, "error": str(error)}
+        except Exception as error:  # Error interno: el cliente no debe quedar esperando
+            respuesta = {"id": identificador, "ok": False, "error": f"Error interno: {error!r}"}
+        if not escritor.is_closing():
+            escritor.write(json.dumps(respuesta, separators=(",", ":")).encode() + b"\n")
+
+    async def manejarConexion(self, lector, escritor):
+        pendientes = set()
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                # Cada solicitud se atiende en su propia tarea para que las de una
+                # misma conexión también puedan agruparse en un lote.
+                tarea = asyncio.create_task(self._responder(escritor, linea))
+                pendientes.add(tarea)
+                tarea.add_done_callback(pendientes.discard)
+                if escritor.transport.get_write_buffer_size() > 2**20:
+                    await escritor.drain()
+            if pendientes:
+                await asyncio.gather(*pendientes)
+            await escritor.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+            escritor.close()
+
+    async def iniciar(self, host="127.0.0.1", puerto=8765, ruta_unix=None):
+        """Abre el socket y devuelve el asyncio.Server (ya escuchando)."""
+        if ruta_unix:
+            return await asyncio.start_unix_server(self.manejarConexion, path=ruta_unix, limit=2**24)
+        return await asyncio.start_server(self.manejarConexion, host, puerto, limit=2**24)
+
+    def cerrar(self):
+        for trabajador in self._trabajadores.values():
+            trabajador.cancel()
+        for cola in self._colas.values():
+            _fallarPendientes(cola, "El servidor se está cerrando")
+        self._ejecutor.shutdown(wait=False)
+
+
+def _fallarPendientes(cola, mensaje):
+    """Vacía la cola de un índice fallando con ErrorSolicitud cada solicitud pendiente."""
+    while not cola.empty():
+        _, futuro = cola.get_nowait()
+        if not futuro.done():
+            futuro.set_exception(ErrorSolicitud(mensaje))
+
+
+def _punto(valor):
+    if not isinstance(valor, (list, tuple)) or len(valor) != 2:
+        raise ErrorSolicitud(f"Punto inválido: {valor!r}")
+    try:
+        return (float(valor[0]), float(valor[1]))
+    except (TypeError, ValueError):
+        raise ErrorSolicitud(f"Punto inválido: {valor!r}") from None
+
+
+async def _servir(args):
+    servidor = ServidorIndices(args.lote_maximo, args.hilos)
+    socket = await servidor.iniciar(args.host, args.puerto, args.unix)
+    direccion = args.unix or f"{args.host}:{args.puerto}"
+    print(f"Sirviendo índices en {direccion}")
+    try:
+        async with socket:
+            await socket.serve_forever()
+    finally:
+        servidor.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de índices espaciales (líneas JSON).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", help="Ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--lote-maximo", type=int, default=256)
+    parser.add_argument("--hilos", type=int, default=4)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
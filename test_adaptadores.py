@@ -0,0 +1,43 @@
+# test_adaptadores.py
+
+import random
+
+import pytest
+
+from adaptadores import INDICES, crearIndice
+
+
+def _indiceEnteros(nombre, lado=10):
+    parametros = {"grid_size_x": 4, "grid_size_y": 4, "bucket_capacity": 200} if nombre == "Grid File" else {}
+    indice = crearIndice(nombre, 0, lado, 0, lado, **parametros)
+    indice.cargarMasivo([(x, y) for x in range(lado + 1) for y in range(lado + 1)])
+    return indice
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_rangos_cerrados_en_los_cuatro_bordes(nombre):
+    indice = _indiceEnteros(nombre)
+
+    assert sorted(indice.buscarEnRango(5, 5, 5, 5)) == [(5, 5)]
+    esperado = [(x, y) for x in (4, 5, 6) for y in (4, 5, 6)]
+    assert sorted(indice.buscarEnRango(4, 6, 4, 6)) == esperado
+    assert sorted(indice.iterarEnRango(4, 6, 4, 6)) == esperado
+    assert indice.buscarEnRango(4, 6, 4, 6, modo='conteo') == 9
+    assert len(indice.buscarEnRango(0, 10, 0, 10)) == 121
+    assert indice.existeEnRango(10, 10, 10, 10)
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_rangos_coinciden_con_busqueda_exhaustiva(nombre):
+    rng = random.Random(3)
+    indice = crearIndice(nombre, 0, 20, 0, 20)
+    puntos = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(300)]
+    for p in puntos:
+        indice.insertar(p)
+    guardados = indice.buscarEnRango(0, 20, 0, 20)
+
+    for _ in range(200):
+        xMin, xMax = sorted(rng.randint(0, 20) for _ in range(2))
+        yMin, yMax = sorted(rng.randint(0, 20) for _ in range(2))
+        esperado = sorted(p for p in guardados if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax)
+        assert sorted(indice.buscarEnRango(xMin, xMax, yMin, yMax)) == esperado
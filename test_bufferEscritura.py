@@ -0,0 +1,37 @@
+# test_bufferEscritura.py
+
+import random
+
+import pytest
+
+from adaptadores import INDICES, crearIndice
+from bufferEscritura import EscritorBuffer
+
+
+def test_grid_file_informa_los_puntos_rechazados():
+    escritor = EscritorBuffer(crearIndice("Grid File", 0, 10, 0, 10, grid_size_x=1, grid_size_y=1,
+                                          bucket_capacity=2))
+    assert [escritor.insertar((i, i)) for i in range(3)] == [True, True, False]
+    assert escritor.buscarEnRango(0, 10, 0, 10, modo='conteo') == 2
+    escritor.vaciar()
+    assert escritor.buscarEnRango(0, 10, 0, 10, modo='conteo') == 2
+
+
+def test_solo_el_r_tree_pasa_por_el_buffer():
+    directos = {nombre: EscritorBuffer(crearIndice(nombre, 0, 10, 0, 10)).directo for nombre in INDICES}
+    assert directos == {"KD-Tree": True, "Quadtree": True, "Grid File": True, "R-Tree": False}
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_consultas_ven_lo_pendiente(nombre):
+    rng = random.Random(0)
+    puntos = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(500)]
+    with EscritorBuffer(crearIndice(nombre, 0, 100, 0, 100, **({"bucket_capacity": 500} if nombre == "Grid File" else {})),
+                        capacidad=64) as escritor:
+        assert escritor.cargarMasivo(puntos) == 500
+        assert sorted(escritor.buscarEnRango(20, 60, 10, 70)) == sorted(
+            p for p in puntos if 20 <= p[0] <= 60 and 10 <= p[1] <= 70)
+        q = (50, 50)
+        assert escritor.buscarVecinoMasCercano(q) == min(puntos, key=lambda p: (p[0] - 50) ** 2 + (p[1] - 50) ** 2)
+    assert escritor.pendientes == []
+    assert len(escritor.indice.buscarEnRango(0, 100, 0, 100)) == 500
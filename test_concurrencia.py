@@ -0,0 +1,97 @@
+# test_concurrencia.py
+
+import math
+import random
+
+import pytest
+
+from adaptadores import INDICES
+from concurrencia import TAMANO_BLOQUE, IndiceConcurrente, pruebaDeEstres
+
+
+def test_grid_file_rechaza_los_puntos_que_no_caben():
+    indice = IndiceConcurrente("Grid File", 0, 10, 0, 10, delta_minimo=2,
+                               grid_size_x=1, grid_size_y=1, bucket_capacity=4)
+    aceptados = [indice.insertar((i, i)) for i in range(6)]
+
+    assert aceptados == [True] * 4 + [False] * 2
+    assert len(indice) == 4
+    assert sorted(indice.buscarEnRango(0, 10, 0, 10)) == [(i, i) for i in range(4)]
+    indice.compactar()
+    assert len(indice) == len(indice.buscarEnRango(0, 10, 0, 10)) == 4
+
+
+def test_cargar_masivo_informa_los_aceptados():
+    indice = IndiceConcurrente("Grid File", 0, 10, 0, 10, delta_minimo=1,
+                               grid_size_x=2, grid_size_y=1, bucket_capacity=3)
+    assert indice.cargarMasivo([(1, 1)] * 5 + [(9, 9)] * 2 + [(20, 20)]) == 5
+    assert indice.cargarMasivo([(2, 2), (8, 8), (8, 8)]) == 1
+    assert len(indice) == len(indice.buscarEnRango(0, 10, 0, 10)) == 6
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_prueba_de_estres(nombre):
+    resultado = pruebaDeEstres(nombre, lectores=4, inserciones=3000, lote=7, semilla=1)
+
+    assert resultado["errores"] == []
+    assert resultado["lecturas"] > 0
+    assert resultado["reconstrucciones"] > 0
+    assert resultado["aceptados"] == resultado["puntos_finales"] == resultado["puntos_indexados"]
+
+
+def test_prueba_de_estres_con_buckets_llenos():
+    resultado = pruebaDeEstres("Grid File", lectores=2, inserciones=2000, lote=5, semilla=2,
+                               grid_size_x=2, grid_size_y=2, bucket_capacity=100)
+
+    assert resultado["errores"] == []
+    assert resultado["aceptados"] == resultado["puntos_finales"] == resultado["puntos_indexados"] == 400
+
+
+def test_el_delta_se_guarda_en_niveles_de_tamano_creciente():
+    rng = random.Random(4)
+    indice = IndiceConcurrente("R-Tree", 0, 100, 0, 100, delta_minimo=10 ** 6)
+    puntos = [(rng.randint(0, 100), rng.randint(0, 100)) for _ in range(5000)]
+    for i in range(0, len(puntos), 37):
+        indice.cargarMasivo(puntos[i:i + 37])
+    indice.esperarReconstruccion()
+
+    v = indice.instantanea()
+    tamanos = [len(n.puntos) for n in v.niveles]
+    assert indice.reconstrucciones == 0
+    assert v.tamano_delta == len(puntos) and len(v.cola) < TAMANO_BLOQUE
+    # Cada nivel es más grande que todos los siguientes juntos
+    assert all(tamanos[i] > sum(tamanos[i + 1:]) for i in range(len(tamanos)))
+    assert len(tamanos) <= math.log2(len(puntos) / TAMANO_BLOQUE) + 1
+    assert list(v.delta()) == puntos
+
+    for _ in range(50):
+        xMin, yMin = rng.uniform(0, 90), rng.uniform(0, 90)
+        xMax, yMax = xMin + rng.uniform(0, 10), yMin + rng.uniform(0, 10)
+        esperado = sorted(p for p in puntos if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax)
+        assert sorted(v.buscarEnRango(xMin, xMax, yMin, yMax)) == esperado
+        assert v.buscarEnRango(xMin, xMax, yMin, yMax, modo='conteo') == len(esperado)
+        assert v.existeEnRango(xMin, xMax, yMin, yMax) == bool(esperado)
+
+        q = (rng.uniform(-10, 110), rng.uniform(-10, 110))
+        distancias = sorted(math.dist(p, q) for p in puntos)
+        assert math.dist(v.buscarVecinoMasCercano(q), q) == distancias[0]
+        assert [math.dist(p, q) for p in v.buscarKVecinos(q, 5)] == distancias[:5]
+        assert v.buscarPunto(puntos[rng.randrange(len(puntos))])
+        assert not v.buscarPunto((0.5, 0.5))
+
+
+def test_la_reconstruccion_en_segundo_plano_conserva_los_puntos_posteriores():
+    indice = IndiceConcurrente("KD-Tree", 0, 1000, 0, 1000, delta_minimo=300)
+    puntos = [(i % 1000, i // 1000) for i in range(20000)]
+    for i in range(0, len(puntos), 50):
+        indice.cargarMasivo(puntos[i:i + 50])
+        # Cada versión publicada tiene todos los puntos aceptados hasta ahora
+        assert len(indice.instantanea()) == i + 50
+    indice.esperarReconstruccion()
+
+    assert indice.reconstrucciones > 0
+    assert sorted(indice.instantanea().puntos()) == sorted(puntos)
+    assert indice.buscarEnRango(0, 1000, 0, 1000, modo='conteo') == len(puntos)
+    indice.compactar()
+    assert indice.instantanea().tamano_delta == 0
+    assert len(indice.instantanea().base) == len(puntos)
@@ -0,0 +1,53 @@
+# test_envoltorios.py
+
+import pytest
+
+from adaptadores import crearIndice
+from bufferEscritura import EscritorBuffer
+from cacheConsultas import CacheConsultas
+from concurrencia import IndiceConcurrente
+
+
+def _envoltorios():
+    buffer = EscritorBuffer(crearIndice("R-Tree", 0, 100, 0, 100), capacidad=8)
+    concurrente = IndiceConcurrente("R-Tree", 0, 100, 0, 100, delta_minimo=5)
+    cache = CacheConsultas(EscritorBuffer(crearIndice("R-Tree", 0, 100, 0, 100), capacidad=8))
+    return {"buffer": buffer, "concurrente": concurrente, "cache": cache}
+
+
+@pytest.mark.parametrize("nombre", ["buffer", "concurrente", "cache"])
+def test_modos_de_resultado(nombre):
+    indice = _envoltorios()[nombre]
+    # 10 puntos: parte queda aplicada en el índice y parte pendiente (búfer o delta)
+    indice.cargarMasivo([(i * 10, i * 10) for i in range(6)], ids=list(range(6)))
+    indice.cargarMasivo([(i * 10, i * 10) for i in range(6, 10)], ids=list(range(6, 10)))
+
+    assert indice.buscarEnRango(0, 45, 0, 45, modo='conteo') == 5
+    assert indice.buscarEnRango(55, 100, 55, 100, modo='conteo') == 4
+    assert sorted(indice.buscarEnRango(0, 45, 0, 45, modo='ids')) == [0, 1, 2, 3, 4]
+    assert sorted(indice.buscarEnRango(0, 100, 0, 100, modo='ids')) == list(range(10))
+    assert sorted(indice.buscarEnRango(0, 45, 0, 45)) == [(i * 10, i * 10) for i in range(5)]
+
+
+@pytest.mark.parametrize("nombre", ["buffer", "concurrente", "cache"])
+def test_modo_arreglo(nombre):
+    np = pytest.importorskip("numpy")
+    indice = _envoltorios()[nombre]
+    indice.cargarMasivo([(i * 10, i * 10) for i in range(10)], ids=list(range(10)))
+
+    arreglo = indice.buscarEnRango(0, 100, 0, 100, modo='arreglo')
+    assert arreglo.dtype == np.int64
+    assert sorted(arreglo.tolist()) == list(range(10))
+
+
+def test_cache_separa_los_modos():
+    cache = CacheConsultas(crearIndice("KD-Tree", 0, 100, 0, 100))
+    cache.cargarMasivo([(1, 1), (2, 2)], ids=[7, 8])
+
+    assert cache.buscarEnRango(0, 10, 0, 10, modo='conteo') == 2
+    assert sorted(cache.buscarEnRango(0, 10, 0, 10, modo='ids')) == [7, 8]
+    assert cache.buscarEnRango(0, 10, 0, 10, modo='conteo') == 2
+    assert cache.ultimaFueAcierto
+    cache.insertar((3, 3), id=9)
+    assert cache.buscarEnRango(0, 10, 0, 10, modo='conteo') == 3
+    assert not cache.ultimaFueAcierto
@@ -0,0 +1,28 @@
+# test_gridFile.py
+
+from gridFile import GridFile
+
+
+def test_iterar_celdas_con_la_ventana_sobre_el_borde_superior():
+    grid = GridFile(0, 30, 0, 30, 3, 3, 10)
+    # Ventana degenerada en la esquina (30, 30): solo la última celda
+    assert list(grid.iterar_celdas((30, 30, 30, 30))) == [((20, 20), (30, 30))]
+    # Franja sobre el borde derecho: la última columna entera
+    assert list(grid.iterar_celdas((30, 40, 0, 30))) == [((20, 0), (30, 10)), ((20, 10), (30, 20)), ((20, 20), (30, 30))]
+    # Agrupada: un solo bloque que contiene la última celda
+    assert list(grid.iterar_celdas((30, 30, 30, 30), max_celdas=1)) == [((20, 20), (30, 30))]
+
+    grid.insertar((30, 30))
+    assert grid.buscarEnRango(30, 30, 30, 30) == [(30, 30)]
+
+
+def test_iterar_celdas_cubre_los_puntos_de_la_ventana():
+    grid = GridFile(0, 100, 0, 50, 7, 4, 50)
+    puntos = [(x, y) for x in range(0, 101, 5) for y in range(0, 51, 5)]
+    grid.cargarMasivo(puntos)
+    for ventana in [(0, 100, 0, 50), (13, 57, 8, 41), (100, 100, 0, 50), (0, 100, 50, 50), (42.8, 42.8, 21.4, 21.4)]:
+        celdas = list(grid.iterar_celdas(ventana))
+        xMin, xMax, yMin, yMax = ventana
+        for p in grid.buscarEnRango(xMin, xMax, yMin, yMax):
+            assert any(x0 <= p[0] <= x1 and y0 <= p[1] <= y1 for (x0, y0), (x1, y1) in celdas)
+        assert all(x0 <= xMax and xMin <= x1 and y0 <= yMax and yMin <= y1 for (x0, y0), (x1, y1) in celdas)
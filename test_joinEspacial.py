@@ -0,0 +1,65 @@
+# test_joinEspacial.py
+
+import itertools
+import math
+import random
+
+import pytest
+
+from adaptadores import INDICES, crearIndice
+from joinEspacial import unirPorConsultas, unirPorDistancia, unirVecinoMasCercano
+
+ESPACIO = (0, 30, 0, 30)
+
+
+def _indice(nombre, puntos):
+    parametros = {"bucket_capacity": len(puntos)} if nombre == "Grid File" else {}
+    indice = crearIndice(nombre, *ESPACIO, **parametros)
+    for p in puntos:
+        indice.insertar(p)
+    return indice
+
+
+def _puntos(rng, n):
+    # Coordenadas enteras: muchos pares a distancia exacta y puntos sobre los bordes
+    return [(rng.randint(0, 30), rng.randint(0, 30)) for _ in range(n)]
+
+
+def _fuerzaBruta(puntosA, puntosB, distancia):
+    return sorted((a, b) for a in puntosA for b in puntosB if math.dist(a, b) <= distancia)
+
+
+@pytest.mark.parametrize("nombreA,nombreB", list(itertools.product(INDICES, repeat=2)))
+def test_joins_coinciden_con_fuerza_bruta(nombreA, nombreB):
+    rng = random.Random(f"{nombreA}-{nombreB}")
+    for _ in range(5):
+        puntosA, puntosB = _puntos(rng, 60), _puntos(rng, 60)
+        indiceA, indiceB = _indice(nombreA, puntosA), _indice(nombreB, puntosB)
+        for distancia in (0, 1, 2.5):
+            esperado = _fuerzaBruta(puntosA, puntosB, distancia)
+            assert sorted(unirPorConsultas(indiceA, indiceB, distancia)) == esperado
+            assert sorted(unirPorDistancia(indiceA, indiceB, distancia)) == esperado
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_vecino_mas_cercano_coincide_con_fuerza_bruta(nombre):
+    rng = random.Random(nombre)
+    puntosA, puntosB = _puntos(rng, 80), _puntos(rng, 80)
+    pares = list(unirVecinoMasCercano(puntosA, _indice(nombre, puntosB)))
+
+    assert sorted(a for a, _ in pares) == sorted(puntosA)
+    for a, b in pares:
+        assert math.dist(a, b) == min(math.dist(a, p) for p in puntosB)
+
+
+def test_grid_file_con_puntos_sobre_el_borde_superior():
+    from gridFile import GridFile
+
+    a, b = GridFile(0, 30, 0, 30, 3, 3, 10), GridFile(0, 30, 0, 30, 3, 3, 10)
+    for grid in (a, b):
+        grid.insertar((30, 30))
+        grid.insertar((10, 30))
+        grid.insertar((30, 0))
+    esperado = sorted((p, p) for p in [(30, 30), (10, 30), (30, 0)])
+    assert sorted(unirPorDistancia(a, b, 0)) == esperado
+    assert sorted(unirPorDistancia(a, b, 1)) == esperado
@@ -0,0 +1,207 @@
+# test_kdTree.py
+
+import math
+import random
+from array import array
+
+import pytest
+
+from kdTree import ArbolKD
+
+
+def _verificarInvariantes(arbol):
+    # Cada nodo: izquierda <= corte <= derecha en su eje, tamano y profundidad correctos
+    def revisar(nodo, profundidad):
+        if nodo is None:
+            return []
+        assert nodo.profundidad == profundidad
+        eje = profundidad % 2
+        izquierda = revisar(nodo.izquierdo, profundidad + 1)
+        derecha = revisar(nodo.derecho, profundidad + 1)
+        assert all(p[eje] <= nodo.punto[eje] for p in izquierda)
+        assert all(p[eje] >= nodo.punto[eje] for p in derecha)
+        assert nodo.tamano == len(izquierda) + len(derecha) + 1
+        return izquierda + derecha + [nodo.punto]
+    return revisar(arbol.raiz, 0)
+
+
+def _cota(alfa, n):
+    return math.floor(math.log(n) / math.log(1 / alfa))
+
+
+def test_estadisticas_de_un_arbol_balanceado():
+    arbol = ArbolKD()
+    assert arbol.estadisticas()['nodos'] == 0
+    assert arbol.estadisticas()['altura'] == 0
+
+    arbol.cargarMasivo([(x, y) for x in range(3) for y in range(3)][:7])
+    estadisticas = arbol.estadisticas()
+
+    assert estadisticas['nodos'] == 7
+    assert estadisticas['hojas'] == 4
+    assert estadisticas['altura'] == estadisticas['altura_optima'] == 3
+    assert estadisticas['factor_balance'] == 1.0
+    assert estadisticas['profundidad_maxima'] == 2
+    assert estadisticas['nodos_por_nivel'] == [1, 2, 4]
+    assert estadisticas['hojas_por_nivel'] == [0, 0, 4]
+    assert estadisticas['profundidad_promedio'] == pytest.approx(10 / 7)
+    assert estadisticas['profundidad_promedio_hojas'] == 2.0
+
+
+def test_carga_masiva_de_duplicados_queda_balanceada():
+    arbol = ArbolKD()
+    assert arbol.cargarMasivo([(1.0, 2.0)] * 3000) == 3000
+
+    estadisticas = arbol.estadisticas()
+    assert estadisticas['nodos'] == 3000
+    assert estadisticas['altura'] == estadisticas['altura_optima']
+    assert arbol.buscarPunto((1.0, 2.0))
+    assert arbol.buscarEnRango(1, 1, 2, 2, modo='conteo') == 3000
+
+    # Un bloque menor que el árbol reparte los iguales entre ambos lados
+    assert arbol.cargarMasivo([(1.0, 2.0)] * 1000) == 1000
+    assert len(_verificarInvariantes(arbol)) == 4000
+    assert arbol.estadisticas()['altura'] <= arbol.estadisticas()['altura_optima'] + 1
+
+
+@pytest.mark.parametrize("alfa", [0.6, 0.7, 0.9])
+def test_duplicados_insertados_de_a_uno_respetan_la_cota(alfa):
+    arbol = ArbolKD(alfa=alfa)
+    for i in range(1, 3001):
+        arbol.insertar((1.0, 2.0))
+        if i % 500 == 0:
+            assert arbol.estadisticas()['profundidad_maxima'] <= _cota(alfa, i)
+    assert len(_verificarInvariantes(arbol)) == 3000
+    assert arbol.buscarEnRango(0, 2, 0, 3, modo='conteo') == 3000
+
+
+@pytest.mark.parametrize("alfa", [0.6, 0.7, 0.9])
+def test_flujo_ordenado_respeta_la_cota(alfa):
+    arbol = ArbolKD(alfa=alfa)
+    puntos = [(i, i % 7) for i in range(3000)]
+    for i, p in enumerate(puntos, 1):
+        arbol.insertar(p)
+        if i % 500 == 0:
+            assert arbol.estadisticas()['profundidad_maxima'] <= _cota(alfa, i)
+    assert sorted(_verificarInvariantes(arbol)) == puntos
+
+
+def test_flujo_ordenado_por_lotes_respeta_la_cota():
+    arbol = ArbolKD(alfa=0.7)
+    arbol.cargarMasivo([(0, 0)] * 50)
+    puntos = [(0, 0)] * 50
+    for inicio in range(0, 3000, 25):
+        lote = [(i, 5) for i in range(inicio, inicio + 25)] + [(0, 0)] * 5
+        assert arbol.cargarMasivo(lote) == 30
+        puntos += lote
+        assert arbol.estadisticas()['profundidad_maxima'] <= _cota(0.7, len(puntos))
+    assert sorted(_verificarInvariantes(arbol)) == sorted(puntos)
+
+
+def test_sin_alfa_un_flujo_ordenado_largo_no_agota_la_pila():
+    arbol = ArbolKD()
+    for i in range(3000):
+        arbol.insertar((i, i))
+    assert arbol.estadisticas()['altura'] == 3000
+    assert arbol.buscarPunto((2999, 2999))
+    arbol.reconstruir()
+    assert arbol.estadisticas()['altura'] == arbol.estadisticas()['altura_optima']
+
+
+def test_consultas_con_duplicados_contra_fuerza_bruta():
+    rng = random.Random(3)
+    base = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(40)]
+    puntos = [rng.choice(base) for _ in range(1500)]
+    arbol = ArbolKD(alfa=0.75)
+    for p in puntos[:500]:
+        arbol.insertar(p)
+    for inicio in range(500, 1500, 100):
+        arbol.cargarMasivo(puntos[inicio:inicio + 100])
+    assert sorted(_verificarInvariantes(arbol)) == sorted(puntos)
+
+    for _ in range(100):
+        xMin, yMin = rng.randint(-2, 20), rng.randint(-2, 20)
+        xMax, yMax = xMin + rng.randint(0, 8), yMin + rng.randint(0, 8)
+        esperado = sorted(p for p in puntos if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax)
+        assert sorted(arbol.buscarEnRango(xMin, xMax, yMin, yMax)) == esperado
+        assert sorted(arbol.iterarEnRango(xMin, xMax, yMin, yMax)) == esperado
+
+        consulta = (rng.randint(-2, 22), rng.randint(-2, 22))
+        assert arbol.buscarPunto(consulta) == (consulta in puntos)
+        vecino = arbol.buscarVecinoMasCercano(consulta).punto
+        assert math.dist(vecino, consulta) == min(math.dist(p, consulta) for p in puntos)
+
+
+def _conjuntoConDuplicados(semilla, cantidad):
+    rng = random.Random(semilla)
+    puntos = [(rng.randint(0, 15), rng.randint(0, 15)) for _ in range(cantidad)]
+    return puntos + puntos[:cantidad // 5]
+
+
+@pytest.mark.parametrize("semilla, cantidad", [(0, 10), (1, 60), (2, 250)])
+@pytest.mark.parametrize("k", [1, 3, 8])
+def test_todos_k_vecinos_contra_fuerza_bruta(semilla, cantidad, k):
+    conjunto = _conjuntoConDuplicados(semilla, cantidad)
+    arbol = ArbolKD()
+    # Mitad insertada de a uno y mitad por lotes: bloques de formas distintas
+    for p in conjunto[:len(conjunto) // 2]:
+        arbol.insertar(p)
+    arbol.cargarMasivo(conjunto[len(conjunto) // 2:])
+    puntos, vecinos, distancias = arbol.todosKVecinos(k)
+
+    assert sorted(puntos) == sorted(_verificarInvariantes(arbol))
+    n = len(puntos)
+    for q in range(n):
+        esperado = sorted(math.dist(puntos[q], puntos[j]) for j in range(n) if j != q)[:k]
+        fila = vecinos[q * k:(q + 1) * k]
+        assert list(distancias[q * k:(q + 1) * k]) == esperado
+        assert q not in fila and len(set(fila)) == k
+        assert all(math.dist(puntos[q], puntos[j]) == d for j, d in zip(fila, distancias[q * k:(q + 1) * k]))
+
+
+def test_todos_k_vecinos_con_k_mayor_o_igual_que_n():
+    arbol = ArbolKD()
+    arbol.cargarMasivo([(0, 0), (3, 4), (3, 4)])
+    puntos, vecinos, distancias = arbol.todosKVecinos(4)
+
+    assert len(vecinos) == len(distancias) == 12
+    for q in range(3):
+        fila = list(vecinos[q * 4:(q + 1) * 4])
+        # Los otros dos puntos y después el relleno
+        assert sorted(fila[:2]) == sorted(j for j in range(3) if j != q)
+        assert fila[2:] == [-1, -1]
+        assert distancias[q * 4 + 2] == distancias[q * 4 + 3] == math.inf
+        duplicado = puntos[q] == (3, 4)
+        assert distancias[q * 4] == (0.0 if duplicado else 5.0)
+
+    solo = ArbolKD()
+    solo.insertar((1, 1))
+    puntos, vecinos, distancias = solo.todosKVecinos(2)
+    assert puntos == [(1, 1)] and list(vecinos) == [-1, -1] and list(distancias) == [math.inf] * 2
+
+    assert ArbolKD().todosKVecinos(3) == ([], array('l'), array('d'))
+    with pytest.raises(ValueError):
+        solo.todosKVecinos(0)
+
+
+@pytest.mark.parametrize("semilla, cantidad", [(3, 2), (4, 40), (5, 300)])
+def test_par_mas_cercano_contra_fuerza_bruta(semilla, cantidad):
+    rng = random.Random(semilla)
+    # Coordenadas reales (sin duplicados) y después con duplicados
+    for puntos in ([(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(cantidad)],
+                   _conjuntoConDuplicados(semilla, cantidad)):
+        arbol = ArbolKD()
+        arbol.cargarMasivo(puntos)
+        a, b, distancia = arbol.parMasCercano()
+        esperado = min(math.dist(p, q) for i, p in enumerate(puntos) for q in puntos[i + 1:])
+        assert distancia == esperado == math.dist(a, b)
+        assert a in puntos and b in puntos
+
+
+def test_par_mas_cercano_con_menos_de_dos_puntos():
+    arbol = ArbolKD()
+    assert arbol.parMasCercano() is None
+    arbol.insertar((2, 3))
+    assert arbol.parMasCercano() is None
+    arbol.insertar((2, 3))
+    assert arbol.parMasCercano() == ((2, 3), (2, 3), 0.0)
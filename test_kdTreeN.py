@@ -0,0 +1,59 @@
+# test_kdTreeN.py
+
+import math
+import random
+
+import pytest
+
+from kdTreeN import ArbolKDN
+
+
+def _puntos(rng, cantidad, dimensiones):
+    # Coordenadas enteras para que haya valores repetidos en cada eje
+    return [tuple(rng.randint(0, 30) for _ in range(dimensiones)) for _ in range(cantidad)]
+
+
+def test_cargar_masivo_devuelve_el_tamano_del_bloque():
+    arbol = ArbolKDN(2)
+    assert arbol.cargarMasivo([(0, 0), (1, 1)]) == 2
+    assert arbol.cargarMasivo([(2, 2), (3, 3), (4, 4)]) == 3
+    assert arbol.cargarMasivo([(5, 5)]) == 1
+    assert len(arbol) == 6
+
+
+@pytest.mark.parametrize("dimensiones", [1, 3, 4])
+def test_consultas_contra_fuerza_bruta(dimensiones):
+    rng = random.Random(dimensiones)
+    puntos = _puntos(rng, 600, dimensiones)
+    arbol = ArbolKDN(dimensiones)
+    # Una parte construida balanceada y el resto insertado de a uno
+    assert arbol.cargarMasivo(puntos[:400]) == 400
+    assert arbol.cargarMasivo(puntos[400:500]) == 100
+    for p in puntos[500:]:
+        arbol.insertar(p)
+    assert len(arbol) == len(puntos)
+
+    for _ in range(60):
+        minimos = [rng.randint(-2, 30) for _ in range(dimensiones)]
+        maximos = [m + rng.randint(0, 15) for m in minimos]
+        esperado = sorted(p for p in puntos if all(a <= x <= b for a, x, b in zip(minimos, p, maximos)))
+        assert sorted(arbol.buscarEnRango(minimos, maximos)) == esperado
+
+        objetivo = tuple(rng.uniform(-5, 35) for _ in range(dimensiones))
+        distancias = sorted(math.dist(p, objetivo) for p in puntos)
+        for k in (1, 5, 20):
+            assert [math.dist(p, objetivo) for p in arbol.buscarKVecinos(objetivo, k)] == distancias[:k]
+        assert math.dist(arbol.buscarVecinoMasCercano(objetivo), objetivo) == distancias[0]
+
+        consulta = tuple(rng.randint(0, 30) for _ in range(dimensiones))
+        assert arbol.buscarPunto(consulta) == (consulta in puntos)
+    assert all(arbol.buscarPunto(p) for p in puntos)
+    assert len(arbol.buscarKVecinos(puntos[0], len(puntos) + 5)) == len(puntos)
+
+
+def test_puntos_de_dimension_incorrecta():
+    arbol = ArbolKDN(3)
+    with pytest.raises(ValueError):
+        arbol.insertar((1, 2))
+    with pytest.raises(ValueError):
+        arbol.buscarEnRango((0, 0), (1, 1))
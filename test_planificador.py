@@ -0,0 +1,74 @@
+# test_planificador.py
+
+import random
+
+import pytest
+
+from adaptadores import INDICES, crearIndice
+from planificador import Planificador, crearPlanificador
+
+
+def _puntos(n, semilla=0):
+    rng = random.Random(semilla)
+    return [(rng.randint(0, 100), rng.randint(0, 100)) for _ in range(n)]
+
+
+def test_todas_las_rutas_responden_lo_mismo():
+    planificador = crearPlanificador(_puntos(2000), list(INDICES), espacio=(0, 100, 0, 100))
+    assert not planificador.incompletos
+    rng = random.Random(1)
+    for _ in range(300):
+        xMin, xMax = sorted(rng.randint(0, 100) for _ in range(2))
+        yMin, yMax = sorted(rng.randint(0, 100) for _ in range(2))
+        respuestas = {nombre: sorted(indice.buscarEnRango(xMin, xMax, yMin, yMax))
+                      for nombre, indice in planificador.indices.items()}
+        assert len({tuple(r) for r in respuestas.values()}) == 1
+        assert sorted(planificador.buscarEnRango(xMin, xMax, yMin, yMax)) == respuestas["KD-Tree"]
+
+
+def test_las_consultas_no_recalibran():
+    planificador = crearPlanificador(_puntos(500), espacio=(0, 100, 0, 100))
+    modelo = planificador.modelo
+    for p in _puntos(1000, semilla=2):
+        planificador.insertar(p)
+    assert planificador.necesitaCalibracion
+    planificador.buscarEnRango(0, 50, 0, 50)
+    planificador.buscarVecinoMasCercano((10, 10))
+    assert planificador.modelo is modelo
+
+    assert planificador.calibrarSiHaceFalta(num_consultas=20, repeticiones=1)
+    assert planificador.modelo is not modelo
+    assert not planificador.necesitaCalibracion
+    assert not planificador.calibrarSiHaceFalta()
+
+
+def test_sin_modelo_usa_el_primer_indice():
+    planificador = crearPlanificador([], ["R-Tree", "KD-Tree"], espacio=(0, 100, 0, 100))
+    for p in _puntos(100):
+        planificador.insertar(p)
+    assert planificador.modelo is None
+    planificador.buscarEnRango(0, 100, 0, 100)
+    planificador.buscarKVecinos((5, 5), 3)
+    assert set(planificador.rutas) == {("rango", "R-Tree"), ("kvecinos", "R-Tree")}
+
+
+def test_grid_file_sin_puntos_necesita_tamano():
+    with pytest.raises(ValueError):
+        crearPlanificador([], espacio=(0, 100, 0, 100))
+    planificador = crearPlanificador([], espacio=(0, 100, 0, 100), n_esperado=5000)
+    for p in _puntos(5000):
+        planificador.insertar(p)
+    assert not planificador.incompletos
+
+
+def test_valida_los_indices():
+    with pytest.raises(ValueError):
+        Planificador({"KD-Tree": crearIndice("KD-Tree", 0, 50, 0, 100)}, 0, 100, 0, 100)
+    lleno = crearIndice("R-Tree", 0, 100, 0, 100)
+    lleno.insertar((1, 1))
+    with pytest.raises(ValueError):
+        Planificador({"R-Tree": lleno}, 0, 100, 0, 100)
+    with pytest.raises(TypeError):
+        Planificador({"lista": []}, 0, 100, 0, 100)
+    with pytest.raises(ValueError):
+        crearPlanificador(_puntos(10), ["R-Tree", "R-Tree"])
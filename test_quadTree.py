@@ -0,0 +1,29 @@
+# test_quadTree.py
+
+import random
+
+from quadTree import QuadTreeAgregado, RangoCerrado, Rectangle
+
+
+def test_agregado_usa_los_valores_de_la_insercion():
+    rng = random.Random(0)
+    pesos = {}
+    arbol = QuadTreeAgregado(Rectangle(50, 50, 50, 50), 4, valor=lambda p: pesos[p.id])
+    puntos = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(500)]
+    for i, p in enumerate(puntos):
+        pesos[i] = i % 7
+        arbol.insertar(p, id=i)
+    esperado = {}
+    rangos = [RangoCerrado(10, 60, 20, 90), RangoCerrado(0, 100, 0, 100), RangoCerrado(33, 34, 0, 100)]
+    for rango in rangos:
+        esperado[rango] = sum(i % 7 for i, p in enumerate(puntos) if rango.contiene_punto(p))
+        assert arbol.agregarEnRango(rango).suma == esperado[rango]
+
+    # Cambiar la fuente después de insertar no altera las sumas, ni en los nodos
+    # enteros dentro del rango ni en los cortados por el borde
+    for i in pesos:
+        pesos[i] = 1000
+    for rango in rangos:
+        agregado = arbol.agregarEnRango(rango)
+        assert agregado.suma == esperado[rango]
+        assert agregado.conteo == sum(1 for p in puntos if rango.contiene_punto(p))
@@ -0,0 +1,141 @@
+# test_quadTreeLineal.py
+
+import json
+import math
+import random
+
+import pytest
+
+from quadTree import QuadTree, RangoCerrado, Rectangle
+from quadTreeLineal import CODIGO_RAIZ, QuadTreeLineal
+
+
+def _arbol(semilla=0, cantidad=800):
+    # Espacio [0, 128) x [0, 128): los bordes de todas las celdas son exactos
+    rng = random.Random(semilla)
+    centros = [(rng.uniform(10, 118), rng.uniform(10, 118)) for _ in range(4)]
+    puntos = []
+    for _ in range(cantidad):
+        cx, cy = rng.choice(centros)
+        x = min(max(round(rng.gauss(cx, 8), 1), 0), 127.9)
+        y = min(max(round(rng.gauss(cy, 8), 1), 0), 127.9)
+        puntos.append((x, y))
+    puntos += puntos[:40]  # Duplicados exactos
+    arbol = QuadTreeLineal(Rectangle(64, 64, 64, 64), 4, profundidad_maxima=10)
+    for p in puntos:
+        assert arbol.insertar(p)
+    return arbol, puntos
+
+
+def _caja(rectangulo):
+    return (rectangulo.x - rectangulo.w, rectangulo.x + rectangulo.w,
+            rectangulo.y - rectangulo.h, rectangulo.y + rectangulo.h)
+
+
+def test_consultas_contra_fuerza_bruta():
+    arbol, puntos = _arbol()
+    punteros = QuadTree(Rectangle(64, 64, 64, 64), 4)
+    punteros.cargarMasivo(puntos)
+    rng = random.Random(1)
+
+    assert not arbol.insertar((128, 5))
+    for _ in range(80):
+        xMin, yMin = rng.uniform(-5, 120), rng.uniform(-5, 120)
+        rango = RangoCerrado(xMin, xMin + rng.uniform(0, 40), yMin, yMin + rng.uniform(0, 40))
+        esperado = sorted(p for p in puntos if rango.contiene_punto(p))
+        assert sorted(arbol.buscarEnRango(rango)) == esperado
+        assert sorted(punteros.buscarEnRango(rango)) == esperado
+
+        consulta = (rng.uniform(-10, 140), rng.uniform(-10, 140))
+        distancias = sorted(math.dist(p, consulta) for p in puntos)
+        for k in (1, 4, 25):
+            vecinos = arbol.buscarKVecinos(consulta, k)
+            assert [d for _, d in vecinos] == distancias[:k]
+            assert all(math.dist(p, consulta) == d for p, d in vecinos)
+        assert arbol.buscarVecinoMasCercano(consulta)[1] == distancias[0]
+
+        p = rng.choice(puntos)
+        assert arbol.buscarPunto(p) == p
+        ausente = (round(rng.uniform(0, 127), 1) + 0.05, 3.0)
+        assert arbol.buscarPunto(ausente) is None
+    assert len(arbol.buscarKVecinos((0, 0), len(puntos) + 3)) == len(puntos)
+    assert arbol.buscarKVecinos((0, 0), 0) == []
+
+
+def test_exportar_importar_ida_y_vuelta():
+    arbol, puntos = _arbol(semilla=2)
+    # Pasando por JSON los códigos quedan como texto y los puntos como listas
+    copia = QuadTreeLineal.importar(json.loads(json.dumps(arbol.exportar())))
+
+    assert copia.hojas == arbol.hojas
+    assert copia._codigos == arbol._codigos
+    assert copia._inicios == arbol._inicios
+    assert copia.exportar() == arbol.exportar()
+    assert all(copia.localizar(p) == arbol.localizar(p) for p in puntos)
+    rango = RangoCerrado(20, 90, 30, 100)
+    assert sorted(copia.buscarEnRango(rango)) == sorted(arbol.buscarEnRango(rango))
+
+    # La copia sigue funcionando al insertar y subdividir
+    for p in puntos[:200]:
+        assert copia.insertar(p) and arbol.insertar(p)
+    assert copia.exportar() == arbol.exportar()
+
+
+def _punterosConLasMismasCeldas(arbol):
+    # QuadTree de punteros subdividido exactamente donde el lineal tiene celdas internas
+    raiz = QuadTree(arbol.boundary, arbol.capacidad)
+    pendientes = [(CODIGO_RAIZ, raiz)]
+    while pendientes:
+        codigo, nodo = pendientes.pop()
+        if codigo in arbol.hojas:
+            continue
+        nodo.subdividir()
+        for hijo in (nodo.noreste, nodo.noroeste, nodo.sureste, nodo.suroeste):
+            pendientes.append((_codigoDe(arbol, hijo.boundary, codigo), hijo))
+    return raiz
+
+
+def _codigoDe(arbol, rectangulo, padre):
+    # Código del hijo de `padre` cuya celda es `rectangulo`
+    for q in range(4):
+        hijo = (padre << 2) | q
+        if _caja(arbol.rectangulo(hijo)) == _caja(rectangulo):
+            return hijo
+    raise AssertionError(f"Sin celda para {_caja(rectangulo)}")
+
+
+def _hojasDePunteros(raiz):
+    hojas = []
+    pendientes = [raiz]
+    while pendientes:
+        nodo = pendientes.pop()
+        if nodo.dividido:
+            pendientes.extend((nodo.noreste, nodo.noroeste, nodo.sureste, nodo.suroeste))
+        else:
+            hojas.append(_caja(nodo.boundary))
+    return hojas
+
+
+@pytest.mark.parametrize("semilla", [0, 3])
+def test_vecinos_contra_el_quadtree_de_punteros(semilla):
+    arbol, _ = _arbol(semilla=semilla, cantidad=400)
+    hojasPunteros = _hojasDePunteros(_punterosConLasMismasCeldas(arbol))
+    assert sorted(hojasPunteros) == sorted(_caja(arbol.rectangulo(c)) for c in arbol.hojas)
+
+    for codigo in arbol.hojas:
+        x0, x1, y0, y1 = _caja(arbol.rectangulo(codigo))
+        lado_x, lado_y = x1 - x0, y1 - y0
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == dy == 0:
+                    continue
+                # Celda del mismo tamaño en esa dirección
+                sx0, sx1 = x0 + dx * lado_x, x1 + dx * lado_x
+                sy0, sy1 = y0 + dy * lado_y, y1 + dy * lado_y
+                # Hojas que se superponen con esa celda y tocan a la hoja (al menos en una esquina)
+                esperado = sorted(
+                    h for h in hojasPunteros
+                    if h[0] < sx1 and sx0 < h[1] and h[2] < sy1 and sy0 < h[3]
+                    and h[0] <= x1 and x0 <= h[1] and h[2] <= y1 and y0 <= h[3])
+                obtenido = sorted(_caja(arbol.rectangulo(c)) for c in arbol.vecinos(codigo, dx, dy))
+                assert obtenido == esperado, (codigo, dx, dy)
@@ -0,0 +1,120 @@
+# test_rTree.py
+
+import math
+import random
+
+import pytest
+
+from geometria import Poligono, Polilinea
+from rTree import Rectangle, RTree
+
+
+def _objetos(semilla, cantidad=120):
+    # Polígonos (triángulos y formas en L no convexas), polilíneas y algunos objetos solo con MBR
+    rng = random.Random(semilla)
+    objetos = []
+    for i in range(cantidad):
+        x, y = rng.uniform(0, 90), rng.uniform(0, 90)
+        tipo = i % 4
+        if tipo == 0:
+            geometria = Poligono([(x, y), (x + rng.uniform(2, 10), y), (x, y + rng.uniform(2, 10))])
+        elif tipo == 1:
+            a, b = rng.uniform(3, 10), rng.uniform(1, 3)
+            geometria = Poligono([(x, y), (x + a, y), (x + a, y + b), (x + b, y + b), (x + b, y + a), (x, y + a)])
+        elif tipo == 2:
+            vertices = [(x, y)]
+            for _ in range(rng.randint(0, 4)):
+                vertices.append((vertices[-1][0] + rng.uniform(-4, 4), vertices[-1][1] + rng.uniform(-4, 4)))
+            geometria = Polilinea(vertices)
+        else:
+            objetos.append((f"caja{i}", (x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5)), None))
+            continue
+        objetos.append((f"obj{i}", None, geometria))
+    return objetos
+
+
+def _mbr(objeto):
+    _, mbr, geometria = objeto
+    return Rectangle(*(mbr if mbr is not None else geometria.mbr()))
+
+
+def _cargar(carga, objetos, puntos):
+    arbol = RTree(max_entries=5, min_entries=2)
+    if carga == "insertar_objeto":
+        for i, objeto in enumerate(objetos):
+            arbol.insertar_objeto(*objeto)
+            arbol.insertar(puntos[i])
+        for p in puntos[len(objetos):]:
+            arbol.insertar(p)
+    elif carga == "cargar_objetos_vacio":
+        # Árbol vacío: STR con los objetos y después los puntos
+        assert arbol.cargar_objetos(objetos) == len(objetos)
+        for p in puntos:
+            arbol.insertar(p)
+    else:
+        # Árbol con puntos: los objetos se insertan de a uno
+        for p in puntos:
+            arbol.insertar(p)
+        assert arbol.cargar_objetos(objetos) == len(objetos)
+    return arbol
+
+
+@pytest.mark.parametrize("carga", ["insertar_objeto", "cargar_objetos_vacio", "cargar_objetos_con_puntos"])
+def test_consultas_de_objetos_contra_fuerza_bruta(carga):
+    rng = random.Random(7)
+    objetos = _objetos(1)
+    puntos = [(round(rng.uniform(0, 100), 1), round(rng.uniform(0, 100), 1)) for _ in range(300)]
+    arbol = _cargar(carga, objetos, puntos)
+
+    for _ in range(80):
+        min_x, min_y = rng.uniform(-5, 95), rng.uniform(-5, 95)
+        q = Rectangle(min_x, min_y, min_x + rng.uniform(0, 20), min_y + rng.uniform(0, 20))
+        intersectan = sorted(o[0] for o in objetos if _mbr(o).intersects(q) and
+                             (o[2] is None or o[2].intersectaRectangulo(q.min_x, q.min_y, q.max_x, q.max_y)))
+        assert sorted(arbol.objetos_que_intersectan(q)) == intersectan
+        assert sorted(arbol.objetos_que_intersectan(q, refinar=False)) == sorted(
+            o[0] for o in objetos if _mbr(o).intersects(q))
+        assert sorted(arbol.objetos_contenidos_en(q)) == sorted(o[0] for o in objetos if q.contains(_mbr(o)))
+        # Los objetos no aparecen en las consultas de puntos
+        assert sorted(arbol.buscarEnRango(q)) == sorted(p for p in puntos if q.contains_point(p))
+
+        punto = (rng.uniform(0, 100), rng.uniform(0, 100))
+        contienen = sorted(o[0] for o in objetos if _mbr(o).contains_point(punto) and
+                           (o[2] is None or o[2].contienePunto(punto)))
+        assert sorted(arbol.objetos_que_contienen(punto)) == contienen
+        assert sorted(arbol.objetos_que_contienen(punto, refinar=False)) == sorted(
+            o[0] for o in objetos if _mbr(o).contains_point(punto))
+
+        distancia = rng.uniform(0, 6)
+        caja = Rectangle(punto[0], punto[1], punto[0], punto[1])
+        cercanos = sorted(o[0] for o in objetos if _mbr(o).min_distance(caja) <= distancia and
+                          (o[2] is None or o[2].distanciaAPunto(punto) <= distancia))
+        assert sorted(arbol.objetos_a_distancia(punto, distancia)) == cercanos
+        assert sorted(arbol.objetos_a_distancia(punto, distancia, refinar=False)) == sorted(
+            o[0] for o in objetos if _mbr(o).min_distance(caja) <= distancia)
+        vecino = arbol.buscarVecinoMasCercano(punto)
+        assert math.dist(vecino, punto) == min(math.dist(p, punto) for p in puntos)
+
+
+def test_el_refinamiento_descarta_lo_que_solo_toca_el_mbr():
+    arbol = RTree()
+    ele = Poligono([(0, 0), (10, 0), (10, 4), (4, 4), (4, 10), (0, 10)])
+    diagonal = Polilinea([(20, 0), (30, 10)])
+    arbol.cargar_objetos([("ele", None, ele), ("diagonal", None, diagonal)])
+    arbol.insertar((8, 8))
+
+    # Hueco de la L: dentro del MBR pero fuera del polígono
+    assert arbol.objetos_que_intersectan(Rectangle(6, 6, 9, 9)) == []
+    assert arbol.objetos_que_intersectan(Rectangle(6, 6, 9, 9), refinar=False) == ["ele"]
+    # Rectángulo dentro del polígono sin cortar ningún borde, y el polígono dentro del rectángulo
+    assert arbol.objetos_que_intersectan(Rectangle(1, 1, 2, 2)) == ["ele"]
+    assert arbol.objetos_contenidos_en(Rectangle(-1, -1, 11, 11)) == ["ele"]
+    assert arbol.objetos_que_contienen((8, 8)) == []
+    assert arbol.objetos_que_contienen((4, 7)) == ["ele"]  # Sobre el borde
+
+    # Esquina del MBR de la diagonal que la línea no toca
+    assert arbol.objetos_que_intersectan(Rectangle(27, 0, 30, 2)) == []
+    assert arbol.objetos_que_contienen((25, 5)) == ["diagonal"]
+    assert arbol.objetos_a_distancia((28, 1), 4) == []
+    assert arbol.objetos_a_distancia((28, 1), 7 / math.sqrt(2)) == ["diagonal"]
+    assert arbol.buscarEnRango(Rectangle(0, 0, 40, 40)) == [(8, 8)]
@@ -0,0 +1,54 @@
+# test_rTreeN.py
+
+import math
+import random
+
+import pytest
+
+from rTreeN import RTreeN
+
+
+def _puntos(rng, cantidad, dimensiones):
+    # Coordenadas enteras para que haya valores repetidos en cada eje
+    return [tuple(rng.randint(0, 30) for _ in range(dimensiones)) for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize("dimensiones", [1, 3, 4])
+@pytest.mark.parametrize("carga", ["str", "insertar"])
+def test_consultas_contra_fuerza_bruta(dimensiones, carga):
+    rng = random.Random(dimensiones)
+    puntos = _puntos(rng, 600, dimensiones)
+    arbol = RTreeN(dimensiones, max_entries=6, min_entries=2)
+    if carga == "str":
+        # Empaquetado con STR y después inserciones sobre el árbol ya armado
+        assert arbol.cargarMasivo(puntos[:500]) == 500
+        assert arbol.cargarMasivo(puntos[500:]) == 100
+    else:
+        for p in puntos:
+            arbol.insertar(p)
+    assert len(arbol) == len(puntos)
+
+    for _ in range(60):
+        minimos = [rng.randint(-2, 30) for _ in range(dimensiones)]
+        maximos = [m + rng.randint(0, 15) for m in minimos]
+        esperado = sorted(p for p in puntos if all(a <= x <= b for a, x, b in zip(minimos, p, maximos)))
+        assert sorted(arbol.buscarEnRango(minimos, maximos)) == esperado
+
+        objetivo = tuple(rng.uniform(-5, 35) for _ in range(dimensiones))
+        distancias = sorted(math.dist(p, objetivo) for p in puntos)
+        for k in (1, 5, 20):
+            assert [math.dist(p, objetivo) for p in arbol.buscarKVecinos(objetivo, k)] == distancias[:k]
+        assert math.dist(arbol.buscarVecinoMasCercano(objetivo), objetivo) == distancias[0]
+
+        consulta = tuple(rng.randint(0, 30) for _ in range(dimensiones))
+        assert arbol.buscarPunto(consulta) == (consulta in puntos)
+    assert all(arbol.buscarPunto(p) for p in puntos)
+    assert len(arbol.buscarKVecinos(puntos[0], len(puntos) + 5)) == len(puntos)
+
+
+def test_arbol_vacio():
+    arbol = RTreeN(4)
+    assert arbol.cargarMasivo([]) == 0
+    assert arbol.buscarEnRango((0,) * 4, (1,) * 4) == []
+    assert arbol.buscarVecinoMasCercano((0,) * 4) is None
+    assert not arbol.buscarPunto((0,) * 4)
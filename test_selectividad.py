@@ -0,0 +1,82 @@
+# test_selectividad.py
+
+import random
+
+import pytest
+
+from adaptadores import crearIndice
+from benchmark import DISTRIBUCIONES, ESPACIO, parametrosPorDefecto
+from selectividad import Histograma, generarRangos, medirError
+
+N = 20000
+# Cotas del q-error con semilla fija (medidas: mediana <= 1.16, p95 <= 2.1 fuera de "duplicados")
+Q_MEDIANA = 1.25
+Q_P95 = 2.5
+
+
+def _datos(distribucion, semilla=0):
+    random.seed(semilla)
+    puntos = DISTRIBUCIONES[distribucion](N, *ESPACIO)
+    indice = crearIndice("Grid File", *ESPACIO, **parametrosPorDefecto("Grid File", N))
+    indice.cargarMasivo(puntos)
+    # Lo que el Grid File guardó es la referencia de los conteos reales
+    return indice, indice.buscarEnRango(*ESPACIO)
+
+
+def _incremental(puntos, resolucion=64):
+    """Mitad de los puntos de una vez y la otra mitad con agregar, de a uno."""
+    mitad = len(puntos) // 2
+    histograma = Histograma.desdePuntos(puntos[:mitad], *ESPACIO, resolucion)
+    for p in puntos[mitad:]:
+        histograma.agregar(p)
+    return histograma
+
+
+@pytest.mark.parametrize("distribucion", ["uniforme", "agrupada", "diagonal"])
+def test_q_error_acotado(distribucion):
+    indice, guardados = _datos(distribucion)
+    rangos = generarRangos(guardados, 500, ESPACIO, semilla=0)
+
+    for histograma in (_incremental(guardados), Histograma.desdeGridFile(indice.estructura)):
+        error = medirError(histograma, indice, rangos)
+        assert error["q_mediana"] <= Q_MEDIANA
+        assert error["q_p95"] <= Q_P95
+
+
+@pytest.mark.parametrize("distribucion", list(DISTRIBUCIONES))
+def test_totales_exactos(distribucion):
+    indice, guardados = _datos(distribucion)
+
+    for histograma in (_incremental(guardados), Histograma.desdeGridFile(indice.estructura)):
+        assert histograma.total == len(histograma) == len(guardados)
+        assert histograma.estimar(*ESPACIO) == pytest.approx(len(guardados))
+
+
+def test_celdas_completas_y_pendientes_son_exactas():
+    rng = random.Random(4)
+    puntos = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(5000)]
+    histograma = Histograma(*ESPACIO, columnas=10, max_pendientes=100)
+    histograma.agregarMuchos(puntos[:4950])
+    for p in puntos[4950:]:
+        histograma.agregar(p)
+    assert len(histograma.pendientes) == 50
+
+    # Rangos alineados con las celdas: la interpolación no interviene
+    for xMin, xMax, yMin, yMax in [(0, 100, 0, 100), (200, 700, 300, 1000), (0, 1000, 500, 600)]:
+        real = sum(1 for x, y in puntos if xMin <= x <= xMax and yMin <= y <= yMax)
+        assert histograma.estimar(xMin, xMax, yMin, yMax) == pytest.approx(real)
+
+    histograma.refrescar()
+    assert histograma.pendientes == []
+    assert histograma.estimar(200, 700, 300, 1000) == pytest.approx(
+        sum(1 for x, y in puntos if 200 <= x <= 700 and 300 <= y <= 1000))
+
+
+def test_desde_grid_file_cuenta_cada_bucket():
+    indice = crearIndice("Grid File", *ESPACIO, grid_size_x=4, grid_size_y=4, bucket_capacity=10)
+    rng = random.Random(5)
+    indice.cargarMasivo([(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(300)])
+    histograma = Histograma.desdeGridFile(indice.estructura)
+
+    assert histograma.total == len(indice.buscarEnRango(*ESPACIO)) == 160
+    assert histograma.estimar(0, 250, 0, 250) == pytest.approx(indice.buscarEnRango(0, 250, 0, 250, modo='conteo'))
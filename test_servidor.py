@@ -0,0 +1,47 @@
+# test_servidor.py
+
+import asyncio
+
+from servidor import ErrorSolicitud, ServidorIndices
+
+
+def _ejecutar(corrutina):
+    return asyncio.run(corrutina)
+
+
+def test_eliminar_falla_las_solicitudes_pendientes():
+    async def escenario():
+        servidor = ServidorIndices(lote_maximo=4, hilos=1)
+        servidor.crear("a", "KD-Tree", [0, 100, 0, 100])
+        await servidor.atender({"op": "insertar", "indice": "a",
+                                "puntos": [[i % 100, i // 100] for i in range(5000)]})
+        tareas = [asyncio.create_task(servidor.atender({"op": "rango", "indice": "a", "rango": [0, 100, 0, 100]}))
+                  for _ in range(50)]
+        await asyncio.sleep(0)
+        servidor.eliminar("a")
+        resultados = await asyncio.wait_for(asyncio.gather(*tareas, return_exceptions=True), timeout=10)
+        servidor.cerrar()
+        return resultados
+
+    resultados = _ejecutar(escenario())
+    assert len(resultados) == 50
+    assert any(isinstance(r, ErrorSolicitud) for r in resultados)
+    assert all(isinstance(r, (list, ErrorSolicitud)) for r in resultados)
+
+
+def test_insertar_informa_los_puntos_aceptados_por_solicitud():
+    async def escenario():
+        servidor = ServidorIndices(hilos=1)
+        servidor.crear("g", "Grid File", [0, 10, 0, 10],
+                       {"grid_size_x": 1, "grid_size_y": 1, "bucket_capacity": 4})
+        resultados = await asyncio.gather(
+            servidor.atender({"op": "insertar", "indice": "g", "puntos": [[1, 1], [2, 2], [50, 50]]}),
+            servidor.atender({"op": "insertar", "indice": "g", "puntos": [[3, 3], [4, 4], [5, 5]]}),
+        )
+        total = await servidor.atender({"op": "rango", "indice": "g", "rango": [0, 10, 0, 10]})
+        servidor.cerrar()
+        return resultados, total
+
+    resultados, total = _ejecutar(escenario())
+    assert resultados == [2, 2]
+    assert len(total) == 4
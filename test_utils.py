@@ -0,0 +1,31 @@
+# test_utils.py
+
+import random
+
+from utils import codigoMorton, decodificarMorton, ordenarPorMorton
+
+
+def _mortonBitABit(ix, iy):
+    codigo = bit = 0
+    while ix or iy:
+        codigo |= (ix & 1) << (2 * bit) | (iy & 1) << (2 * bit + 1)
+        ix >>= 1
+        iy >>= 1
+        bit += 1
+    return codigo
+
+
+def test_codigo_morton_de_cualquier_ancho():
+    rng = random.Random(0)
+    for bits in (1, 8, 16, 17, 40, 70):
+        for _ in range(500):
+            ix, iy = rng.getrandbits(bits), rng.getrandbits(bits)
+            assert codigoMorton(ix, iy) == _mortonBitABit(ix, iy)
+            assert decodificarMorton(codigoMorton(ix, iy)) == (ix, iy)
+
+
+def test_ordenar_por_morton_sigue_la_curva_z():
+    puntos = [(x + 0.5, y + 0.5) for x in range(4) for y in range(4)]
+    ordenados = ordenarPorMorton(puntos, 0, 4, 0, 4)
+    assert ordenados[:4] == [(0.5, 0.5), (1.5, 0.5), (0.5, 1.5), (1.5, 1.5)]
+    assert sorted(ordenados) == sorted(puntos)
@@ -0,0 +1,27 @@
+# test_ventanaTemporal.py
+
+import random
+
+import pytest
+
+from adaptadores import INDICES
+from ventanaTemporal import IndiceVentanaTemporal
+
+
+@pytest.mark.parametrize("nombre", list(INDICES))
+def test_len_cuenta_solo_la_ventana(nombre):
+    rng = random.Random(0)
+    ventana = IndiceVentanaTemporal(nombre, 0, 1000, 0, 1000, duracion_segmento=60.0, ventana=180.0,
+                                    puntos_por_segmento=500)
+    historial = []
+    for minuto in range(10):
+        tiempos = sorted(minuto * 60.0 + rng.random() * 60.0 for _ in range(500))
+        puntos = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in tiempos]
+        ventana.cargarMasivo(puntos, tiempos)
+        historial.extend(tiempos)
+
+        vivos = sum(1 for t in historial if t >= ventana.inicioVentana())
+        assert len(ventana) == vivos == len(ventana.buscarEnRango(0, 1000, 0, 1000))
+        assert ventana.guardados() >= vivos
+    assert ventana.guardados() == 2000
+    assert len(ventana) < 1600
@@ -0,0 +1,346 @@
+# trazas.py
+#
+# Trazas de las operaciones de los índices, para ver a dónde se va el tiempo
+# (por ejemplo, si un pico de latencia del R-Tree está en _split_node,
+# _choose_subtree, _adjust_tree o en el recorrido de la consulta).
+#
+# - Trazador.instrumentar(estructura) envuelve los métodos de esa instancia
+#   (inserción, divisiones, propagación de desbordes, ajuste de MBRs y cada
+#   tipo de consulta; ver OPERACIONES) con spans. Las estructuras no tienen
+#   código de trazas: sin instrumentar no pagan nada, y desinstrumentar las
+#   deja como estaban.
+# - Cada span terminado se guarda (si `guardar`) y se pasa a los hooks
+#   registrados con agregarHook. Trazador.span() abre spans a mano alrededor
+#   de cualquier bloque, que quedan anidados con los de las estructuras.
+# - Exportadores: JSON de Chrome trace (chrome://tracing, Perfetto, speedscope),
+#   estadísticas compatibles con pstats/cProfile (snakeviz, gprof2dot) y pilas
+#   plegadas para flamegraph.pl.
+#
+# Ejemplo:
+#   python trazas.py --estructura R-Tree --n 20000 --chrome traza.json --pstats traza.prof
+
+import argparse
+import inspect
+import json
+import marshal
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from adaptadores import INDICES, crearIndice
+from benchmark import parametrosPorDefecto
+
+# Métodos que se trazan en cada estructura y su categoría. Los que no existen
+# en la instancia se saltean, así que sirve también para las subclases.
+OPERACIONES = {
+    "ArbolKD": {
+        "insertar": "insercion", "cargarMasivo": "insercion",
+        "_reconstruirChivoExpiatorio": "reconstruccion", "reconstruir": "reconstruccion",
+        "buscarPunto": "puntual", "buscarEnRango": "rango", "iterarEnRango": "rango",
+        "buscarVecinoMasCercano": "vecino", "todosKVecinos": "k_vecinos", "parMasCercano": "vecino",
+    },
+    "QuadTree": {
+        "insertar": "insercion", "cargarMasivo": "insercion", "subdividir": "division",
+        "buscarPunto": "puntual", "buscarEnRango": "rango", "iterarEnRango": "rango",
+        "agregarEnRango": "agregado", "buscarVecinoMasCercano": "vecino", "buscarKVecinos": "k_vecinos",
+    },
+    "GridFile": {
+        "insertar": "insercion", "cargarMasivo": "insercion",
+        "buscarPunto": "puntual", "buscarEnRango": "rango", "iterarEnRango": "rango",
+        "buscarVecinoMasCercano": "vecino",
+    },
+    "RTree": {
+        "insertar": "insercion", "cargarMasivo": "insercion", "insertar_objeto": "insercion",
+        "cargar_objetos": "insercion", "_insert_batch": "insercion",
+        "_choose_subtree": "eleccion_subarbol", "_handle_overflow": "desborde", "_split_node": "division",
+        "_adjust_tree": "ajuste_mbr", "_pack_str": "empaquetado",
+        "buscarEnRango": "rango", "iterarEnRango": "rango", "agregarEnRango": "agregado",
+        "buscarVecinoMasCercano": "vecino",
+        "objetos_que_intersectan": "objetos", "objetos_contenidos_en": "objetos",
+        "objetos_que_contienen": "objetos", "objetos_a_distancia": "objetos",
+    },
+}
+
+
+# Si cada función es un generador (se consulta una vez por función, no por instancia)
+_ES_GENERADOR = {}
+
+
+def _operacionesDe(estructura):
+    """Tabla de OPERACIONES de la clase de la estructura (o de la primera base que tenga una)."""
+    for clase in type(estructura).__mro__:
+        if clase.__name__ in OPERACIONES:
+            return clase.__name__, OPERACIONES[clase.__name__]
+    raise ValueError(f"No hay operaciones definidas para trazar {type(estructura).__name__}")
+
+
+class Span:
+    """Intervalo de una operación; los tiempos están en nanosegundos de perf_counter_ns."""
+    __slots__ = ('nombre', 'categoria', 'inicio', 'fin', 'hilo', 'pila', 'args')
+
+    def __init__(self, nombre, categoria, inicio, hilo, pila, args=None):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.inicio = inicio
+        self.fin = None
+        self.hilo = hilo
+        self.pila = pila  # Nombres de los spans abiertos, de la raíz a este (incluido)
+        self.args = args
+
+    @property
+    def duracion(self):
+        return self.fin - self.inicio
+
+    def __repr__(self):
+        return f"Span({self.nombre}, {self.categoria}, {self.duracion / 1e3:.1f}us)"
+
+
+class Trazador:
+    """
+    Registra spans de las estructuras instrumentadas y de los bloques span().
+    - guardar: conservar los spans para exportarlos (hasta `maximo`, los más nuevos).
+    - Los hooks (agregarHook) reciben cada Span al cerrarse, en el hilo que lo cerró.
+    """
+    def __init__(self, guardar=True, maximo=1_000_000):
+        self.guardar = guardar
+        self.spans = deque(maxlen=maximo)
+        self._hooks = []
+        self._local = threading.local()
+        self._instrumentadas = []
+        self._origen = time.perf_counter_ns()
+
+    # ---------- Hooks y spans ----------
+
+    def agregarHook(self, hook):
+        self._hooks.append(hook)
+        return hook
+
+    def quitarHook(self, hook):
+        self._hooks.remove(hook)
+
+    def _pila(self):
+        pila = getattr(self._local, 'pila', None)
+        if pila is None:
+            pila = self._local.pila = []
+        return pila
+
+    @contextmanager
+    def span(self, nombre, categoria="", **args):
+        pila = self._pila()
+        pila.append(nombre)
+        actual = Span(nombre, categoria, time.perf_counter_ns(), threading.get_ident(), tuple(pila), args or None)
+        try:
+            yield actual
+        finally:
+            actual.fin = time.perf_counter_ns()
+            pila.pop()
+            if self.guardar:
+                self.spans.append(actual)
+            for hook in self._hooks:
+                hook(actual)
+
+    def limpiar(self):
+        self.spans.clear()
+
+    # ---------- Instrumentación ----------
+
+    def _envolver(self, metodo, nombre, categoria):
+        span = self.span
+        funcion = getattr(metodo, '__func__', metodo)
+        generador = _ES_GENERADOR.get(funcion)
+        if generador is None:
+            generador = _ES_GENERADOR[funcion] = inspect.isgeneratorfunction(funcion)
+        if generador:
+            # El span de un generador abarca todo su consumo (incluido el tiempo entre cada yield)
+            def envoltura(*args, **kwargs):
+                with span(nombre, categoria):
+                    yield from metodo(*args, **kwargs)
+        else:
+            def envoltura(*args, **kwargs):
+                with span(nombre, categoria):
+                    return metodo(*args, **kwargs)
+        envoltura.__wrapped__ = metodo
+        return envoltura
+
+    def instrumentar(self, estructura, operaciones=None):
+        """
+        Envuelve los métodos de la instancia `estructura` (o de `estructura.estructura`
+        si es un adaptador) listados en OPERACIONES, o solo los de `operaciones`.
+        Devuelve la estructura instrumentada.
+        """
+        estructura = getattr(estructura, 'estructura', estructura)
+        clase, tabla = _operacionesDe(estructura)
+        plan = [(metodo, f"{clase}.{metodo}", categoria) for metodo, categoria in tabla.items()
+                if (operaciones is None or metodo in operaciones) and hasattr(estructura, metodo)]
+        return self._aplicar(estructura, plan)
+
+    def _aplicar(self, estructura, plan):
+        nombres = []
+        propios = vars(estructura)
+        for metodo, nombre, categoria in plan:
+            if metodo not in propios:  # Si ya está, es que ya se instrumentó
+                setattr(estructura, metodo, self._envolver(getattr(estructura, metodo), nombre, categoria))
+                nombres.append(metodo)
+        if hasattr(estructura, '_crearHijo') and '_crearHijo' not in propios:
+            # Cada cuadrante del Quadtree es otra instancia: se instrumentan los que
+            # ya existen y, a través de _crearHijo, los que se creen después. La
+            # recursión solo llama insertar y subdividir de los hijos (las consultas
+            # bajan por métodos privados), así que solo esos se envuelven. El span
+            # de subdividir incluye instrumentar los cuadrantes nuevos.
+            planHijos = [paso for paso in plan if paso[0] in ('insertar', 'subdividir')]
+            crearHijo = estructura._crearHijo
+
+            def crearHijoInstrumentado(boundary):
+                return self._aplicar(crearHijo(boundary), planHijos)
+            estructura._crearHijo = crearHijoInstrumentado
+            nombres.append('_crearHijo')
+            if estructura.dividido:
+                for hijo in (estructura.noroeste, estructura.noreste, estructura.suroeste, estructura.sureste):
+                    self._aplicar(hijo, planHijos)
+        self._instrumentadas.append((estructura, nombres))
+        return estructura
+
+    def desinstrumentar(self, estructura=None):
+        """Quita las envolturas de una estructura (o de todas); vuelven los métodos de la clase."""
+        estructura = getattr(estructura, 'estructura', estructura)
+        restantes = []
+        for instrumentada, nombres in self._instrumentadas:
+            if estructura is not None and instrumentada is not estructura:
+                restantes.append((instrumentada, nombres))
+                continue
+            for metodo in nombres:
+                vars(instrumentada).pop(metodo, None)
+        self._instrumentadas = restantes
+
+    # ---------- Resúmenes y exportadores ----------
+
+    def resumen(self):
+        """Por nombre de span: cantidad, tiempo total y tiempo propio (sin los spans hijos), en segundos."""
+        propios = self._tiemposPropios()
+        totales = {}
+        for s in self.spans:
+            t = totales.setdefault(s.nombre, {'categoria': s.categoria, 'llamadas': 0, 'total': 0.0, 'propio': 0.0})
+            t['llamadas'] += 1
+            # Como en cProfile, el total de una llamada recursiva cuenta solo en la más externa
+            if s.nombre not in s.pila[:-1]:
+                t['total'] += s.duracion / 1e9
+        for nombre, propio in propios.items():
+            totales[nombre]['propio'] = propio / 1e9
+        return totales
+
+    def _tiemposPropios(self, clave=lambda s: s.nombre):
+        """
+        Tiempo propio en ns (duración menos la de los hijos directos) acumulado
+        por clave(span). Los hijos son los spans del mismo hilo contenidos en el padre.
+        """
+        propios = {}
+        porHilo = {}
+        for s in self.spans:
+            porHilo.setdefault(s.hilo, []).append(s)
+        for spans in porHilo.values():
+            spans.sort(key=lambda s: (s.inicio, -s.fin))
+            abiertos = []  # [span, duración de sus hijos]
+            for s in spans + [None]:
+                while abiertos and (s is None or abiertos[-1][0].fin <= s.inicio):
+                    cerrado, hijos = abiertos.pop()
+                    k = clave(cerrado)
+                    propios[k] = propios.get(k, 0) + cerrado.duracion - hijos
+                if s is None:
+                    break
+                if abiertos:
+                    abiertos[-1][1] += s.duracion
+                abiertos.append([s, 0])
+        return propios
+
+    def exportarChrome(self, ruta):
+        """JSON de Chrome trace con eventos completos ('X'); tiempos en microsegundos."""
+        pid = os.getpid()
+        eventos = []
+        for s in self.spans:
+            evento = {"name": s.nombre, "cat": s.categoria, "ph": "X", "pid": pid, "tid": s.hilo,
+                      "ts": (s.inicio - self._origen) / 1e3, "dur": s.duracion / 1e3}
+            if s.args:
+                evento["args"] = {clave: repr(valor) for clave, valor in s.args.items()}
+            eventos.append(evento)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, archivo)
+        return len(eventos)
+
+    def exportarPstats(self, ruta):
+        """
+        Estadísticas en el formato que guarda cProfile (marshal de
+        {función: (cc, nc, tt, ct, llamadores)}), legibles con pstats.Stats(ruta).
+        Cada nombre de span es una "función" del archivo 'trazas'.
+        """
+        def clave(nombre):
+            return ("trazas", 0, nombre)
+
+        propios = self._tiemposPropios()
+        stats = {}
+        for s in self.spans:
+            cc, nc, tt, ct, llamadores = stats.get(clave(s.nombre), (0, 0, 0.0, 0.0, {}))
+            externa = s.nombre not in s.pila[:-1]
+            duracion = s.duracion / 1e9
+            cc, nc = cc + externa, nc + 1
+            ct += duracion if externa else 0.0
+            if len(s.pila) > 1:
+                llamador = clave(s.pila[-2])
+                lcc, lnc, ltt, lct = llamadores.get(llamador, (0, 0, 0.0, 0.0))
+                llamadores[llamador] = (lcc + externa, lnc + 1, ltt, lct + (duracion if externa else 0.0))
+            stats[clave(s.nombre)] = (cc, nc, tt, ct, llamadores)
+        for nombre, propio in propios.items():
+            cc, nc, _, ct, llamadores = stats[clave(nombre)]
+            stats[clave(nombre)] = (cc, nc, propio / 1e9, ct, llamadores)
+        with open(ruta, "wb") as archivo:
+            marshal.dump(stats, archivo)
+        return len(stats)
+
+    def exportarPilasPlegadas(self, ruta):
+        """Pilas plegadas ('a;b;c <microsegundos propios>') para flamegraph.pl o speedscope."""
+        propios = self._tiemposPropios(clave=lambda s: ";".join(s.pila))
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            for pila, propio in sorted(propios.items()):
+                archivo.write(f"{pila} {max(0, propio // 1000)}\n")
+        return len(propios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traza inserciones y consultas de una estructura.")
+    parser.add_argument("--estructura", default="R-Tree", choices=list(INDICES))
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--chrome", help="Ruta del JSON de Chrome trace")
+    parser.add_argument("--pstats", help="Ruta de las estadísticas para pstats")
+    parser.add_argument("--plegadas", help="Ruta de las pilas plegadas")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.semilla)
+    indice = crearIndice(args.estructura, 0, 1000, 0, 1000, **parametrosPorDefecto(args.estructura, args.n))
+    trazador = Trazador()
+    trazador.instrumentar(indice)
+    for _ in range(args.n):
+        indice.insertar((rng.uniform(0, 1000), rng.uniform(0, 1000)))
+    for _ in range(args.consultas):
+        x, y = rng.uniform(0, 950), rng.uniform(0, 950)
+        indice.buscarEnRango(x, x + 50, y, y + 50)
+        indice.buscarVecinoMasCercano((x, y))
+
+    resumen = trazador.resumen()
+    print(f"{'span':<36}{'llamadas':>10}{'total (ms)':>14}{'propio (ms)':>14}")
+    for nombre, t in sorted(resumen.items(), key=lambda item: -item[1]['propio']):
+        print(f"{nombre:<36}{t['llamadas']:>10}{t['total'] * 1e3:>14.1f}{t['propio'] * 1e3:>14.1f}")
+    if args.chrome:
+        trazador.exportarChrome(args.chrome)
+    if args.pstats:
+        trazador.exportarPstats(args.pstats)
+    if args.plegadas:
+        trazador.exportarPilasPlegadas(args.plegadas)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 # utils.py
 
 import random
+from array import array
 
 # Genera una lista de puntos aleatorios dentro del rango dado, con un decimal
 def generarPuntosAleatorios(cantidad, xMin, xMax, yMin, yMax):
@@ -12,6 +13,243 @@ def generarPuntosAleatorios(cantidad, xMin, xMax, yMin, yMax):
         puntos.append((x, y))
     return puntos
 
-# Valida si un punto es una tupla con dos elementos numéricos
-def esPuntoValido(punto):
-    return isinstance(punto, tuple) and len(punto) == 2 and all(isinstance(coord, (int, float)) for coord in punto)
+# Valida si un punto es una tupla con `dimensiones` elementos numéricos (dos por defecto)
+def esPuntoValido(punto, dimensiones=2):
+    return isinstance(punto, tuple) and len(punto) == dimensiones and all(isinstance(coord, (int, float)) for coord in punto)
+
+
+# Separa los 16 bits bajos de v intercalando ceros (0b1011 -> 0b1000101)
+def _expandirBits16(v):
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+# Intercala los bits de dos índices enteros no negativos (x en bits pares, y en impares),
+# de a 16 bits por vuelta
+def codigoMorton(ix, iy):
+    if ix < 0x10000 and iy < 0x10000:
+        return _expandirBits16(ix) | _expandirBits16(iy) << 1
+    codigo = 0
+    desplazamiento = 0
+    while ix or iy:
+        codigo |= (_expandirBits16(ix & 0xFFFF) | _expandirBits16(iy & 0xFFFF) << 1) << desplazamiento
+        ix >>= 16
+        iy >>= 16
+        desplazamiento += 32
+    return codigo
+
+# Operación inversa de codigoMorton: devuelve la tupla (ix, iy)
+def decodificarMorton(codigo):
+    ix = iy = 0
+    bit = 0
+    while codigo:
+        ix |= (codigo & 1) << bit
+        iy |= ((codigo >> 1) & 1) << bit
+        codigo >>= 2
+        bit += 1
+    return ix, iy
+
+# Genera puntos agrupados en cúmulos gaussianos cuyos centros se eligen con generarPuntosAleatorios
+def generarPuntosAgrupados(cantidad, xMin, xMax, yMin, yMax, grupos=5, dispersion=None):
+    if dispersion is None:
+        dispersion = 0.05 * min(xMax - xMin, yMax - yMin)
+    centros = generarPuntosAleatorios(max(1, grupos), xMin, xMax, yMin, yMax)
+    puntos = []
+    for _ in range(cantidad):
+        cx, cy = random.choice(centros)
+        # Se recorta al rango para que todos los puntos sean indexables
+        x = round(min(max(random.gauss(cx, dispersion), xMin), xMax), 1)
+        y = round(min(max(random.gauss(cy, dispersion), yMin), yMax), 1)
+        puntos.append((x, y))
+    return puntos
+
+# Genera puntos concentrados alrededor de la diagonal del rango (datos sesgados)
+def generarPuntosDiagonal(cantidad, xMin, xMax, yMin, yMax, ruido=0.02):
+    puntos = []
+    for x, _ in generarPuntosAleatorios(cantidad, xMin, xMax, yMin, yMax):
+        t = (x - xMin) / (xMax - xMin) if xMax != xMin else 0
+        y = yMin + t * (yMax - yMin) + random.gauss(0, ruido * (yMax - yMin))
+        puntos.append((x, round(min(max(y, yMin), yMax), 1)))
+    return puntos
+
+# Genera puntos con muchas coordenadas repetidas, tomados de un conjunto pequeño de puntos distintos
+def generarPuntosDuplicados(cantidad, xMin, xMax, yMin, yMax, distintos=None):
+    if distintos is None:
+        distintos = max(1, cantidad // 20)
+    base = generarPuntosAleatorios(distintos, xMin, xMax, yMin, yMax)
+    return [random.choice(base) for _ in range(cantidad)]
+
+# Convierte un iterable de pares (o un arreglo NumPy de forma (n, 2)) en una lista de tuplas.
+# Las tuplas (incluidos los PuntoId) se conservan tal cual para no perder su id.
+def comoListaDeTuplas(puntos):
+    if hasattr(puntos, 'tolist'):
+        puntos = puntos.tolist()
+    return [p if isinstance(p, tuple) else tuple(p) for p in puntos]
+
+
+# ======================== IDS Y MODOS DE RESULTADO ========================
+
+class PuntoId(tuple):
+    """
+    Punto con el id del registro al que pertenece. Se comporta como la tupla
+    (x, y) en comparaciones, índices y desempaquetado, así que las estructuras
+    lo guardan sin cambios; las consultas devuelven el mismo objeto y `p.id`
+    permite llegar al registro sin buscarlo por coordenadas (dos registros en
+    el mismo lugar siguen siendo dos puntos distintos).
+    """
+
+    def __new__(cls, punto, id):
+        nuevo = super().__new__(cls, punto)
+        nuevo.id = id
+        return nuevo
+
+    def __getnewargs__(self):
+        return tuple(self), self.id
+
+    def __repr__(self):
+        return f"PuntoId({tuple.__repr__(self)}, id={self.id!r})"
+
+
+# Punto con id si se indicó uno; si no, el punto tal cual
+def conId(punto, id=None):
+    return punto if id is None else PuntoId(punto, id)
+
+
+# Lista de puntos con sus ids (ids puede ser None o una secuencia del mismo largo)
+def conIds(puntos, ids=None):
+    puntos = comoListaDeTuplas(puntos)
+    if ids is None:
+        return puntos
+    if hasattr(ids, 'tolist'):
+        ids = ids.tolist()
+    ids = list(ids)
+    if len(ids) != len(puntos):
+        raise ValueError("puntos e ids deben tener el mismo largo")
+    return [PuntoId(p, i) for p, i in zip(puntos, ids)]
+
+
+# Modos de resultado de buscarEnRango:
+# - 'puntos':  lista de puntos (como siempre)
+# - 'ids':     lista con el id de cada punto (None si se insertó sin id)
+# - 'arreglo': arreglo NumPy int64 de ids (-1 si no tiene id); requiere ids enteros
+# - 'conteo':  solo la cantidad de puntos, sin armar ninguna lista
+MODOS_RESULTADO = ('puntos', 'ids', 'arreglo', 'conteo')
+
+
+class _Conteo:
+    __slots__ = ('cantidad',)
+
+    def __init__(self):
+        self.cantidad = 0
+
+    def append(self, punto):
+        self.cantidad += 1
+
+
+class _Ids:
+    __slots__ = ('ids', 'ausente')
+
+    def __init__(self, ids, ausente):
+        self.ids = ids
+        self.ausente = ausente
+
+    def append(self, punto):
+        id = getattr(punto, 'id', None)
+        self.ids.append(self.ausente if id is None else id)
+
+
+# Destino de los resultados de una consulta: las búsquedas solo llaman a append()
+def crearSumidero(modo='puntos'):
+    if modo == 'puntos':
+        return []
+    if modo == 'conteo':
+        return _Conteo()
+    if modo == 'ids':
+        return _Ids([], None)
+    if modo == 'arreglo':
+        return _Ids(array('q'), -1)
+    raise ValueError(f"Modo de resultado desconocido: {modo!r}. Opciones: {', '.join(MODOS_RESULTADO)}")
+
+
+# Valor que devuelve la consulta a partir de su sumidero
+def resultadoDeSumidero(sumidero):
+    if isinstance(sumidero, _Conteo):
+        return sumidero.cantidad
+    if isinstance(sumidero, _Ids):
+        if isinstance(sumidero.ids, array):
+            import numpy as np
+            return np.frombuffer(sumidero.ids, dtype=np.int64) if sumidero.ids else np.empty(0, dtype=np.int64)
+        return sumidero.ids
+    return sumidero
+
+
+# Resultado de buscarEnRango en `modo` más otros puntos que no están en el índice
+# (por ejemplo, los pendientes de un búfer o el delta de una instantánea)
+def extenderResultado(resultado, puntos, modo='puntos'):
+    sumidero = crearSumidero(modo)
+    for p in puntos:
+        sumidero.append(p)
+    extra = resultadoDeSumidero(sumidero)
+    if modo == 'conteo':
+        return resultado + extra
+    if modo == 'arreglo':
+        import numpy as np
+        return np.concatenate((resultado, extra)) if len(extra) else resultado
+    resultado.extend(extra)
+    return resultado
+
+class Agregado:
+    """
+    Resumen de un conjunto de puntos: cuántos son y, si tienen valor asociado,
+    la suma, el mínimo y el máximo de esos valores (None si no hay ninguno).
+    Lo guardan los nodos de QuadTreeAgregado y RTreeAgregado y lo devuelven
+    sus consultas agregarEnRango.
+    """
+    __slots__ = ('conteo', 'suma', 'minimo', 'maximo')
+
+    def __init__(self):
+        self.conteo = 0
+        self.suma = 0
+        self.minimo = None
+        self.maximo = None
+
+    def agregarValor(self, valor=None):
+        """Suma un punto con su valor (None si solo se cuenta)."""
+        self.conteo += 1
+        if valor is not None:
+            self.suma += valor
+            if self.minimo is None or valor < self.minimo:
+                self.minimo = valor
+            if self.maximo is None or valor > self.maximo:
+                self.maximo = valor
+
+    def combinar(self, otro):
+        """Acumula otro Agregado en este."""
+        self.conteo += otro.conteo
+        self.suma += otro.suma
+        if otro.minimo is not None and (self.minimo is None or otro.minimo < self.minimo):
+            self.minimo = otro.minimo
+        if otro.maximo is not None and (self.maximo is None or otro.maximo > self.maximo):
+            self.maximo = otro.maximo
+
+    def promedio(self):
+        return self.suma / self.conteo if self.conteo and self.minimo is not None else None
+
+    def __repr__(self):
+        return f"Agregado(conteo={self.conteo}, suma={self.suma}, minimo={self.minimo}, maximo={self.maximo})"
+
+# Ordena los puntos por su código Morton (curva Z) dentro del rectángulo dado,
+# de modo que puntos cercanos en el espacio queden cercanos en la lista.
+# Ordena por codigoMorton(ix, iy) sobre una malla de 2^16 x 2^16.
+def ordenarPorMorton(puntos, xMin, xMax, yMin, yMax):
+    celdas = (1 << 16) - 1
+    escalaX = celdas / (xMax - xMin) if xMax > xMin else 0
+    escalaY = celdas / (yMax - yMin) if yMax > yMin else 0
+
+    def clave(p):
+        ix = int((min(max(p[0], xMin), xMax) - xMin) * escalaX)
+        iy = int((min(max(p[1], yMin), yMax) - yMin) * escalaY)
+        return codigoMorton(ix, iy)
+
+    return sorted(puntos, key=clave)
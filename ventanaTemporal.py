@@ -0,0 +1,322 @@
+# ventanaTemporal.py
+#
+# Índice de ventana deslizante para datos que llegan en flujo (por ejemplo,
+# posiciones GPS) y solo se consultan durante los últimos minutos.
+#
+# - Los puntos se reparten en segmentos por tiempo: el segmento número
+#   floor(t / duracion_segmento) tiene su propio índice de adaptadores.py
+#   (Grid File o R-Tree, por ejemplo).
+# - Expirar datos no toca ningún índice: los segmentos que quedan enteros fuera
+#   de la ventana se descartan de una vez, sin reconstruir nada.
+# - Las consultas recorren solo los segmentos vivos que se superponen con el
+#   intervalo pedido. Si el segmento cae entero dentro del intervalo, sus
+#   resultados se usan tal cual. Si lo corta, cada punto se filtra por su
+#   marca de tiempo.
+#
+# Los puntos se guardan como PuntoTemporal (un PuntoId con `.t`), así que las
+# consultas devuelven tuplas (x, y) que además llevan su tiempo y su id.
+#
+# Ejemplo:
+#   python ventanaTemporal.py --estructura "Grid File" --minutos 30 --ventana 10
+
+import argparse
+import bisect
+import math
+import random
+import time
+
+from adaptadores import INDICES, crearIndice, kMasCercanos
+from benchmark import parametrosPorDefecto
+from utils import PuntoId, comoListaDeTuplas
+
+
+class PuntoTemporal(PuntoId):
+    """PuntoId con la marca de tiempo `t` de la observación."""
+
+    def __new__(cls, punto, t, id=None):
+        nuevo = super().__new__(cls, punto, id)
+        nuevo.t = t
+        return nuevo
+
+    def __getnewargs__(self):
+        return tuple(self), self.t, self.id
+
+    def __repr__(self):
+        return f"PuntoTemporal({tuple.__repr__(self)}, t={self.t!r}, id={self.id!r})"
+
+
+class Segmento:
+    """Puntos con t en [inicio, inicio + duración), con su propio índice espacial."""
+    __slots__ = ('numero', 'indice', 'cantidad', 't_min', 't_max')
+
+    def __init__(self, numero, indice):
+        self.numero = numero
+        self.indice = indice
+        self.cantidad = 0
+        self.t_min = math.inf  # Tiempos reales del primer y último punto guardados
+        self.t_max = -math.inf
+
+    def registrar(self, tiempos):
+        self.cantidad += len(tiempos)
+        self.t_min = min(self.t_min, min(tiempos))
+        self.t_max = max(self.t_max, max(tiempos))
+
+    def __repr__(self):
+        return f"Segmento({self.numero}, {self.cantidad} puntos, t=[{self.t_min}, {self.t_max}])"
+
+
+class IndiceVentanaTemporal:
+    """
+    Ventana deslizante de `ventana` unidades de tiempo sobre segmentos de
+    `duracion_segmento`. El reloj de la ventana es el mayor tiempo insertado
+    (o el que se pase a expirar); los puntos más viejos que ahora - ventana se
+    rechazan al insertar y dejan de verse en las consultas.
+
+    - nombre: estructura de cada segmento (ver adaptadores.INDICES).
+    - puntos_por_segmento: tamaño esperado de un segmento, para elegir los
+      parámetros con benchmark.parametrosPorDefecto si no se pasan `parametros`.
+    """
+    def __init__(self, nombre, x_min, x_max, y_min, y_max, duracion_segmento=60.0, ventana=600.0,
+                 puntos_por_segmento=4096, **parametros):
+        if nombre not in INDICES:
+            raise ValueError(f"Estructura desconocida: {nombre!r}. Opciones: {', '.join(INDICES)}")
+        if duracion_segmento <= 0 or ventana <= 0:
+            raise ValueError("duracion_segmento y ventana deben ser positivos")
+        self.nombre = nombre
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.duracion_segmento = duracion_segmento
+        self.ventana = ventana
+        self.parametros = parametros or parametrosPorDefecto(nombre, puntos_por_segmento)
+        self.ahora = -math.inf
+        self.expirados = 0  # Puntos descartados junto con sus segmentos
+        self._numeros = []  # Números de los segmentos vivos, en orden
+        self._segmentos = {}
+
+    def __len__(self):
+        """
+        Puntos dentro de la ventana (t >= inicioVentana()). En el segmento que
+        cruza el inicio de la ventana se cuentan uno por uno; ver guardados().
+        """
+        inicio = self.inicioVentana()
+        total = 0
+        for segmento in self._segmentos.values():
+            if segmento.t_min >= inicio:
+                total += segmento.cantidad
+            elif segmento.t_max >= inicio:
+                total += sum(1 for p in segmento.indice.iterarEnRango(self.x_min, self.x_max, self.y_min, self.y_max)
+                             if p.t >= inicio)
+        return total
+
+    def guardados(self):
+        """Puntos en los segmentos vivos, incluidos los ya vencidos que se descartarán con su segmento."""
+        return sum(s.cantidad for s in self._segmentos.values())
+
+    def segmentos(self):
+        """Segmentos vivos, del más viejo al más nuevo."""
+        return [self._segmentos[n] for n in self._numeros]
+
+    def inicioVentana(self):
+        return self.ahora - self.ventana
+
+    # ---------- Escritura y expiración ----------
+
+    def _segmento(self, numero):
+        segmento = self._segmentos.get(numero)
+        if segmento is None:
+            indice = crearIndice(self.nombre, self.x_min, self.x_max, self.y_min, self.y_max, **self.parametros)
+            segmento = self._segmentos[numero] = Segmento(numero, indice)
+            bisect.insort(self._numeros, numero)
+        return segmento
+
+    def expirar(self, ahora=None):
+        """
+        Adelanta el reloj (si se indica `ahora`) y descarta los segmentos que
+        terminan antes del inicio de la ventana; devuelve cuántos se descartaron.
+        """
+        if ahora is not None and ahora > self.ahora:
+            self.ahora = ahora
+        limite = self.inicioVentana()
+        descartados = 0
+        while self._numeros and (self._numeros[0] + 1) * self.duracion_segmento <= limite:
+            segmento = self._segmentos.pop(self._numeros.pop(0))
+            self.expirados += segmento.cantidad
+            descartados += 1
+        return descartados
+
+    def insertar(self, punto, t, id=None):
+        return self.cargarMasivo([punto], [t], None if id is None else [id]) == 1
+
+    def cargarMasivo(self, puntos, tiempos, ids=None):
+        """
+        Inserta un bloque de observaciones (puntos con sus tiempos e ids
+        opcionales). Cada segmento recibe su parte con una sola llamada a
+        cargarMasivo. Devuelve cuántos puntos se guardaron.
+        """
+        puntos = comoListaDeTuplas(puntos)
+        tiempos = list(tiempos)
+        ids = [None] * len(puntos) if ids is None else list(ids)
+        if not len(puntos) == len(tiempos) == len(ids):
+            raise ValueError("puntos, tiempos e ids deben tener el mismo largo")
+        if not puntos:
+            return 0
+        self.expirar(max(tiempos))
+
+        limite = self.inicioVentana()
+        grupos = {}
+        for punto, t, id in zip(puntos, tiempos, ids):
+            if t < limite:
+                continue
+            grupos.setdefault(math.floor(t / self.duracion_segmento), []).append(PuntoTemporal(punto, t, id))
+
+        cantidad = 0
+        for numero, grupo in grupos.items():
+            segmento = self._segmento(numero)
+            # Los adaptadores descartan lo que cae fuera del espacio: solo se registra lo guardado
+            if segmento.indice.cargarMasivo(grupo) == len(grupo):
+                guardados = grupo
+            else:
+                guardados = [p for p in grupo if segmento.indice.buscarPunto(p)]
+            if guardados:
+                segmento.registrar([p.t for p in guardados])
+                cantidad += len(guardados)
+        return cantidad
+
+    # ---------- Consultas ----------
+
+    def _intervalo(self, desde, hasta):
+        inicio = self.inicioVentana()
+        return (inicio if desde is None else max(desde, inicio)), (math.inf if hasta is None else hasta)
+
+    def _segmentosEn(self, desde, hasta):
+        """Pares (segmento, completo) de los segmentos vivos con puntos en [desde, hasta]."""
+        for numero in self._numeros:
+            segmento = self._segmentos[numero]
+            if segmento.cantidad == 0 or segmento.t_max < desde or segmento.t_min > hasta:
+                continue
+            yield segmento, desde <= segmento.t_min and segmento.t_max <= hasta
+
+    def iterarEnRango(self, xMin, xMax, yMin, yMax, desde=None, hasta=None, limite=None):
+        """Puntos dentro del rectángulo con desde <= t <= hasta (por defecto, toda la ventana)."""
+        if limite is not None and limite <= 0:
+            return
+        desde, hasta = self._intervalo(desde, hasta)
+        encontrados = 0
+        for segmento, completo in self._segmentosEn(desde, hasta):
+            for p in segmento.indice.iterarEnRango(xMin, xMax, yMin, yMax):
+                if completo or desde <= p.t <= hasta:
+                    yield p
+                    encontrados += 1
+                    if encontrados == limite:
+                        return
+
+    def buscarEnRango(self, xMin, xMax, yMin, yMax, desde=None, hasta=None):
+        desde, hasta = self._intervalo(desde, hasta)
+        resultado = []
+        for segmento, completo in self._segmentosEn(desde, hasta):
+            puntos = segmento.indice.buscarEnRango(xMin, xMax, yMin, yMax)
+            resultado.extend(puntos if completo else [p for p in puntos if desde <= p.t <= hasta])
+        return resultado
+
+    def existeEnRango(self, xMin, xMax, yMin, yMax, desde=None, hasta=None):
+        for _ in self.iterarEnRango(xMin, xMax, yMin, yMax, desde, hasta, limite=1):
+            return True
+        return False
+
+    def buscarKVecinos(self, punto, k, desde=None, hasta=None):
+        """
+        Los k puntos más cercanos con t en el intervalo. Los segmentos completos
+        aportan sus k vecinos; los que el intervalo corta se recorren enteros
+        filtrando por tiempo (son a lo sumo los de los dos extremos).
+        """
+        if k <= 0:
+            return []
+        desde, hasta = self._intervalo(desde, hasta)
+        candidatos = []
+        for segmento, completo in self._segmentosEn(desde, hasta):
+            if completo:
+                candidatos.extend(segmento.indice.buscarKVecinos(punto, k))
+            else:
+                candidatos.extend(p for p in segmento.indice.iterarEnRango(self.x_min, self.x_max,
+                                                                           self.y_min, self.y_max)
+                                  if desde <= p.t <= hasta)
+        return kMasCercanos(punto, k, candidatos)
+
+    def buscarVecinoMasCercano(self, punto, desde=None, hasta=None):
+        vecinos = self.buscarKVecinos(punto, 1, desde, hasta)
+        return vecinos[0] if vecinos else None
+
+    def __repr__(self):
+        return (f"IndiceVentanaTemporal({self.nombre}, {len(self._numeros)} segmentos de "
+                f"{self.duracion_segmento}, ventana {self.ventana})")
+
+
+def simular(nombre, minutos, ventana_minutos, puntos_por_minuto, consultas_por_minuto=20, semilla=0):
+    """
+    Flujo sintético de GPS: compara la ventana segmentada con reconstruir un
+    índice completo en cada minuto (lo que se hacía antes) y verifica que ambos
+    respondan lo mismo. Devuelve un dict con tiempos y cantidad de diferencias.
+    """
+    rng = random.Random(semilla)
+    lado = 1000.0
+    ventana = IndiceVentanaTemporal(nombre, 0, lado, 0, lado, duracion_segmento=60.0, ventana=ventana_minutos * 60.0,
+                                    puntos_por_segmento=puntos_por_minuto)
+    historial = []
+    segundosVentana = segundosReconstruccion = 0.0
+    diferencias = 0
+    for minuto in range(minutos):
+        tiempos = sorted(minuto * 60.0 + rng.random() * 60.0 for _ in range(puntos_por_minuto))
+        puntos = [(rng.uniform(0, lado), rng.uniform(0, lado)) for _ in tiempos]
+
+        inicio = time.perf_counter()
+        ventana.cargarMasivo(puntos, tiempos)
+        segundosVentana += time.perf_counter() - inicio
+
+        historial.extend(zip(puntos, tiempos))
+        limite = ventana.inicioVentana()
+        historial = [(p, t) for p, t in historial if t >= limite]
+        inicio = time.perf_counter()
+        vivos = [p for p, _ in historial]
+        completo = crearIndice(nombre, 0, lado, 0, lado, **parametrosPorDefecto(nombre, len(vivos)))
+        completo.cargarMasivo(vivos)
+        segundosReconstruccion += time.perf_counter() - inicio
+
+        for _ in range(consultas_por_minuto):
+            x, y = rng.uniform(0, lado - 100), rng.uniform(0, lado - 100)
+            esperado = sorted(completo.buscarEnRango(x, x + 100, y, y + 100))
+            if sorted(tuple(p) for p in ventana.buscarEnRango(x, x + 100, y, y + 100)) != esperado:
+                diferencias += 1
+    return {
+        "estructura": nombre,
+        "segundos_ventana": segundosVentana,
+        "segundos_reconstruccion": segundosReconstruccion,
+        "puntos_vivos": len(ventana),
+        "puntos_guardados": ventana.guardados(),
+        "segmentos": len(ventana.segmentos()),
+        "diferencias": diferencias,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ventana deslizante contra reconstrucción completa por minuto.")
+    parser.add_argument("--estructura", default="Grid File", choices=list(INDICES))
+    parser.add_argument("--minutos", type=int, default=30)
+    parser.add_argument("--ventana", type=int, default=10, help="Minutos que se conservan")
+    parser.add_argument("--puntos-por-minuto", type=int, default=5000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    r = simular(args.estructura, args.minutos, args.ventana, args.puntos_por_minuto, semilla=args.semilla)
+    print(f"{r['estructura']}: ingesta en ventana {r['segundos_ventana']:.2f} s, "
+          f"reconstrucción por minuto {r['segundos_reconstruccion']:.2f} s "
+          f"({r['puntos_vivos']} puntos vivos, {r['puntos_guardados']} guardados, en {r['segmentos']} segmentos)")
+    if r["diferencias"]:
+        print(f"ERROR: {r['diferencias']} consultas difieren de la reconstrucción completa")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
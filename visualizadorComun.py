@@ -0,0 +1,94 @@
+# visualizadorComun.py
+#
+# Rutinas de dibujo compartidas por los visualizadores. Están pensadas para
+# conjuntos grandes: un solo `scatter` por clase de puntos, una sola
+# LineCollection para todas las celdas o MBRs y etiquetas solo cuando hay pocos puntos.
+# Las ventanas de visualización se expresan como tuplas (xMin, xMax, yMin, yMax).
+#
+# matplotlib se importa recién al dibujar la primera figura (ver pyplot()),
+# así importar un visualizador no cuesta el arranque de matplotlib.
+
+import sys
+
+# Por encima de esta cantidad de puntos no se anotan sus coordenadas
+UMBRAL_ETIQUETAS = 200
+# Por encima de esta cantidad los puntos se dibujan como densidad (hexbin)
+UMBRAL_DENSIDAD = 20000
+
+
+def pyplot():
+    """
+    matplotlib.pyplot, importado la primera vez que se pide. Si nadie lo
+    importó antes se elige el backend no interactivo Agg: las figuras se
+    entregan a st.pyplot o se guardan en archivos, nunca se abren ventanas.
+    """
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def dibujarPuntos(ax, puntos, color='blue', label=None, marker='o', size=None, etiquetas=None,
+                  umbral_densidad=UMBRAL_DENSIDAD):
+    """
+    Dibuja una clase de puntos con una sola llamada.
+    - etiquetas: None para decidir según UMBRAL_ETIQUETAS, o True/False para forzarlo.
+    - Si hay más de `umbral_densidad` puntos se dibuja un hexbin en lugar de marcadores.
+    """
+    if not puntos:
+        return None
+
+    x, y = zip(*puntos)
+    if umbral_densidad is not None and len(puntos) > umbral_densidad:
+        return ax.hexbin(x, y, gridsize=100, cmap='Blues', mincnt=1, bins='log', label=label)
+
+    artista = ax.scatter(x, y, color=color, label=label, marker=marker, s=size)
+
+    if etiquetas is None:
+        etiquetas = len(puntos) <= UMBRAL_ETIQUETAS
+    if etiquetas:
+        for px, py in puntos:
+            ax.annotate(f"({px}, {py})", (px, py), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9, color='black')
+    return artista
+
+
+def dibujarRectangulos(ax, rectangulos, edgecolor='gray', linestyle='--', linewidth=0.8):
+    """
+    Dibuja el contorno de muchos rectángulos como una sola LineCollection.
+    `rectangulos` es un iterable de tuplas (x_min, y_min, ancho, alto).
+    """
+    contornos = [
+        ((x, y), (x + ancho, y), (x + ancho, y + alto), (x, y + alto), (x, y))
+        for x, y, ancho, alto in rectangulos
+    ]
+    if not contornos:
+        return None
+    from matplotlib.collections import LineCollection
+    coleccion = LineCollection(contornos, colors=edgecolor, linestyles=linestyle, linewidths=linewidth)
+    ax.add_collection(coleccion)
+    return coleccion
+
+
+def filtrarPuntos(puntos, ventana):
+    """Puntos dentro de la ventana (xMin, xMax, yMin, yMax); todos si no hay ventana."""
+    if ventana is None:
+        return puntos
+    xMin, xMax, yMin, yMax = ventana
+    return [p for p in puntos if xMin <= p[0] <= xMax and yMin <= p[1] <= yMax]
+
+
+def ajustarVentana(ax, xMax, yMax, ventana=None):
+    """Límites de los ejes: [0, xMax] x [0, yMax], o la ventana visible si se indica."""
+    if ventana is None:
+        ax.set_xlim(0, xMax)
+        ax.set_ylim(0, yMax)
+    else:
+        ax.set_xlim(ventana[0], ventana[1])
+        ax.set_ylim(ventana[2], ventana[3])
+
+
+def mostrarLeyenda(ax):
+    """Muestra la leyenda solo si hay artistas con etiqueta (evita el aviso de matplotlib)."""
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
@@ -1,56 +1,50 @@
 # visualizadorGridFile.py
 
-import matplotlib.pyplot as plt
+from visualizadorComun import pyplot, ajustarVentana, dibujarPuntos, filtrarPuntos, dibujarRectangulos, mostrarLeyenda
 
-def _dibujar_grid_boundaries(ax, grid_file):
-    """Función auxiliar para dibujar los límites de las celdas del Grid File."""
+def _dibujar_grid_boundaries(ax, grid_file, ventana=None, max_celdas=None):
+    """
+    Función auxiliar para dibujar los límites de las celdas del Grid File.
+    Solo se generan las celdas visibles en la ventana, agrupadas si superan max_celdas.
+    """
     if not grid_file:
         return
     
-    boundaries = grid_file.get_grid_cells_boundaries()
-    for ((x_start, y_start), (x_end, y_end)) in boundaries:
-        rect = plt.Rectangle(
-            (x_start, y_start), x_end - x_start, y_end - y_start,
-            linewidth=0.8, edgecolor='gray', facecolor='none', linestyle=':'
-        )
-        ax.add_patch(rect)
+    boundaries = grid_file.iterar_celdas(ventana, max_celdas)
+    dibujarRectangulos(ax, ((x_start, y_start, x_end - x_start, y_end - y_start)
+                            for ((x_start, y_start), (x_end, y_end)) in boundaries),
+                       edgecolor='gray', linestyle=':', linewidth=0.8)
 
 # Dibuja los puntos y las celdas del Grid File
-def graficarConGridFile(listaPuntos, grid_file, xMax=10, yMax=10):
+def graficarConGridFile(listaPuntos, grid_file, xMax=10, yMax=10, ventana=None, max_celdas=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_title("Puntos y celdas del Grid File")
     ax.set_xlabel("Eje X")
     ax.set_ylabel("Eje Y")
     ax.grid(True, linestyle='dotted') # Cuadrícula principal del plot
 
-    if listaPuntos:
-        x, y = zip(*listaPuntos)
-        ax.scatter(x, y, color='blue', label="Puntos")
-        for px, py in listaPuntos:
-            ax.annotate(f"({px}, {py})", (px, py), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9, color='black')
+    dibujarPuntos(ax, filtrarPuntos(listaPuntos, ventana), color='blue', label="Puntos")
 
-    _dibujar_grid_boundaries(ax, grid_file)
+    _dibujar_grid_boundaries(ax, grid_file, ventana, max_celdas)
     
-    ax.legend()
+    mostrarLeyenda(ax)
     return fig
 
 # Dibuja puntos, celdas y resultados de consulta para Grid File
-def graficarConsultaGridFile(puntos, grid_file, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10):
+def graficarConsultaGridFile(puntos, grid_file, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10, ventana=None, max_celdas=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
 
     # Puntos base en azul
-    for punto in puntos:
-        ax.plot(punto[0], punto[1], 'o', color='blue')
-        ax.annotate(f"({punto[0]}, {punto[1]})", (punto[0], punto[1]), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9)
+    dibujarPuntos(ax, filtrarPuntos(puntos, ventana), color='blue')
 
     # Dibujar las divisiones del Grid File
-    _dibujar_grid_boundaries(ax, grid_file)
+    _dibujar_grid_boundaries(ax, grid_file, ventana, max_celdas)
     
     # Resultados en verde
-    for punto in puntosResultado:
-        ax.plot(punto[0], punto[1], 'o', color='green', markersize=8)
+    dibujarPuntos(ax, puntosResultado, color='green', size=64, etiquetas=False, umbral_densidad=None)
 
     # Punto de consulta
     if puntoConsulta:
@@ -70,8 +64,7 @@ def graficarConsultaGridFile(puntos, grid_file, puntosResultado=[], puntoConsult
         rect_plot = plt.Rectangle((xMin, yMin), ancho, alto, linewidth=1.5, edgecolor='orange', facecolor='none', linestyle='--')
         ax.add_patch(rect_plot)
 
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.grid(True, linestyle='dotted')
@@ -1,39 +1,32 @@
-import matplotlib.pyplot as plt
+from visualizadorComun import pyplot, ajustarVentana, dibujarPuntos, filtrarPuntos, mostrarLeyenda
 
 # Dibuja solamente los puntos actuales sin consultas
-def graficarPuntos(listaPuntos, xMax=10, yMax=10):
+def graficarPuntos(listaPuntos, xMax=10, yMax=10, ventana=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_title("Puntos en el espacio")
     ax.set_xlabel("Eje X")
     ax.set_ylabel("Eje Y")
     ax.grid(True)
 
-    if listaPuntos:
-        x, y = zip(*listaPuntos)
-        ax.scatter(x, y, color='blue', label="Puntos")
-        # Mostrar coordenadas al lado de cada punto
-        for px, py in listaPuntos:
-            ax.annotate(f"({px}, {py})", (px, py), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9, color='black')
+    # Un solo scatter; las coordenadas se anotan solo si hay pocos puntos
+    dibujarPuntos(ax, filtrarPuntos(listaPuntos, ventana), color='blue', label="Puntos")
 
-    ax.legend()
+    mostrarLeyenda(ax)
     return fig
 
 
 # Dibuja puntos más resultados de consulta
-def graficarConsulta(puntos, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10):
+def graficarConsulta(puntos, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10, ventana=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
 
     # Puntos base en azul
-    for punto in puntos:
-        ax.plot(punto[0], punto[1], 'o', color='blue')
-        ax.annotate(f"({punto[0]}, {punto[1]})", (punto[0], punto[1]), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9)
+    dibujarPuntos(ax, filtrarPuntos(puntos, ventana), color='blue')
 
     # Resultados en verde
-    for punto in puntosResultado:
-        ax.plot(punto[0], punto[1], 'o', color='green')
-        ax.annotate(f"({punto[0]}, {punto[1]})", (punto[0], punto[1]), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9)
+    dibujarPuntos(ax, puntosResultado, color='green', umbral_densidad=None)
 
     # Punto de consulta
     if puntoConsulta:
@@ -53,8 +46,7 @@ def graficarConsulta(puntos, puntosResultado=[], puntoConsulta=None, rect=None,
         rectangulo = plt.Rectangle((xMin, yMin), ancho, alto, linewidth=1.5, edgecolor='orange', facecolor='none', linestyle='--')
         ax.add_patch(rectangulo)
 
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.grid(True)
@@ -1,57 +1,53 @@
 # visualizadorQuadTree.py
 
-import matplotlib.pyplot as plt
 from quadTree import Rectangle # Se usa para el tipo de dato del rango
+from visualizadorComun import pyplot, ajustarVentana, dibujarPuntos, filtrarPuntos, dibujarRectangulos, mostrarLeyenda
 
-def _dibujar_divisiones_quadtree(ax, quadtree):
-    """Función auxiliar para dibujar los límites del quadtree en un eje."""
+def _dibujar_divisiones_quadtree(ax, quadtree, ventana=None, profundidad=None):
+    """
+    Función auxiliar para dibujar los límites del quadtree en un eje.
+    Solo se recorren los cuadrantes visibles en la ventana y hasta la profundidad indicada.
+    """
     if not quadtree:
         return
     
-    limites = quadtree.obtener_limites()
-    for b in limites:
-        rect = plt.Rectangle(
-            (b.x - b.w, b.y - b.h), 2 * b.w, 2 * b.h,
-            linewidth=0.8, edgecolor='gray', facecolor='none', linestyle='--'
-        )
-        ax.add_patch(rect)
+    if ventana is not None:
+        xMin, xMax, yMin, yMax = ventana
+        ventana = Rectangle((xMin + xMax) / 2, (yMin + yMax) / 2, (xMax - xMin) / 2, (yMax - yMin) / 2)
+    limites = quadtree.iterar_limites(ventana, profundidad)
+    dibujarRectangulos(ax, ((b.x - b.w, b.y - b.h, 2 * b.w, 2 * b.h) for b in limites),
+                       edgecolor='gray', linestyle='--', linewidth=0.8)
 
 # Dibuja los puntos y las divisiones del Quadtree
-def graficarConQuadTree(listaPuntos, quadtree, xMax=10, yMax=10):
+def graficarConQuadTree(listaPuntos, quadtree, xMax=10, yMax=10, ventana=None, profundidad=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_title("Puntos y divisiones del Quadtree")
     ax.set_xlabel("Eje X")
     ax.set_ylabel("Eje Y")
     ax.grid(True)
 
-    if listaPuntos:
-        x, y = zip(*listaPuntos)
-        ax.scatter(x, y, color='blue', label="Puntos")
-        for px, py in listaPuntos:
-            ax.annotate(f"({px}, {py})", (px, py), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9, color='black')
+    dibujarPuntos(ax, filtrarPuntos(listaPuntos, ventana), color='blue', label="Puntos")
 
-    _dibujar_divisiones_quadtree(ax, quadtree)
+    _dibujar_divisiones_quadtree(ax, quadtree, ventana, profundidad)
     
-    ax.legend()
+    mostrarLeyenda(ax)
     return fig
 
 # Dibuja puntos, divisiones y resultados de consulta para Quadtree
-def graficarConsultaQuadTree(puntos, quadtree, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10):
+def graficarConsultaQuadTree(puntos, quadtree, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10, ventana=None, profundidad=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
 
     # Puntos base en azul
-    for punto in puntos:
-        ax.plot(punto[0], punto[1], 'o', color='blue')
-        ax.annotate(f"({punto[0]}, {punto[1]})", (punto[0], punto[1]), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9)
+    dibujarPuntos(ax, filtrarPuntos(puntos, ventana), color='blue')
 
     # Dibujar las divisiones del Quadtree
-    _dibujar_divisiones_quadtree(ax, quadtree)
+    _dibujar_divisiones_quadtree(ax, quadtree, ventana, profundidad)
     
     # Resultados en verde
-    for punto in puntosResultado:
-        ax.plot(punto[0], punto[1], 'o', color='green', markersize=8)
+    dibujarPuntos(ax, puntosResultado, color='green', size=64, etiquetas=False, umbral_densidad=None)
 
     # Punto de consulta
     if puntoConsulta:
@@ -70,8 +66,7 @@ def graficarConsultaQuadTree(puntos, quadtree, puntosResultado=[], puntoConsulta
         rect_plot = plt.Rectangle((rect.x - rect.w, rect.y - rect.h), ancho, alto, linewidth=1.5, edgecolor='orange', facecolor='none', linestyle='--')
         ax.add_patch(rect_plot)
 
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.grid(True)
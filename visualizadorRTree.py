@@ -1,26 +1,22 @@
 # visualizadorRTree.py
 
-import matplotlib.pyplot as plt
 from rTree import Rectangle # Importa la clase Rectangle del rTree.py
+from visualizadorComun import pyplot, ajustarVentana, dibujarPuntos, filtrarPuntos, dibujarRectangulos, mostrarLeyenda
 
-def _dibujar_mbrs_r_tree(ax, rtree):
+def _dibujar_mbrs_r_tree(ax, rtree, ventana=None, profundidad=None):
     """Función auxiliar para dibujar los MBRs de los nodos del R-Tree."""
     if not rtree or not rtree.root or not rtree.root.entries:
         return
     
-    # Obtener todos los MBRs para dibujar
-    mbrs = rtree.get_all_mbrs() # Este método debe existir en rTree.py
+    # Obtener los MBRs visibles en la ventana, hasta la profundidad indicada
+    if ventana is not None:
+        ventana = Rectangle(ventana[0], ventana[2], ventana[1], ventana[3])
+    mbrs = rtree.iterar_mbrs(ventana, profundidad)
 
-    for mbr in mbrs:
-        if mbr: # Asegurarse de que el MBR no sea None
-            # plt.Rectangle toma (x,y) de la esquina inferior izquierda, ancho, alto
-            rect = plt.Rectangle(
-                (mbr.min_x, mbr.min_y), 
-                mbr.max_x - mbr.min_x, 
-                mbr.max_y - mbr.min_y,
-                linewidth=1, edgecolor='purple', facecolor='none', linestyle='-'
-            )
-            ax.add_patch(rect)
+    # Todos los MBRs en una sola colección: (x, y) de la esquina inferior izquierda, ancho, alto
+    dibujarRectangulos(ax, ((mbr.min_x, mbr.min_y, mbr.max_x - mbr.min_x, mbr.max_y - mbr.min_y)
+                            for mbr in mbrs if mbr), # Asegurarse de que el MBR no sea None
+                       edgecolor='purple', linestyle='-', linewidth=1)
     
     # Opcional: Dibujar los MBRs de las entradas en nodos hoja (los puntos mismos)
     # Esto puede ser mucho si hay muchos puntos y MBRs pequeños.
@@ -29,41 +25,35 @@ def _dibujar_mbrs_r_tree(ax, rtree):
     # o añadir una función específica para ello.
 
 # Dibuja los puntos y los MBRs del R-Tree
-def graficarConRTree(listaPuntos, rtree, xMax=10, yMax=10):
+def graficarConRTree(listaPuntos, rtree, xMax=10, yMax=10, ventana=None, profundidad=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_title("Puntos y MBRs del R-Tree")
     ax.set_xlabel("Eje X")
     ax.set_ylabel("Eje Y")
     ax.grid(True, linestyle='dotted')
 
-    if listaPuntos:
-        x, y = zip(*listaPuntos)
-        ax.scatter(x, y, color='blue', label="Puntos")
-        for px, py in listaPuntos:
-            ax.annotate(f"({px}, {py})", (px, py), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9, color='black')
+    dibujarPuntos(ax, filtrarPuntos(listaPuntos, ventana), color='blue', label="Puntos")
 
-    _dibujar_mbrs_r_tree(ax, rtree)
+    _dibujar_mbrs_r_tree(ax, rtree, ventana, profundidad)
     
-    ax.legend()
+    mostrarLeyenda(ax)
     return fig
 
 # Dibuja puntos, MBRs y resultados de consulta para R-Tree
-def graficarConsultaRTree(puntos, rtree, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10):
+def graficarConsultaRTree(puntos, rtree, puntosResultado=[], puntoConsulta=None, rect=None, vecinoCercano=None, xMax=10, yMax=10, ventana=None, profundidad=None):
+    plt = pyplot()
     fig, ax = plt.subplots()
 
     # Puntos base en azul
-    for punto in puntos:
-        ax.plot(punto[0], punto[1], 'o', color='blue')
-        ax.annotate(f"({punto[0]}, {punto[1]})", (punto[0], punto[1]), textcoords="offset points", xytext=(5, 5), ha='left', fontsize=9)
+    dibujarPuntos(ax, filtrarPuntos(puntos, ventana), color='blue')
 
     # Dibujar los MBRs del R-Tree
-    _dibujar_mbrs_r_tree(ax, rtree)
+    _dibujar_mbrs_r_tree(ax, rtree, ventana, profundidad)
     
     # Resultados en verde
-    for punto in puntosResultado:
-        ax.plot(punto[0], punto[1], 'o', color='green', markersize=8)
+    dibujarPuntos(ax, puntosResultado, color='green', size=64, etiquetas=False, umbral_densidad=None)
 
     # Punto de consulta
     if puntoConsulta:
@@ -86,8 +76,7 @@ def graficarConsultaRTree(puntos, rtree, puntosResultado=[], puntoConsulta=None,
             rect_plot = plt.Rectangle((xMin, yMin), ancho, alto, linewidth=1.5, edgecolor='orange', facecolor='none', linestyle='--')
             ax.add_patch(rect_plot)
 
-    ax.set_xlim(0, xMax)
-    ax.set_ylim(0, yMax)
+    ajustarVentana(ax, xMax, yMax, ventana)
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.grid(True, linestyle='dotted')